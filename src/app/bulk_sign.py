@@ -0,0 +1,160 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: bulk_sign.py
+# ============================================================
+# Descripción:
+# Firma masiva sin pasar por HTTP, para los trabajos de release que
+# dejan cientos de imágenes en disco:
+#
+#   python -m src.app.maintenance bulk-sign [DIR] [--manifest LISTA]
+#       --environment prod [--workers N] [--json]
+#
+# Cada proceso del pool guarda la imagen con el pipeline de ingesta
+# de UploadBinaryUseCase (una sola lectura) y la firma con el servicio
+# de firma configurado (CryptoAdapter, caché y cifrado incluidos). Los
+# registros se escriben juntos al final, en una sola escritura de la
+# base de datos, con RegisterSignedBatchUseCase.
+#
+# Si el proceso muere antes de registrar, las imágenes guardadas
+# quedan huérfanas y las borra el recolector de basura (gc).
+# ============================================================
+
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Estado de cada proceso del pool (se arma una vez en el initializer)
+_WORKER: Dict[str, Any] = {}
+
+
+class _NamedFile:
+    """Archivo abierto con el nombre que tendrá el registro."""
+
+    def __init__(self, path: str):
+        self.filename = os.path.basename(path)
+        self._file = open(path, "rb")
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _init_worker() -> None:
+    from src.application.use_cases import UploadBinaryUseCase
+    from src.config import settings
+    from .storage import build_file_repository, build_signing_service
+
+    file_repo = build_file_repository()
+    signing = build_signing_service(file_repo)
+    _WORKER["file_repo"] = file_repo
+    _WORKER["signing"] = signing
+    # Solo se usa la ingesta: el registro lo hace el proceso principal en lote
+    _WORKER["upload"] = UploadBinaryUseCase(
+        file_repo, None, signing, max_size=settings.UPLOAD_MAX_BYTES, magic_prefixes=settings.UPLOAD_MAGIC_BYTES,
+    )
+
+
+def _sign_one(task: Tuple[str, str]) -> Tuple[str, Optional[Dict[str, Any]], Optional[str]]:
+    path, environment = task
+    file_repo = _WORKER["file_repo"]
+
+    source = _NamedFile(path)
+    binary = None
+    try:
+        binary = _WORKER["upload"].ingest(source, environment)
+        sizes = file_repo.get_sizes(binary.file_path)
+        binary.raw_size = sizes["raw_size"]
+        binary.stored_size = sizes["stored_size"]
+        binary.storage_tier = "hot"
+
+        signature, signed_path = _WORKER["signing"].sign_file(binary)
+        if not signed_path:
+            raise RuntimeError("could not write the signed artifact")
+        binary.status = "signed"
+        binary.signature = signature
+        binary.signed_path = signed_path
+        binary.signed_at = datetime.now().isoformat()
+        return path, binary.to_dict(), None
+    except Exception as e:
+        # Sin registro no debe quedar nada de esta imagen
+        if binary is not None:
+            for artifact in (binary.file_path, binary.signed_path, binary.encrypted_path):
+                if artifact:
+                    file_repo.delete(artifact)
+        return path, None, str(e)
+    finally:
+        source.close()
+
+
+def collect_images(directory: Optional[str] = None, manifest: Optional[str] = None) -> List[str]:
+    """
+    Images to sign: every regular file in `directory` (non-recursive,
+    dotfiles skipped) and/or every path listed in `manifest` (one per
+    line, '#' comments; relative paths are relative to the manifest).
+    """
+    paths: List[str] = []
+    if directory:
+        with os.scandir(directory) as entries:
+            paths += sorted(e.path for e in entries if e.is_file() and not e.name.startswith("."))
+
+    if manifest:
+        base = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest, "r") as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    paths.append(line if os.path.isabs(line) else os.path.join(base, line))
+    return paths
+
+
+def bulk_sign(paths: List[str], environment: str, workers: int = 1) -> Dict[str, Any]:
+    """
+    Signs `paths` in a process pool and registers them in one batch.
+    Returns a summary with the throughput and the failures.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from src.application.use_cases import RegisterSignedBatchUseCase
+    from src.domain.models import BinaryFile
+    from .storage import build_audit_log, build_database_repository, build_release_index
+
+    started = time.perf_counter()
+    signed: List[BinaryFile] = []
+    failed: List[Dict[str, str]] = []
+
+    tasks = [(path, environment) for path in paths]
+    with ProcessPoolExecutor(max_workers=max(1, workers), initializer=_init_worker) as pool:
+        # chunksize > 1 reparte las imágenes en lotes y reduce el ir y venir entre procesos
+        chunksize = max(1, len(tasks) // (max(1, workers) * 4))
+        for path, record, error in pool.map(_sign_one, tasks, chunksize=chunksize):
+            if record is not None:
+                signed.append(BinaryFile.from_dict(record))
+            else:
+                failed.append({"path": path, "error": error})
+                print(f"[BulkSign] {path}: {error}")
+
+    signing_seconds = time.perf_counter() - started
+
+    db_repo = build_database_repository()
+    # La bitácora se vacía al salir (atexit)
+    registered = RegisterSignedBatchUseCase(db_repo, build_audit_log(), build_release_index(db_repo)).execute(signed)
+
+    elapsed = time.perf_counter() - started
+    total_bytes = sum(b.raw_size or 0 for b in signed)
+    return {
+        "signed": registered,
+        "failed": failed,
+        "bytes": total_bytes,
+        "seconds": round(elapsed, 3),
+        "signing_seconds": round(signing_seconds, 3),
+        "files_per_second": round(registered / elapsed, 2) if elapsed else 0.0,
+        "mib_per_second": round(total_bytes / (1024 * 1024) / elapsed, 2) if elapsed else 0.0,
+        "ids": [b.id for b in signed],
+    }
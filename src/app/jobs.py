@@ -0,0 +1,69 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: jobs.py
+# ============================================================
+# Descripción:
+# Arma el worker de la cola de trabajos persistente:
+#
+#   sign   -> ProcessSigningJobUseCase (firmas que una petición no
+#             terminó: falló o el proceso murió a la mitad)
+#   email  -> DeliverNotificationUseCase (correos fuera de la
+#             petición, con reintentos)
+#
+# Con varios workers HTTP solo uno lo arranca (background_jobs); la
+# cola respeta los límites de concurrencia entre procesos de todos
+# modos, así que también se puede correr aparte con
+# `python -m src.app.maintenance jobs --work`.
+# ============================================================
+
+from typing import Any, Callable, Dict
+
+
+def build_job_handlers(queue) -> Dict[str, Callable[[Dict[str, Any]], Any]]:
+    from src.application.use_cases import DeliverNotificationUseCase, ProcessSigningJobUseCase
+    from src.infrastructure.job_queue import QueuedNotifier
+    from .storage import (
+        build_audit_log,
+        build_database_repository,
+        build_delta_service,
+        build_file_repository,
+        build_intent_log,
+        build_notifier,
+        build_release_index,
+        build_signing_service,
+    )
+
+    db_repo = build_database_repository()
+    file_repo = build_file_repository()
+
+    signing = ProcessSigningJobUseCase(
+        db_repo,
+        build_signing_service(file_repo),
+        # El correo de confirmación también pasa por la cola
+        QueuedNotifier(queue),
+        build_delta_service(file_repo),
+        build_audit_log(),
+        build_intent_log(),
+        build_release_index(db_repo),
+    )
+    delivery = DeliverNotificationUseCase(db_repo, build_notifier())
+
+    return {
+        "sign": signing.execute,
+        "email": delivery.execute,
+    }
+
+
+def start_job_worker(threads: int):
+    from src.infrastructure.job_queue import JobWorker
+    from .storage import build_job_queue
+
+    queue = build_job_queue()
+    if queue is None or threads <= 0:
+        return None
+
+    return JobWorker(queue, build_job_handlers(queue), threads=threads).start()
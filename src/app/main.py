@@ -17,9 +17,12 @@ from flask import Flask
 from .routes import register_routes
 from ..common.vars import Hosts
 
-def create_app() -> Flask:
+def create_app(background_jobs: bool = True) -> Flask:
     """
     Create and configure the main Flask application.
+
+    With several workers (src/app/server.py) only one of them runs the
+    startup recovery and the background archiver (`background_jobs`).
     """
     # Ruta absoluta a /src/app/templates
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -27,11 +30,64 @@ def create_app() -> Flask:
 
     app = Flask(__name__, template_folder=templates_dir)
     register_routes(app)
+
+    from src.config import settings
+
+    # Detrás de un proxy inverso, remote_addr sería la del proxy y todos
+    # los clientes compartirían la misma cubeta del límite
+    if settings.TRUSTED_PROXY_COUNT > 0:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        count = settings.TRUSTED_PROXY_COUNT
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=count, x_proto=count, x_host=count)
+
+    # Configuración de firma inválida: se detiene al arrancar, no en la
+    # primera petición que firme
+    if settings.SIGNING_HASH_MODE == "tree":
+        from src.infrastructure.tree_hasher import check_block_size
+        check_block_size(settings.SIGNING_BLOCK_SIZE)
+
+    # Perfiles de peticiones lentas (GET /admin/profiles)
+    if settings.PROFILING_ENABLED:
+        from .profiling import install_profiler
+        from src.infrastructure.profile_store import ProfileRingBuffer
+        store = ProfileRingBuffer(settings.PROFILE_DIR, settings.PROFILE_MAX_ENTRIES)
+        install_profiler(app, store, settings.PROFILE_THRESHOLD_MS, settings.PROFILE_SAMPLE_RATE)
+
+    # Firmas que quedaron a medias por una caída (solo si hay registro)
+    if not background_jobs:
+        return app
+
+    if settings.RECOVERY_ON_STARTUP and settings.INTENT_LOG_ENABLED and os.path.exists(settings.INTENT_LOG_PATH):
+        from .maintenance import recover_interrupted_signings
+        result = recover_interrupted_signings()
+        if result["resigned"] or result["rolled_back"] or result["completed"]:
+            print(f"[Recovery] {result}")
+
+    if settings.ARCHIVE_INTERVAL_SECONDS > 0:
+        from .maintenance import start_background_archiver
+        start_background_archiver(settings.ARCHIVE_INTERVAL_SECONDS, settings.ARCHIVE_AFTER_DAYS)
+
+    # Firmas y correos pendientes en la cola persistente (después de la
+    # recuperación, para no reintentar algo que ella ya resolvió)
+    if settings.JOB_QUEUE_ENABLED and settings.JOB_WORKER_THREADS > 0:
+        from .jobs import start_job_worker
+        start_job_worker(settings.JOB_WORKER_THREADS)
+
     return app
 
-app = create_app()
+def __getattr__(name):
+    """
+    Crea `app` solo cuando alguien la pide (por ejemplo, un servidor
+    WSGI con `src.app.main:app`), no al importar el módulo.
+    """
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == '__main__':
-    app.run(host=Hosts.main[0], port=Hosts.main[1])
+    create_app().run(host=Hosts.main[0], port=Hosts.main[1])
 
 
@@ -0,0 +1,386 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: maintenance.py
+# ============================================================
+# Descripción:
+# Comandos de mantenimiento del almacenamiento, pensados para
+# ejecutarse desde cron o manualmente (desde la raíz del proyecto):
+#
+#   python -m src.app.maintenance retention [--days N] [--dry-run]
+#   python -m src.app.maintenance archive [--days N] [--dry-run] [--no-snapshot]
+#   python -m src.app.maintenance snapshot
+#   python -m src.app.maintenance compact
+#   python -m src.app.maintenance audit (--id ID | --since FECHA --until FECHA)
+#   python -m src.app.maintenance recover
+#   python -m src.app.maintenance manifest
+#   python -m src.app.maintenance events [--id ID] [--actor A] [--status S] [--since F] [--until F] [--json]
+#   python -m src.app.maintenance jobs [--dead] [--requeue ID] [--work]
+#   python -m src.app.maintenance gc [--dry-run] [--purge-days N | --no-purge] [--min-age S] [--upload-max-age S] [--json]
+#   python -m src.app.maintenance keygen --environment E
+#   python -m src.app.maintenance bulk-sign [DIR] [--manifest LISTA] --environment E [--workers N] [--json]
+#   python -m src.app.maintenance decrypt --environment E --input CIFRADO --output IMAGEN
+#
+# Reutilizan los mismos casos de uso y adaptadores que la app web.
+# El archivado también puede correr dentro de la app como tarea en
+# segundo plano (ARCHIVE_INTERVAL_SECONDS > 0); un flock sobre
+# ARCHIVE_DIR asegura que solo un proceso archive a la vez.
+# ============================================================
+
+import os
+import json
+import argparse
+import threading
+
+from src.config import settings
+from src.application.use_cases import (
+    ApplyRetentionPolicyUseCase,
+    ArchiveRecordsUseCase,
+    CollectGarbageUseCase,
+    RecoverInterruptedSigningsUseCase,
+)
+from src.infrastructure.archive_repository import ArchiveRepository
+from src.infrastructure.audit_log import read_events
+from src.infrastructure.json_repository import JsonRepository
+from src.infrastructure.upload_session_repository import UploadSessionRepository
+from src.app.storage import build_file_repository, build_signing_service, build_release_index
+
+
+def _build_repos():
+    return build_file_repository(), JsonRepository()
+
+
+def run_retention(args) -> None:
+    file_repo, json_repo = _build_repos()
+    use_case = ApplyRetentionPolicyUseCase(json_repo, file_repo)
+    moved = use_case.execute(args.days, dry_run=args.dry_run)
+
+    action = "Would move" if args.dry_run else "Moved"
+    print(f"[Retention] {action} {len(moved)} record(s) to cold storage")
+    for file_id in moved:
+        print(f"  - {file_id}")
+
+
+def _archive(max_age_days: int, dry_run: bool = False, snapshot: bool = True, wait: bool = True):
+    """
+    Archiva bajo el candado del archivo histórico. Devuelve (None, "")
+    si `wait` es False y otro proceso está archivando.
+    """
+    json_repo = JsonRepository()
+    archive = ArchiveRepository(settings.ARCHIVE_DIR)
+    use_case = ArchiveRecordsUseCase(json_repo, archive)
+
+    with archive.exclusive(blocking=wait) as acquired:
+        if not acquired:
+            return None, ""
+
+        # Otro proceso pudo archivar justo antes: sin candidatos no hay
+        # copia de seguridad que hacer
+        candidates = use_case.execute(max_age_days, dry_run=True)
+        if dry_run or not candidates:
+            return candidates, ""
+
+        # Copia de seguridad de la base activa antes de modificarla
+        snapshot_path = archive.snapshot(json_repo.json_path) if snapshot else ""
+        return use_case.execute(max_age_days), snapshot_path
+
+
+def run_archive(args) -> None:
+    archived, snapshot_path = _archive(args.days, dry_run=args.dry_run, snapshot=not args.no_snapshot)
+
+    if snapshot_path:
+        print(f"[Archive] Snapshot written to {snapshot_path}")
+    action = "Would archive" if args.dry_run else "Archived"
+    print(f"[Archive] {action} {len(archived)} record(s)")
+    for file_id in archived:
+        print(f"  - {file_id}")
+
+
+def run_snapshot(args) -> None:
+    path = ArchiveRepository(settings.ARCHIVE_DIR).snapshot(JsonRepository().json_path)
+    print(f"[Snapshot] Written to {path}" if path else "[Snapshot] Failed")
+
+
+def run_compact(args) -> None:
+    JsonRepository().compact()
+    print("[Compact] database.json rewritten without indentation")
+
+
+def run_audit(args) -> None:
+    archive = ArchiveRepository(settings.ARCHIVE_DIR)
+
+    if args.id:
+        record = archive.get_record(args.id)
+        records = [record] if record else []
+    else:
+        records = archive.list_records_between(args.since, args.until)
+
+    for record in records:
+        print(f"{record.uploaded_at}  {record.id}  {record.environment}  {record.status}  {record.filename}")
+    print(f"[Audit] {len(records)} archived record(s)")
+
+
+def recover_interrupted_signings():
+    """
+    Completes or rolls back signings left half-finished by a crash.
+    """
+    from src.infrastructure.intent_log import SqliteIntentLog
+
+    file_repo, json_repo = _build_repos()
+    use_case = RecoverInterruptedSigningsUseCase(
+        json_repo, file_repo, build_signing_service(file_repo), SqliteIntentLog(settings.INTENT_LOG_PATH),
+        release_index=build_release_index(json_repo),
+    )
+    return use_case.execute()
+
+
+def run_recover(args) -> None:
+    result = recover_interrupted_signings()
+    print(
+        f"[Recovery] completed={len(result['completed'])} resigned={len(result['resigned'])}"
+        f" rolled_back={len(result['rolled_back'])} temp_files_removed={result['temp_files_removed']}"
+    )
+    for key in ("completed", "resigned", "rolled_back"):
+        for file_id in result[key]:
+            print(f"  - {key}: {file_id}")
+
+
+def run_manifest(args) -> None:
+    json_repo = JsonRepository()
+    count = build_release_index(json_repo).rebuild(json_repo.list_records())
+    print(f"[Manifest] Release index rebuilt with {count} release(s)")
+
+
+def run_events(args) -> None:
+    count = 0
+    for event in read_events(args.dir, args.id, args.actor, args.status, args.since, args.until):
+        count += 1
+        if args.json:
+            print(json.dumps(event, ensure_ascii=False))
+            continue
+        duration = f"  {event['duration_ms']}ms" if "duration_ms" in event else ""
+        error = f"  error={event['error']}" if "error" in event else ""
+        print(
+            f"{event.get('ts')}  {event.get('file_id')}  {event.get('old_status')} -> {event.get('new_status')}"
+            f"  {event.get('actor')}{duration}{error}"
+        )
+    if not args.json:
+        print(f"[Events] {count} event(s)")
+
+
+def run_jobs(args) -> None:
+    from src.infrastructure.job_queue import SqliteJobQueue
+
+    queue = SqliteJobQueue(
+        settings.JOB_QUEUE_PATH,
+        lease_seconds=settings.JOB_LEASE_SECONDS,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+        concurrency=settings.JOB_CONCURRENCY,
+    )
+
+    if args.requeue is not None:
+        ok = queue.requeue(args.requeue)
+        print(f"[Jobs] {'Requeued' if ok else 'No dead job with id'} {args.requeue}")
+        return
+
+    if args.dead:
+        for job in queue.dead_letters():
+            print(f"{job['id']}  {job['kind']}  attempts={job['attempts']}  {json.dumps(job['payload'])}  {job['error']}")
+        return
+
+    if args.work:
+        # Worker en primer plano hasta Ctrl+C
+        from .jobs import start_job_worker
+        worker = start_job_worker(max(1, settings.JOB_WORKER_THREADS))
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            worker.stop()
+        return
+
+    for kind, counts in sorted(queue.stats().items()):
+        print(f"{kind}: " + "  ".join(f"{status}={count}" for status, count in sorted(counts.items())))
+
+
+def run_gc(args) -> None:
+    file_repo, json_repo = _build_repos()
+    use_case = CollectGarbageUseCase(json_repo, file_repo, ArchiveRepository(settings.ARCHIVE_DIR), UploadSessionRepository())
+    report = use_case.execute(
+        purge_after_days=None if args.no_purge else args.purge_days,
+        min_age_seconds=args.min_age,
+        dry_run=args.dry_run,
+        workers=settings.GC_WORKERS,
+        upload_max_age_seconds=args.upload_max_age or None,
+    )
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    for entry in report["orphaned"]:
+        print(f"  - orphaned: {entry['path']} ({entry['size']} bytes)")
+    for kind in ("rejected", "superseded"):
+        for entry in report[kind]:
+            print(f"  - {kind}: {entry['id']} {' '.join(entry['paths'])}")
+    for entry in report["expired_uploads"]:
+        print(f"  - expired upload: {entry['upload_id']} ({entry['size']} bytes)")
+
+    action = "Would reclaim" if args.dry_run else "Reclaimed"
+    print(
+        f"[GC] {action} {report['reclaimed_bytes']} bytes: orphaned={len(report['orphaned'])}"
+        f" rejected={len(report['rejected'])} superseded={len(report['superseded'])}"
+        f" expired_uploads={len(report['expired_uploads'])} errors={report['errors']}"
+    )
+
+
+def run_keygen(args) -> None:
+    from src.infrastructure.stream_encryption import generate_key
+
+    path = settings.ENCRYPTION_KEY_PATH.format(environment=args.environment)
+    try:
+        key_id = generate_key(path)
+    except FileExistsError:
+        print(f"[Keygen] {path} already exists; remove it first to rotate the key")
+        return
+    print(f"[Keygen] Wrote {path} (key id {key_id})")
+
+
+def run_decrypt(args) -> None:
+    from src.infrastructure.stream_encryption import decrypt_stream, load_key
+
+    key = load_key(settings.ENCRYPTION_KEY_PATH.format(environment=args.environment))
+    with open(args.input, "rb") as source, open(args.output, "wb") as dest:
+        size = decrypt_stream(source, dest, key)
+    print(f"[Decrypt] Wrote {size} bytes to {args.output}")
+
+
+def run_bulk_sign(args) -> None:
+    from src.app.bulk_sign import bulk_sign, collect_images
+
+    paths = collect_images(args.directory, args.manifest)
+    if not paths:
+        print("[BulkSign] Nothing to sign")
+        return
+
+    summary = bulk_sign(paths, args.environment, args.workers)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(
+        f"[BulkSign] Signed {summary['signed']}/{len(paths)} image(s), {summary['bytes']} bytes"
+        f" in {summary['seconds']}s: {summary['files_per_second']} files/s,"
+        f" {summary['mib_per_second']} MiB/s, failed={len(summary['failed'])}"
+    )
+
+
+def start_background_archiver(interval_seconds: int, max_age_days: int) -> threading.Thread:
+    """
+    Runs the archiver every `interval_seconds` in a daemon thread.
+    """
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(interval_seconds):
+            try:
+                # Si otra instancia ya está archivando, este ciclo se omite
+                archived, _ = _archive(max_age_days, wait=False)
+                if archived:
+                    print(f"[Archive] Archived {len(archived)} record(s)")
+            except Exception as e:
+                print(f"[Archive] Background run failed: {e}")
+
+    thread = threading.Thread(target=loop, name="archiver", daemon=True)
+    thread.stop = stop
+    thread.start()
+    return thread
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="OTA Signer maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    retention = commands.add_parser("retention", help="Move old rejected/superseded artifacts to cold storage")
+    retention.add_argument("--days", type=int, default=settings.RETENTION_DAYS, help="Minimum age in days")
+    retention.add_argument("--dry-run", action="store_true", help="Only list what would be moved")
+    retention.set_defaults(func=run_retention)
+
+    archive = commands.add_parser("archive", help="Move old signed/rejected records to the compressed archive")
+    archive.add_argument("--days", type=int, default=settings.ARCHIVE_AFTER_DAYS, help="Minimum age in days")
+    archive.add_argument("--dry-run", action="store_true", help="Only list what would be archived")
+    archive.add_argument("--no-snapshot", action="store_true", help="Skip the database snapshot")
+    archive.set_defaults(func=run_archive)
+
+    snapshot = commands.add_parser("snapshot", help="Write a compressed copy of database.json")
+    snapshot.set_defaults(func=run_snapshot)
+
+    compact = commands.add_parser("compact", help="Rewrite database.json without indentation")
+    compact.set_defaults(func=run_compact)
+
+    audit = commands.add_parser("audit", help="Query archived records")
+    audit.add_argument("--id", help="Record id")
+    audit.add_argument("--since", default="", help="ISO date, inclusive")
+    audit.add_argument("--until", default="9999", help="ISO date, exclusive")
+    audit.set_defaults(func=run_audit)
+
+    recover = commands.add_parser("recover", help="Complete or roll back signings interrupted by a crash")
+    recover.set_defaults(func=run_recover)
+
+    manifest = commands.add_parser("manifest", help="Rebuild the latest-signed release index")
+    manifest.set_defaults(func=run_manifest)
+
+    events = commands.add_parser("events", help="Query the status-transition audit log")
+    events.add_argument("--dir", default=settings.AUDIT_DIR, help="Audit log directory")
+    events.add_argument("--id", help="Record id")
+    events.add_argument("--actor", help="Actor, e.g. panel@10.0.0.5")
+    events.add_argument("--status", help="New status")
+    events.add_argument("--since", default="", help="ISO date, inclusive")
+    events.add_argument("--until", default="9999", help="ISO date, exclusive")
+    events.add_argument("--json", action="store_true", help="Print raw JSON lines")
+    events.set_defaults(func=run_events)
+
+    jobs = commands.add_parser("jobs", help="Inspect or run the persistent job queue")
+    jobs.add_argument("--dead", action="store_true", help="List dead-lettered jobs")
+    jobs.add_argument("--requeue", type=int, metavar="ID", help="Retry a dead job")
+    jobs.add_argument("--work", action="store_true", help="Run a job worker in the foreground")
+    jobs.set_defaults(func=run_jobs)
+
+    gc = commands.add_parser("gc", help="Delete orphaned, rejected and superseded blobs and stale upload sessions")
+    gc.add_argument("--dry-run", action="store_true", help="Only report what would be deleted")
+    gc.add_argument("--purge-days", type=int, default=settings.GC_PURGE_AFTER_DAYS,
+                    help="Minimum age of rejected/superseded records to purge")
+    gc.add_argument("--no-purge", action="store_true", help="Only delete orphaned blobs")
+    gc.add_argument("--min-age", type=float, default=settings.GC_MIN_AGE_SECONDS,
+                    help="Minimum age in seconds of an orphaned blob")
+    gc.add_argument("--upload-max-age", type=float, default=settings.GC_UPLOAD_MAX_AGE_SECONDS,
+                    help="Expire chunked upload sessions idle for this many seconds (0 = never)")
+    gc.add_argument("--json", action="store_true", help="Print the report as JSON")
+    gc.set_defaults(func=run_gc)
+
+    keygen = commands.add_parser("keygen", help="Create the encryption master key of an environment")
+    keygen.add_argument("--environment", required=True, help="Environment, e.g. prod")
+    keygen.set_defaults(func=run_keygen)
+
+    decrypt = commands.add_parser("decrypt", help="Decrypt an encrypted signed artifact")
+    decrypt.add_argument("--environment", required=True, help="Environment whose key encrypted it")
+    decrypt.add_argument("--input", required=True, help="Encrypted artifact")
+    decrypt.add_argument("--output", required=True, help="Where to write the signed image")
+    decrypt.set_defaults(func=run_decrypt)
+
+    bulk = commands.add_parser("bulk-sign", help="Sign a directory or list of images without going through HTTP")
+    bulk.add_argument("directory", nargs="?", help="Directory with the images")
+    bulk.add_argument("--manifest", help="File with one image path per line")
+    bulk.add_argument("--environment", required=True, help="Environment of the release")
+    bulk.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Signing processes")
+    bulk.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    bulk.set_defaults(func=run_bulk_sign)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: profiling.py
+# ============================================================
+# Descripción:
+# Middleware opcional (PROFILING_ENABLED) que perfila con cProfile
+# una fracción de las peticiones y conserva el perfil solo si la
+# petición tardó más que el umbral. Así se puede saber después si
+# una carga o aprobación lenta se fue en leer JSON, en disco, en el
+# hash o en SMTP (GET /admin/profiles).
+#
+# cProfile solo mide el hilo que lo activa y no admite dos
+# perfiladores a la vez, por eso se perfila una petición a la vez
+# por proceso; las demás pasan sin costo.
+# ============================================================
+
+import time
+import random
+import threading
+from flask import g, request
+
+
+def install_profiler(app, store, threshold_ms: float, sample_rate: float = 1.0) -> None:
+    import cProfile
+
+    busy = threading.Lock()
+
+    @app.before_request
+    def start_profile():
+        if random.random() >= sample_rate or not busy.acquire(blocking=False):
+            return None
+
+        profiler = cProfile.Profile()
+        g.profile = (profiler, time.perf_counter())
+        profiler.enable()
+        return None
+
+    @app.teardown_request
+    def stop_profile(error=None):
+        profile = g.pop("profile", None)
+        if profile is None:
+            return
+
+        profiler, started = profile
+        try:
+            profiler.disable()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if elapsed_ms >= threshold_ms:
+                store.save(profiler, {
+                    "method": request.method,
+                    "path": request.path,
+                    "endpoint": request.endpoint,
+                    "duration_ms": round(elapsed_ms, 2),
+                    "error": repr(error) if error else None,
+                    "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                })
+        except Exception as e:
+            print(f"[Profiler] Error saving profile for {request.path}: {e}")
+        finally:
+            busy.release()
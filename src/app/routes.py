@@ -11,11 +11,14 @@
 # OTA Signer utilizando el framework Flask. Aquí se gestiona el
 # flujo completo del sistema de firmado digital, incluyendo:
 #
-#   - Carga de binarios
+#   - Carga de binarios (completa o por partes reanudable)
 #   - Aprobación y rechazo desde el panel
 #   - Envío de notificaciones por correo
 #   - Firmado automático para producción
 #   - Tokens de aprobación/rechazo vía correo
+#   - Control de admisión (429/503 con Retry-After) en carga y firma
+#   - Manifiesto de la última versión firmada para dispositivos
+#   - Perfiles de peticiones lentas (/admin/profiles)
 #
 # Las rutas funcionan como capa de presentación, conectando las
 # solicitudes del usuario con los casos de uso del dominio, y
@@ -23,8 +26,9 @@
 # operación, siguiendo una arquitectura limpia y modular.
 # ============================================================
 # src/app/routes.py
-from flask import request, jsonify, render_template, redirect, url_for
+from flask import request, jsonify, render_template, redirect, url_for, send_file
 import os
+import math
 
 from src.application.use_cases import (
     UploadBinaryUseCase,
@@ -32,12 +36,17 @@ from src.application.use_cases import (
     SignBinaryUseCase,
     ApproveBinaryUseCase,
     RejectBinaryUseCase,
+    StartChunkedUploadUseCase,
+    UploadChunkUseCase,
+    FinalizeChunkedUploadUseCase,
+    IdempotencyKeyReused,
 )
 
-from src.infrastructure.file_repository import FileRepository
-from src.infrastructure.json_repository import JsonRepository
-from src.infrastructure.crypto_adapter import CryptoAdapter
-from src.infrastructure.email_notifier import EmailNotifier
+from src.common.lazy import Lazy
+
+# Los adaptadores de infraestructura (SMTP, hash en paralelo, dotenv,
+# etc.) se importan dentro de las funciones que los construyen: así
+# importar este módulo y crear la app no paga su costo de arranque.
 
 
 def register_routes(app):
@@ -45,28 +54,204 @@ def register_routes(app):
     # HOME
     @app.route("/")
     def home():
-        repo = JsonRepository()
-        use_case = ListFilesUseCase(repo)
+        use_case = ListFilesUseCase(database())
         files = use_case.execute()
         return render_template("home.html", files=files)
 
 
     # Shared infrastructure
     def _build_infra():
-        file_repo = FileRepository()
-        json_repo = JsonRepository()
-        crypto = CryptoAdapter(file_repo)
-
-        # 🔥 Configuración fija de correo (sin .env)
-        notifier = EmailNotifier(
-            sender_email="vicentever427@gmail.com",
-            sender_password="qwiw ljey ahnp uuxt",
-            default_receiver="gavicov29@gmail.com"
+        from src.config import settings
+        from .storage import build_signing_service
+
+        file_repo = file_store()
+        json_repo = database()
+        crypto = build_signing_service(
+            file_repo, signing_cache() if settings.SIGNING_CACHE_ENABLED else None
+        )
+
+        # Con cola de trabajos los correos se envían desde el worker de trabajos
+        queue = job_queue()
+        if queue is not None:
+            from src.infrastructure.job_queue import QueuedNotifier
+            return file_repo, json_repo, crypto, QueuedNotifier(queue)
+
+        return file_repo, json_repo, crypto, email_notifier()
+
+    def _build_notifier():
+        from .storage import build_notifier
+        return build_notifier()
+
+    def _build_delta(file_repo):
+        from .storage import build_delta_service
+        return build_delta_service(file_repo)
+
+    def _build_file_store():
+        from .storage import build_file_repository
+        return build_file_repository()
+
+    def _build_upload_repo():
+        from src.infrastructure.upload_session_repository import UploadSessionRepository
+        return UploadSessionRepository()
+
+    def _build_signing_cache():
+        from src.config import settings
+        from src.infrastructure.signing_cache import SignatureCache
+
+        return SignatureCache(
+            settings.SIGNING_CACHE_PATH,
+            max_memory_entries=settings.SIGNING_CACHE_MEMORY_ENTRIES,
+            max_disk_entries=settings.SIGNING_CACHE_DISK_ENTRIES,
         )
 
-        return file_repo, json_repo, crypto, notifier
+    def _build_idempotency_store():
+        from src.config import settings
 
+        # Deduplicación de reintentos de /upload (IDEMPOTENCY_ENABLED)
+        if not settings.IDEMPOTENCY_ENABLED:
+            return None
 
+        from src.infrastructure.idempotency_store import SqliteIdempotencyStore
+        return SqliteIdempotencyStore(settings.IDEMPOTENCY_DB_PATH)
+
+    def _build_audit_log():
+        from .storage import build_audit_log
+        return build_audit_log()
+
+    def _build_intent_log():
+        from .storage import build_intent_log
+        return build_intent_log()
+
+    def _build_job_queue():
+        from .storage import build_job_queue
+        return build_job_queue()
+
+    def _build_rate_limiter():
+        from src.config import settings
+        from src.common.admission import TokenBucketLimiter
+
+        if settings.RATE_LIMIT_PER_MINUTE <= 0:
+            return None
+
+        # Cada worker aplica su parte del límite: las conexiones se
+        # reparten entre ellos, así el total por cliente se mantiene
+        workers = max(1, settings.WORKERS)
+        return TokenBucketLimiter(
+            settings.RATE_LIMIT_PER_MINUTE / 60 / workers,
+            max(1, settings.RATE_LIMIT_BURST // workers),
+        )
+
+    def _build_signing_slots():
+        from src.config import settings
+        from src.common.admission import WeightedSemaphore
+        return WeightedSemaphore(max(1, settings.SIGNING_CAPACITY_BYTES // max(1, settings.WORKERS)))
+
+    def _build_release_index():
+        from .storage import build_release_index
+        return build_release_index(database())
+
+    def _build_database():
+        from .storage import build_database_repository
+        return build_database_repository()
+
+    def _build_profile_store():
+        from src.config import settings
+        from src.infrastructure.profile_store import ProfileRingBuffer
+        return ProfileRingBuffer(settings.PROFILE_DIR, settings.PROFILE_MAX_ENTRIES)
+
+    def _build_metrics_board():
+        from src.config import settings
+
+        # Solo con varios workers hace falta juntar las métricas
+        if settings.WORKERS <= 1:
+            return None
+
+        from src.infrastructure.metrics_board import SharedMetricsBoard
+        return SharedMetricsBoard(settings.RUN_DIR, _local_metrics, settings.METRICS_PUBLISH_INTERVAL)
+
+    # Compartidos entre peticiones (se crean en el primer uso):
+    #   - upload_repo conserva el hash incremental de cada carga por partes
+    #   - signing_cache conserva el LRU en memoria y sus contadores
+    #   - rate_limiter y signing_slots llevan la carga del proceso
+    #   - audit_log mantiene la cola y el hilo escritor de la bitácora
+    #   - email_notifier acumula los eventos del modo resumen
+    #   - file_store conserva el cliente S3 y su caché local
+    #   - metrics_board publica las métricas de este worker a los demás
+    #   - release_index sirve los manifiestos desde memoria
+    #   - job_queue recibe los trabajos de firma y correo
+    #   - database conserva la caché de lectura de registros
+    database = Lazy(_build_database)
+    file_store = Lazy(_build_file_store)
+    upload_repo = Lazy(_build_upload_repo)
+    signing_cache = Lazy(_build_signing_cache)
+    idempotency_store = Lazy(_build_idempotency_store)
+    rate_limiter = Lazy(_build_rate_limiter)
+    signing_slots = Lazy(_build_signing_slots)
+    audit_log = Lazy(_build_audit_log)
+    intent_log = Lazy(_build_intent_log)
+    email_notifier = Lazy(_build_notifier)
+    metrics_board = Lazy(_build_metrics_board)
+    profile_store = Lazy(_build_profile_store)
+    release_index = Lazy(_build_release_index)
+    job_queue = Lazy(_build_job_queue)
+
+    def _actor(channel):
+        # Quién hizo el cambio: canal (panel, api, email) y dirección del cliente
+        return f"{channel}@{request.remote_addr or 'unknown'}"
+
+
+    # ============================================
+    # ADMISSION CONTROL
+    #   429 -> el cliente excedió su límite de peticiones
+    #   503 -> no hay cupo para hashear/firmar más bytes ahora
+    # ============================================
+    RATE_LIMITED_ENDPOINTS = {
+        "upload_file",
+        "start_chunked_upload",
+        "finalize_chunked_upload",
+        "approve_file",
+        "sign_file",
+    }
+
+    @app.before_request
+    def rate_limit():
+        if request.endpoint not in RATE_LIMITED_ENDPOINTS:
+            return None
+
+        limiter = rate_limiter()
+        if limiter is None:
+            return None
+
+        retry_after = limiter.acquire(request.remote_addr or "unknown")
+        if retry_after:
+            response = jsonify({"error": "Too many requests"})
+            response.headers["Retry-After"] = str(math.ceil(retry_after))
+            return response, 429
+        return None
+
+    def _signing_slot(weight):
+        from src.config import settings
+        return signing_slots().slot(weight, settings.ADMISSION_TIMEOUT_SECONDS)
+
+    def _overloaded():
+        from src.config import settings
+
+        response = jsonify({"error": "Server is busy, try again later"})
+        response.headers["Retry-After"] = str(settings.ADMISSION_RETRY_AFTER_SECONDS)
+        return response, 503
+
+    def _upload_weight():
+        # Sin Content-Length (transfer chunked) se reserva lo máximo que
+        # puede medir la carga; sin límite configurado, todo el cupo
+        from src.config import settings
+
+        if request.content_length is not None:
+            return request.content_length
+        return settings.UPLOAD_MAX_BYTES or signing_slots().capacity
+
+    def _record_weight(json_repo, file_id):
+        record = json_repo.get_record(file_id)
+        return record.raw_size if record and record.raw_size else 0
 
 
     # ============================================
@@ -74,27 +259,164 @@ def register_routes(app):
     # ============================================
     @app.route("/upload", methods=["POST"])
     def upload_file():
-        if "file" not in request.files:
-            return jsonify({"error": "No file provided"}), 400
+        from src.config import settings
+        from src.common.ingest import IngestRejected, PayloadTooLarge
+
+        # El cupo se toma antes de leer el cuerpo: request.files lo
+        # recibe completo y lo escribe en disco
+        with _signing_slot(_upload_weight()) as admitted:
+            if not admitted:
+                return _overloaded()
+
+            if "file" not in request.files:
+                return jsonify({"error": "No file provided"}), 400
+
+            file = request.files["file"]
+            environment = request.form.get("environment", "dev")
+
+            file_repo, json_repo, crypto, notifier = _build_infra()
+            use_case = UploadBinaryUseCase(
+                file_repo, json_repo, crypto, notifier, _build_delta(file_repo), idempotency_store(), audit_log(), intent_log(),
+                release_index(), job_queue(), settings.UPLOAD_MAX_BYTES, settings.UPLOAD_MAGIC_BYTES,
+            )
+            try:
+                binary = use_case.execute(file, environment, request.headers.get("Idempotency-Key"), _actor("api"))
+            except IngestRejected as e:
+                return jsonify({"error": str(e)}), 413 if isinstance(e, PayloadTooLarge) else 415
+            except IdempotencyKeyReused as e:
+                return jsonify({"error": str(e)}), 422
+
+        if binary is None:
+            return jsonify({"error": "A request with this Idempotency-Key is already in progress"}), 409
+
+        return jsonify(binary.to_dict()), 200
+
+
+    # ============================================
+    # CHUNKED / RESUMABLE UPLOAD
+    #   POST   /uploads                     -> iniciar
+    #   PUT    /uploads/<id>  (Upload-Offset) -> enviar bloque
+    #   GET    /uploads/<id>                -> offset actual (reanudar)
+    #   POST   /uploads/<id>/finalize       -> registrar y firmar
+    #   DELETE /uploads/<id>                -> cancelar
+    # ============================================
+    @app.route("/uploads", methods=["POST"])
+    def start_chunked_upload():
+        data = request.get_json(silent=True) or request.form
+        filename = data.get("filename")
+        if not filename:
+            return jsonify({"error": "filename is required"}), 400
+
+        environment = data.get("environment", "dev")
+        total_size = data.get("total_size")
+        try:
+            total_size = int(total_size) if total_size is not None else None
+        except (TypeError, ValueError):
+            return jsonify({"error": "total_size must be an integer"}), 400
+        if total_size is not None and total_size < 0:
+            return jsonify({"error": "total_size must not be negative"}), 400
+
+        from src.config import settings
+        from src.common.ingest import PayloadTooLarge
+        from .storage import hash_algorithm_for
+
+        # El límite también acota el offset de las cargas sin total_size
+        use_case = StartChunkedUploadUseCase(upload_repo(), settings.UPLOAD_MAX_BYTES)
+        try:
+            session = use_case.execute(filename, environment, total_size, hash_algorithm_for(environment))
+        except PayloadTooLarge as e:
+            return jsonify({"error": str(e)}), 413
+
+        return jsonify(session), 201
+
+
+    @app.route("/uploads/<upload_id>", methods=["GET"])
+    def chunked_upload_status(upload_id):
+        session = upload_repo().get_session(upload_id)
+        if session is None:
+            return jsonify({"error": "Upload session not found"}), 404
+
+        return jsonify(session), 200
+
+
+    @app.route("/uploads/<upload_id>", methods=["PUT"])
+    def upload_chunk(upload_id):
+        try:
+            offset = int(request.headers.get("Upload-Offset", request.args.get("offset", "")))
+        except ValueError:
+            return jsonify({"error": "Upload-Offset header is required"}), 400
+        if offset < 0:
+            return jsonify({"error": "Upload-Offset must not be negative"}), 400
+
+        # El cuerpo se lee en streaming y se escribe directo a disco
+        use_case = UploadChunkUseCase(upload_repo())
+        session = use_case.execute(upload_id, offset, request.stream)
+
+        if session is None:
+            return jsonify({"error": "Upload session not found"}), 404
+
+        if session.get("finalizing"):
+            return jsonify({"error": "Upload is being finalized", **session}), 409
+
+        if not session["accepted"]:
+            return jsonify({"error": "Offset mismatch", **session}), 409
 
-        file = request.files["file"]
-        environment = request.form.get("environment", "dev")
+        if session["overflow"]:
+            if session["total_size"] is None:
+                return jsonify({"error": f"Upload exceeds the {session.get('max_size')} byte limit", **session}), 413
+            return jsonify({"error": "Chunk exceeds the declared total_size", **session}), 413
+
+        return jsonify(session), 200
+
+
+    @app.route("/uploads/<upload_id>/finalize", methods=["POST"])
+    def finalize_chunked_upload(upload_id):
+        from src.config import settings
+        from src.common.ingest import IngestRejected
 
         file_repo, json_repo, crypto, notifier = _build_infra()
-        use_case = UploadBinaryUseCase(file_repo, json_repo, crypto, notifier)
-        binary = use_case.execute(file, environment)
+        use_case = FinalizeChunkedUploadUseCase(
+            upload_repo(), file_repo, json_repo, crypto, notifier, _build_delta(file_repo),
+            audit_log(), intent_log(), release_index(), job_queue(), settings.UPLOAD_MAGIC_BYTES,
+        )
+
+        session = upload_repo().get_session(upload_id)
+        with _signing_slot(session["offset"] if session else 0) as admitted:
+            if not admitted:
+                return _overloaded()
+            try:
+                binary = use_case.execute(upload_id, _actor("api"))
+            except IngestRejected as e:
+                return jsonify({"error": str(e)}), 415
+
+        if binary is None:
+            return jsonify({"error": "Upload not found or incomplete"}), 400
 
         return jsonify(binary.to_dict()), 200
 
 
+    @app.route("/uploads/<upload_id>", methods=["DELETE"])
+    def abort_chunked_upload(upload_id):
+        if not upload_repo().abort(upload_id):
+            return jsonify({"error": "Upload session not found"}), 404
+
+        return jsonify({"message": "Upload aborted"}), 200
+
+
     # ============================================
     # APPROVE FROM PANEL (by file_id)
     # ============================================
     @app.route("/approve/<file_id>", methods=["POST"])
     def approve_file(file_id):
         file_repo, json_repo, crypto, notifier = _build_infra()
-        use_case = ApproveBinaryUseCase(json_repo, crypto, notifier)
-        result = use_case.execute(file_id)
+        use_case = ApproveBinaryUseCase(json_repo, crypto, notifier, _build_delta(file_repo), audit_log(), intent_log(),
+            release_index(), job_queue(),
+        )
+
+        with _signing_slot(_record_weight(json_repo, file_id)) as admitted:
+            if not admitted:
+                return _overloaded()
+            result = use_case.execute(file_id, _actor("panel"))
 
         if result is None:
             return jsonify({"error": "File not found or cannot be approved"}), 404
@@ -108,8 +430,8 @@ def register_routes(app):
     @app.route("/reject/<file_id>", methods=["POST"])
     def reject_file(file_id):
         file_repo, json_repo, crypto, notifier = _build_infra()
-        use_case = RejectBinaryUseCase(json_repo, notifier)
-        result = use_case.execute(file_id)
+        use_case = RejectBinaryUseCase(json_repo, notifier, audit_log())
+        result = use_case.execute(file_id, _actor("panel"))
 
         if result is None:
             return jsonify({"error": "File not found or cannot be rejected"}), 404
@@ -128,8 +450,14 @@ def register_routes(app):
             return jsonify({"error": "file_id is required"}), 400
 
         file_repo, json_repo, crypto, notifier = _build_infra()
-        use_case = SignBinaryUseCase(json_repo, crypto, notifier)
-        binary = use_case.execute(file_id)
+        use_case = SignBinaryUseCase(json_repo, crypto, notifier, _build_delta(file_repo), audit_log(), intent_log(),
+            release_index(), job_queue(),
+        )
+
+        with _signing_slot(_record_weight(json_repo, file_id)) as admitted:
+            if not admitted:
+                return _overloaded()
+            binary = use_case.execute(file_id, _actor("api"))
 
         if binary is None:
             return jsonify({"error": "Cannot sign file (not found or wrong status)"}), 400
@@ -149,8 +477,16 @@ def register_routes(app):
             return "Token inválido o archivo no encontrado", 404
 
         # Ejecuta el caso de uso normal
-        approve_usecase = ApproveBinaryUseCase(json_repo, crypto, notifier)
-        result = approve_usecase.execute(binary.id)
+        approve_usecase = ApproveBinaryUseCase(json_repo, crypto, notifier, _build_delta(file_repo), audit_log(), intent_log(),
+            release_index(), job_queue(),
+        )
+
+        with _signing_slot(binary.raw_size or 0) as admitted:
+            if not admitted:
+                from src.config import settings
+                retry_after = {"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)}
+                return "El servidor está ocupado, intenta de nuevo en unos minutos", 503, retry_after
+            result = approve_usecase.execute(binary.id, _actor("email"))
 
         if result is None:
             return "El archivo no pudo ser aprobado", 400
@@ -169,10 +505,187 @@ def register_routes(app):
         if not binary:
             return "Token inválido o archivo no encontrado", 404
 
-        reject_usecase = RejectBinaryUseCase(json_repo, notifier)
-        result = reject_usecase.execute(binary.id)
+        reject_usecase = RejectBinaryUseCase(json_repo, notifier, audit_log())
+        result = reject_usecase.execute(binary.id, _actor("email"))
 
         if result is None:
             return "El archivo no pudo ser rechazado", 400
 
         return render_template("email_action_success.html", message="Archivo rechazado correctamente")
+
+
+    # =====================================================
+    # DEVICE MANIFEST (latest signed release)
+    #   GET /manifest/<environment>/<filename>
+    #   Se sirve desde memoria; con If-None-Match responde 304
+    # =====================================================
+    @app.route("/manifest/<environment>/<path:filename>", methods=["GET"])
+    def release_manifest(environment, filename):
+        from src.config import settings
+
+        served = release_index().manifest(environment, filename)
+        if served is None:
+            return jsonify({"error": "No signed release for this environment/filename"}), 404
+
+        body, etag = served
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={settings.MANIFEST_MAX_AGE}",
+        }
+        if etag in request.headers.get("If-None-Match", ""):
+            return "", 304, headers
+        return body, 200, {**headers, "Content-Type": "application/json"}
+
+
+    # =====================================================
+    # BLOCK PROOF (releases firmados en modo "tree")
+    #   GET /manifest/<environment>/<filename>/blocks/<index>
+    #   -> hash del bloque y su ruta de prueba hasta la raíz firmada
+    # =====================================================
+    @app.route("/manifest/<environment>/<path:filename>/blocks/<int:index>", methods=["GET"])
+    def release_block_proof(environment, filename, index):
+        from src.infrastructure.tree_hasher import merkle_proof
+
+        entry = release_index().latest(environment, filename)
+        binary = database().get_record(entry["id"]) if entry else None
+        if binary is None or not binary.block_hashes:
+            return jsonify({"error": "No tree-signed release for this environment/filename"}), 404
+        if not 0 <= index < len(binary.block_hashes):
+            return jsonify({"error": "Block index out of range"}), 404
+
+        algorithm = binary.hash_algorithm or "sha256"
+        return jsonify({
+            "id": binary.id,
+            "index": index,
+            "leaf_count": len(binary.block_hashes),
+            "block_size": binary.block_size,
+            "hash_algorithm": algorithm,
+            "leaf": binary.block_hashes[index],
+            "proof": merkle_proof(binary.block_hashes, index, algorithm),
+            "root": binary.signature,
+        }), 200
+
+
+    # =====================================================
+    # STATS (agregados mantenidos por el repositorio)
+    #   GET /api/stats -> conteos por estado/ambiente, bytes y
+    #                     firmas por hora, sin recorrer los registros
+    # =====================================================
+    @app.route("/api/stats", methods=["GET"])
+    def stats():
+        return jsonify(database().aggregates()), 200
+
+
+    # =====================================================
+    # SEARCH
+    #   GET /api/search?q=<prefijo>&limit=N -> registros cuyo
+    #   filename, una palabra del filename o id empieza con q
+    # =====================================================
+    @app.route("/api/search", methods=["GET"])
+    def search():
+        query = request.args.get("q", "").strip()
+        if not query:
+            return jsonify({"error": "q is required"}), 400
+
+        try:
+            limit = min(100, max(1, int(request.args.get("limit", 20))))
+        except ValueError:
+            return jsonify({"error": "limit must be an integer"}), 400
+
+        return jsonify({"query": query, "results": database().search(query, limit)}), 200
+
+
+    # =====================================================
+    # METRICS
+    # =====================================================
+    def _local_metrics():
+        from src.config import settings
+
+        limiter = rate_limiter()
+        log = audit_log()
+        db = database()
+        return {
+            # Con la caché desactivada no se abre su base SQLite solo para reportarla
+            "signing_cache": signing_cache().stats() if settings.SIGNING_CACHE_ENABLED else None,
+            "admission": {
+                "signing": signing_slots().stats(),
+                "rate_limited": limiter.rejected if limiter else 0,
+            },
+            "audit": {"written": log.written, "dropped": log.dropped} if log else None,
+            "database_cache": db.stats() if hasattr(db, "stats") else None,
+        }
+
+    @app.before_request
+    def start_metrics_board():
+        # Arranca la publicación en la primera petición del worker
+        metrics_board()
+
+    def _job_metrics():
+        # La cola es compartida: se reporta una vez, no por worker
+        queue = job_queue()
+        return queue.stats() if queue is not None else None
+
+    @app.route("/api/metrics", methods=["GET"])
+    def metrics():
+        board = metrics_board()
+        if board is None:
+            return jsonify({**_local_metrics(), "jobs": _job_metrics()}), 200
+
+        # Varios workers: este proceso, cada worker y la suma de todos
+        from src.infrastructure.metrics_board import merge_counters
+
+        workers = board.collect()
+        return jsonify({
+            **workers[board.pid],
+            "worker": board.pid,
+            "workers": {str(pid): snapshot for pid, snapshot in workers.items()},
+            "totals": merge_counters(workers.values()),
+            "jobs": _job_metrics(),
+        }), 200
+
+
+    # =====================================================
+    # PROFILES OF SLOW REQUESTS (admin)
+    #   GET /admin/profiles                   -> lista (más nuevos primero)
+    #   GET /admin/profiles/<id>              -> reporte pstats en texto
+    #   GET /admin/profiles/<id>?format=pstats -> archivo para snakeviz, etc.
+    # =====================================================
+    def _admin_denied():
+        from src.config import settings
+
+        if not settings.PROFILING_ENABLED:
+            return jsonify({"error": "Profiling is disabled"}), 404
+        # Sin ADMIN_TOKEN configurado los perfiles no se exponen a nadie
+        if not settings.ADMIN_TOKEN or request.headers.get("X-Admin-Token") != settings.ADMIN_TOKEN:
+            return jsonify({"error": "Forbidden"}), 403
+        return None
+
+    @app.route("/admin/profiles", methods=["GET"])
+    def list_profiles():
+        denied = _admin_denied()
+        if denied:
+            return denied
+        return jsonify(profile_store().list()), 200
+
+    @app.route("/admin/profiles/<profile_id>", methods=["GET"])
+    def get_profile(profile_id):
+        denied = _admin_denied()
+        if denied:
+            return denied
+
+        store = profile_store()
+        if request.args.get("format") == "pstats":
+            path = store.raw_path(profile_id)
+            if path is None:
+                return jsonify({"error": "Profile not found"}), 404
+            return send_file(path, mimetype="application/octet-stream", as_attachment=True,
+                             download_name=f"{profile_id}.prof")
+
+        sort = request.args.get("sort", "cumulative")
+        if sort not in ("cumulative", "tottime", "calls"):
+            return jsonify({"error": "sort must be cumulative, tottime or calls"}), 400
+
+        report = store.report(profile_id, sort=sort)
+        if report is None:
+            return jsonify({"error": "Profile not found"}), 404
+        return report, 200, {"Content-Type": "text/plain; charset=utf-8"}
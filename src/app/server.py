@@ -0,0 +1,258 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: server.py
+# ============================================================
+# Descripción:
+# Lanzador de producción con varios procesos (prefork). El proceso
+# maestro abre el socket una sola vez y crea WORKERS procesos hijo
+# que aceptan conexiones del mismo socket; cada uno construye su
+# propia app con create_app() y atiende peticiones en hilos.
+#
+#   SIGHUP          -> recarga ordenada: arranca workers nuevos (con
+#                      el código actual) y retira los anteriores
+#                      cuando terminan sus peticiones en curso
+#   SIGTERM/SIGINT  -> detiene el servidor de la misma forma
+#   worker caído    -> se reemplaza automáticamente
+#
+# El estado que comparten los workers vive fuera del proceso:
+# database.json (flock), cargas por partes (flock por sesión),
+# SQLite (caché de firmas, idempotencia, intenciones), bitácora
+# de auditoría (O_APPEND) y el tablero de métricas en RUN_DIR.
+# Solo el worker 0 ejecuta la recuperación al arrancar y el
+# archivado en segundo plano.
+#
+# Uso:
+#   python -m src.app.server --workers 4
+#   kill -HUP $(cat data/run/master.pid)
+# ============================================================
+
+import os
+import sys
+import time
+import errno
+import signal
+import socket
+import argparse
+import threading
+from typing import Dict, Optional
+
+from src.config import settings
+
+
+class PreforkServer:
+    """
+    Master process: owns the listening socket and supervises workers.
+    """
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 5000,
+        workers: int = 1,
+        graceful_timeout: float = 30.0,
+        run_dir: str = settings.RUN_DIR,
+        backlog: int = 2048,
+    ):
+        self.host = host
+        self.port = port
+        self.num_workers = max(1, workers)
+        self.graceful_timeout = graceful_timeout
+        self.run_dir = run_dir
+        self.backlog = backlog
+        self.pid = os.getpid()
+
+        self.socket: Optional[socket.socket] = None
+        self.workers: Dict[int, int] = {}        # pid -> slot
+        self.retiring: Dict[int, float] = {}     # pid -> instante límite
+        self._reload = False
+        self._stop = False
+
+    # --- Maestro ---------------------------------------------
+
+    def __bind(self) -> socket.socket:
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(self.backlog)
+        sock.set_inheritable(True)
+        return sock
+
+    def __write_pidfile(self) -> str:
+        os.makedirs(self.run_dir, exist_ok=True)
+        path = os.path.join(self.run_dir, "master.pid")
+        with open(path, "w") as f:
+            f.write(str(self.pid))
+        return path
+
+    def __on_reload(self, signum, frame) -> None:
+        self._reload = True
+
+    def __on_stop(self, signum, frame) -> None:
+        self._stop = True
+
+    def run(self) -> int:
+        self.socket = self.__bind()
+        self.port = self.socket.getsockname()[1]
+        pidfile = self.__write_pidfile()
+
+        # Los hijos leen el número de workers para repartir los límites
+        settings.WORKERS = self.num_workers
+
+        signal.signal(signal.SIGHUP, self.__on_reload)
+        signal.signal(signal.SIGTERM, self.__on_stop)
+        signal.signal(signal.SIGINT, self.__on_stop)
+
+        print(f"[PreforkServer] Listening on {self.host}:{self.port} with {self.num_workers} worker(s), master pid {self.pid}")
+        try:
+            for slot in range(self.num_workers):
+                self.__spawn(slot)
+            self.__supervise()
+        finally:
+            if os.getpid() == self.pid:
+                self.__shutdown()
+                try:
+                    os.remove(pidfile)
+                except OSError:
+                    pass
+        return 0
+
+    def __supervise(self) -> None:
+        while not self._stop:
+            if self._reload:
+                self._reload = False
+                self.__reload()
+
+            self.__reap()
+
+            # Workers que no terminan a tiempo se detienen a la fuerza
+            now = time.monotonic()
+            for pid, deadline in list(self.retiring.items()):
+                if now > deadline:
+                    self.__kill(pid, signal.SIGKILL)
+
+            time.sleep(0.2)
+
+    def __reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            self.retiring.pop(pid, None)
+            slot = self.workers.pop(pid, None)
+            if slot is not None and not self._stop:
+                print(f"[PreforkServer] Worker {pid} exited (status {status}), restarting slot {slot}")
+                time.sleep(0.5)
+                self.__spawn(slot)
+
+    def __reload(self) -> None:
+        print(f"[PreforkServer] Reloading {len(self.workers)} worker(s)")
+        old = list(self.workers)
+        self.workers = {}
+        for slot in range(self.num_workers):
+            self.__spawn(slot)
+        self.__retire(old)
+
+    def __retire(self, pids) -> None:
+        deadline = time.monotonic() + self.graceful_timeout
+        for pid in pids:
+            self.retiring[pid] = deadline
+            self.__kill(pid, signal.SIGTERM)
+
+    @staticmethod
+    def __kill(pid: int, sig: int) -> None:
+        try:
+            os.kill(pid, sig)
+        except OSError as e:
+            if e.errno != errno.ESRCH:
+                raise
+
+    def __shutdown(self) -> None:
+        print("[PreforkServer] Stopping workers")
+        self.__retire(list(self.workers))
+        self.workers = {}
+        while self.retiring:
+            self.__reap()
+            now = time.monotonic()
+            for pid, deadline in list(self.retiring.items()):
+                if now > deadline:
+                    self.__kill(pid, signal.SIGKILL)
+            time.sleep(0.1)
+        self.socket.close()
+
+    def __spawn(self, slot: int) -> int:
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = slot
+            return pid
+
+        # --- Hijo: nunca regresa al ciclo del maestro ---
+        code = 1
+        try:
+            code = self.__serve(slot)
+        except Exception as e:
+            print(f"[PreforkServer] Worker {os.getpid()} failed: {e}")
+        finally:
+            sys.stdout.flush()
+        sys.exit(code)
+
+    # --- Worker ----------------------------------------------
+
+    def __serve(self, slot: int) -> int:
+        # Hasta que el servidor arranque, SIGTERM termina el worker de inmediato
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        from werkzeug.serving import make_server
+        from src.app.main import create_app
+
+        # Recuperación y archivado: una sola vez por servidor
+        app = create_app(background_jobs=(slot == 0))
+        server = make_server(self.host, self.port, app, threaded=True, fd=self.socket.fileno())
+        self.socket.close()
+
+        # Al detenerse se espera a los hilos con peticiones en curso
+        server.daemon_threads = False
+        server.block_on_close = True
+
+        def stop(signum=None, frame=None):
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        def watch_master():
+            # Si el maestro muere sin avisar, el worker no queda huérfano
+            while os.getppid() == self.pid:
+                time.sleep(1)
+            stop()
+
+        signal.signal(signal.SIGTERM, stop)
+        threading.Thread(target=watch_master, name="watch-master", daemon=True).start()
+
+        server.serve_forever()
+        server.server_close()
+        return 0
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="OTA Signer production server (multi-process)")
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--workers", type=int, default=settings.WORKERS, help="Worker processes")
+    parser.add_argument("--graceful-timeout", type=float, default=settings.WORKER_GRACEFUL_TIMEOUT,
+                        help="Seconds a worker has to finish in-flight requests on reload/stop")
+    args = parser.parse_args(argv)
+
+    server = PreforkServer(args.host, args.port, args.workers, args.graceful_timeout)
+    sys.exit(server.run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: storage.py
+# ============================================================
+# Descripción:
+# Construye el repositorio de archivos según STORAGE_BACKEND,
+# para que la app web y los comandos de mantenimiento usen el
+# mismo almacenamiento (disco local o almacén de objetos S3), el
+# servicio de firma configurado sobre ese almacenamiento (con caché y
+# cifrado opcionales) y el índice de últimas versiones firmadas.
+#
+# También arma los servicios opcionales (correo, deltas, bitácora,
+# registro de intenciones y cola de trabajos) para que las rutas y
+# el worker de trabajos los configuren igual.
+# ============================================================
+
+from src.config import settings
+from typing import Optional
+from src.application.ports import (
+    IAuditLog,
+    IDatabaseRepository,
+    IDeltaService,
+    IFileRepository,
+    IIntentLog,
+    IJobQueue,
+    INotifierService,
+    IReleaseIndex,
+    ISigningService,
+)
+
+
+def build_file_repository() -> IFileRepository:
+    if settings.STORAGE_BACKEND == "s3":
+        from src.infrastructure.object_store_repository import ObjectStoreFileRepository
+
+        return ObjectStoreFileRepository(
+            settings.S3_BUCKET,
+            prefix=settings.S3_PREFIX,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region_name=settings.S3_REGION,
+            cache_dir=settings.S3_CACHE_DIR,
+            cache_max_bytes=settings.S3_CACHE_MAX_BYTES,
+            cache_min_age=settings.S3_CACHE_MIN_AGE,
+            chunk_size=settings.S3_MULTIPART_CHUNK_SIZE,
+            cold_storage_class=settings.S3_COLD_STORAGE_CLASS or None,
+        )
+
+    if settings.STORAGE_BACKEND != "local":
+        raise ValueError(f"Unknown STORAGE_BACKEND '{settings.STORAGE_BACKEND}', expected 'local' or 's3'")
+
+    from src.infrastructure.compression import parse_xz_preset
+    from src.infrastructure.file_repository import FileRepository
+
+    return FileRepository(
+        compression=settings.STORAGE_COMPRESSION or None,
+        compression_level=settings.STORAGE_COMPRESSION_LEVEL,
+        cold_preset=parse_xz_preset(settings.STORAGE_COLD_PRESET),
+    )
+
+
+def build_database_repository() -> IDatabaseRepository:
+    from src.infrastructure.json_repository import JsonRepository
+
+    repo = JsonRepository()
+    if not settings.DB_CACHE_ENABLED:
+        return repo
+
+    from src.infrastructure.record_cache import CachedDatabaseRepository
+
+    # El sello es la propia base de datos: cualquier escritura (de otro
+    # worker o de un comando de mantenimiento) invalida la caché
+    return CachedDatabaseRepository(
+        repo,
+        max_entries=settings.DB_CACHE_MAX_ENTRIES,
+        stamp_path=repo.json_path,
+        check_interval=settings.DB_CACHE_CHECK_INTERVAL,
+    )
+
+
+def build_signing_service(file_repo: IFileRepository, cache=None) -> ISigningService:
+    from src.infrastructure.crypto_adapter import CryptoAdapter
+
+    signing: ISigningService = CryptoAdapter(
+        file_repo,
+        hash_mode=settings.SIGNING_HASH_MODE,
+        block_size=settings.SIGNING_BLOCK_SIZE,
+        max_workers=settings.SIGNING_WORKERS,
+        hash_algorithm=settings.SIGNING_HASH_ALGORITHM,
+        environment_algorithms=settings.SIGNING_HASH_ALGORITHMS,
+    )
+
+    # Caché de firmas compartida: se consulta antes de hashear/escribir
+    if cache is not None:
+        from src.infrastructure.signing_cache import CachedSigningService
+        signing = CachedSigningService(signing, cache, file_repo)
+
+    # Cifrado después de firmar: va por fuera de la caché para que un
+    # acierto también produzca el artefacto cifrado
+    if settings.ENCRYPTION_ENVIRONMENTS:
+        from src.infrastructure.stream_encryption import EncryptingSigningService, load_environment_keys
+
+        signing = EncryptingSigningService(
+            signing,
+            file_repo,
+            load_environment_keys(settings.ENCRYPTION_KEY_PATH, settings.ENCRYPTION_ENVIRONMENTS),
+            algorithm=settings.ENCRYPTION_ALGORITHM,
+            segment_size=settings.ENCRYPTION_SEGMENT_SIZE,
+            workers=settings.ENCRYPTION_WORKERS,
+        )
+    return signing
+
+
+def hash_algorithm_for(environment: str) -> str:
+    # El mismo criterio que CryptoAdapter.algorithm_for, sin construir el adaptador
+    return settings.SIGNING_HASH_ALGORITHMS.get(environment, settings.SIGNING_HASH_ALGORITHM)
+
+
+def build_release_index(db_repo: IDatabaseRepository) -> IReleaseIndex:
+    from src.infrastructure.release_index import JsonReleaseIndex
+
+    index = JsonReleaseIndex(settings.RELEASE_INDEX_PATH)
+    # Primera vez (o índice borrado): se materializa desde la base de datos
+    if not index.exists():
+        index.rebuild(db_repo.list_records())
+    return index
+
+
+def build_notifier() -> Optional[INotifierService]:
+    # Credenciales SMTP desde el entorno (EMAIL_SENDER, EMAIL_PASSWORD)
+    if not settings.EMAIL_SENDER or not settings.EMAIL_PASSWORD:
+        print("[Storage] EMAIL_SENDER/EMAIL_PASSWORD not set, email notifications are disabled")
+        return None
+
+    from src.infrastructure.email_notifier import EmailNotifier, DigestEmailNotifier
+
+    credentials = dict(
+        sender_email=settings.EMAIL_SENDER,
+        sender_password=settings.EMAIL_PASSWORD,
+        default_receiver=settings.EMAIL_DEFAULT_RECEIVER or None,
+        receivers=settings.EMAIL_RECEIVERS,
+        smtp_host=settings.SMTP_HOST,
+        smtp_port=settings.SMTP_PORT,
+    )
+
+    # Modo resumen: un correo por destinatario cada ventana
+    if settings.EMAIL_DIGEST_WINDOW_SECONDS > 0:
+        return DigestEmailNotifier(**credentials, window_seconds=settings.EMAIL_DIGEST_WINDOW_SECONDS)
+    return EmailNotifier(**credentials)
+
+
+def build_delta_service(file_repo: IFileRepository) -> Optional[IDeltaService]:
+    # Deltas opcionales entre versiones firmadas (DELTA_ENABLED)
+    if not settings.DELTA_ENABLED:
+        return None
+
+    from src.infrastructure.delta_encoder import DeltaEncoder
+    return DeltaEncoder(file_repo, block_size=settings.DELTA_BLOCK_SIZE)
+
+
+def build_audit_log() -> Optional[IAuditLog]:
+    # Bitácora de cambios de estado (AUDIT_ENABLED)
+    if not settings.AUDIT_ENABLED:
+        return None
+
+    from src.infrastructure.audit_log import BufferedAuditLog
+    return BufferedAuditLog(
+        settings.AUDIT_DIR,
+        flush_interval=settings.AUDIT_FLUSH_INTERVAL,
+        max_bytes=settings.AUDIT_MAX_BYTES,
+        max_files=settings.AUDIT_MAX_FILES,
+    )
+
+
+def build_intent_log() -> Optional[IIntentLog]:
+    # Registro de intenciones para recuperar firmas interrumpidas
+    if not settings.INTENT_LOG_ENABLED:
+        return None
+
+    from src.infrastructure.intent_log import SqliteIntentLog
+    return SqliteIntentLog(settings.INTENT_LOG_PATH)
+
+
+def build_job_queue() -> Optional[IJobQueue]:
+    # Cola persistente de firmas y correos (JOB_QUEUE_ENABLED)
+    if not settings.JOB_QUEUE_ENABLED:
+        return None
+
+    from src.infrastructure.job_queue import SqliteJobQueue
+    return SqliteJobQueue(
+        settings.JOB_QUEUE_PATH,
+        lease_seconds=settings.JOB_LEASE_SECONDS,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+        concurrency=settings.JOB_CONCURRENCY,
+    )
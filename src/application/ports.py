@@ -14,8 +14,16 @@
 # dominio de:
 #
 #   - Repositorios de archivos
+#   - Sesiones de carga por partes (reanudables)
 #   - Repositorio de base de datos (JSON)
+#   - Archivo histórico de registros (snapshots y particiones)
 #   - Servicio de firmado digital
+#   - Servicio de deltas entre versiones firmadas
+#   - Almacén de idempotencia (deduplicación de cargas)
+#   - Registro de intenciones de firma (recuperación)
+#   - Índice de últimas versiones firmadas (manifiesto)
+#   - Cola persistente de trabajos (firma y correo)
+#   - Bitácora de auditoría de cambios de estado
 #   - Servicio de notificaciones por correo
 #
 # Cualquier clase de infraestructura debe implementar estas
@@ -25,7 +33,7 @@
 # ============================================================
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
 from src.domain.models import BinaryFile
 
 
@@ -49,6 +57,46 @@ class IFileRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def open_read(self, file_path: str) -> BinaryIO:
+        """
+        Abre un archivo y devuelve un stream con sus bytes originales
+        (ya descomprimidos), para procesarlo por bloques.
+        """
+        pass
+
+    @abstractmethod
+    def raw_path(self, file_path: str) -> Optional[str]:
+        """
+        Devuelve una ruta local con los bytes originales si existe
+        (permite mmap o copia en el kernel), o None si el archivo
+        está comprimido o no es local.
+        """
+        pass
+
+    @abstractmethod
+    def get_sizes(self, file_path: str) -> Dict[str, Any]:
+        """
+        Devuelve el tamaño original (raw_size), el tamaño almacenado
+        (stored_size) y el códec de compresión (codec) del archivo.
+        """
+        pass
+
+    @abstractmethod
+    def path_for(self, file_id: str, signed: bool = False) -> str:
+        """
+        Ruta en la que save() guardaría `file_id`, exista o no.
+        """
+        pass
+
+    @abstractmethod
+    def signed_path_for(self, original_path: str) -> str:
+        """
+        Ruta en la que copy_to_signed() guardaría el artefacto firmado
+        de `original_path`, exista o no.
+        """
+        pass
+
     @abstractmethod
     def move_to_signed(self, original_path: str, signed_data: bytes) -> str:
         """
@@ -56,6 +104,46 @@ class IFileRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def copy_to_signed(self, original_path: str, trailer: bytes) -> str:
+        """
+        Copia el archivo original a /data/signed/ sin cargarlo en memoria
+        y agrega al final el trailer de firma.
+        """
+        pass
+
+    @abstractmethod
+    def link_signed(self, signed_path: str, original_path: str) -> str:
+        """
+        Reutiliza un artefacto firmado existente (mismo contenido) como
+        artefacto firmado de `original_path`, sin volver a escribirlo.
+        """
+        pass
+
+    @abstractmethod
+    def import_file(self, source_path: str, file_id: str) -> str:
+        """
+        Incorpora al almacenamiento un archivo ya escrito en disco
+        (por ejemplo, una carga por partes finalizada) y devuelve su ruta.
+        """
+        pass
+
+    @abstractmethod
+    def move_to_cold(self, file_path: str) -> str:
+        """
+        Mueve un archivo al almacenamiento frío (alta compresión)
+        y devuelve su nueva ruta.
+        """
+        pass
+
+    @abstractmethod
+    def remove_incomplete(self) -> int:
+        """
+        Elimina restos de escrituras interrumpidas (temporales, cargas
+        multipart sin completar). Devuelve cuántos se eliminaron.
+        """
+        pass
+
     @abstractmethod
     def delete(self, file_path: str) -> None:
         """
@@ -70,6 +158,92 @@ class IFileRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def scan_blobs(self) -> Iterator[Tuple[str, int, float]]:
+        """
+        Recorre todo lo guardado (originales, firmados, fríos y deltas)
+        y devuelve (ruta, tamaño almacenado, última modificación) de cada
+        archivo, con la misma ruta que se guarda en los registros. Omite
+        temporales y archivos laterales (.meta).
+        """
+        pass
+
+
+# ============================================================
+#   SESIONES DE CARGA POR PARTES (CHUNKED / RESUMABLE)
+# ============================================================
+
+class IUploadSessionRepository(ABC):
+
+    @abstractmethod
+    def create_session(
+        self,
+        filename: str,
+        environment: str,
+        total_size: Optional[int] = None,
+        hash_algorithm: str = "sha256",
+        max_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Crea una sesión de carga vacía y devuelve su estado (incluye
+        upload_id). Los bloques se hashean con `hash_algorithm`; sin
+        `total_size`, el offset no puede pasar de `max_size`.
+        """
+        pass
+
+    @abstractmethod
+    def get_session(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Devuelve el estado de la sesión (offset recibido) o None si no existe.
+        """
+        pass
+
+    @abstractmethod
+    def write_chunk(self, upload_id: str, offset: int, stream: Any) -> Optional[Dict[str, Any]]:
+        """
+        Escribe en disco el bloque que inicia en `offset` actualizando el hash
+        incremental, sin pasar de `total_size` (o de `max_size`). Devuelve el
+        estado de la sesión tomado con el candado: `offset` nuevo, `accepted`
+        = False si `offset` deja un hueco o la sesión ya se está finalizando
+        (no se escribe nada) y `overflow` = True si se recibieron bytes más
+        allá del límite (se descartan).
+        Un `offset` negativo lanza ValueError.
+        """
+        pass
+
+    @abstractmethod
+    def finalize(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Devuelve el estado final de la sesión con `digest`,
+        `hash_algorithm`, `size` y `part_path` (archivo completo listo
+        para incorporarse) y la marca como `finalizing`: ya no acepta
+        bloques. La sesión sigue existiendo hasta complete().
+        """
+        pass
+
+    @abstractmethod
+    def complete(self, upload_id: str) -> None:
+        """
+        Borra la sesión una vez que su archivo se incorporó al repositorio.
+        """
+        pass
+
+    @abstractmethod
+    def abort(self, upload_id: str) -> bool:
+        """
+        Descarta la sesión y los datos recibidos.
+        """
+        pass
+
+    @abstractmethod
+    def expire_sessions(self, max_age_seconds: float, dry_run: bool = False) -> List[Dict[str, Any]]:
+        """
+        Borra las sesiones sin actividad en `max_age_seconds` (cargas
+        abandonadas) y devuelve su `upload_id` y `size`. Con `dry_run`
+        solo las lista.
+        """
+        pass
+
 
 # ============================================================
 #   REPOSITORIO DE BASE DE DATOS (JSON)
@@ -81,6 +255,14 @@ class IDatabaseRepository(ABC):
     def add_record(self, record: Any) -> None:
         pass
 
+    @abstractmethod
+    def add_records(self, records: List[Any]) -> int:
+        """
+        Agrega varios registros con una sola escritura.
+        Devuelve cuántos se agregaron.
+        """
+        pass
+
     @abstractmethod
     def get_record(self, file_id: str) -> Optional[BinaryFile]:
         pass
@@ -97,6 +279,53 @@ class IDatabaseRepository(ABC):
     def delete_record(self, file_id: str) -> bool:
         pass
 
+    @abstractmethod
+    def delete_records(self, file_ids: List[str]) -> int:
+        """
+        Elimina varios registros con una sola escritura.
+        Devuelve cuántos se eliminaron.
+        """
+        pass
+
+    @abstractmethod
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Hasta `limit` registros (resumidos) cuyo filename, una palabra
+        del filename o id empieza con `query`, sin recorrer la base.
+        """
+        pass
+
+    @abstractmethod
+    def aggregates(self) -> Dict[str, Any]:
+        """
+        Conteos por estado y ambiente, bytes almacenados y firmas por
+        hora, mantenidos al escribir (no recorre los registros).
+        """
+        pass
+
+
+# ============================================================
+#   ARCHIVO HISTÓRICO DE REGISTROS
+# ============================================================
+
+class IRecordArchive(ABC):
+
+    @abstractmethod
+    def append_records(self, records: List[BinaryFile]) -> int:
+        """
+        Agrega registros al archivo histórico (particionado por fecha).
+        Devuelve cuántos se escribieron.
+        """
+        pass
+
+    @abstractmethod
+    def snapshot(self, source_path: str) -> str:
+        """
+        Guarda una copia comprimida de la base de datos activa.
+        Devuelve la ruta del snapshot o "" si falla.
+        """
+        pass
+
 
 # ============================================================
 #   SERVICIO DE FIRMA DIGITAL
@@ -113,6 +342,224 @@ class ISigningService(ABC):
         """
         pass
 
+    @property
+    @abstractmethod
+    def key_id(self) -> str:
+        """
+        Identifica la configuración de firma (algoritmo, modo, bloque).
+        Dos firmas del mismo contenido con el mismo key_id son iguales.
+        """
+        pass
+
+    @abstractmethod
+    def algorithm_for(self, environment: Optional[str]) -> str:
+        """
+        Algoritmo de hash con el que se firma en `environment`. Quien
+        calcule el digest antes de firmar (carga, caché) debe usar este
+        mismo para que la firma lo reutilice.
+        """
+        pass
+
+    @abstractmethod
+    def content_digest(self, binary: BinaryFile) -> str:
+        """
+        Digest sobre el que se firmaría `binary` (lineal o raíz Merkle),
+        sin escribir el artefacto. Lo calculado queda en `binary`, así que
+        un sign_file posterior no vuelve a leer la imagen.
+        """
+        pass
+
+    @abstractmethod
+    def artifact_paths(self, binary: BinaryFile) -> List[str]:
+        """
+        Rutas de todos los artefactos que sign_file escribe para `binary`
+        (firmado, cifrado), existan o no. La recuperación las borra al
+        revertir una firma interrumpida.
+        """
+        pass
+
+
+# ============================================================
+#   SERVICIO DE DELTAS (PARCHES ENTRE VERSIONES FIRMADAS)
+# ============================================================
+
+class IDeltaService(ABC):
+
+    @abstractmethod
+    def create_delta(self, base: BinaryFile, target: BinaryFile) -> Optional[Dict[str, Any]]:
+        """
+        Genera y firma el parche base -> target. Devuelve los campos
+        delta_base_id, delta_path, delta_signature y delta_size, o None
+        si el delta no aporta ahorro.
+        """
+        pass
+
+
+# ============================================================
+#   ALMACÉN DE IDEMPOTENCIA (DEDUPLICACIÓN DE CARGAS)
+# ============================================================
+
+class IIdempotencyStore(ABC):
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Devuelve el resultado guardado para `key` si no ha expirado.
+        """
+        pass
+
+    @abstractmethod
+    def claim(self, key: str, ttl_seconds: int) -> bool:
+        """
+        Reserva `key` para la petición en curso. Devuelve False si otra
+        petición con la misma clave ya la reservó o terminó.
+        """
+        pass
+
+    @abstractmethod
+    def put(self, key: str, value: Dict[str, Any], ttl_seconds: int) -> None:
+        """
+        Guarda el resultado de `key` durante `ttl_seconds`.
+        """
+        pass
+
+    @abstractmethod
+    def release(self, key: str) -> None:
+        """
+        Libera una reserva de una petición que falló.
+        """
+        pass
+
+
+# ============================================================
+#   REGISTRO DE INTENCIONES (RECUPERACIÓN TRAS UNA CAÍDA)
+# ============================================================
+
+class IIntentLog(ABC):
+
+    @abstractmethod
+    def begin(self, file_id: str, operation: str, old_status: str) -> bool:
+        """
+        Anota que se va a firmar `file_id` (antes de escribir el
+        artefacto). Devuelve False si otra firma del mismo registro sigue
+        en curso.
+        """
+        pass
+
+    @abstractmethod
+    def complete(self, file_id: str) -> None:
+        """
+        Cierra la intención una vez actualizado el registro.
+        """
+        pass
+
+    @abstractmethod
+    def pending(self) -> List[Dict[str, Any]]:
+        """
+        Intenciones abandonadas (su proceso ya no existe): firmas que
+        quedaron a medias y deben completarse o revertirse.
+        """
+        pass
+
+
+# ============================================================
+#   ÍNDICE DE ÚLTIMAS VERSIONES FIRMADAS (MANIFIESTO DE DISPOSITIVOS)
+# ============================================================
+
+class IReleaseIndex(ABC):
+
+    @abstractmethod
+    def record_signed(self, binary: BinaryFile) -> None:
+        """
+        Actualiza el índice cuando `binary` llega a 'signed' (si es más
+        nuevo que la versión registrada para su filename/ambiente).
+        """
+        pass
+
+    @abstractmethod
+    def latest(self, environment: str, filename: str) -> Optional[Dict[str, Any]]:
+        """
+        Entrada del manifiesto de la última versión firmada, o None.
+        """
+        pass
+
+    @abstractmethod
+    def manifest(self, environment: str, filename: str) -> Optional[Tuple[bytes, str]]:
+        """
+        Cuerpo JSON ya serializado y su ETag, listos para servir.
+        """
+        pass
+
+    @abstractmethod
+    def rebuild(self, records: List[BinaryFile]) -> int:
+        """
+        Reconstruye el índice completo; devuelve el número de entradas.
+        """
+        pass
+
+
+# ============================================================
+#   COLA PERSISTENTE DE TRABAJOS (FIRMA Y CORREO)
+# ============================================================
+
+class IJobQueue(ABC):
+
+    @abstractmethod
+    def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        dedupe_key: Optional[str] = None,
+        delay: float = 0,
+        lease_seconds: Optional[float] = None,
+    ) -> Optional[int]:
+        """
+        Guarda un trabajo de forma durable y devuelve su id. Con
+        `dedupe_key`, no se encola si ya hay uno pendiente con esa clave
+        (devuelve None). Con `lease_seconds`, el trabajo queda tomado por
+        este proceso para ejecutarlo en línea; si el proceso muere, al
+        vencer el préstamo lo retoma un worker.
+        """
+        pass
+
+    @abstractmethod
+    def lease(self, kinds: List[str], limit: int = 1) -> List[Dict[str, Any]]:
+        """
+        Toma hasta `limit` trabajos listos (respetando los límites de
+        concurrencia por tipo) por el tiempo del préstamo.
+        """
+        pass
+
+    @abstractmethod
+    def complete(self, job_id: int) -> None:
+        """
+        Marca el trabajo como terminado.
+        """
+        pass
+
+    @abstractmethod
+    def fail(self, job_id: int, error: str) -> None:
+        """
+        Reintenta más tarde o, agotados los intentos, lo manda a la cola
+        de trabajos muertos.
+        """
+        pass
+
+
+# ============================================================
+#   BITÁCORA DE AUDITORÍA (EVENTOS DE CAMBIO DE ESTADO)
+# ============================================================
+
+class IAuditLog(ABC):
+
+    @abstractmethod
+    def record(self, event: Dict[str, Any]) -> None:
+        """
+        Registra un evento (quién, cuándo, estado anterior/nuevo, etc.).
+        No debe bloquear la petición: la escritura puede ser diferida.
+        """
+        pass
+
 
 # ============================================================
 #   🔥 NUEVO: SERVICIO DE NOTIFICACIÓN POR CORREO
@@ -13,23 +13,223 @@
 # Implementa la lógica principal siguiendo Arquitectura Limpia.
 # ============================================================
 
-from datetime import datetime
+import os
+import time
+from datetime import datetime, timedelta
 from uuid import uuid4
 from typing import List, Dict, Any, Optional
 
 from src.domain.models import BinaryFile
+from src.common.hashing import DEFAULT_HASH_ALGORITHM
+from src.common.ingest import (
+    DigestStage, IngestPipeline, IngestRejected, IngestStage, MagicBytesStage, PayloadTooLarge, SizeLimitStage,
+)
 from src.application.ports import (
     IFileRepository,
+    IUploadSessionRepository,
     IDatabaseRepository,
+    IRecordArchive,
     ISigningService,
+    IDeltaService,
+    IIdempotencyStore,
+    IAuditLog,
+    IIntentLog,
+    IReleaseIndex,
+    IJobQueue,
     INotifierService,
 )
 
 
+# Ventanas de deduplicación de cargas (segundos). La reserva de una
+# petición en curso vence pronto para que un proceso caído no bloquee
+# su Idempotency-Key durante todo el día
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+IDEMPOTENCY_CLAIM_TTL = 5 * 60
+CONTENT_DEDUP_TTL = 10 * 60
+
+
+class IdempotencyKeyReused(ValueError):
+    """La Idempotency-Key ya se usó con otro contenido, filename o ambiente."""
+
+# Tiempo que una petición conserva su trabajo de firma; si el proceso
+# muere antes de terminar, al vencer lo retoma el worker de trabajos
+SIGNING_JOB_LEASE = 10 * 60
+
+
+def _audit(
+    audit_log: Optional[IAuditLog],
+    binary: BinaryFile,
+    old_status: Optional[str],
+    actor: str,
+    started: Optional[float] = None,
+    **extra: Any,
+) -> None:
+    """
+    Registra en la bitácora el cambio de estado de `binary`
+    (old_status -> binary.status). `started` es un time.perf_counter()
+    tomado antes de la operación, para medir su duración.
+    """
+    if audit_log is None:
+        return
+
+    event = {
+        "ts": datetime.now().isoformat(),
+        "file_id": binary.id,
+        "filename": binary.filename,
+        "environment": binary.environment,
+        "old_status": old_status,
+        "new_status": binary.status,
+        "actor": actor,
+        "digest": binary.digest,
+    }
+    if started is not None:
+        event["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    event.update(extra)
+
+    try:
+        audit_log.record(event)
+    except Exception as e:
+        print(f"[AuditLog] Could not record event for {binary.id}: {e}")
+
+
+def _attach_delta(
+    db_repo: IDatabaseRepository,
+    delta_service: Optional[IDeltaService],
+    binary: BinaryFile,
+    release_index: Optional[IReleaseIndex] = None,
+) -> None:
+    """
+    Si hay servicio de deltas, genera el parche firmado contra la versión
+    publicada del mismo filename/ambiente (según el índice de versiones,
+    sin recorrer la base) y lo registra en `binary`. Sin índice no hay
+    base conocida y no se genera delta.
+    Un fallo aquí nunca invalida la firma del artefacto completo.
+    """
+    if delta_service is None or release_index is None:
+        return
+
+    try:
+        latest = release_index.latest(binary.environment, binary.filename)
+        if not latest or latest["id"] == binary.id:
+            return
+
+        base = db_repo.get_record(latest["id"])
+        if base is None or base.status != "signed":
+            return
+
+        delta = delta_service.create_delta(base, binary)
+        if delta:
+            for field, value in delta.items():
+                setattr(binary, field, value)
+    except Exception as e:
+        print(f"[Delta] Error generating delta for {binary.id}: {e}")
+
+
+def _sign_record(
+    db_repo: IDatabaseRepository,
+    signing_service: ISigningService,
+    delta_service: Optional[IDeltaService],
+    intent_log: Optional[IIntentLog],
+    record: BinaryFile,
+    operation: str,
+    release_index: Optional[IReleaseIndex] = None,
+) -> BinaryFile:
+    """
+    Firma `record` y guarda el resultado. Con registro de intenciones,
+    la intención se abre antes de escribir el artefacto y se cierra
+    después de actualizar la base de datos: si el proceso muere en
+    medio, la recuperación al arrancar completa o revierte la firma.
+    Con índice de versiones, la firma se publica en el manifiesto.
+    Lanza RuntimeError si el mismo registro ya se está firmando.
+    """
+    old_status = record.status
+
+    if intent_log is not None:
+        if not intent_log.begin(record.id, operation, old_status):
+            raise RuntimeError(f"{record.id} is already being signed")
+
+        # Otra petición pudo terminar de firmarlo justo antes
+        current = db_repo.get_record(record.id)
+        if current is None or current.status != old_status:
+            intent_log.complete(record.id)
+            raise RuntimeError(f"{record.id} changed status while waiting to be signed")
+
+    try:
+        signature, signed_path = signing_service.sign_file(record)
+        record.status = "signed"
+        record.signature = signature
+        record.signed_path = signed_path
+        record.signed_at = datetime.now().isoformat()
+        _attach_delta(db_repo, delta_service, record, release_index)
+
+        db_repo.update_record(record.id, record.signing_updates())
+    except Exception:
+        # Error controlado (no una caída): no hay nada que recuperar
+        record.status = old_status
+        if intent_log is not None:
+            intent_log.complete(record.id)
+        raise
+
+    _publish_release(release_index, record)
+
+    if intent_log is not None:
+        intent_log.complete(record.id)
+    return record
+
+
+def _publish_release(release_index: Optional[IReleaseIndex], record: BinaryFile) -> None:
+    # El manifiesto se puede reconstruir desde la base de datos: un fallo aquí no invalida la firma
+    if release_index is None:
+        return
+    try:
+        release_index.record_signed(record)
+    except Exception as e:
+        print(f"[ReleaseIndex] Could not publish {record.id}: {e}")
+
+
+def _claim_signing_job(
+    job_queue: Optional[IJobQueue], record: BinaryFile, operation: str, actor: str
+) -> Optional[int]:
+    """
+    Registra la firma de `record` en la cola de trabajos antes de hacerla
+    en línea, ya tomada por esta petición. Si la firma falla o el proceso
+    muere, el worker de trabajos la reintenta. Devuelve None si no hay
+    cola o si ya había un trabajo para ese registro.
+    """
+    if job_queue is None:
+        return None
+    try:
+        return job_queue.enqueue(
+            "sign",
+            {"file_id": record.id, "operation": operation, "actor": actor},
+            dedupe_key=f"sign:{record.id}",
+            lease_seconds=SIGNING_JOB_LEASE,
+        )
+    except Exception as e:
+        print(f"[JobQueue] Could not enqueue signing of {record.id}: {e}")
+        return None
+
+
+def _settle_signing_job(job_queue: Optional[IJobQueue], job_id: Optional[int], error: Optional[str] = None) -> None:
+    # Sin error el trabajo termina; con error queda para reintento
+    if job_queue is None or job_id is None:
+        return
+    try:
+        if error is None:
+            job_queue.complete(job_id)
+        else:
+            job_queue.fail(job_id, error)
+    except Exception as e:
+        print(f"[JobQueue] Could not settle job {job_id}: {e}")
+
+
 class UploadBinaryUseCase:
     """
     Upload: si environment == 'prod' -> sign automático (y notificar signed).
     Si environment != 'prod' -> dejar pending, notificar approval request.
+
+    La carga se lee una sola vez: el pipeline de ingesta valida tamaño y
+    formato y calcula el digest de firma mientras el repositorio escribe.
     """
 
     def __init__(
@@ -38,18 +238,118 @@ class UploadBinaryUseCase:
         db_repo: IDatabaseRepository,
         signing_service: ISigningService,
         notifier: Optional[INotifierService] = None,
+        delta_service: Optional[IDeltaService] = None,
+        idempotency_store: Optional[IIdempotencyStore] = None,
+        audit_log: Optional[IAuditLog] = None,
+        intent_log: Optional[IIntentLog] = None,
+        release_index: Optional[IReleaseIndex] = None,
+        job_queue: Optional[IJobQueue] = None,
+        max_size: Optional[int] = None,
+        magic_prefixes: Optional[List[bytes]] = None,
     ):
         self.file_repo = file_repo
         self.db_repo = db_repo
         self.signing_service = signing_service
         self.notifier = notifier
+        self.delta_service = delta_service
+        self.idempotency_store = idempotency_store
+        self.audit_log = audit_log
+        self.intent_log = intent_log
+        self.release_index = release_index
+        self.job_queue = job_queue
+        self.max_size = max_size
+        self.magic_prefixes = magic_prefixes
 
-    def execute(self, file, environment: str) -> BinaryFile:
+    def ingest_stages(self, environment: str) -> List[IngestStage]:
+        """
+        Etapas que recorre cada bloque de la carga, en orden. El digest
+        va al final para que solo se calcule sobre contenido aceptado.
+        """
+        stages: List[IngestStage] = []
+        if self.max_size:
+            stages.append(SizeLimitStage(self.max_size))
+        if self.magic_prefixes:
+            stages.append(MagicBytesStage(self.magic_prefixes))
+        stages.append(DigestStage(self.signing_service.algorithm_for(environment)))
+        return stages
+
+    def execute(
+        self, file, environment: str, idempotency_key: Optional[str] = None, actor: str = "system"
+    ) -> Optional[BinaryFile]:
+        """
+        Con almacén de idempotencia, un reintento con la misma
+        Idempotency-Key devuelve el registro original (releído de la base
+        de datos) sin escribir ni enviar correos; el mismo contenido,
+        filename y ambiente dentro de la ventana también, y su copia
+        recién escrita se borra. Devuelve None si otra petición con la
+        misma clave sigue en curso. Lanza IdempotencyKeyReused si la
+        clave llega con otro contenido, e IngestRejected si una etapa
+        rechaza la carga.
+        """
+        store = self.idempotency_store
+        if store is None:
+            return self._upload(file, environment, actor)
+
+        request_key = f"key:{idempotency_key}" if idempotency_key else None
+        if request_key:
+            previous = store.get(request_key)
+            if previous is not None:
+                replay = self.__replay(previous, file, environment)
+                if replay is not None:
+                    return replay
+                # El registro original ya no existe: se carga como nuevo
+            elif not store.claim(request_key, IDEMPOTENCY_CLAIM_TTL):
+                print(f"[UploadBinaryUseCase] Upload already in progress for key {idempotency_key}")
+                return None
+
+        try:
+            binary = self._upload(file, environment, actor, store)
+            if request_key:
+                store.put(request_key, {"id": binary.id, "fingerprint": self.__fingerprint(binary)}, IDEMPOTENCY_KEY_TTL)
+            return binary
+        except Exception:
+            if request_key:
+                store.release(request_key)
+            raise
+
+    @staticmethod
+    def __fingerprint(binary: BinaryFile) -> str:
+        return f"{binary.environment}:{binary.filename}:{binary.hash_algorithm}:{binary.digest}"
+
+    def __replay(self, previous: Dict[str, Any], file, environment: str) -> Optional[BinaryFile]:
+        # Se valida y hashea el cuerpo sin escribirlo, para comprobar que
+        # el reintento trae lo mismo que la petición original
+        pipeline = IngestPipeline(file, self.ingest_stages(environment))
+        while pipeline.read(pipeline.chunk_size):
+            pass
+        digest = pipeline.stage(DigestStage)
+        incoming = BinaryFile(
+            id="", filename=getattr(file, "filename", "unknown.bin"), environment=environment, status="pending",
+            digest=digest.digest, hash_algorithm=digest.algorithm,
+        )
+        # Las entradas anteriores guardaban el registro completo
+        expected = previous.get("fingerprint") or self.__fingerprint(BinaryFile.from_dict(previous))
+        if expected != self.__fingerprint(incoming):
+            raise IdempotencyKeyReused("Idempotency-Key was already used with a different payload")
+
+        return self.db_repo.get_record(previous["id"])
+
+    def ingest(self, file, environment: str) -> BinaryFile:
+        """
+        Escribe la carga pasando por el pipeline (una sola lectura) y
+        devuelve la entidad todavía sin registrar.
+        """
         binary_id = str(uuid4())
-        saved_path = self.file_repo.save(file, binary_id)
+        pipeline = IngestPipeline(file, self.ingest_stages(environment))
+        saved_path = self.file_repo.save(pipeline, binary_id)
 
-        # crear entidad y persistir initial
-        binary = BinaryFile(
+        # save() atrapa los errores: el rechazo de una etapa se relanza aquí
+        pipeline.raise_for_error()
+        if not saved_path:
+            raise RuntimeError(f"Could not store upload {binary_id}")
+
+        digest = pipeline.stage(DigestStage)
+        return BinaryFile(
             id=binary_id,
             filename=getattr(file, "filename", "unknown.bin"),
             environment=environment,
@@ -58,22 +358,55 @@ class UploadBinaryUseCase:
             signed_path=None,
             signature=None,
             file_path=saved_path,
+            digest=digest.digest,
+            hash_algorithm=digest.algorithm,
         )
 
+    def _upload(self, file, environment: str, actor: str, store: Optional[IIdempotencyStore] = None) -> BinaryFile:
+        binary = self.ingest(file, environment)
+        if store is None:
+            return self.register(binary, actor)
+
+        # Reintento con el mismo contenido: se descarta la copia nueva,
+        # salvo que el original ya no exista o haya sido rechazado
+        content_key = f"digest:{environment}:{binary.filename}:{binary.digest}"
+        previous = store.get(content_key)
+        original = self.db_repo.get_record(previous["id"]) if previous is not None else None
+        if original is not None and original.status != "rejected":
+            self.file_repo.delete(binary.file_path)
+            return original
+
+        binary = self.register(binary, actor)
+        store.put(content_key, {"id": binary.id}, CONTENT_DEDUP_TTL)
+        return binary
+
+    def register(self, binary: BinaryFile, actor: str = "system") -> BinaryFile:
+        """
+        Persiste el registro de un binario ya guardado y aplica el flujo
+        del ambiente (firma automática en prod, aprobación en los demás).
+        """
+        if binary.raw_size is None and binary.file_path:
+            sizes = self.file_repo.get_sizes(binary.file_path)
+            binary.raw_size = sizes["raw_size"]
+            binary.stored_size = sizes["stored_size"]
+            binary.storage_tier = "hot"
+
+        # En prod la firma se registra en la cola antes que el registro:
+        # si el proceso muere justo después, el worker la completa
+        job_id = None
+        if binary.environment == "prod":
+            job_id = _claim_signing_job(self.job_queue, binary, "upload", "auto-sign")
+
         self.db_repo.add_record(binary.to_dict())
+        _audit(self.audit_log, binary, None, actor, size=binary.raw_size)
 
         # Si es producción: firmar automáticamente y notificar signed
-        if environment == "prod":
+        if binary.environment == "prod":
+            started = time.perf_counter()
             try:
-                signature, signed_path = self.signing_service.sign_file(binary)
-                binary.status = "signed"
-                binary.signature = signature
-                binary.signed_path = signed_path
-
-                self.db_repo.update_record(
-                    binary.id,
-                    {"status": binary.status, "signed_path": binary.signed_path, "signature": binary.signature},
-                )
+                _sign_record(self.db_repo, self.signing_service, self.delta_service, self.intent_log, binary, "upload", self.release_index)
+                _settle_signing_job(self.job_queue, job_id)
+                _audit(self.audit_log, binary, "pending", "auto-sign", started)
 
                 if self.notifier:
                     try:
@@ -83,6 +416,8 @@ class UploadBinaryUseCase:
 
             except Exception as e:
                 print(f"[UploadBinaryUseCase] Signing failed for prod: {e}")
+                _settle_signing_job(self.job_queue, job_id, str(e))
+                _audit(self.audit_log, binary, "pending", "auto-sign", started, error=str(e))
         else:
             # No es prod -> enviar solicitud de aprobación (PENDING)
             if self.notifier:
@@ -94,6 +429,176 @@ class UploadBinaryUseCase:
         return binary
 
 
+class RegisterSignedBatchUseCase:
+    """
+    Registra de una vez binarios ya guardados y firmados fuera de la
+    app (firma masiva): una sola escritura de la base de datos, un
+    evento de bitácora por binario y el manifiesto actualizado al final.
+    """
+
+    def __init__(
+        self,
+        db_repo: IDatabaseRepository,
+        audit_log: Optional[IAuditLog] = None,
+        release_index: Optional[IReleaseIndex] = None,
+    ):
+        self.db_repo = db_repo
+        self.audit_log = audit_log
+        self.release_index = release_index
+
+    def execute(self, binaries: List[BinaryFile], actor: str = "bulk-sign") -> int:
+        added = self.db_repo.add_records([b.to_dict() for b in binaries])
+
+        for binary in binaries:
+            _audit(self.audit_log, binary, None, actor, size=binary.raw_size)
+
+        # Solo la versión más nueva de cada ambiente/filename llega al manifiesto
+        latest: Dict[Any, BinaryFile] = {}
+        for binary in binaries:
+            key = (binary.environment, binary.filename)
+            if key not in latest or (binary.uploaded_at or "") > (latest[key].uploaded_at or ""):
+                latest[key] = binary
+        for binary in latest.values():
+            _publish_release(self.release_index, binary)
+        return added
+
+
+class StartChunkedUploadUseCase:
+    """
+    Inicia una carga por partes y devuelve el upload_id y offset 0.
+    Con `max_size`, la sesión no acepta bytes más allá de ese límite
+    aunque el cliente no declare total_size.
+    """
+
+    def __init__(self, upload_repo: IUploadSessionRepository, max_size: Optional[int] = None):
+        self.upload_repo = upload_repo
+        self.max_size = max_size
+
+    def execute(
+        self,
+        filename: str,
+        environment: str,
+        total_size: Optional[int] = None,
+        hash_algorithm: str = DEFAULT_HASH_ALGORITHM,
+    ) -> Dict[str, Any]:
+        if self.max_size and total_size is not None and total_size > self.max_size:
+            raise PayloadTooLarge(f"Upload exceeds the {self.max_size} byte limit")
+
+        # Los bloques se hashean con el algoritmo de firma del ambiente
+        return self.upload_repo.create_session(
+            filename, environment, total_size, hash_algorithm, self.max_size or None,
+        )
+
+
+class UploadChunkUseCase:
+    """
+    Escribe un bloque de una carga por partes.
+    Devuelve el estado de la sesión con `accepted` = False si el offset
+    no coincide (el cliente debe reanudar desde `offset`) y `overflow` =
+    True si el bloque pasaba del tamaño declarado.
+    """
+
+    def __init__(self, upload_repo: IUploadSessionRepository):
+        self.upload_repo = upload_repo
+
+    def execute(self, upload_id: str, offset: int, stream) -> Optional[Dict[str, Any]]:
+        # El estado sale del repositorio con el candado de la sesión tomado
+        session = self.upload_repo.write_chunk(upload_id, offset, stream)
+        if session is None:
+            print(f"[UploadChunkUseCase] Upload session not found: {upload_id}")
+        return session
+
+
+class FinalizeChunkedUploadUseCase:
+    """
+    Cierra una carga por partes, incorpora el archivo al repositorio y
+    continúa con el flujo normal de UploadBinaryUseCase reutilizando el
+    digest calculado durante la carga. Con `magic_prefixes`, el inicio
+    del archivo recibido pasa por la misma validación que /upload.
+    """
+
+    def __init__(
+        self,
+        upload_repo: IUploadSessionRepository,
+        file_repo: IFileRepository,
+        db_repo: IDatabaseRepository,
+        signing_service: ISigningService,
+        notifier: Optional[INotifierService] = None,
+        delta_service: Optional[IDeltaService] = None,
+        audit_log: Optional[IAuditLog] = None,
+        intent_log: Optional[IIntentLog] = None,
+        release_index: Optional[IReleaseIndex] = None,
+        job_queue: Optional[IJobQueue] = None,
+        magic_prefixes: Optional[List[bytes]] = None,
+    ):
+        self.upload_repo = upload_repo
+        self.file_repo = file_repo
+        self.db_repo = db_repo
+        self.signing_service = signing_service
+        self.notifier = notifier
+        self.delta_service = delta_service
+        self.audit_log = audit_log
+        self.intent_log = intent_log
+        self.release_index = release_index
+        self.job_queue = job_queue
+        self.magic_prefixes = magic_prefixes
+
+    def execute(self, upload_id: str, actor: str = "system") -> Optional[BinaryFile]:
+        """
+        Lanza UnsupportedFormat (y descarta la sesión) si el archivo no
+        empieza con uno de los prefijos aceptados.
+        """
+        session = self.upload_repo.finalize(upload_id)
+        if session is None:
+            # Reintento de una finalización que ya se completó
+            existing = self.db_repo.get_record(upload_id)
+            if existing is not None:
+                return existing
+
+            print(f"[FinalizeChunkedUploadUseCase] Cannot finalize upload: {upload_id}")
+            return None
+
+        if self.magic_prefixes:
+            # La sesión ya no acepta bloques: el inicio del .part es definitivo
+            try:
+                self.__check_format(session["part_path"])
+            except IngestRejected:
+                self.upload_repo.abort(upload_id)
+                raise
+
+        saved_path = self.file_repo.import_file(session["part_path"], upload_id)
+        if not saved_path:
+            # La sesión sigue completa: el cliente puede reintentar
+            return None
+        self.upload_repo.complete(upload_id)
+
+        binary = BinaryFile(
+            id=upload_id,
+            filename=session["filename"],
+            environment=session["environment"],
+            status="pending",
+            uploaded_at=datetime.now().isoformat(),
+            signed_path=None,
+            signature=None,
+            file_path=saved_path,
+            digest=session["digest"],
+            hash_algorithm=session.get("hash_algorithm"),
+        )
+
+        upload = UploadBinaryUseCase(
+            self.file_repo, self.db_repo, self.signing_service, self.notifier, self.delta_service,
+            audit_log=self.audit_log, intent_log=self.intent_log, release_index=self.release_index,
+            job_queue=self.job_queue,
+        )
+        return upload.register(binary, actor)
+
+    def __check_format(self, part_path: str) -> None:
+        stage = MagicBytesStage(self.magic_prefixes)
+        with open(part_path, "rb") as part:
+            stage.feed(part.read(stage.needed))
+        stage.finish()
+
+
 class ListFilesUseCase:
     def __init__(self, db_repo: IDatabaseRepository):
         self.db_repo = db_repo
@@ -112,12 +617,27 @@ class SignBinaryUseCase:
     Firma solo archivos que ya están 'approved'.
     """
 
-    def __init__(self, db_repo: IDatabaseRepository, signing_service: ISigningService, notifier: Optional[INotifierService] = None):
+    def __init__(
+        self,
+        db_repo: IDatabaseRepository,
+        signing_service: ISigningService,
+        notifier: Optional[INotifierService] = None,
+        delta_service: Optional[IDeltaService] = None,
+        audit_log: Optional[IAuditLog] = None,
+        intent_log: Optional[IIntentLog] = None,
+        release_index: Optional[IReleaseIndex] = None,
+        job_queue: Optional[IJobQueue] = None,
+    ):
         self.db_repo = db_repo
         self.signing_service = signing_service
         self.notifier = notifier
+        self.delta_service = delta_service
+        self.audit_log = audit_log
+        self.intent_log = intent_log
+        self.release_index = release_index
+        self.job_queue = job_queue
 
-    def execute(self, file_id: str) -> Optional[BinaryFile]:
+    def execute(self, file_id: str, actor: str = "system") -> Optional[BinaryFile]:
         record = self.db_repo.get_record(file_id)
         if record is None:
             print(f"[SignBinaryUseCase] Record not found for file id: {file_id}")
@@ -127,17 +647,12 @@ class SignBinaryUseCase:
             print(f"[SignBinaryUseCase] Cannot sign file {file_id} with status '{record.status}'")
             return None
 
+        job_id = _claim_signing_job(self.job_queue, record, "sign", actor)
+        started = time.perf_counter()
         try:
-            signature, signed_path = self.signing_service.sign_file(record)
-
-            record.status = "signed"
-            record.signature = signature
-            record.signed_path = signed_path
-
-            self.db_repo.update_record(
-                record.id,
-                {"status": record.status, "signed_path": record.signed_path, "signature": record.signature},
-            )
+            _sign_record(self.db_repo, self.signing_service, self.delta_service, self.intent_log, record, "sign", self.release_index)
+            _settle_signing_job(self.job_queue, job_id)
+            _audit(self.audit_log, record, "approved", actor, started)
 
             if self.notifier:
                 try:
@@ -148,6 +663,8 @@ class SignBinaryUseCase:
             return record
         except Exception as e:
             print(f"[SignBinaryUseCase] Error signing file {file_id}: {e}")
+            _settle_signing_job(self.job_queue, job_id, str(e))
+            _audit(self.audit_log, record, "approved", actor, started, error=str(e))
             return None
 
 
@@ -156,12 +673,27 @@ class ApproveBinaryUseCase:
     Aprueba un archivo pending -> lo marca approved y luego dispara la firma.
     """
 
-    def __init__(self, db_repo: IDatabaseRepository, signing_service: ISigningService, notifier: Optional[INotifierService] = None):
+    def __init__(
+        self,
+        db_repo: IDatabaseRepository,
+        signing_service: ISigningService,
+        notifier: Optional[INotifierService] = None,
+        delta_service: Optional[IDeltaService] = None,
+        audit_log: Optional[IAuditLog] = None,
+        intent_log: Optional[IIntentLog] = None,
+        release_index: Optional[IReleaseIndex] = None,
+        job_queue: Optional[IJobQueue] = None,
+    ):
         self.db_repo = db_repo
         self.signing_service = signing_service
         self.notifier = notifier
+        self.delta_service = delta_service
+        self.audit_log = audit_log
+        self.intent_log = intent_log
+        self.release_index = release_index
+        self.job_queue = job_queue
 
-    def execute(self, file_id: str) -> Optional[BinaryFile]:
+    def execute(self, file_id: str, actor: str = "system") -> Optional[BinaryFile]:
         record = self.db_repo.get_record(file_id)
         if record is None:
             print(f"[ApproveBinaryUseCase] Record not found: {file_id}")
@@ -172,21 +704,21 @@ class ApproveBinaryUseCase:
             print(f"[ApproveBinaryUseCase] Cannot approve file with status '{record.status}'")
             return None
 
+        # La firma queda en la cola antes de marcar approved: un caído
+        # entre los dos pasos no deja un registro aprobado sin firmar
+        job_id = _claim_signing_job(self.job_queue, record, "approve", actor)
+
         # Marcar approved
         record.status = "approved"
         self.db_repo.update_record(file_id, {"status": "approved"})
+        _audit(self.audit_log, record, "pending", actor)
 
         # Firmar inmediatamente
+        started = time.perf_counter()
         try:
-            signature, signed_path = self.signing_service.sign_file(record)
-            record.status = "signed"
-            record.signature = signature
-            record.signed_path = signed_path
-
-            self.db_repo.update_record(
-                file_id,
-                {"status": record.status, "signed_path": record.signed_path, "signature": record.signature},
-            )
+            _sign_record(self.db_repo, self.signing_service, self.delta_service, self.intent_log, record, "approve", self.release_index)
+            _settle_signing_job(self.job_queue, job_id)
+            _audit(self.audit_log, record, "approved", actor, started)
 
             if self.notifier:
                 try:
@@ -198,6 +730,8 @@ class ApproveBinaryUseCase:
 
         except Exception as e:
             print(f"[ApproveBinaryUseCase] Error signing after approve: {e}")
+            _settle_signing_job(self.job_queue, job_id, str(e))
+            _audit(self.audit_log, record, "approved", actor, started, error=str(e))
             return None
 
 
@@ -206,11 +740,17 @@ class RejectBinaryUseCase:
     Rechaza un archivo (pending -> rejected) y notifica.
     """
 
-    def __init__(self, db_repo: IDatabaseRepository, notifier: Optional[INotifierService] = None):
+    def __init__(
+        self,
+        db_repo: IDatabaseRepository,
+        notifier: Optional[INotifierService] = None,
+        audit_log: Optional[IAuditLog] = None,
+    ):
         self.db_repo = db_repo
         self.notifier = notifier
+        self.audit_log = audit_log
 
-    def execute(self, file_id: str) -> Optional[BinaryFile]:
+    def execute(self, file_id: str, actor: str = "system") -> Optional[BinaryFile]:
         record = self.db_repo.get_record(file_id)
         if record is None:
             print(f"[RejectBinaryUseCase] Record not found: {file_id}")
@@ -223,6 +763,7 @@ class RejectBinaryUseCase:
 
         record.status = "rejected"
         self.db_repo.update_record(file_id, {"status": "rejected"})
+        _audit(self.audit_log, record, "pending", actor)
 
         if self.notifier:
             try:
@@ -231,3 +772,467 @@ class RejectBinaryUseCase:
                 print(f"[RejectBinaryUseCase] Notifier failed (rejection): {e}")
 
         return record
+
+
+class ProcessSigningJobUseCase:
+    """
+    Ejecuta un trabajo "sign" de la cola: completa la firma que una
+    petición registró y no terminó (falló o el proceso murió). Si el
+    registro ya no necesita firma, el trabajo simplemente termina; si la
+    firma falla, lanza la excepción para que la cola lo reintente.
+    """
+
+    def __init__(
+        self,
+        db_repo: IDatabaseRepository,
+        signing_service: ISigningService,
+        notifier: Optional[INotifierService] = None,
+        delta_service: Optional[IDeltaService] = None,
+        audit_log: Optional[IAuditLog] = None,
+        intent_log: Optional[IIntentLog] = None,
+        release_index: Optional[IReleaseIndex] = None,
+    ):
+        self.db_repo = db_repo
+        self.signing_service = signing_service
+        self.notifier = notifier
+        self.delta_service = delta_service
+        self.audit_log = audit_log
+        self.intent_log = intent_log
+        self.release_index = release_index
+
+    def execute(self, payload: Dict[str, Any]) -> Optional[BinaryFile]:
+        file_id = payload["file_id"]
+        operation = payload.get("operation", "sign")
+        actor = payload.get("actor") or "job-worker"
+
+        record = self.db_repo.get_record(file_id)
+        if record is None or record.status in ("signed", "rejected"):
+            return None
+
+        if record.status == "pending":
+            if operation == "approve":
+                # La aprobación se registró pero el estado no llegó a guardarse
+                record.status = "approved"
+                self.db_repo.update_record(file_id, {"status": "approved"})
+                _audit(self.audit_log, record, "pending", actor)
+            elif operation != "upload":
+                # Solo la firma automática de prod se hace desde pending
+                return None
+
+        old_status = record.status
+        started = time.perf_counter()
+        _sign_record(self.db_repo, self.signing_service, self.delta_service, self.intent_log, record, operation, self.release_index)
+        _audit(self.audit_log, record, old_status, actor, started, retried=True)
+
+        if self.notifier:
+            try:
+                self.notifier.send_signed_confirmation(record)
+            except Exception as e:
+                print(f"[ProcessSigningJobUseCase] Notifier failed (signed): {e}")
+
+        return record
+
+
+class DeliverNotificationUseCase:
+    """
+    Ejecuta un trabajo "email" de la cola con el notificador real. Lee el
+    registro al enviar, así el correo refleja su estado actual. Un error
+    de envío se propaga para que la cola lo reintente.
+    """
+
+    def __init__(self, db_repo: IDatabaseRepository, notifier: Optional[INotifierService]):
+        self.db_repo = db_repo
+        self.notifier = notifier
+
+    def execute(self, payload: Dict[str, Any]) -> bool:
+        if self.notifier is None:
+            print("[DeliverNotificationUseCase] Email is not configured, dropping notification")
+            return False
+
+        record = self.db_repo.get_record(payload["file_id"])
+        if record is None:
+            print(f"[DeliverNotificationUseCase] Record not found: {payload['file_id']}")
+            return False
+
+        send = {
+            "approval": self.notifier.send_approval_request,
+            "signed": self.notifier.send_signed_confirmation,
+            "rejected": self.notifier.send_rejection_notification,
+        }.get(payload.get("event"))
+        if send is None:
+            print(f"[DeliverNotificationUseCase] Unknown event: {payload.get('event')}")
+            return False
+
+        send(record)
+        return True
+
+
+class ApplyRetentionPolicyUseCase:
+    """
+    Mueve al almacenamiento frío los artefactos antiguos que ya no se
+    distribuyen: rechazados, o firmados que fueron reemplazados por una
+    versión firmada más nueva del mismo filename/ambiente.
+    """
+
+    def __init__(self, db_repo: IDatabaseRepository, file_repo: IFileRepository):
+        self.db_repo = db_repo
+        self.file_repo = file_repo
+
+    def execute(self, max_age_days: int, dry_run: bool = False) -> List[str]:
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+        records = self.db_repo.list_records()
+
+        # Última versión firmada por (filename, ambiente)
+        latest: Dict[Any, str] = {}
+        for r in records:
+            if r.status == "signed":
+                key = (r.filename, r.environment)
+                if (r.uploaded_at or "") > latest.get(key, ""):
+                    latest[key] = r.uploaded_at or ""
+
+        moved = []
+        for r in records:
+            if r.storage_tier == "cold" or not r.uploaded_at or r.uploaded_at >= cutoff:
+                continue
+
+            superseded = r.status == "signed" and r.uploaded_at < latest[(r.filename, r.environment)]
+            if r.status != "rejected" and not superseded:
+                continue
+
+            moved.append(r.id)
+            if dry_run:
+                continue
+
+            # Cada archivo movido se registra aunque el otro falle, para
+            # que el registro nunca apunte a una ruta que ya no existe
+            updates: Dict[str, Any] = {}
+            for field in ("file_path", "signed_path", "encrypted_path"):
+                path = getattr(r, field)
+                if path:
+                    cold_path = self.file_repo.move_to_cold(path)
+                    if cold_path:
+                        updates[field] = cold_path
+
+            complete = all(updates.get(f) for f in ("file_path", "signed_path", "encrypted_path") if getattr(r, f))
+            if complete:
+                updates["storage_tier"] = "cold"
+            if "file_path" in updates:
+                updates["stored_size"] = self.file_repo.get_sizes(updates["file_path"])["stored_size"]
+
+            if updates:
+                self.db_repo.update_record(r.id, updates)
+            if not complete:
+                print(f"[ApplyRetentionPolicyUseCase] Could not archive every file of {r.id}")
+                moved.remove(r.id)
+
+        return moved
+
+
+def _blob_key(path: str) -> str:
+    # Rutas locales relativas y absolutas apuntan al mismo archivo
+    return path if "://" in path else os.path.abspath(path)
+
+
+class CollectGarbageUseCase:
+    """
+    Recupera espacio del almacenamiento en una sola pasada: recorre los
+    archivos guardados y los cruza con las rutas de todos los registros
+    (activos y archivados).
+
+      orphaned   -> archivo sin registro que lo use (cargas sin
+                    terminar, copias viejas, nombres heredados)
+      rejected   -> original de un registro rechazado
+      superseded -> original y delta de una versión firmada reemplazada
+                    por otra más nueva (el artefacto firmado se conserva)
+      expired_uploads -> sesiones de carga por partes sin actividad en
+                    `upload_max_age_seconds` (clientes que no volvieron)
+
+    Puede correr junto con el tráfico: solo borra huérfanos con más de
+    `min_age_seconds` (una carga escribe el archivo antes de crear su
+    registro), y cada registro se vuelve a leer y se actualiza antes de
+    borrar su archivo, así nunca apunta a algo que ya no existe. Los
+    borrados van en lotes paralelos.
+    """
+
+    def __init__(
+        self,
+        db_repo: IDatabaseRepository,
+        file_repo: IFileRepository,
+        archive: Optional[IDatabaseRepository] = None,
+        upload_repo: Optional[IUploadSessionRepository] = None,
+    ):
+        self.db_repo = db_repo
+        self.file_repo = file_repo
+        self.archive = archive
+        self.upload_repo = upload_repo
+
+    def execute(
+        self,
+        purge_after_days: Optional[int] = None,
+        min_age_seconds: float = 3600,
+        dry_run: bool = False,
+        workers: int = 4,
+        batch_size: int = 256,
+        upload_max_age_seconds: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        # El recorrido va antes de leer los registros: un archivo creado
+        # después del listado de registros ya quedó protegido por su edad
+        blobs = list(self.file_repo.scan_blobs())
+        records = self.db_repo.list_records()
+        archived = self.archive.list_records() if self.archive is not None else []
+
+        referenced = set()
+        for r in records + archived:
+            for path in (r.file_path, r.signed_path, r.delta_path, r.encrypted_path):
+                if path:
+                    referenced.add(_blob_key(path))
+
+        report: Dict[str, Any] = {
+            "orphaned": [], "rejected": [], "superseded": [], "expired_uploads": [], "reclaimed_bytes": 0, "errors": 0,
+        }
+
+        cutoff = time.time() - min_age_seconds
+        orphans = [
+            (path, size) for path, size, mtime in blobs
+            if mtime < cutoff and _blob_key(path) not in referenced
+        ]
+        report["orphaned"] = [{"path": path, "size": size} for path, size in orphans]
+
+        purges = self.__purge_candidates(records, purge_after_days) if purge_after_days is not None else []
+        for kind, record, fields in purges:
+            report[kind].append({"id": record.id, "paths": [getattr(record, f) for f in fields]})
+
+        sizes = {_blob_key(path): size for path, size, _ in blobs}
+        report["reclaimed_bytes"] = sum(size for _, size in orphans) + sum(
+            sizes.get(_blob_key(getattr(record, f)), 0) for _, record, fields in purges for f in fields
+        )
+
+        # Cada sesión se revisa y borra con su propio candado
+        if self.upload_repo is not None and upload_max_age_seconds is not None:
+            report["expired_uploads"] = self.upload_repo.expire_sessions(upload_max_age_seconds, dry_run)
+            report["reclaimed_bytes"] += sum(s["size"] for s in report["expired_uploads"])
+
+        if dry_run:
+            return report
+
+        tasks = [lambda path=path: self.__delete_orphan(path) for path, _ in orphans]
+        tasks += [lambda p=p: self.__purge(*p) for p in purges]
+        report["errors"] = self.__run_batches(tasks, workers, batch_size)
+        return report
+
+    def __purge_candidates(self, records: List[BinaryFile], purge_after_days: int) -> List[Any]:
+        cutoff = (datetime.now() - timedelta(days=purge_after_days)).isoformat()
+
+        latest: Dict[Any, str] = {}
+        for r in records:
+            if r.status == "signed":
+                key = (r.filename, r.environment)
+                if (r.uploaded_at or "") > latest.get(key, ""):
+                    latest[key] = r.uploaded_at or ""
+
+        candidates = []
+        for r in records:
+            if not r.uploaded_at or r.uploaded_at >= cutoff:
+                continue
+            if r.status == "rejected" and r.file_path:
+                candidates.append(("rejected", r, ["file_path"]))
+            elif r.status == "signed" and r.uploaded_at < latest[(r.filename, r.environment)]:
+                fields = [f for f in ("file_path", "delta_path") if getattr(r, f)]
+                if fields:
+                    candidates.append(("superseded", r, fields))
+        return candidates
+
+    def __delete_orphan(self, path: str) -> None:
+        # Otro proceso pudo reutilizar la ruta mientras se recorría
+        if _blob_key(path) in {_blob_key(p) for p in self.__paths_of(self.__record_for(path))}:
+            return
+        self.file_repo.delete(path)
+
+    def __record_for(self, path: str) -> Optional[BinaryFile]:
+        name = os.path.basename(path)
+        for prefix in ("signed_", "encrypted_", ""):
+            if name.startswith(prefix):
+                record = self.db_repo.get_record(name[len(prefix):].split(".", 1)[0])
+                if record is not None:
+                    return record
+        return None
+
+    @staticmethod
+    def __paths_of(record: Optional[BinaryFile]) -> List[str]:
+        if record is None:
+            return []
+        return [p for p in (record.file_path, record.signed_path, record.delta_path, record.encrypted_path) if p]
+
+    def __purge(self, kind: str, record: BinaryFile, fields: List[str]) -> None:
+        current = self.db_repo.get_record(record.id)
+        if current is None or current.status != record.status:
+            return
+
+        paths = [getattr(current, f) for f in fields if getattr(current, f)]
+        updates: Dict[str, Any] = {f: None for f in fields}
+        if "delta_path" in fields:
+            updates.update(delta_base_id=None, delta_signature=None, delta_size=None)
+        updates["storage_tier"] = "purged"
+
+        # Primero el registro, después los archivos
+        self.db_repo.update_record(record.id, updates)
+        for path in paths:
+            self.file_repo.delete(path)
+
+    @staticmethod
+    def __run_batches(tasks: List[Any], workers: int, batch_size: int) -> int:
+        if not tasks:
+            return 0
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        def run(batch):
+            errors = 0
+            for task in batch:
+                try:
+                    task()
+                except Exception as e:
+                    print(f"[CollectGarbageUseCase] Error reclaiming storage: {e}")
+                    errors += 1
+            return errors
+
+        batches = [tasks[i:i + batch_size] for i in range(0, len(tasks), batch_size)]
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            return sum(pool.map(run, batches))
+
+
+class ArchiveRecordsUseCase:
+    """
+    Saca de la base de datos activa los registros terminados (firmados o
+    rechazados) con más de `max_age_days` días y los guarda en el archivo
+    histórico. La última versión firmada de cada filename/ambiente se
+    conserva siempre, porque es la que se distribuye y la base de los deltas.
+    """
+
+    TERMINAL_STATES = ("signed", "rejected")
+
+    def __init__(self, db_repo: IDatabaseRepository, archive: IRecordArchive):
+        self.db_repo = db_repo
+        self.archive = archive
+
+    def execute(self, max_age_days: int, dry_run: bool = False) -> List[str]:
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+        records = self.db_repo.list_records()
+
+        latest: Dict[Any, BinaryFile] = {}
+        for r in records:
+            if r.status == "signed":
+                key = (r.filename, r.environment)
+                if key not in latest or (r.uploaded_at or "") > (latest[key].uploaded_at or ""):
+                    latest[key] = r
+        keep = {r.id for r in latest.values()}
+
+        selected = [
+            r for r in records
+            if r.status in self.TERMINAL_STATES
+            and r.uploaded_at and r.uploaded_at < cutoff
+            and r.id not in keep
+        ]
+        ids = [r.id for r in selected]
+
+        if dry_run or not selected:
+            return ids
+
+        # Primero se escribe el archivo y después se borra de la base activa:
+        # si algo falla a la mitad, el registro queda duplicado, nunca perdido
+        self.archive.append_records(selected)
+        self.db_repo.delete_records(ids)
+        return ids
+
+
+class RecoverInterruptedSigningsUseCase:
+    """
+    Revisa al arrancar las intenciones de firma abandonadas por un
+    proceso que murió:
+      - si el registro ya quedó firmado y su artefacto existe, solo se
+        cierra la intención (completed);
+      - si no, se vuelve a firmar (resigned);
+      - si eso tampoco es posible, el registro regresa a su estado
+        anterior sin firma ni artefacto (rolled_back).
+    También borra los temporales de escrituras interrumpidas.
+    """
+
+    def __init__(
+        self,
+        db_repo: IDatabaseRepository,
+        file_repo: IFileRepository,
+        signing_service: ISigningService,
+        intent_log: IIntentLog,
+        delta_service: Optional[IDeltaService] = None,
+        audit_log: Optional[IAuditLog] = None,
+        release_index: Optional[IReleaseIndex] = None,
+    ):
+        self.db_repo = db_repo
+        self.file_repo = file_repo
+        self.signing_service = signing_service
+        self.intent_log = intent_log
+        self.delta_service = delta_service
+        self.audit_log = audit_log
+        self.release_index = release_index
+
+    def __artifact_exists(self, path: Optional[str]) -> bool:
+        if not path:
+            return False
+        try:
+            self.file_repo.get_sizes(path)
+            return True
+        except Exception:
+            return False
+
+    def __artifacts(self, record: BinaryFile) -> List[str]:
+        paths = [record.signed_path, record.encrypted_path] + self.signing_service.artifact_paths(record)
+        # Nunca el original: es lo que permite volver a firmar
+        return sorted({p for p in paths if p and p != record.file_path})
+
+    def execute(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"completed": [], "resigned": [], "rolled_back": [], "temp_files_removed": 0}
+        result["temp_files_removed"] = self.file_repo.remove_incomplete()
+
+        for intent in self.intent_log.pending():
+            file_id = intent["file_id"]
+            record = self.db_repo.get_record(file_id)
+
+            if record is None:
+                self.intent_log.complete(file_id)
+                continue
+
+            if record.status == "signed" and self.__artifact_exists(record.signed_path):
+                # La caída pudo ocurrir antes de publicar la versión en el manifiesto
+                _publish_release(self.release_index, record)
+                self.intent_log.complete(file_id)
+                result["completed"].append(file_id)
+                continue
+
+            # La firma no llegó a la base de datos: se repite desde el estado anterior
+            record.status = intent["old_status"]
+            started = time.perf_counter()
+            try:
+                _sign_record(self.db_repo, self.signing_service, self.delta_service, self.intent_log, record, intent["operation"], self.release_index)
+                _audit(self.audit_log, record, intent["old_status"], "recovery", started)
+                result["resigned"].append(file_id)
+            except Exception as e:
+                print(f"[RecoverInterruptedSigningsUseCase] Rolling back {file_id}: {e}")
+                # Artefactos que escribió el proceso caído o el intento de
+                # recién: sin registro que los use, no deben quedar publicados
+                for path in self.__artifacts(record):
+                    self.file_repo.delete(path)
+                self.db_repo.update_record(file_id, {
+                    "status": intent["old_status"],
+                    "signature": None,
+                    "signed_path": None,
+                    "signed_at": None,
+                    "encrypted_path": None,
+                    "encrypted_size": None,
+                    "encryption_key_id": None,
+                })
+                self.intent_log.complete(file_id)
+                record.status = intent["old_status"]
+                _audit(self.audit_log, record, "signing", "recovery", started, error=str(e))
+                result["rolled_back"].append(file_id)
+
+        return result
@@ -0,0 +1,114 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: admission.py
+# ============================================================
+# Descripción:
+# Control de admisión para los endpoints de carga y firma:
+#
+#   - TokenBucketLimiter: límite de peticiones por cliente
+#     (cubeta de tokens). Al agotarse se responde 429.
+#   - WeightedSemaphore: límite global de bytes que se están
+#     hasheando/firmando a la vez. Cada operación pesa lo que
+#     mide su archivo; si no hay cupo en el tiempo de espera se
+#     responde 503 en vez de aceptar más trabajo del que cabe.
+#
+# Ambos límites son por proceso.
+# ============================================================
+
+import time
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List
+
+
+class TokenBucketLimiter:
+    """
+    Per-client token bucket: `rate` tokens per second up to `burst`.
+    """
+
+    def __init__(self, rate: float, burst: int, max_clients: int = 10_000, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._clock = clock
+        self._buckets: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def __prune(self, now: float) -> None:
+        # Un cliente con la cubeta llena equivale a uno nuevo: se olvida
+        full_after = self.burst / self.rate
+        for client in [c for c, (_, last) in self._buckets.items() if now - last >= full_after]:
+            del self._buckets[client]
+
+    def acquire(self, client: str) -> float:
+        """
+        Takes one token. Returns 0 when allowed, otherwise the seconds
+        until the next token is available.
+        """
+        with self._lock:
+            now = self._clock()
+            tokens, last = self._buckets.get(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+
+            if tokens >= 1:
+                self._buckets[client] = [tokens - 1, now]
+                if len(self._buckets) > self.max_clients:
+                    self.__prune(now)
+                return 0.0
+
+            self._buckets[client] = [tokens, now]
+            self.rejected += 1
+            return (1 - tokens) / self.rate
+
+
+class WeightedSemaphore:
+    """
+    Semaphore whose permits are bytes: at most `capacity` bytes of
+    files are processed at the same time.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self.rejected = 0
+
+    def __weight(self, weight: int) -> int:
+        # Un archivo más grande que la capacidad se admite solo
+        return max(1, min(int(weight or 0), self.capacity))
+
+    def acquire(self, weight: int, timeout: float) -> bool:
+        weight = self.__weight(weight)
+        with self._cond:
+            admitted = self._cond.wait_for(lambda: self._in_use + weight <= self.capacity, timeout)
+            if not admitted:
+                self.rejected += 1
+                return False
+            self._in_use += weight
+            return True
+
+    def release(self, weight: int) -> None:
+        with self._cond:
+            self._in_use -= self.__weight(weight)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, weight: int, timeout: float) -> Iterator[bool]:
+        """
+        `with sem.slot(size, timeout) as admitted:` releases automatically.
+        """
+        admitted = self.acquire(weight, timeout)
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                self.release(weight)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {"capacity": self.capacity, "in_use": self._in_use, "rejected": self.rejected}
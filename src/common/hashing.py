@@ -0,0 +1,66 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: hashing.py
+# ============================================================
+# Descripción:
+# Algoritmos de hash disponibles para la firma. Cada ambiente puede
+# usar uno distinto (SIGNING_HASH_ALGORITHMS) y el registro guarda
+# cuál se usó (BinaryFile.hash_algorithm), así la verificación no
+# depende de la configuración actual.
+#
+#   sha256   -> el de siempre; cualquier dispositivo lo soporta
+#   sha512   -> más rápido que sha256 en CPUs de 64 bits sin SHA-NI
+#   blake2b  -> BLAKE2b-512 de hashlib, sin dependencias
+#   blake3   -> el más rápido, paralelo; dependencia opcional
+#               (pip install blake3)
+#
+# Los registros anteriores no tienen hash_algorithm: son sha256.
+# ============================================================
+
+import hashlib
+from typing import Any, BinaryIO
+
+
+HASH_ALGORITHMS = ("sha256", "sha512", "blake2b", "blake3")
+DEFAULT_HASH_ALGORITHM = "sha256"
+
+# Tamaño de lectura para hashear streams (1 MiB)
+CHUNK_SIZE = 1024 * 1024
+
+
+def _blake3():
+    try:
+        import blake3
+    except ImportError as e:
+        raise ImportError("blake3 hashing requires the 'blake3' package (pip install blake3)") from e
+    return blake3
+
+
+def check_algorithm(algorithm: str) -> str:
+    """Validates `algorithm` (and that its package is installed)."""
+    if algorithm not in HASH_ALGORITHMS:
+        raise ValueError(f"Unknown hash algorithm '{algorithm}', expected one of {HASH_ALGORITHMS}")
+    if algorithm == "blake3":
+        _blake3()
+    return algorithm
+
+
+def new_hash(algorithm: str = DEFAULT_HASH_ALGORITHM, data: bytes = b"") -> Any:
+    """hashlib-style object (update / digest / hexdigest / copy)."""
+    if algorithm == "blake3":
+        return _blake3().blake3(data)
+    if algorithm not in HASH_ALGORITHMS:
+        raise ValueError(f"Unknown hash algorithm '{algorithm}', expected one of {HASH_ALGORITHMS}")
+    return hashlib.new(algorithm, data)
+
+
+def hash_stream(stream: BinaryIO, algorithm: str = DEFAULT_HASH_ALGORITHM) -> str:
+    """Hex digest of everything left in `stream`, read in 1 MiB chunks."""
+    hasher = new_hash(algorithm)
+    for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+        hasher.update(chunk)
+    return hasher.hexdigest()
@@ -0,0 +1,179 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: ingest.py
+# ============================================================
+# Descripción:
+# Pipeline de ingesta en una sola pasada. Las etapas (límite de
+# tamaño, validación de formato por bytes mágicos, hash, ...) se
+# componen sobre un único stream por bloques: IngestPipeline es un
+# objeto tipo archivo que se entrega al repositorio de archivos, así
+# que cada bloque se lee una vez de la petición, pasa por todas las
+# etapas y se escribe (comprimido, si aplica) en el mismo recorrido.
+# Agregar una etapa no agrega otra lectura completa de la imagen.
+#
+# Una etapa puede rechazar la carga lanzando IngestRejected; el error
+# se conserva en el pipeline porque los repositorios de archivos
+# atrapan las excepciones de save() y solo devuelven "".
+# ============================================================
+
+from typing import Any, BinaryIO, List, Optional, Sequence
+from src.common.hashing import CHUNK_SIZE, DEFAULT_HASH_ALGORITHM, new_hash
+
+
+class IngestRejected(ValueError):
+    """An ingest stage refused the upload."""
+
+
+class PayloadTooLarge(IngestRejected):
+    pass
+
+
+class UnsupportedFormat(IngestRejected):
+    pass
+
+
+class IngestStage:
+    """
+    One step of the pipeline. `feed` receives every chunk in order and
+    returns the bytes to pass on; `finish` is called once at the end.
+    """
+
+    def feed(self, chunk: bytes) -> bytes:
+        return chunk
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class SizeLimitStage(IngestStage):
+    """Rejects uploads larger than `max_bytes`."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+
+    def feed(self, chunk: bytes) -> bytes:
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise PayloadTooLarge(f"Upload exceeds the {self.max_bytes} byte limit")
+        return chunk
+
+
+class MagicBytesStage(IngestStage):
+    """Rejects uploads whose first bytes match none of `prefixes`."""
+
+    def __init__(self, prefixes: Sequence[bytes]):
+        self.prefixes = [bytes(p) for p in prefixes]
+        self.needed = max(len(p) for p in self.prefixes)
+        self.head = b""
+        self.checked = False
+
+    def __check(self) -> None:
+        self.checked = True
+        if not any(self.head.startswith(p) for p in self.prefixes):
+            raise UnsupportedFormat("Upload does not start with an accepted image signature")
+
+    def feed(self, chunk: bytes) -> bytes:
+        if not self.checked:
+            self.head += chunk[:self.needed - len(self.head)]
+            if len(self.head) >= self.needed:
+                self.__check()
+        return chunk
+
+    def finish(self) -> bytes:
+        # Archivo más corto que el prefijo más largo
+        if not self.checked:
+            self.__check()
+        return b""
+
+
+class DigestStage(IngestStage):
+    """Digest and size of the content, with the environment's algorithm."""
+
+    def __init__(self, algorithm: str = DEFAULT_HASH_ALGORITHM):
+        self.algorithm = algorithm
+        self.size = 0
+        self.digest: Optional[str] = None
+        self._hasher = new_hash(algorithm)
+
+    def feed(self, chunk: bytes) -> bytes:
+        self._hasher.update(chunk)
+        self.size += len(chunk)
+        return chunk
+
+    def finish(self) -> bytes:
+        self.digest = self._hasher.hexdigest()
+        return b""
+
+
+class IngestPipeline:
+    """
+    File-like view of `source` after every stage, read in one pass.
+    """
+
+    def __init__(self, source: BinaryIO, stages: List[IngestStage], chunk_size: int = CHUNK_SIZE):
+        self.source = source
+        self.stages = stages
+        self.chunk_size = chunk_size
+        self.filename = getattr(source, "filename", None)
+        self.error: Optional[BaseException] = None
+
+        self._buffer = b""
+        self._done = False
+
+    def __pull(self) -> None:
+        chunk = self.source.read(self.chunk_size)
+        if chunk:
+            for stage in self.stages:
+                chunk = stage.feed(chunk)
+            self._buffer += chunk
+            return
+
+        # Fin del stream: cada etapa puede emitir bytes finales, que
+        # pasan por las etapas siguientes
+        self._done = True
+        for i, stage in enumerate(self.stages):
+            tail = stage.finish()
+            for following in self.stages[i + 1:]:
+                if tail:
+                    tail = following.feed(tail)
+            self._buffer += tail
+
+    def read(self, size: int = -1) -> bytes:
+        try:
+            while not self._done and (size < 0 or len(self._buffer) < size):
+                self.__pull()
+        except BaseException as e:
+            self.error = e
+            raise
+
+        if size < 0 or size >= len(self._buffer):
+            chunk, self._buffer = self._buffer, b""
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+    def raise_for_error(self) -> None:
+        """Re-raises the error that stopped the pipeline, if any."""
+        if self.error is not None:
+            raise self.error
+
+    def stage(self, kind: type) -> Any:
+        """First stage of type `kind`, e.g. pipeline.stage(DigestStage)."""
+        return next((s for s in self.stages if isinstance(s, kind)), None)
+
+
+__all__ = [
+    "DigestStage",
+    "IngestPipeline",
+    "IngestRejected",
+    "IngestStage",
+    "MagicBytesStage",
+    "PayloadTooLarge",
+    "SizeLimitStage",
+    "UnsupportedFormat",
+]
@@ -13,21 +13,26 @@
 # ============================================================
 
 import os
-from dotenv import load_dotenv
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
 
 # ======================================================
 #  Load environment variables
 # ======================================================
 # Permite usar un archivo .env para definir variables de entorno
 # (por ejemplo: DEBUG=True, FLASK_PORT=5000, etc.)
-load_dotenv()
+# dotenv solo se importa si el archivo existe; se usa una ruta fija
+# en lugar de buscar el .env recorriendo directorios.
+DOTENV_PATH = os.getenv("DOTENV_PATH", os.path.join(BASE_DIR, ".env"))
+
+if os.path.exists(DOTENV_PATH):
+    from dotenv import load_dotenv
+    load_dotenv(DOTENV_PATH)
 
 # ======================================================
 # General Application Settings
 # ======================================================
 
-BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
-
 # Nombre de la aplicación (puede usarse en logs, UI, etc.)
 APP_NAME = os.getenv("APP_NAME", "ProyectoArquitecturas")
 
@@ -41,6 +46,21 @@ DEBUG = os.getenv("DEBUG", "True").lower() in ("true", "1", "yes")
 HOST = os.getenv("FLASK_HOST", "0.0.0.0")
 PORT = int(os.getenv("FLASK_PORT", 5000))
 
+# ======================================================
+#  Production Server (src/app/server.py)
+# ======================================================
+
+# Procesos worker del lanzador. Los límites de admisión se reparten
+# entre ellos para que el total no cambie al escalar
+WORKERS = int(os.getenv("WORKERS", 1))
+
+# Segundos que un worker tiene para terminar sus peticiones en curso
+# al recargar (SIGHUP) o detener (SIGTERM) el servidor
+WORKER_GRACEFUL_TIMEOUT = float(os.getenv("WORKER_GRACEFUL_TIMEOUT", 30))
+
+# Cada cuántos segundos un worker publica sus métricas para los demás
+METRICS_PUBLISH_INTERVAL = float(os.getenv("METRICS_PUBLISH_INTERVAL", 5))
+
 # ======================================================
 #  Repository Paths
 # ======================================================
@@ -50,9 +70,83 @@ DATA_DIR = os.getenv("DATA_DIR", os.path.join(BASE_DIR, "data"))
 BINARIES_DIR = os.path.join(DATA_DIR, "binaries")
 SIGNED_DIR = os.path.join(DATA_DIR, "signed")
 
+# Estado de los workers en ejecución (métricas publicadas, pid del maestro)
+RUN_DIR = os.getenv("RUN_DIR", os.path.join(DATA_DIR, "run"))
+
+# Compresión de binarios y artefactos firmados: "" (ninguna), "xz" o
+# "zst" (requiere el paquete zstandard)
+STORAGE_COMPRESSION = os.getenv("STORAGE_COMPRESSION", "")
+_compression_level = os.getenv("STORAGE_COMPRESSION_LEVEL")
+STORAGE_COMPRESSION_LEVEL = int(_compression_level) if _compression_level else None
+
+# Dónde viven binarios y artefactos firmados: "local" (DATA_DIR) o
+# "s3" (almacén de objetos compartido entre nodos, requiere boto3;
+# credenciales en las variables estándar AWS_ACCESS_KEY_ID, etc.)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+S3_BUCKET = os.getenv("S3_BUCKET", "ota-signer")
+S3_PREFIX = os.getenv("S3_PREFIX", "")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL", "")
+S3_REGION = os.getenv("S3_REGION", "")
+S3_MULTIPART_CHUNK_SIZE = int(os.getenv("S3_MULTIPART_CHUNK_SIZE", 8 * 1024 * 1024))
+S3_COLD_STORAGE_CLASS = os.getenv("S3_COLD_STORAGE_CLASS", "")
+
+# Caché local de lectura de los objetos más usados (bytes)
+S3_CACHE_DIR = os.getenv("S3_CACHE_DIR", os.path.join(DATA_DIR, "cache", "objects"))
+S3_CACHE_MAX_BYTES = int(os.getenv("S3_CACHE_MAX_BYTES", 10 * 1024 * 1024 * 1024))
+
+# Segundos que un objeto recién usado queda protegido de la expulsión
+# (su ruta local puede estar en uso para mmap o hash en paralelo)
+S3_CACHE_MIN_AGE = float(os.getenv("S3_CACHE_MIN_AGE", 300))
+
+# Días tras los cuales los artefactos rechazados o reemplazados pasan
+# al almacenamiento frío (xz)
+RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", 30))
+
+# Preset de xz del almacenamiento frío ("0".."9", "e" = extreme). La
+# memoria al comprimir crece con el preset: 6 ~94 MiB, 9e ~674 MiB
+STORAGE_COLD_PRESET = os.getenv("STORAGE_COLD_PRESET", "6")
+
+# Archivo histórico: los registros firmados o rechazados con más de
+# ARCHIVE_AFTER_DAYS días salen de database.json hacia particiones
+# comprimidas por mes en ARCHIVE_DIR
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(DATA_DIR, "archive"))
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", 90))
+
+# Cada cuántos segundos la app archiva en segundo plano (0 = desactivado)
+ARCHIVE_INTERVAL_SECONDS = int(os.getenv("ARCHIVE_INTERVAL_SECONDS", 0))
+
+# Recolector de basura del almacenamiento (maintenance gc): borra los
+# originales rechazados o reemplazados con más de GC_PURGE_AFTER_DAYS
+# días (antes de que se archive su registro) y los archivos huérfanos
+# con más de GC_MIN_AGE_SECONDS, en lotes paralelos de GC_WORKERS hilos
+GC_PURGE_AFTER_DAYS = int(os.getenv("GC_PURGE_AFTER_DAYS", 60))
+GC_MIN_AGE_SECONDS = int(os.getenv("GC_MIN_AGE_SECONDS", 3600))
+GC_WORKERS = int(os.getenv("GC_WORKERS", 4))
+# Sesiones de carga por partes sin bloques nuevos en este tiempo se
+# consideran abandonadas y gc borra su .part (0 = no expirar)
+GC_UPLOAD_MAX_AGE_SECONDS = int(os.getenv("GC_UPLOAD_MAX_AGE_SECONDS", 24 * 60 * 60))
+
+# Índice de la última versión firmada por ambiente/filename que sirve
+# /manifest, y cuántos segundos pueden cachearlo dispositivos y proxies
+RELEASE_INDEX_PATH = os.getenv("RELEASE_INDEX_PATH", os.path.join(DATA_DIR, "releases.json"))
+MANIFEST_MAX_AGE = int(os.getenv("MANIFEST_MAX_AGE", 60))
+
 # Ruta del archivo JSON para el repositorio de metadatos
 JSON_DB_PATH = os.getenv("JSON_DB_PATH", os.path.join(DATA_DIR, "database.json"))
 
+# Pipeline de ingesta de /upload: tamaño máximo en bytes (0 = sin
+# límite) y prefijos aceptados de la imagen en hexadecimal, separados
+# por comas, p. ej. "7f454c46,27051956" (vacío = cualquier formato)
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 0))
+UPLOAD_MAGIC_BYTES = [bytes.fromhex(p.strip()) for p in os.getenv("UPLOAD_MAGIC_BYTES", "").split(",") if p.strip()]
+
+# Caché de lectura de la base de datos (LRU por id y listado). Se
+# invalida al escribir y, entre procesos, cuando cambia la base de datos
+DB_CACHE_ENABLED = os.getenv("DB_CACHE_ENABLED", "True").lower() in ("true", "1", "yes")
+DB_CACHE_MAX_ENTRIES = int(os.getenv("DB_CACHE_MAX_ENTRIES", 4096))
+# Segundos entre comprobaciones del sello (0 = en cada lectura)
+DB_CACHE_CHECK_INTERVAL = float(os.getenv("DB_CACHE_CHECK_INTERVAL", 0))
+
 # ======================================================
 # Flask Template Config
 # ======================================================
@@ -67,13 +161,207 @@ TEMPLATES_DIR = os.getenv("TEMPLATES_DIR", os.path.join(BASE_DIR, "src", "templa
 # Clave de Flask (para sesiones, CSRF, etc.)
 SECRET_KEY = os.getenv("SECRET_KEY", "change-me-in-production")
 
+# ======================================================
+#  Signing Settings
+# ======================================================
+
+# Modo de hash de la firma: "linear" (un solo flujo) o "tree" (raíz
+# Merkle de bloques hasheados en paralelo)
+SIGNING_HASH_MODE = os.getenv("SIGNING_HASH_MODE", "linear")
+
+# Algoritmo de hash de la firma: sha256, sha512, blake2b o blake3
+# (pip install blake3). Se puede cambiar por ambiente, según lo que
+# soporten sus dispositivos: "dev=blake3;qa=blake2b"
+SIGNING_HASH_ALGORITHM = os.getenv("SIGNING_HASH_ALGORITHM", "sha256")
+
+
+def _parse_environment_map(raw: str) -> dict:
+    """
+    "dev=blake3;qa=blake2b" -> {"dev": "blake3", "qa": "blake2b"}
+    """
+    values = {}
+    for entry in raw.split(";"):
+        environment, _, value = entry.partition("=")
+        if environment.strip() and value.strip():
+            values[environment.strip()] = value.strip()
+    return values
+
+
+SIGNING_HASH_ALGORITHMS = _parse_environment_map(os.getenv("SIGNING_HASH_ALGORITHMS", ""))
+
+# Tamaño de bloque del modo "tree" (múltiplo de 64 KiB)
+SIGNING_BLOCK_SIZE = int(os.getenv("SIGNING_BLOCK_SIZE", 4 * 1024 * 1024))
+
+# Procesos para el hash en árbol (por defecto, todos los núcleos)
+SIGNING_WORKERS = int(os.getenv("SIGNING_WORKERS", os.cpu_count() or 1))
+
+# Caché de resultados de firma (digest, key_id, ambiente) -> firma
+SIGNING_CACHE_ENABLED = os.getenv("SIGNING_CACHE_ENABLED", "True").lower() in ("true", "1", "yes")
+SIGNING_CACHE_PATH = os.getenv("SIGNING_CACHE_PATH", os.path.join(DATA_DIR, "cache", "signatures.sqlite"))
+SIGNING_CACHE_MEMORY_ENTRIES = int(os.getenv("SIGNING_CACHE_MEMORY_ENTRIES", 1024))
+SIGNING_CACHE_DISK_ENTRIES = int(os.getenv("SIGNING_CACHE_DISK_ENTRIES", 100_000))
+
+# Deduplicación de reintentos de /upload (Idempotency-Key y digest)
+IDEMPOTENCY_ENABLED = os.getenv("IDEMPOTENCY_ENABLED", "True").lower() in ("true", "1", "yes")
+IDEMPOTENCY_DB_PATH = os.getenv("IDEMPOTENCY_DB_PATH", os.path.join(DATA_DIR, "cache", "idempotency.sqlite"))
+
+# Generar un delta firmado contra la versión firmada anterior
+# del mismo archivo/ambiente
+DELTA_ENABLED = os.getenv("DELTA_ENABLED", "False").lower() in ("true", "1", "yes")
+
+# Tamaño de bloque usado para detectar bloques repetidos en el delta
+DELTA_BLOCK_SIZE = int(os.getenv("DELTA_BLOCK_SIZE", 4096))
+
+# Cifrado del artefacto firmado (AEAD por segmentos) para ambientes
+# confidenciales: "prod,qa"; vacío = sin cifrado. Cada ambiente usa la
+# llave maestra de ENCRYPTION_KEY_PATH (python -m src.app.maintenance
+# keygen --environment prod)
+ENCRYPTION_ENVIRONMENTS = [e.strip() for e in os.getenv("ENCRYPTION_ENVIRONMENTS", "").split(",") if e.strip()]
+ENCRYPTION_ALGORITHM = os.getenv("ENCRYPTION_ALGORITHM", "aes-256-gcm")
+ENCRYPTION_SEGMENT_SIZE = int(os.getenv("ENCRYPTION_SEGMENT_SIZE", 1024 * 1024))
+ENCRYPTION_WORKERS = int(os.getenv("ENCRYPTION_WORKERS", 1))
+ENCRYPTION_KEY_PATH = os.getenv(
+    "ENCRYPTION_KEY_PATH", os.path.join(DATA_DIR, "{environment}_keys", "encryption.key")
+)
+
+# ======================================================
+#  Crash Recovery
+# ======================================================
+
+# Registro de intenciones de firma: permite completar o revertir al
+# arrancar las firmas que quedaron a medias por una caída
+INTENT_LOG_ENABLED = os.getenv("INTENT_LOG_ENABLED", "True").lower() in ("true", "1", "yes")
+INTENT_LOG_PATH = os.getenv("INTENT_LOG_PATH", os.path.join(DATA_DIR, "intents.sqlite"))
+RECOVERY_ON_STARTUP = os.getenv("RECOVERY_ON_STARTUP", "True").lower() in ("true", "1", "yes")
+
+# ======================================================
+#  Email Notifications
+# ======================================================
+
+def _parse_receivers(raw: str) -> dict:
+    """
+    "prod=ops@x.com,qa@x.com;dev=dev@x.com" -> {"prod": [...], "dev": [...]}
+    """
+    receivers = {}
+    for entry in raw.split(";"):
+        environment, _, emails = entry.partition("=")
+        addresses = [e.strip() for e in emails.split(",") if e.strip()]
+        if environment.strip() and addresses:
+            receivers[environment.strip()] = addresses
+    return receivers
+
+# Cuenta SMTP que envía las notificaciones (en Gmail, una contraseña
+# de aplicación). Nunca se escriben en el código: van en el entorno o
+# en .env. Sin remitente o contraseña no se envían correos
+EMAIL_SENDER = os.getenv("EMAIL_SENDER", "")
+EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD", "")
+EMAIL_DEFAULT_RECEIVER = os.getenv("EMAIL_DEFAULT_RECEIVER", "")
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
+
+# Destinatarios por ambiente (si un ambiente no aparece, se usa el
+# destinatario por defecto)
+EMAIL_RECEIVERS = _parse_receivers(os.getenv("EMAIL_RECEIVERS", ""))
+
+# Ventana del modo resumen en segundos: los eventos se juntan y se
+# envía un solo correo por destinatario (0 = un correo por evento)
+EMAIL_DIGEST_WINDOW_SECONDS = float(os.getenv("EMAIL_DIGEST_WINDOW_SECONDS", 0))
+
+# ======================================================
+#  Audit Log
+# ======================================================
+
+# Bitácora de cambios de estado (JSON por línea, escrita por lotes)
+AUDIT_ENABLED = os.getenv("AUDIT_ENABLED", "True").lower() in ("true", "1", "yes")
+AUDIT_DIR = os.getenv("AUDIT_DIR", os.path.join(DATA_DIR, "audit"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", 1.0))
+AUDIT_MAX_BYTES = int(os.getenv("AUDIT_MAX_BYTES", 64 * 1024 * 1024))
+AUDIT_MAX_FILES = int(os.getenv("AUDIT_MAX_FILES", 20))
+
+# ======================================================
+#  Admission Control
+# ======================================================
+
+# Límite de peticiones de carga/firma por cliente (0 = sin límite),
+# repartido entre los workers
+RATE_LIMIT_PER_MINUTE = int(os.getenv("RATE_LIMIT_PER_MINUTE", 60))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", 10))
+
+# Proxies de confianza delante de la app (0 = ninguno). Con N > 0 la
+# dirección del cliente (límite por cliente y bitácora) se toma de
+# X-Forwarded-For, confiando solo en los últimos N saltos; sin proxy
+# no debe activarse, porque el cliente podría falsificar la cabecera
+TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", 0))
+
+# Bytes de archivos que se pueden hashear/firmar a la vez (en total;
+# cada worker recibe SIGNING_CAPACITY_BYTES / WORKERS)
+SIGNING_CAPACITY_BYTES = int(os.getenv("SIGNING_CAPACITY_BYTES", 2 * 1024 * 1024 * 1024))
+
+# Espera máxima por cupo antes de responder 503, y Retry-After sugerido
+ADMISSION_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_TIMEOUT_SECONDS", 5))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", 10))
+
+# ======================================================
+#  Job Queue
+# ======================================================
+
+# Cola persistente (SQLite) para firmas y correos: sobrevive a reinicios
+JOB_QUEUE_ENABLED = os.getenv("JOB_QUEUE_ENABLED", "True").lower() in ("true", "1", "yes")
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", os.path.join(DATA_DIR, "jobs.sqlite"))
+
+# Hilos del worker de trabajos (solo en un proceso; 0 = no procesar aquí)
+JOB_WORKER_THREADS = int(os.getenv("JOB_WORKER_THREADS", 2))
+
+# Intentos antes de mandar un trabajo a la cola de muertos, y tiempo
+# que un worker conserva un trabajo antes de que otro lo retome
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 5))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", 300))
+
+
+def _parse_concurrency(raw: str) -> dict:
+    """
+    "sign=2,email=4" -> {"sign": 2, "email": 4}
+    """
+    limits = {}
+    for entry in raw.split(","):
+        kind, _, limit = entry.partition("=")
+        if kind.strip() and limit.strip():
+            limits[kind.strip()] = int(limit)
+    return limits
+
+
+# Trabajos de cada tipo en ejecución a la vez, entre todos los workers
+JOB_CONCURRENCY = _parse_concurrency(os.getenv("JOB_CONCURRENCY", "sign=2,email=4"))
+
+# ======================================================
+#  Profiling
+# ======================================================
+
+# Perfilado de peticiones lentas con cProfile (desactivado por defecto)
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "False").lower() in ("true", "1", "yes")
+
+# Solo se guardan los perfiles de peticiones que tardan al menos esto
+PROFILE_THRESHOLD_MS = float(os.getenv("PROFILE_THRESHOLD_MS", 500))
+
+# Fracción de peticiones que se perfilan (1.0 = todas)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 1.0))
+
+# Búfer circular en disco con los últimos PROFILE_MAX_ENTRIES perfiles
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(DATA_DIR, "profiles"))
+PROFILE_MAX_ENTRIES = int(os.getenv("PROFILE_MAX_ENTRIES", 50))
+
+# Token requerido en X-Admin-Token para /admin/profiles ("" = nadie
+# puede consultarlos aunque PROFILING_ENABLED esté activo)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
 # ======================================================
 #  Helper: ensure folders exist
 # ======================================================
 
 def ensure_directories():
     """Crea las carpetas necesarias para el funcionamiento de la app."""
-        for path in [DATA_DIR, BINARIES_DIR, SIGNED_DIR]:
-                os.makedirs(path, exist_ok=True)
+    for path in [DATA_DIR, BINARIES_DIR, SIGNED_DIR]:
+        os.makedirs(path, exist_ok=True)
+
 
-                ensure_directories()
+ensure_directories()
@@ -28,9 +28,25 @@ class BinaryFile:
         uploaded_at: str = None,
         signed_path: str = None,
         signature: str = None,
+        signed_at: str = None,
         file_path: str = None,
         approval_token: str = None,
         reject_token: str = None,
+        digest: str = None,
+        hash_mode: str = None,
+        hash_algorithm: str = None,
+        block_size: int = None,
+        block_hashes: list = None,
+        delta_base_id: str = None,
+        delta_path: str = None,
+        delta_signature: str = None,
+        delta_size: int = None,
+        raw_size: int = None,
+        stored_size: int = None,
+        storage_tier: str = None,
+        encrypted_path: str = None,
+        encrypted_size: int = None,
+        encryption_key_id: str = None,
     ):
         self.id = id
         self.filename = filename
@@ -39,12 +55,48 @@ class BinaryFile:
         self.uploaded_at = uploaded_at or datetime.now().isoformat()
         self.signed_path = signed_path
         self.signature = signature
+        self.signed_at = signed_at          # Momento de la firma (ISO)
         self.file_path = file_path          # Ruta original para la firma
 
         # === Tokens para aprobar/rechazar vía correo ===
         self.approval_token = approval_token
         self.reject_token = reject_token
 
+        # Digest del contenido original con el algoritmo del ambiente
+        # (ver hash_algorithm), si ya se calculó durante la carga
+        self.digest = digest
+
+        # === Modo de hash de la firma ===
+        # 'linear' (digest de todo el archivo) o 'tree' (raíz Merkle);
+        # en modo 'tree' se guardan los hashes por bloque para que el
+        # dispositivo verifique y reanude descargas bloque por bloque.
+        self.hash_mode = hash_mode
+        # Algoritmo del digest y de la firma ('sha256', 'sha512',
+        # 'blake2b', 'blake3'); None en registros antiguos = 'sha256'
+        self.hash_algorithm = hash_algorithm
+        self.block_size = block_size
+        self.block_hashes = block_hashes
+
+        # === Delta firmado contra la versión firmada anterior ===
+        self.delta_base_id = delta_base_id
+        self.delta_path = delta_path
+        self.delta_signature = delta_signature
+        self.delta_size = delta_size
+
+        # === Almacenamiento ===
+        # Tamaño original y tamaño en disco (comprimido si aplica);
+        # storage_tier: 'hot', 'cold' (archivado con máxima compresión) o
+        # 'purged' (el recolector de basura borró el original)
+        self.raw_size = raw_size
+        self.stored_size = stored_size
+        self.storage_tier = storage_tier
+
+        # === Artefacto firmado y cifrado (ambientes confidenciales) ===
+        # Cifrado por segmentos AEAD; solo se guarda el id de la llave
+        self.encrypted_path = encrypted_path
+        self.encrypted_size = encrypted_size
+        self.encryption_key_id = encryption_key_id
+
     def to_dict(self):
         """Return a dictionary representation of the BinaryFile."""
         return {
@@ -55,9 +107,46 @@ class BinaryFile:
             "uploaded_at": self.uploaded_at,
             "signed_path": self.signed_path,
             "signature": self.signature,
+            "signed_at": self.signed_at,
             "file_path": self.file_path,
             "approval_token": self.approval_token,
-            "reject_token": self.reject_token
+            "reject_token": self.reject_token,
+            "digest": self.digest,
+            "hash_mode": self.hash_mode,
+            "hash_algorithm": self.hash_algorithm,
+            "block_size": self.block_size,
+            "block_hashes": self.block_hashes,
+            "delta_base_id": self.delta_base_id,
+            "delta_path": self.delta_path,
+            "delta_signature": self.delta_signature,
+            "delta_size": self.delta_size,
+            "raw_size": self.raw_size,
+            "stored_size": self.stored_size,
+            "storage_tier": self.storage_tier,
+            "encrypted_path": self.encrypted_path,
+            "encrypted_size": self.encrypted_size,
+            "encryption_key_id": self.encryption_key_id,
+        }
+
+    def signing_updates(self):
+        """Return the fields that change when the file is signed."""
+        return {
+            "status": self.status,
+            "signed_path": self.signed_path,
+            "signature": self.signature,
+            "signed_at": self.signed_at,
+            "digest": self.digest,
+            "hash_mode": self.hash_mode,
+            "hash_algorithm": self.hash_algorithm,
+            "block_size": self.block_size,
+            "block_hashes": self.block_hashes,
+            "delta_base_id": self.delta_base_id,
+            "delta_path": self.delta_path,
+            "delta_signature": self.delta_signature,
+            "delta_size": self.delta_size,
+            "encrypted_path": self.encrypted_path,
+            "encrypted_size": self.encrypted_size,
+            "encryption_key_id": self.encryption_key_id,
         }
 
     @classmethod
@@ -74,7 +163,23 @@ class BinaryFile:
             uploaded_at=data.get("uploaded_at"),
             signed_path=data.get("signed_path"),
             signature=data.get("signature"),
+            signed_at=data.get("signed_at"),
             file_path=data.get("file_path"),
             approval_token=data.get("approval_token"),
             reject_token=data.get("reject_token"),
+            digest=data.get("digest"),
+            hash_mode=data.get("hash_mode"),
+            hash_algorithm=data.get("hash_algorithm"),
+            block_size=data.get("block_size"),
+            block_hashes=data.get("block_hashes"),
+            delta_base_id=data.get("delta_base_id"),
+            delta_path=data.get("delta_path"),
+            delta_signature=data.get("delta_signature"),
+            delta_size=data.get("delta_size"),
+            raw_size=data.get("raw_size"),
+            stored_size=data.get("stored_size"),
+            storage_tier=data.get("storage_tier"),
+            encrypted_path=data.get("encrypted_path"),
+            encrypted_size=data.get("encrypted_size"),
+            encryption_key_id=data.get("encryption_key_id"),
         )
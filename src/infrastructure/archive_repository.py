@@ -0,0 +1,211 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: archive_repository.py
+# ============================================================
+# Descripción:
+# Archivo histórico de registros que ya salieron de la base de
+# datos activa. Los registros se guardan como JSON por línea,
+# comprimidos con xz y particionados por mes de carga:
+#
+#   data/archive/records/2025-11.jsonl.xz
+#   data/archive/snapshots/database-20251113-101500.json.xz
+#
+# Cada ejecución agrega un stream xz nuevo al final de la
+# partición (lzma lee streams concatenados), así que nunca se
+# reescribe lo ya archivado. La clase también implementa
+# IDatabaseRepository en modo solo lectura para auditorías.
+#
+# Un solo proceso archiva a la vez: exclusive() toma flock sobre
+# <archive_dir>/archive.lock, que comparten el comando de
+# mantenimiento y el archivado en segundo plano de cada instancia.
+# ============================================================
+
+import os
+import json
+import lzma
+import shutil
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from src.application.ports import IDatabaseRepository, IRecordArchive
+from src.domain.models import BinaryFile
+from src.infrastructure.atomic import atomic_path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+PARTITION_SUFFIX = ".jsonl.xz"
+UNDATED_PARTITION = "undated"
+
+# Sin fcntl (Windows) al menos se excluyen los hilos del proceso
+_RUN_LOCK = threading.Lock()
+
+
+class ArchiveRepository(IDatabaseRepository, IRecordArchive):
+    """
+    Date-partitioned, append-only archive of records (read-only as a database).
+    """
+
+    def __init__(self, archive_dir: str = os.path.join("data", "archive")):
+        self.lock_path = os.path.join(archive_dir, "archive.lock")
+        self.records_dir = os.path.join(archive_dir, "records")
+        self.snapshots_dir = os.path.join(archive_dir, "snapshots")
+        os.makedirs(self.records_dir, exist_ok=True)
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+
+    @contextmanager
+    def exclusive(self, blocking: bool = True):
+        """
+        Holds the archive lock for one run. Yields False (without
+        waiting) if `blocking` is False and another process holds it.
+        """
+        if not _RUN_LOCK.acquire(blocking):
+            yield False
+            return
+        try:
+            if fcntl is None:
+                yield True
+                return
+            with open(self.lock_path, "a") as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    yield False
+                    return
+                try:
+                    yield True
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            _RUN_LOCK.release()
+
+    # --- Helpers ---------------------------------------------
+
+    @staticmethod
+    def __partition_of(record: BinaryFile) -> str:
+        # uploaded_at es ISO 8601: los primeros 7 caracteres son AAAA-MM
+        if record.uploaded_at and len(record.uploaded_at) >= 7:
+            return record.uploaded_at[:7]
+        return UNDATED_PARTITION
+
+    def __partitions(self) -> List[str]:
+        """Particiones existentes, de la más reciente a la más antigua."""
+        names = [
+            name[: -len(PARTITION_SUFFIX)]
+            for name in os.listdir(self.records_dir)
+            if name.endswith(PARTITION_SUFFIX)
+        ]
+        return sorted(names, reverse=True)
+
+    def __read_partition(self, partition: str) -> Iterator[BinaryFile]:
+        path = os.path.join(self.records_dir, partition + PARTITION_SUFFIX)
+        try:
+            with lzma.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield BinaryFile.from_dict(json.loads(line))
+        except (OSError, EOFError, lzma.LZMAError, ValueError) as e:
+            print(f"[ArchiveRepository] Error reading partition {partition}: {e}")
+
+    def __unique(self, partition: str) -> List[BinaryFile]:
+        # Si un archivado se interrumpió, el registro pudo escribirse dos
+        # veces en la misma partición: gana la última copia
+        records: Dict[str, BinaryFile] = {}
+        for record in self.__read_partition(partition):
+            records[record.id] = record
+        return list(records.values())
+
+    # --- IRecordArchive --------------------------------------
+
+    def append_records(self, records: List[BinaryFile]) -> int:
+        by_partition: Dict[str, List[BinaryFile]] = {}
+        for record in records:
+            by_partition.setdefault(self.__partition_of(record), []).append(record)
+
+        written = 0
+        for partition, items in by_partition.items():
+            path = os.path.join(self.records_dir, partition + PARTITION_SUFFIX)
+            with lzma.open(path, "at", encoding="utf-8") as f:
+                for record in items:
+                    f.write(json.dumps(record.to_dict(), separators=(",", ":")) + "\n")
+                    written += 1
+            # Los datos deben estar en disco antes de borrarlos de la base activa
+            with open(path, "rb+") as f:
+                os.fsync(f.fileno())
+
+        return written
+
+    def snapshot(self, source_path: str) -> str:
+        name = f"database-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json.xz"
+        snapshot_path = os.path.join(self.snapshots_dir, name)
+
+        try:
+            with atomic_path(snapshot_path) as tmp_path:
+                with open(source_path, "rb") as source, lzma.open(tmp_path, "wb") as out:
+                    shutil.copyfileobj(source, out, 1024 * 1024)
+            return snapshot_path
+        except Exception as e:
+            print(f"[ArchiveRepository] Error creating snapshot: {e}")
+            return ""
+
+    # --- IDatabaseRepository (solo lectura) ------------------
+
+    def add_record(self, record: Any) -> None:
+        print("[ArchiveRepository] Archive is read-only, use append_records()")
+
+    def add_records(self, records: List[Any]) -> int:
+        print("[ArchiveRepository] Archive is read-only, use append_records()")
+        return 0
+
+    def get_record(self, file_id: str) -> Optional[BinaryFile]:
+        for partition in self.__partitions():
+            found = None
+            for record in self.__read_partition(partition):
+                if record.id == file_id:
+                    found = record
+            if found:
+                return found
+        return None
+
+    def list_records(self) -> List[BinaryFile]:
+        return [r for partition in self.__partitions() for r in self.__unique(partition)]
+
+    def list_records_between(self, since: str, until: str) -> List[BinaryFile]:
+        """
+        Records uploaded in [since, until) (ISO dates); only the partitions
+        that overlap the range are decompressed.
+        """
+        selected = []
+        for partition in self.__partitions():
+            if partition != UNDATED_PARTITION and not since[:7] <= partition <= until[:7]:
+                continue
+            selected.extend(r for r in self.__unique(partition) if since <= (r.uploaded_at or "") < until)
+        return selected
+
+    def update_record(self, file_id: str, updates: Dict) -> bool:
+        print("[ArchiveRepository] Archive is read-only")
+        return False
+
+    def delete_record(self, file_id: str) -> bool:
+        print("[ArchiveRepository] Archive is read-only")
+        return False
+
+    def delete_records(self, file_ids: List[str]) -> int:
+        print("[ArchiveRepository] Archive is read-only")
+        return 0
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        # Sin índice: las consultas al histórico son por id o por fechas (audit)
+        return []
+
+    def aggregates(self) -> Dict[str, Any]:
+        # El archivo histórico no lleva agregados: /api/stats cubre los registros activos
+        return {}
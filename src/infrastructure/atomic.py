@@ -0,0 +1,107 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: atomic.py
+# ============================================================
+# Descripción:
+# Escritura atómica de archivos: el contenido se escribe en un
+# temporal dentro de la misma carpeta, se sincroniza a disco
+# (fsync) y se renombra sobre la ruta final. Un lector ve el
+# archivo anterior o el nuevo completo, nunca uno truncado, y dos
+# escrituras en paralelo no pueden mezclar su contenido.
+#
+# Los temporales se llaman ".tmp-<uuid>-<nombre>" para que la
+# recuperación al arrancar pueda encontrarlos y borrarlos.
+# ============================================================
+
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, List
+
+
+TEMP_PREFIX = ".tmp-"
+
+
+def temp_path_for(path: str) -> str:
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f"{TEMP_PREFIX}{uuid.uuid4().hex}-{name}")
+
+
+def fsync_file(path: str) -> None:
+    # fsync sobre cualquier descriptor del archivo baja sus datos a disco
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_dir(directory: str) -> None:
+    """Persist a rename (no-op where directories cannot be opened)."""
+    try:
+        fd = os.open(directory or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def publish(temp_path: str, path: str) -> None:
+    """fsync `temp_path` and atomically rename it to `path`."""
+    fsync_file(temp_path)
+    os.replace(temp_path, path)
+    fsync_dir(os.path.dirname(path))
+
+
+@contextmanager
+def atomic_path(path: str) -> Iterator[str]:
+    """
+    `with atomic_path(dest) as tmp:` write anything to `tmp`; on success
+    it replaces `dest`, on error it is removed.
+    """
+    temp_path = temp_path_for(path)
+    try:
+        yield temp_path
+        publish(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+@contextmanager
+def atomic_open(path: str, mode: str = "wb", **kwargs):
+    with atomic_path(path) as temp_path:
+        with open(temp_path, mode, **kwargs) as f:
+            yield f
+
+
+def remove_temp_files(directory: str, older_than: float = 3600) -> List[str]:
+    """
+    Delete leftovers of interrupted atomic writes in `directory`. Only
+    files untouched for `older_than` seconds are removed, so writes still
+    in progress in another process are left alone.
+    """
+    removed = []
+    if not os.path.isdir(directory):
+        return removed
+    cutoff = time.time() - older_than
+    for name in os.listdir(directory):
+        if name.startswith(TEMP_PREFIX):
+            path = os.path.join(directory, name)
+            try:
+                if os.path.getmtime(path) > cutoff:
+                    continue
+                os.remove(path)
+                removed.append(path)
+            except OSError:
+                pass
+    return removed
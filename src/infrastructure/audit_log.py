@@ -0,0 +1,209 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: audit_log.py
+# ============================================================
+# Descripción:
+# Bitácora de auditoría de solo anexado (JSON por línea) con los
+# cambios de estado de cada binario: quién, cuándo, estado
+# anterior/nuevo, digest y duración.
+#
+# record() solo encola el evento; un hilo en segundo plano junta
+# los eventos y los escribe por lotes (una escritura y a lo sumo un
+# fsync por lote), así la petición no hace E/S síncrona. Cuando
+# el archivo activo supera max_bytes se rota:
+#
+#   data/audit/audit.log                    <- activo
+#   data/audit/audit-20251113-101500.log    <- rotados
+# ============================================================
+
+import os
+import json
+import time
+import queue
+import atexit
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from src.application.ports import IAuditLog
+
+
+ACTIVE_NAME = "audit.log"
+
+
+class BufferedAuditLog(IAuditLog):
+    """
+    Append-only JSON-lines audit log written by a background thread.
+    """
+
+    def __init__(
+        self,
+        log_dir: str = os.path.join("data", "audit"),
+        flush_interval: float = 1.0,
+        max_batch: int = 500,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_files: int = 20,
+        max_queue: int = 100_000,
+        fsync: bool = True,
+    ):
+        os.makedirs(log_dir, exist_ok=True)
+
+        self.log_dir = log_dir
+        self.path = os.path.join(log_dir, ACTIVE_NAME)
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.fsync = fsync
+        self.dropped = 0
+        self.written = 0
+
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(max_queue)
+        self._file = None
+        self._closed = False
+        self._thread = threading.Thread(target=self.__run, name="audit-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # --- API -------------------------------------------------
+
+    def record(self, event: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # Con la cola llena se prefiere perder un evento a frenar la petición
+            self.dropped += 1
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until every queued event is on disk."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    # --- Hilo escritor ---------------------------------------
+
+    def __run(self) -> None:
+        while True:
+            first = self._queue.get()
+            batch = [first]
+
+            # Junta lo que llegue durante flush_interval (hasta max_batch)
+            deadline = time.monotonic() + self.flush_interval
+            while first is not None and len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+                if batch[-1] is None:
+                    break
+
+            events = [e for e in batch if e is not None]
+            try:
+                if events:
+                    self.__write(events)
+            except Exception as e:
+                print(f"[BufferedAuditLog] Error writing {len(events)} event(s): {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if batch[-1] is None:
+                if self._file:
+                    self._file.close()
+                return
+
+    def __open(self):
+        # Otro proceso pudo rotar el archivo: si el inodo cambió, se reabre
+        if self._file is not None:
+            try:
+                if os.stat(self.path).st_ino == os.fstat(self._file.fileno()).st_ino:
+                    return self._file
+            except FileNotFoundError:
+                pass
+            self._file.close()
+
+        self._file = open(self.path, "ab")
+        return self._file
+
+    def __write(self, events: List[Dict[str, Any]]) -> None:
+        data = b"".join(
+            json.dumps(e, separators=(",", ":"), default=str).encode("utf-8") + b"\n" for e in events
+        )
+        f = self.__open()
+        f.write(data)
+        f.flush()
+        if self.fsync:
+            os.fsync(f.fileno())
+        self.written += len(events)
+
+        if f.tell() >= self.max_bytes:
+            self.__rotate()
+
+    def __rotate(self) -> None:
+        self._file.close()
+        self._file = None
+
+        rotated = os.path.join(self.log_dir, f"audit-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.log")
+        try:
+            os.replace(self.path, rotated)
+        except FileNotFoundError:
+            return
+
+        for old in rotated_files(self.log_dir)[: -self.max_files or None]:
+            os.remove(old)
+
+
+def rotated_files(log_dir: str) -> List[str]:
+    """Rotated logs, oldest first."""
+    if not os.path.isdir(log_dir):
+        return []
+    names = sorted(n for n in os.listdir(log_dir) if n.startswith("audit-") and n.endswith(".log"))
+    return [os.path.join(log_dir, n) for n in names]
+
+
+def read_events(
+    log_dir: str,
+    file_id: Optional[str] = None,
+    actor: Optional[str] = None,
+    status: Optional[str] = None,
+    since: str = "",
+    until: str = "9999",
+) -> Iterator[Dict[str, Any]]:
+    """
+    Events in chronological order, filtered by record, actor, new
+    status and [since, until) ISO timestamps.
+    """
+    paths = rotated_files(log_dir) + [os.path.join(log_dir, ACTIVE_NAME)]
+
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # Última línea truncada por un cierre abrupto
+                    continue
+                if file_id and event.get("file_id") != file_id:
+                    continue
+                if actor and event.get("actor") != actor:
+                    continue
+                if status and event.get("new_status") != status:
+                    continue
+                if not since <= event.get("ts", "") < until:
+                    continue
+                yield event
@@ -0,0 +1,95 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: compression.py
+# ============================================================
+# Descripción:
+# Códecs de compresión en streaming para el almacenamiento de
+# binarios. El códec se identifica por la extensión del archivo:
+#
+#   .xz   -> lzma (biblioteca estándar)
+#   .zst  -> zstandard (dependencia opcional: pip install zstandard)
+#   otro  -> sin compresión
+#
+# Lectores y escritores trabajan por bloques, así que nunca se
+# materializa la imagen completa en memoria.
+# ============================================================
+
+import lzma
+from typing import BinaryIO, Optional
+
+
+CODEC_EXTENSIONS = {"xz": ".xz", "zst": ".zst"}
+
+# Nivel "frío" para artefactos que casi no se leen. El preset 6 usa
+# ~94 MiB al comprimir; 9e llega a ~674 MiB por cada archivo que se
+# mueve, así que solo se usa si se configura (STORAGE_COLD_PRESET)
+COLD_CODEC = "xz"
+COLD_PRESET = 6
+
+
+def parse_xz_preset(value: str) -> int:
+    """
+    Convierte un preset de xz escrito como en la línea de comandos
+    ("0".."9", con sufijo "e" para extreme) en el valor de lzma.
+    Lanza ValueError si no es válido.
+    """
+    text = str(value).strip().lower()
+    extreme = text.endswith("e")
+    digits = text[:-1] if extreme else text
+    if not digits.isdigit() or not 0 <= int(digits) <= 9:
+        raise ValueError(f"Invalid xz preset '{value}', expected 0-9 with an optional 'e' suffix")
+    return int(digits) | (lzma.PRESET_EXTREME if extreme else 0)
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("zstd storage requires the 'zstandard' package (pip install zstandard)") from e
+    return zstandard
+
+
+def codec_for(path: str) -> Optional[str]:
+    """Devuelve el códec de un archivo según su extensión (None = sin comprimir)."""
+    for codec, ext in CODEC_EXTENSIONS.items():
+        if path.endswith(ext):
+            return codec
+    return None
+
+
+def strip_codec_extension(name: str) -> str:
+    codec = codec_for(name)
+    return name[: -len(CODEC_EXTENSIONS[codec])] if codec else name
+
+
+def open_reader(path: str) -> BinaryIO:
+    """Abre un archivo y devuelve un stream con los bytes originales."""
+    codec = codec_for(path)
+
+    if codec == "xz":
+        return lzma.open(path, "rb")
+
+    if codec == "zst":
+        raw = open(path, "rb")
+        return _zstd().ZstdDecompressor().stream_reader(raw, closefd=True)
+
+    return open(path, "rb")
+
+
+def open_writer(path: str, codec: Optional[str], level: Optional[int] = None) -> BinaryIO:
+    """Abre un archivo para escritura comprimiendo con `codec`."""
+    if codec == "xz":
+        return lzma.open(path, "wb", preset=6 if level is None else level)
+
+    if codec == "zst":
+        raw = open(path, "wb")
+        return _zstd().ZstdCompressor(level=3 if level is None else level).stream_writer(raw, closefd=True)
+
+    if codec is None:
+        return open(path, "wb")
+
+    raise ValueError(f"Unknown compression codec '{codec}', expected one of {tuple(CODEC_EXTENSIONS)}")
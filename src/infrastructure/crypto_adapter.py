@@ -7,13 +7,21 @@
 # Archivo: crypto_adapter.py
 # ============================================================
 # Descripción:
-# Adaptador criptográfico que implementa la firma SHA-256 para
-# archivos binarios siguiendo la interfaz ISigningService.
+# Adaptador criptográfico que implementa la firma de archivos
+# binarios siguiendo la interfaz ISigningService.
+# Soporta dos modos de hash: 'linear' (un solo flujo) y 'tree'
+# (raíz Merkle de bloques hasheados en paralelo), con el algoritmo
+# configurado para cada ambiente (SHA-256 por defecto).
 # ============================================================
 
-import hashlib
+from typing import Dict, List, Optional
 from src.application.ports import ISigningService, IFileRepository
+from src.common.hashing import DEFAULT_HASH_ALGORITHM, check_algorithm, hash_stream
 from src.domain.models import BinaryFile
+from src.infrastructure.tree_hasher import TreeHasher, DEFAULT_BLOCK_SIZE, check_block_size, merkle_root
+
+
+HASH_MODES = ("linear", "tree")
 
 
 class CryptoAdapter(ISigningService):
@@ -21,16 +29,89 @@ class CryptoAdapter(ISigningService):
     Handles cryptographic signing of files.
     """
 
-    def __init__(self, file_repo: IFileRepository):
+    def __init__(
+        self,
+        file_repo: IFileRepository,
+        hash_mode: str = "linear",
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        max_workers: Optional[int] = None,
+        hash_algorithm: str = DEFAULT_HASH_ALGORITHM,
+        environment_algorithms: Optional[Dict[str, str]] = None,
+    ):
+        if hash_mode not in HASH_MODES:
+            raise ValueError(f"Unknown hash mode '{hash_mode}', expected one of {HASH_MODES}")
+
         self.file_repo = file_repo
+        self.hash_mode = hash_mode
+        # Un tamaño de bloque inválido falla aquí y no en la primera firma
+        self.block_size = check_block_size(block_size) if hash_mode == "tree" else block_size
+        self.max_workers = max_workers
 
-    def sign_file(self, binary: BinaryFile):
-        data = self.file_repo.load(binary.file_path)
-        sha256_hash = hashlib.sha256()
-        sha256_hash.update(data)
-        signature = sha256_hash.hexdigest()
+        # Un algoritmo mal escrito (o blake3 sin instalar) falla al construir
+        # el adaptador, antes de escribir nada
+        self.hash_algorithm = check_algorithm(hash_algorithm)
+        self.environment_algorithms = {
+            env: check_algorithm(algorithm) for env, algorithm in (environment_algorithms or {}).items()
+        }
+
+    @property
+    def key_id(self) -> str:
+        mode = f"tree/{self.block_size}" if self.hash_mode == "tree" else "linear"
+        overrides = ",".join(f"{env}={alg}" for env, alg in sorted(self.environment_algorithms.items()))
+        return f"{self.hash_algorithm}/{mode}" + (f";{overrides}" if overrides else "")
+
+    def algorithm_for(self, environment: Optional[str]) -> str:
+        return self.environment_algorithms.get(environment or "", self.hash_algorithm)
+
+    def content_digest(self, binary: BinaryFile) -> str:
+        algorithm = self.algorithm_for(binary.environment)
+
+        # Modo árbol: se firma la raíz Merkle y se guardan los hashes por bloque
+        if self.hash_mode == "tree":
+            # Hashes por bloque ya calculados con la misma configuración
+            if (binary.hash_mode == "tree" and binary.block_hashes and binary.block_size == self.block_size
+                    and binary.hash_algorithm == algorithm):
+                return merkle_root(binary.block_hashes, algorithm)
 
-        signed_data = data + b"\n\n# SIGNATURE: " + signature.encode("utf-8")
-        signed_path = self.file_repo.move_to_signed(binary.file_path, signed_data)
+            hasher = TreeHasher(self.block_size, self.max_workers, algorithm)
+            raw_path = self.file_repo.raw_path(binary.file_path)
+
+            if raw_path:
+                root, block_hashes = hasher.hash_file(raw_path)
+            else:
+                # Archivo comprimido: se hashea el stream descomprimido
+                with self.file_repo.open_read(binary.file_path) as stream:
+                    root, block_hashes = hasher.hash_stream(stream)
+
+            binary.hash_mode = "tree"
+            binary.hash_algorithm = algorithm
+            binary.block_size = self.block_size
+            binary.block_hashes = block_hashes
+            return root
+
+        binary.hash_mode = "linear"
+
+        # Carga por partes: el digest ya se calculó al recibir los bloques,
+        # así que no se vuelve a leer el archivo para hashearlo (si se
+        # calculó con el mismo algoritmo)
+        if binary.digest and (binary.hash_algorithm or DEFAULT_HASH_ALGORITHM) == algorithm:
+            binary.hash_algorithm = algorithm
+            return binary.digest
+
+        # Hash por bloques sobre el stream (descomprimido si aplica):
+        # la imagen nunca se carga completa en memoria
+        with self.file_repo.open_read(binary.file_path) as stream:
+            binary.digest = hash_stream(stream, algorithm)
+        binary.hash_algorithm = algorithm
+        return binary.digest
+
+    def artifact_paths(self, binary: BinaryFile) -> List[str]:
+        return [self.file_repo.signed_path_for(binary.file_path)] if binary.file_path else []
+
+    def sign_file(self, binary: BinaryFile):
+        signature = self.content_digest(binary)
+        return signature, self.__write_signed(binary, signature)
 
-        return signature, signed_path
+    def __write_signed(self, binary: BinaryFile, signature: str) -> str:
+        trailer = b"\n\n# SIGNATURE: " + signature.encode("utf-8")
+        return self.file_repo.copy_to_signed(binary.file_path, trailer)
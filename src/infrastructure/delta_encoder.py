@@ -0,0 +1,312 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: delta_encoder.py
+# ============================================================
+# Descripción:
+# Genera parches binarios (deltas) entre el artefacto firmado
+# anterior de un archivo y el nuevo, al estilo rsync: los bloques de
+# la versión anterior se indexan por un checksum rodante (Adler-32)
+# y uno fuerte (BLAKE2b), y la versión nueva se
+# recorre byte por byte buscando esos bloques en cualquier posición.
+# Así, insertar o quitar unos bytes al inicio no convierte el resto
+# de la imagen en datos nuevos. Lo que coincide viaja como referencia
+# (COPY) y el resto como datos comprimidos (DATA).
+#
+# Rodar byte por byte en Python cuesta ~0.35 s/MiB, así que tras
+# SKIP_AFTER bytes sin coincidencias (datos nuevos) solo se rueda una
+# ventana de cada SKIP_STRIDE: una ventana de block_size bytes cubre
+# todas las alineaciones posibles, así que una zona que vuelve a
+# coincidir se detecta a lo sumo SKIP_STRIDE + 2 bloques después.
+#
+# Base y objetivo son los artefactos firmados (imagen + trailer de
+# firma), que es lo que el dispositivo tiene instalado y lo que debe
+# reconstruir; el digest de la base se calcula sobre ese archivo.
+#
+# Formato (big-endian):
+#   cabecera: "OTADELTA" | versión u8 | block_size u32 |
+#             base_size u64 | target_size u64 |
+#             sha256(base) 32B | sha256(target) 32B
+#   COPY:     0x01 | base_offset u64 | length u32
+#   DATA:     0x02 | raw_len u32 | zlib_len u32 | datos zlib
+# Al final se agrega el trailer "# SIGNATURE: <sha256 del delta>".
+# ============================================================
+
+import os
+import zlib
+import struct
+import hashlib
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+from src.application.ports import IDeltaService, IFileRepository
+from src.infrastructure.atomic import publish, temp_path_for
+from src.domain.models import BinaryFile
+
+
+MAGIC = b"OTADELTA"
+# v2: COPY en cualquier offset de la base y digests de los artefactos firmados
+VERSION = 2
+HEADER = struct.Struct(">8sBIQQ32s32s")
+COPY_OP = struct.Struct(">BQI")
+DATA_OP = struct.Struct(">BII")
+OP_COPY = 1
+OP_DATA = 2
+
+DEFAULT_BLOCK_SIZE = 4096
+
+# Los datos literales se comprimen en tramos de hasta 1 MiB
+LITERAL_FLUSH = 1024 * 1024
+
+# Datos sin coincidencias tras los cuales se rueda solo una ventana
+# de cada SKIP_STRIDE bytes
+SKIP_AFTER = 64 * 1024
+SKIP_STRIDE = 64 * 1024
+
+# Módulo de Adler-32
+_ADLER_MOD = 65521
+
+
+def _block_key(block: bytes) -> bytes:
+    return hashlib.blake2b(block, digest_size=16).digest()
+
+
+def _index_base(base: BinaryIO, block_size: int):
+    """
+    Índice de los bloques completos de la base: Adler-32 -> {BLAKE2b: offset}.
+    Devuelve (índice, tamaño, sha256).
+    """
+    base_sha = hashlib.sha256()
+    index: Dict[int, Dict[bytes, int]] = {}
+
+    offset = 0
+    for block in iter(lambda: base.read(block_size), b""):
+        base_sha.update(block)
+        if len(block) == block_size:
+            index.setdefault(zlib.adler32(block), {}).setdefault(_block_key(block), offset)
+        offset += len(block)
+    return index, offset, base_sha
+
+
+def encode_delta(base: BinaryIO, target: BinaryIO, delta_path: str, block_size: int = DEFAULT_BLOCK_SIZE) -> None:
+    """
+    Escribe en `delta_path` el parche que transforma el stream `base`
+    en el stream `target` (ambos se leen una sola vez; del objetivo solo
+    se mantiene en memoria una ventana de unos MiB).
+    """
+    index, base_size, base_sha = _index_base(base, block_size)
+
+    target_sha = hashlib.sha256()
+    target_size = 0
+
+    with open(delta_path, "w+b") as out:
+        # La cabecera se reescribe al final, cuando se conoce el digest
+        out.write(b"\0" * HEADER.size)
+
+        literal = bytearray()
+        copy_start, copy_len = None, 0
+
+        def flush_literal():
+            if literal:
+                packed = zlib.compress(bytes(literal), 6)
+                out.write(DATA_OP.pack(OP_DATA, len(literal), len(packed)))
+                out.write(packed)
+                literal.clear()
+
+        def flush_copy():
+            nonlocal copy_start, copy_len
+            if copy_start is not None:
+                out.write(COPY_OP.pack(OP_COPY, copy_start, copy_len))
+                copy_start, copy_len = None, 0
+
+        def add_literal(data):
+            flush_copy()
+            literal.extend(data)
+            if len(literal) >= LITERAL_FLUSH:
+                flush_literal()
+
+        block = block_size
+        buf = b""
+        pos = 0          # posición de la ventana en buf
+        pending = 0      # inicio de los literales aún no agregados
+        eof = False
+        weak = None      # Adler-32 de buf[pos:pos + block] (None = recalcular)
+        a = b = 0        # sus dos sumas, sin reducir
+        unmatched = 0    # bytes recorridos desde la última coincidencia
+
+        while True:
+            # Ventana + 1 byte disponibles para poder rodar
+            if len(buf) - pos <= block and not eof:
+                add_literal(buf[pending:pos])
+                chunk = target.read(LITERAL_FLUSH)
+                target_sha.update(chunk)
+                target_size += len(chunk)
+                eof = not chunk
+                buf, pos, pending = buf[pos:] + chunk, 0, 0
+                continue
+
+            end = len(buf)
+            if end - pos < block:
+                break
+
+            if weak is None:
+                weak = zlib.adler32(buf[pos:pos + block])
+                a, b = weak & 0xFFFF, weak >> 16
+
+            if weak not in index:
+                # Datos nuevos: se rueda una sola ventana y se salta el resto
+                skipping = unmatched >= SKIP_AFTER
+                limit = min(end - block, pos + block) if skipping else end - block
+                start = pos
+                # Las sumas se ruedan sin reducir; la clave es su Adler-32
+                # (el cálculo va en línea: es el ciclo más caliente)
+                for out_byte, in_byte in zip(buf[pos:limit], buf[pos + block:limit + block]):
+                    a += in_byte - out_byte
+                    b += a - block * out_byte - 1
+                    pos += 1
+                    weak = (b % _ADLER_MOD) << 16 | a % _ADLER_MOD
+                    if weak in index:
+                        break
+                unmatched += pos - start
+
+                if weak not in index:
+                    if skipping and pos < end - block:
+                        jump = min(SKIP_STRIDE, end - pos)
+                        pos += jump
+                        unmatched += jump
+                        weak = None
+                    elif eof:
+                        # Última ventana posible: el resto va como literal
+                        break
+                    # Si no, la ventana llegó al final de buf: se rellena y se sigue rodando
+                    continue
+
+            base_offset = index[weak].get(_block_key(buf[pos:pos + block]))
+
+            if base_offset is None:
+                # Falso positivo del checksum débil: se avanza un byte
+                if pos + block < end:
+                    out_byte = buf[pos]
+                    a += buf[pos + block] - out_byte
+                    b += a - block * out_byte - 1
+                    weak = (b % _ADLER_MOD) << 16 | a % _ADLER_MOD
+                else:
+                    weak = None
+                pos += 1
+                unmatched += 1
+                continue
+
+            add_literal(buf[pending:pos])
+            flush_literal()
+            if copy_start is not None and copy_start + copy_len == base_offset:
+                copy_len += block
+            else:
+                flush_copy()
+                copy_start, copy_len = base_offset, block
+            pos += block
+            pending = pos
+            weak = None
+            unmatched = 0
+
+        add_literal(buf[pending:])
+        flush_literal()
+        flush_copy()
+
+        out.seek(0)
+        out.write(HEADER.pack(MAGIC, VERSION, block_size, base_size, target_size, base_sha.digest(), target_sha.digest()))
+
+
+def apply_delta(base_path: str, delta_path: str, out_path: str) -> bool:
+    """
+    Reconstruye el artefacto firmado nuevo a partir del instalado
+    (`base_path`) y el delta (lado del dispositivo). Devuelve False si
+    los digests no coinciden.
+    """
+    with open(delta_path, "rb") as delta:
+        magic, version, _, base_size, target_size, base_digest, target_digest = HEADER.unpack(delta.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            return False
+
+        base_sha = hashlib.sha256()
+        with open(base_path, "rb") as base:
+            for chunk in iter(lambda: base.read(LITERAL_FLUSH), b""):
+                base_sha.update(chunk)
+        if base_sha.digest() != base_digest:
+            return False
+
+        target_sha = hashlib.sha256()
+        written = 0
+
+        with open(base_path, "rb") as base, open(out_path, "wb") as out:
+            # El trailer de firma queda después del último op y se ignora
+            while written < target_size:
+                op = delta.read(1)
+                if op == bytes([OP_COPY]):
+                    _, base_offset, length = COPY_OP.unpack(op + delta.read(COPY_OP.size - 1))
+                    base.seek(base_offset)
+                    data = base.read(length)
+                elif op == bytes([OP_DATA]):
+                    _, raw_len, packed_len = DATA_OP.unpack(op + delta.read(DATA_OP.size - 1))
+                    data = zlib.decompress(delta.read(packed_len))
+                else:
+                    return False
+
+                out.write(data)
+                target_sha.update(data)
+                written += len(data)
+
+    return written == target_size and target_sha.digest() == target_digest
+
+
+class DeltaEncoder(IDeltaService):
+    """
+    Produces signed block-level deltas in the signed folder.
+    """
+
+    def __init__(self, file_repo: IFileRepository, signed_dir: str = os.path.join("data", "signed"), block_size: int = DEFAULT_BLOCK_SIZE):
+        self.file_repo = file_repo
+        self.signed_dir = signed_dir
+        self.block_size = block_size
+        os.makedirs(self.signed_dir, exist_ok=True)
+
+    def create_delta(self, base: BinaryFile, target: BinaryFile) -> Optional[Dict[str, Any]]:
+        if not base.signed_path or not target.signed_path:
+            return None
+
+        delta_path = os.path.join(self.signed_dir, f"delta_{base.id}_{target.id}")
+        # Se escribe en un temporal y se publica completo (con firma) al final
+        tmp_path = temp_path_for(delta_path)
+
+        try:
+            # Entre artefactos firmados: es lo que el dispositivo tiene y lo que debe quedar
+            with self.file_repo.open_read(base.signed_path) as base_stream, \
+                    self.file_repo.open_read(target.signed_path) as target_stream:
+                encode_delta(base_stream, target_stream, tmp_path, self.block_size)
+
+            delta_sha = hashlib.sha256()
+            with open(tmp_path, "rb") as f:
+                for chunk in iter(lambda: f.read(LITERAL_FLUSH), b""):
+                    delta_sha.update(chunk)
+            signature = delta_sha.hexdigest()
+
+            # Si el delta no ahorra nada, el dispositivo descarga la imagen completa
+            if os.path.getsize(tmp_path) >= self.file_repo.get_sizes(target.signed_path)["raw_size"]:
+                return None
+
+            with open(tmp_path, "ab") as f:
+                f.write(b"\n\n# SIGNATURE: " + signature.encode("utf-8"))
+            publish(tmp_path, delta_path)
+
+            return {
+                "delta_base_id": base.id,
+                "delta_path": delta_path,
+                "delta_signature": signature,
+                "delta_size": os.path.getsize(delta_path),
+            }
+        except Exception as e:
+            print(f"[DeltaEncoder] Error creating delta {base.id} -> {target.id}: {e}")
+            return None
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -10,22 +10,76 @@
 # Implementa un servicio real de notificaciones por correo
 # usando Gmail SMTP. Envía mensajes para estados: PENDING,
 # SIGNED y REJECTED.
+#
+# Los cuerpos HTML son plantillas Jinja (templates/email/) que se
+# compilan una sola vez por proceso. Cada ambiente puede tener
+# varios destinatarios. En modo resumen (DigestEmailNotifier) los
+# eventos se acumulan durante una ventana y se envía un único
+# correo por destinatario con todos ellos.
 # ============================================================
 
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-
+import os
+import atexit
+import threading
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from src.application.ports import INotifierService
 from src.domain.models import BinaryFile
 
 
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "email")
+
+DIGEST_TITLES = {
+    "approval": "Pendientes de aprobación",
+    "signed": "Firmados",
+    "rejected": "Rechazados",
+}
+
+
+@lru_cache(maxsize=1)
+def _templates():
+    """
+    Entorno Jinja compartido: cada plantilla se compila la primera vez
+    que se usa y queda en caché (auto_reload desactivado).
+    """
+    from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+    return Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=select_autoescape(["html"]),
+        auto_reload=False,
+    )
+
+
+def render_template(name: str, **context) -> str:
+    return _templates().get_template(name).render(**context)
+
+
 class EmailNotifier(INotifierService):
 
-    def __init__(self, sender_email: str, sender_password: str, default_receiver: str = None):
+    def __init__(
+        self,
+        sender_email: str,
+        sender_password: str,
+        default_receiver: str = None,
+        receivers: Optional[Dict[str, List[str]]] = None,
+        smtp_host: str = "smtp.gmail.com",
+        smtp_port: int = 587,
+    ):
         self.sender_email = sender_email
         self.sender_password = sender_password
         self.default_receiver = default_receiver
+        self.receivers = receivers or {}
+        self.smtp_host = smtp_host
+        self.smtp_port = smtp_port
+
+    def recipients_for(self, environment: Optional[str]) -> List[str]:
+        """Receivers configured for the environment, or the default one."""
+        configured = self.receivers.get(environment or "")
+        if configured:
+            return configured
+        return [self.default_receiver] if self.default_receiver else []
 
 
     # ============================================================
@@ -34,19 +88,9 @@ class EmailNotifier(INotifierService):
     def send_approval_request(self, binary: BinaryFile) -> None:
 
         subject = f"OTA Signer - Solicitud de aprobación | {binary.filename}"
+        body = render_template("approval_request.html", binary=binary)
 
-        body = f"""
-        <h2>Solicitud de Aprobación</h2>
-        <p>Un archivo ha sido cargado y requiere revisión.</p>
-
-        <b>Archivo:</b> {binary.filename}<br>
-        <b>ID:</b> {binary.id}<br>
-        <b>Estado actual:</b> PENDING<br><br>
-
-        <p>Por favor revisa el panel de administración y aprueba para continuar con la firma digital.</p>
-        """
-
-        self._send_email_html(self.default_receiver, subject, body)
+        self._send_email_html(self.recipients_for(binary.environment), subject, body)
 
 
     # ============================================================
@@ -55,19 +99,9 @@ class EmailNotifier(INotifierService):
     def send_signed_confirmation(self, binary: BinaryFile) -> None:
 
         subject = f"OTA Signer - Archivo firmado | {binary.filename}"
+        body = render_template("signed_confirmation.html", binary=binary)
 
-        body = f"""
-        <h2>Archivo Firmado</h2>
-        <p>El archivo ha sido firmado con éxito.</p>
-
-        <b>Archivo:</b> {binary.filename}<br>
-        <b>ID:</b> {binary.id}<br>
-        <b>Ruta firmada:</b> {binary.signed_path}<br><br>
-
-        <p>La firma ya está disponible.</p>
-        """
-
-        self._send_email_html(self.default_receiver, subject, body)
+        self._send_email_html(self.recipients_for(binary.environment), subject, body)
 
 
     # ============================================================
@@ -76,47 +110,135 @@ class EmailNotifier(INotifierService):
     def send_rejection_notification(self, binary: BinaryFile) -> None:
 
         subject = f"OTA Signer - Archivo Rechazado | {binary.filename}"
+        body = render_template("rejection_notification.html", binary=binary)
 
-        body = f"""
-        <h2>Archivo Rechazado</h2>
-
-        <p>El archivo ha sido revisado pero NO fue aprobado.</p>
-
-        <b>Archivo:</b> {binary.filename}<br>
-        <b>ID:</b> {binary.id}<br>
-        <b>Estado:</b> REJECTED<br><br>
-
-        <p>Si es necesario, vuelve a cargar una nueva versión del archivo.</p>
-        """
-
-        self._send_email_html(self.default_receiver, subject, body)
+        self._send_email_html(self.recipients_for(binary.environment), subject, body)
 
 
     # ============================================================
     # MÉTODO CENTRAL DE ENVÍO (HTML)
     # ============================================================
-    def _send_email_html(self, to_email: str, subject: str, body_html: str):
-
-        msg = MIMEMultipart("alternative")
-        msg["From"] = self.sender_email
-        msg["To"] = to_email
-        msg["Subject"] = subject
-
-        msg.attach(MIMEText(body_html, "html"))
+    def _send_email_html(self, to_email, subject: str, body_html: str):
+        recipients = [to_email] if isinstance(to_email, str) else list(to_email)
+        # Si no sale el correo se avisa con una excepción: la cola de
+        # trabajos lo reintenta más tarde
+        if recipients and self._deliver([(recipients, subject, body_html)]) == 0:
+            raise RuntimeError(f"Email '{subject}' could not be delivered")
+
+    def _deliver(self, messages: List[Tuple[List[str], str, str]]) -> int:
+        """
+        Envía varios mensajes (destinatarios, asunto, HTML) en una sola
+        sesión SMTP. Devuelve cuántos se enviaron.
+        """
+        # smtplib y email se importan al enviar el primer correo,
+        # no al arrancar la aplicación
+        import smtplib
+        from email.message import EmailMessage
 
         try:
-            server = smtplib.SMTP("smtp.gmail.com", 587)
+            server = smtplib.SMTP(self.smtp_host, self.smtp_port)
             server.starttls()
             server.login(self.sender_email, self.sender_password)
-            server.sendmail(self.sender_email, to_email, msg.as_string())
-            server.quit()
+        except Exception as e:
+            self.__report_error(", ".join(r for m in messages for r in m[0]), f"{len(messages)} mensaje(s)", e)
+            return 0
 
-            print(f"[EMAIL OK] → {to_email} | {subject}")
+        sent = 0
+        try:
+            for recipients, subject, body_html in messages:
+                msg = EmailMessage()
+                msg["From"] = self.sender_email
+                msg["To"] = ", ".join(recipients)
+                msg["Subject"] = subject
+                msg.set_content(body_html, subtype="html")
+
+                try:
+                    server.send_message(msg)
+                    sent += 1
+                    print(f"[EMAIL OK] → {msg['To']} | {subject}")
+                except Exception as e:
+                    self.__report_error(msg["To"], subject, e)
+        finally:
+            try:
+                server.quit()
+            except Exception:
+                pass
+        return sent
+
+    @staticmethod
+    def __report_error(to_email: str, subject: str, error: Exception) -> None:
+        print("\n" + "="*60)
+        print("ERROR EN ENVÍO DE CORREO")
+        print(f"Destinatario: {to_email}")
+        print(f"Asunto: {subject}")
+        print(f"Error: {error}")
+        print("="*60 + "\n")
+
+
+class DigestEmailNotifier(EmailNotifier):
+    """
+    Coalesces events per recipient during `window_seconds` and sends one
+    summary email per recipient when the window closes.
+    """
+
+    def __init__(self, *args, window_seconds: float = 300, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.window_seconds = window_seconds
+        self._pending: Dict[str, List[Dict]] = {}
+        self._window_start: Optional[datetime] = None
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def __queue(self, kind: str, binary: BinaryFile) -> None:
+        # Copia del estado actual: el caso de uso puede seguir modificando el binario
+        event = {"kind": kind, "binary": BinaryFile.from_dict(binary.to_dict())}
+
+        with self._lock:
+            for recipient in self.recipients_for(binary.environment):
+                self._pending.setdefault(recipient, []).append(event)
+
+            if self._timer is None:
+                self._window_start = datetime.now()
+                self._timer = threading.Timer(self.window_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
 
-        except Exception as e:
-            print("\n" + "="*60)
-            print("ERROR EN ENVÍO DE CORREO")
-            print(f"Destinatario: {to_email}")
-            print(f"Asunto: {subject}")
-            print(f"Error: {e}")
-            print("="*60 + "\n")
+    def send_approval_request(self, binary: BinaryFile) -> None:
+        self.__queue("approval", binary)
+
+    def send_signed_confirmation(self, binary: BinaryFile) -> None:
+        self.__queue("signed", binary)
+
+    def send_rejection_notification(self, binary: BinaryFile) -> None:
+        self.__queue("rejected", binary)
+
+    def flush(self) -> int:
+        """
+        Sends the pending digests now. Returns the number of emails.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            since = self._window_start or datetime.now()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if not pending:
+            return 0
+
+        until = datetime.now()
+        messages = []
+        for recipient, events in pending.items():
+            subject = f"OTA Signer - Resumen: {len(events)} evento(s)"
+            body = render_template(
+                "digest.html",
+                events=events,
+                titles=DIGEST_TITLES,
+                since=since.strftime("%Y-%m-%d %H:%M:%S"),
+                until=until.strftime("%Y-%m-%d %H:%M:%S"),
+            )
+            messages.append(([recipient], subject, body))
+
+        self._deliver(messages)
+        return len(messages)
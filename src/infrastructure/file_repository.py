@@ -10,12 +10,35 @@
 # Implementa un repositorio de archivos encargado de guardar,
 # cargar, mover, listar y eliminar binarios en el sistema de
 # archivos, tanto originales como firmados.
+# Opcionalmente guarda los archivos comprimidos (xz o zstd) en
+# streaming y registra el tamaño original y el almacenado en un
+# archivo lateral <blob>.meta. Los artefactos antiguos pueden
+# moverse a un nivel frío (/data/cold/) de máxima compresión.
+# Todas las escrituras son atómicas (temporal + fsync + rename):
+# una caída nunca deja un artefacto truncado en su ruta final.
 # ============================================================
 
+import io
 import os
+import json
+import shutil
 from datetime import datetime
-from typing import BinaryIO, Any
+from typing import BinaryIO, Any, Dict, Iterator, Optional, Tuple
 from src.application.ports import IFileRepository
+from src.infrastructure.atomic import atomic_path, publish, remove_temp_files, temp_path_for
+from src.infrastructure.compression import (
+    CODEC_EXTENSIONS,
+    COLD_CODEC,
+    COLD_PRESET,
+    codec_for,
+    open_reader,
+    open_writer,
+    strip_codec_extension,
+)
+
+
+# Tamaño de bloque para copiar/comprimir en streaming (1 MiB)
+CHUNK_SIZE = 1024 * 1024
 
 
 class FileRepository(IFileRepository):
@@ -24,65 +47,240 @@ class FileRepository(IFileRepository):
     and retrieving their content.
     """
 
-    def __init__(self, base_path: str = "data"):
+    def __init__(
+        self,
+        base_path: str = "data",
+        compression: Optional[str] = None,
+        compression_level: Optional[int] = None,
+        cold_preset: int = COLD_PRESET,
+    ):
+        if compression is not None and compression not in CODEC_EXTENSIONS:
+            raise ValueError(f"Unknown compression '{compression}', expected one of {tuple(CODEC_EXTENSIONS)}")
+
         self.base_path = base_path
         self.binary_dir = os.path.join(base_path, "binaries")
         self.signed_dir = os.path.join(base_path, "signed")
+        self.cold_dir = os.path.join(base_path, "cold")
+        self.compression = compression
+        self.compression_level = compression_level
+        self.cold_preset = cold_preset
         self.__ensure_directories()
 
     def __ensure_directories(self):
         os.makedirs(self.binary_dir, exist_ok=True)
         os.makedirs(self.signed_dir, exist_ok=True)
 
+    # --- Helpers ---------------------------------------------
+
+    def __blob_name(self, name: str) -> str:
+        return name + CODEC_EXTENSIONS.get(self.compression, "")
+
+    def __signed_path(self, original_path: str) -> str:
+        filename = strip_codec_extension(os.path.basename(original_path))
+        return os.path.join(self.signed_dir, self.__blob_name(f"signed_{filename}"))
+
+    def __write_stream(self, source: BinaryIO, dest_path: str, codec: Optional[str], level: Optional[int], trailer: bytes = b"") -> int:
+        """
+        Copy `source` into `dest_path` compressing with `codec`.
+        Returns the number of raw bytes written.
+        """
+        raw_size = 0
+        with atomic_path(dest_path) as tmp_path:
+            with open_writer(tmp_path, codec, level) as out:
+                for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                    out.write(chunk)
+                    raw_size += len(chunk)
+                if trailer:
+                    out.write(trailer)
+                    raw_size += len(trailer)
+            stored_size = os.path.getsize(tmp_path)
+
+            # El .meta se publica antes que el blob: si existe el blob, su .meta es válido
+            if codec:
+                with atomic_path(f"{dest_path}.meta") as meta_tmp:
+                    with open(meta_tmp, "w") as meta:
+                        json.dump({"codec": codec, "raw_size": raw_size, "stored_size": stored_size}, meta)
+
+        return raw_size
+
+    # --- Operations ------------------------------------------
+
     def save(self, file: Any, file_id: str, signed: bool = False) -> str:
         """
         Save file data to appropriate directory.
         """
-        directory = self.signed_dir if signed else self.binary_dir
-        file_path = os.path.join(directory, file_id)
+        file_path = self.path_for(file_id, signed)
 
         try:
-            data = file.read() if not isinstance(file, bytes) else file
-            with open(file_path, "wb") as f:
-                f.write(data)
+            source = io.BytesIO(file) if isinstance(file, bytes) else file
+            self.__write_stream(source, file_path, self.compression, self.compression_level)
             return file_path
         except Exception as e:
             print(f"[FileRepository] Error saving file: {e}")
             return ""
 
+    def path_for(self, file_id: str, signed: bool = False) -> str:
+        directory = self.signed_dir if signed else self.binary_dir
+        return os.path.join(directory, self.__blob_name(file_id))
+
+    def signed_path_for(self, original_path: str) -> str:
+        return self.__signed_path(original_path)
+
     def load(self, file_path: str) -> bytes:
         """
         Read a file from disk and return its raw bytes.
         """
         try:
-            with open(file_path, "rb") as f:
+            with open_reader(file_path) as f:
                 return f.read()
         except Exception as e:
             print(f"[FileRepository] Error loading file: {e}")
             return b""
 
+    def open_read(self, file_path: str) -> BinaryIO:
+        """
+        Open a stored file as a stream of its original bytes.
+        """
+        return open_reader(file_path)
+
+    def raw_path(self, file_path: str) -> Optional[str]:
+        """
+        Return the path itself when the file is stored uncompressed.
+        """
+        return file_path if codec_for(file_path) is None else None
+
+    def get_sizes(self, file_path: str) -> Dict[str, Any]:
+        """
+        Return raw and stored sizes of a file.
+        """
+        try:
+            with open(f"{file_path}.meta", "r") as meta:
+                return json.load(meta)
+        except (OSError, ValueError):
+            size = os.path.getsize(file_path)
+            return {"codec": codec_for(file_path), "raw_size": size, "stored_size": size}
+
     def move_to_signed(self, original_path: str, signed_data: bytes) -> str:
         """
         Save signed data in signed folder.
         """
-        filename = os.path.basename(original_path)
-        signed_path = os.path.join(self.signed_dir, f"signed_{filename}")
+        signed_path = self.__signed_path(original_path)
 
         try:
-            with open(signed_path, "wb") as f:
-                f.write(signed_data)
+            self.__write_stream(io.BytesIO(signed_data), signed_path, self.compression, self.compression_level)
             return signed_path
         except Exception as e:
             print(f"[FileRepository] Error moving signed file: {e}")
             return ""
 
+    def copy_to_signed(self, original_path: str, trailer: bytes) -> str:
+        """
+        Copy the original file into the signed folder and append the trailer.
+        """
+        signed_path = self.__signed_path(original_path)
+
+        try:
+            if self.compression is None and codec_for(original_path) is None:
+                # copyfile usa sendfile/copy_file_range: la copia ocurre en el kernel
+                with atomic_path(signed_path) as tmp_path:
+                    shutil.copyfile(original_path, tmp_path)
+                    with open(tmp_path, "ab") as f:
+                        f.write(trailer)
+            else:
+                with open_reader(original_path) as source:
+                    self.__write_stream(source, signed_path, self.compression, self.compression_level, trailer)
+            return signed_path
+        except Exception as e:
+            print(f"[FileRepository] Error copying signed file: {e}")
+            return ""
+
+    def link_signed(self, signed_path: str, original_path: str) -> str:
+        """
+        Hard-link an existing signed artifact as the signed file of another
+        original (falls back to a copy across file systems).
+        """
+        # Mismo nombre que copy_to_signed, con el códec del artefacto existente
+        filename = strip_codec_extension(os.path.basename(original_path))
+        target = os.path.join(self.signed_dir, f"signed_{filename}" + CODEC_EXTENSIONS.get(codec_for(signed_path), ""))
+
+        if not os.path.exists(signed_path):
+            return ""
+
+        try:
+            if os.path.abspath(signed_path) != os.path.abspath(target):
+                # .meta primero; cada enlace se crea con nombre temporal y
+                # se renombra encima del destino (atómico)
+                for source, dest in ((f"{signed_path}.meta", f"{target}.meta"), (signed_path, target)):
+                    if not os.path.exists(source):
+                        continue
+                    tmp_path = temp_path_for(dest)
+                    try:
+                        os.link(source, tmp_path)
+                    except OSError:
+                        shutil.copyfile(source, tmp_path)
+                    publish(tmp_path, dest)
+            return target
+        except Exception as e:
+            print(f"[FileRepository] Error linking signed file: {e}")
+            return ""
+
+    def import_file(self, source_path: str, file_id: str) -> str:
+        """
+        Move an already written file into the binaries folder.
+        """
+        file_path = os.path.join(self.binary_dir, self.__blob_name(file_id))
+
+        try:
+            if self.compression is None:
+                tmp_path = temp_path_for(file_path)
+                shutil.move(source_path, tmp_path)
+                publish(tmp_path, file_path)
+            else:
+                with open(source_path, "rb") as source:
+                    self.__write_stream(source, file_path, self.compression, self.compression_level)
+                os.remove(source_path)
+            return file_path
+        except Exception as e:
+            print(f"[FileRepository] Error importing file: {e}")
+            return ""
+
+    def move_to_cold(self, file_path: str) -> str:
+        """
+        Recompress a file with the cold-tier codec into /data/cold/.
+        """
+        if os.path.dirname(file_path) == self.cold_dir:
+            return file_path
+
+        os.makedirs(self.cold_dir, exist_ok=True)
+        name = strip_codec_extension(os.path.basename(file_path))
+        cold_path = os.path.join(self.cold_dir, name + CODEC_EXTENSIONS[COLD_CODEC])
+
+        try:
+            with open_reader(file_path) as source:
+                self.__write_stream(source, cold_path, COLD_CODEC, self.cold_preset)
+            self.delete(file_path)
+            return cold_path
+        except Exception as e:
+            print(f"[FileRepository] Error moving file to cold storage: {e}")
+            return ""
+
+    def remove_incomplete(self) -> int:
+        """
+        Delete temporary files left behind by interrupted writes.
+        """
+        removed = 0
+        for directory in (self.binary_dir, self.signed_dir, self.cold_dir):
+            removed += len(remove_temp_files(directory))
+        return removed
+
     def delete(self, file_path: str) -> None:
         """
         Delete file from disk.
         """
         try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            for path in (file_path, f"{file_path}.meta"):
+                if os.path.exists(path):
+                    os.remove(path)
         except Exception as e:
             print(f"[FileRepository] Error deleting file: {e}")
 
@@ -93,7 +291,38 @@ class FileRepository(IFileRepository):
         directory = self.signed_dir if signed else self.binary_dir
 
         try:
-            return os.listdir(directory)
+            return [
+                name for name in os.listdir(directory)
+                if not name.endswith(".meta") and not name.startswith(".tmp-")
+            ]
         except Exception as e:
             print(f"[FileRepository] Error listing files: {e}")
             return []
+
+    def scan_blobs(self) -> Iterator[Tuple[str, int, float]]:
+        """
+        Walk binaries/, signed/ and cold/ with os.scandir (one stat per
+        entry, no per-file open).
+        """
+        for directory in (self.binary_dir, self.signed_dir, self.cold_dir):
+            try:
+                entries = os.scandir(directory)
+            except FileNotFoundError:
+                continue
+
+            with entries:
+                for entry in entries:
+                    name = entry.name
+                    # Temporales (TEMP_PREFIX) y ocultos como .gitkeep no son artefactos
+                    if name.endswith((".meta", ".lock")) or name.startswith("."):
+                        continue
+                    try:
+                        if not entry.is_file(follow_symlinks=False):
+                            continue
+                        st = entry.stat(follow_symlinks=False)
+                    except FileNotFoundError:
+                        # Borrado mientras se recorría el directorio
+                        continue
+                    # rename() cambia ctime y no mtime: una carga por partes
+                    # recién importada cuenta como nueva
+                    yield os.path.join(directory, name), st.st_size, max(st.st_mtime, st.st_ctime)
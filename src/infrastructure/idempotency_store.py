@@ -0,0 +1,78 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: idempotency_store.py
+# ============================================================
+# Descripción:
+# Almacén de idempotencia respaldado por SQLite. Guarda, con
+# vencimiento, el resultado de una carga por su Idempotency-Key o
+# por el digest de su contenido, para que los reintentos (por
+# ejemplo, de CI) devuelvan el registro original sin escribir en
+# disco, en la base de datos ni enviar correos de nuevo.
+# Al ser SQLite, la deduplicación funciona entre procesos.
+# ============================================================
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, Optional
+from src.application.ports import IIdempotencyStore
+
+
+class SqliteIdempotencyStore(IIdempotencyStore):
+    """
+    Expiring key/value store; a row with a NULL value is an in-flight claim.
+    """
+
+    def __init__(self, db_path: str = os.path.join("data", "cache", "idempotency.sqlite")):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS idempotency ("
+            " key TEXT PRIMARY KEY, value TEXT, expires_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def __purge_expired(self) -> None:
+        self._db.execute("DELETE FROM idempotency WHERE expires_at < ?", (time.time(),))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM idempotency WHERE key = ? AND expires_at >= ?", (key, time.time())
+            ).fetchone()
+
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+
+    def claim(self, key: str, ttl_seconds: int) -> bool:
+        with self._lock:
+            self.__purge_expired()
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO idempotency (key, value, expires_at) VALUES (?, NULL, ?)",
+                (key, time.time() + ttl_seconds),
+            )
+            self._db.commit()
+            return cursor.rowcount == 1
+
+    def put(self, key: str, value: Dict[str, Any], ttl_seconds: int) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO idempotency (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + ttl_seconds),
+            )
+            self._db.commit()
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM idempotency WHERE key = ? AND value IS NULL", (key,))
+            self._db.commit()
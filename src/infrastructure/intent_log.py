@@ -0,0 +1,148 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: intent_log.py
+# ============================================================
+# Descripción:
+# Registro de intenciones de firma respaldado por SQLite. Antes de
+# escribir el artefacto firmado se anota (registro, operación,
+# estado anterior, dueño) y la fila se borra después de actualizar
+# el registro en la base de datos. Si el proceso muere entre ambos
+# pasos, la fila queda y la recuperación al arrancar la encuentra.
+#
+# El dueño es "<host>:<pid>:<inicio>", donde inicio es el boot id y
+# el instante de arranque del proceso (/proc). Una intención de un
+# proceso vivo en este mismo equipo nunca se considera abandonada,
+# salvo que su PID ya sea de otro proceso (reinicio del equipo o PID
+# reutilizado); las de otros equipos, solo cuando superan
+# stale_after segundos.
+# ============================================================
+
+import os
+import time
+import socket
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+from src.application.ports import IIntentLog
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def _process_start(pid: int) -> str:
+    """
+    "<boot id>.<start time>" of `pid`, unique across PID reuse and
+    reboots; "" where /proc is not available.
+    """
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # El nombre del proceso (campo 2) puede tener espacios y paréntesis
+            fields = f.read().rpartition(")")[2].split()
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            boot_id = f.read().strip()
+        return f"{boot_id}.{fields[19]}"
+    except (OSError, IndexError):
+        return ""
+
+
+class SqliteIntentLog(IIntentLog):
+    """
+    Durable table of signings in progress, one row per record.
+    """
+
+    def __init__(self, db_path: str = os.path.join("data", "intents.sqlite"), stale_after: float = 3600):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self.stale_after = stale_after
+        self.host = socket.gethostname()
+        self._owner_pid: Optional[int] = None
+        self._owner = ""
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # Cada begin/complete debe sobrevivir a un corte de energía
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS intents ("
+            " file_id TEXT PRIMARY KEY, operation TEXT NOT NULL, old_status TEXT,"
+            " owner TEXT NOT NULL, started_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    @property
+    def owner(self) -> str:
+        # El PID cambia en un proceso hijo (fork): se recalcula entonces
+        pid = os.getpid()
+        if self._owner_pid != pid:
+            self._owner_pid, self._owner = pid, f"{self.host}:{pid}:{_process_start(pid)}"
+        return self._owner
+
+    def __abandoned(self, owner: str, started_at: float) -> bool:
+        parts = owner.rsplit(":", 2)
+        if len(parts) == 3 and parts[1].isdigit():
+            host, pid, start = parts
+        else:
+            # Dueños anteriores, sin instante de arranque
+            host, _, pid = owner.rpartition(":")
+            start = ""
+
+        if host == self.host and pid.isdigit():
+            if not _pid_alive(int(pid)):
+                return True
+            return bool(start) and _process_start(int(pid)) != start
+        return time.time() - started_at > self.stale_after
+
+    def begin(self, file_id: str, operation: str, old_status: str) -> bool:
+        with self._lock:
+            # IMMEDIATE: leer y reservar en una sola transacción entre procesos
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT owner, started_at FROM intents WHERE file_id = ?", (file_id,)
+                ).fetchone()
+
+                # Solo se toma una intención ajena si su proceso ya no existe
+                if row is not None and not self.__abandoned(*row):
+                    self._db.rollback()
+                    return False
+
+                self._db.execute(
+                    "INSERT OR REPLACE INTO intents (file_id, operation, old_status, owner, started_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (file_id, operation, old_status, self.owner, time.time()),
+                )
+                self._db.commit()
+                return True
+            except Exception:
+                self._db.rollback()
+                raise
+
+    def complete(self, file_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM intents WHERE file_id = ?", (file_id,))
+            self._db.commit()
+
+    def pending(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT file_id, operation, old_status, owner, started_at FROM intents ORDER BY started_at"
+            ).fetchall()
+
+        return [
+            {"file_id": f, "operation": op, "old_status": old, "owner": owner, "started_at": started}
+            for f, op, old, owner, started in rows
+            if self.__abandoned(owner, started)
+        ]
@@ -0,0 +1,329 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: job_queue.py
+# ============================================================
+# Descripción:
+# Cola de trabajos persistente en SQLite para la firma y el envío
+# de correos. Un trabajo sobrevive a la caída del proceso:
+#
+#   queued  -> listo para tomarse (a partir de available_at)
+#   leased  -> tomado por un worker hasta leased_until; si el
+#              préstamo vence (el worker murió) se vuelve a tomar
+#   dead    -> agotó max_attempts; queda para revisión manual
+#
+# Los terminados se borran. Cada tipo de trabajo tiene un límite
+# de concurrencia que se respeta entre todos los procesos, porque
+# los préstamos activos se cuentan en la misma transacción que
+# los toma (BEGIN IMMEDIATE).
+#
+# JobWorker ejecuta los trabajos en hilos; QueuedNotifier envía los
+# correos a través de la cola en lugar de hacerlo en la petición.
+# ============================================================
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from src.application.ports import IJobQueue, INotifierService
+from src.domain.models import BinaryFile
+
+
+class SqliteJobQueue(IJobQueue):
+    """
+    Durable job queue with leases, retries with backoff, dead-lettering
+    and per-kind concurrency limits.
+    """
+
+    def __init__(
+        self,
+        db_path: str = os.path.join("data", "jobs.sqlite"),
+        lease_seconds: float = 300,
+        max_attempts: int = 5,
+        retry_base_seconds: float = 5,
+        concurrency: Optional[Dict[str, int]] = None,
+    ):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.concurrency = concurrency or {}
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # En WAL, NORMAL no corrompe la base ante una caída del proceso;
+        # solo un corte de energía puede perder las últimas transacciones
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, payload TEXT NOT NULL,"
+            " dedupe_key TEXT UNIQUE, status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,"
+            " max_attempts INTEGER NOT NULL, available_at REAL NOT NULL, lease_owner TEXT,"
+            " leased_until REAL, last_error TEXT, created_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs(status, available_at)")
+
+    def __transaction(self):
+        # Una transacción que escribe: se toma el candado de escritura de
+        # SQLite desde el inicio para que otro proceso no tome lo mismo
+        self._db.execute("BEGIN IMMEDIATE")
+
+    # --- Productor -------------------------------------------
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        dedupe_key: Optional[str] = None,
+        delay: float = 0,
+        lease_seconds: Optional[float] = None,
+    ) -> Optional[int]:
+        now = time.time()
+        leased = lease_seconds is not None
+
+        with self._lock:
+            self.__transaction()
+            try:
+                if dedupe_key is not None:
+                    # Un trabajo muerto con la misma clave se reemplaza por el nuevo
+                    self._db.execute("DELETE FROM jobs WHERE dedupe_key = ? AND status = 'dead'", (dedupe_key,))
+
+                cursor = self._db.execute(
+                    "INSERT OR IGNORE INTO jobs (kind, payload, dedupe_key, status, attempts, max_attempts,"
+                    " available_at, lease_owner, leased_until, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        kind, json.dumps(payload), dedupe_key,
+                        "leased" if leased else "queued", 1 if leased else 0, self.max_attempts,
+                        now + delay, self.owner if leased else None,
+                        now + lease_seconds if leased else None, now,
+                    ),
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+        return cursor.lastrowid if cursor.rowcount == 1 else None
+
+    def enqueue_many(self, kind: str, payloads: List[Dict[str, Any]]) -> int:
+        """Bulk insert in one transaction (no dedupe)."""
+        now = time.time()
+        rows = [(kind, json.dumps(p), "queued", self.max_attempts, now, now) for p in payloads]
+        with self._lock:
+            self.__transaction()
+            self._db.executemany(
+                "INSERT INTO jobs (kind, payload, status, max_attempts, available_at, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._db.execute("COMMIT")
+        return len(rows)
+
+    # --- Consumidor ------------------------------------------
+
+    def lease(self, kinds: List[str], limit: int = 1) -> List[Dict[str, Any]]:
+        now = time.time()
+        placeholders = ",".join("?" for _ in kinds)
+
+        with self._lock:
+            self.__transaction()
+            try:
+                # Préstamos vencidos que ya agotaron sus intentos: a la cola de muertos
+                self._db.execute(
+                    "UPDATE jobs SET status = 'dead', last_error = COALESCE(last_error, 'lease expired')"
+                    " WHERE status = 'leased' AND leased_until < ? AND attempts >= max_attempts",
+                    (now,),
+                )
+
+                slots = {}
+                for kind in kinds:
+                    limit_for_kind = self.concurrency.get(kind)
+                    if limit_for_kind is None:
+                        slots[kind] = limit
+                        continue
+                    (active,) = self._db.execute(
+                        "SELECT COUNT(*) FROM jobs WHERE kind = ? AND status = 'leased' AND leased_until >= ?",
+                        (kind, now),
+                    ).fetchone()
+                    slots[kind] = max(0, limit_for_kind - active)
+
+                candidates = self._db.execute(
+                    f"SELECT id, kind, payload, attempts FROM jobs WHERE kind IN ({placeholders})"
+                    " AND ((status = 'queued' AND available_at <= ?) OR (status = 'leased' AND leased_until < ?))"
+                    " ORDER BY available_at, id LIMIT ?",
+                    (*kinds, now, now, limit * max(1, len(kinds))),
+                ).fetchall()
+
+                jobs = []
+                for job_id, kind, payload, attempts in candidates:
+                    if len(jobs) >= limit or slots[kind] <= 0:
+                        continue
+                    slots[kind] -= 1
+                    jobs.append({"id": job_id, "kind": kind, "payload": json.loads(payload), "attempts": attempts + 1})
+
+                self._db.executemany(
+                    "UPDATE jobs SET status = 'leased', lease_owner = ?, leased_until = ?, attempts = attempts + 1"
+                    " WHERE id = ?",
+                    [(self.owner, now + self.lease_seconds, job["id"]) for job in jobs],
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+        return jobs
+
+    def complete(self, job_id: int) -> None:
+        self.complete_many([job_id])
+
+    def complete_many(self, job_ids: List[int]) -> None:
+        with self._lock:
+            self.__transaction()
+            self._db.executemany("DELETE FROM jobs WHERE id = ?", [(i,) for i in job_ids])
+            self._db.execute("COMMIT")
+
+    def fail(self, job_id: int, error: str) -> None:
+        with self._lock:
+            self.__transaction()
+            row = self._db.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                self._db.execute("COMMIT")
+                return
+
+            attempts, max_attempts = row
+            if attempts >= max_attempts:
+                self._db.execute(
+                    "UPDATE jobs SET status = 'dead', last_error = ?, lease_owner = NULL WHERE id = ?",
+                    (error, job_id),
+                )
+            else:
+                # Espera exponencial: base, 2*base, 4*base... (máximo 1 h)
+                delay = min(3600, self.retry_base_seconds * 2 ** (attempts - 1))
+                self._db.execute(
+                    "UPDATE jobs SET status = 'queued', available_at = ?, last_error = ?,"
+                    " lease_owner = NULL, leased_until = NULL WHERE id = ?",
+                    (time.time() + delay, error, job_id),
+                )
+            self._db.execute("COMMIT")
+
+    # --- Administración --------------------------------------
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            rows = self._db.execute("SELECT kind, status, COUNT(*) FROM jobs GROUP BY kind, status").fetchall()
+        stats: Dict[str, Dict[str, int]] = {}
+        for kind, status, count in rows:
+            stats.setdefault(kind, {})[status] = count
+        return stats
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, kind, payload, attempts, last_error, created_at FROM jobs"
+                " WHERE status = 'dead' ORDER BY id LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [
+            {"id": r[0], "kind": r[1], "payload": json.loads(r[2]), "attempts": r[3], "error": r[4], "created_at": r[5]}
+            for r in rows
+        ]
+
+    def requeue(self, job_id: int) -> bool:
+        """Gives a dead job a fresh set of attempts."""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = 'queued', attempts = 0, available_at = ?, last_error = NULL"
+                " WHERE id = ? AND status = 'dead'",
+                (time.time(), job_id),
+            )
+        return cursor.rowcount == 1
+
+
+class JobWorker:
+    """
+    Runs queued jobs with `handlers[kind](payload)` in `threads` daemon
+    threads. A handler that raises is retried by the queue.
+    """
+
+    def __init__(
+        self,
+        queue: SqliteJobQueue,
+        handlers: Dict[str, Callable[[Dict[str, Any]], Any]],
+        threads: int = 2,
+        poll_interval: float = 0.5,
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.processed = 0
+        self.failed = 0
+        self._stop = threading.Event()
+        self._workers: List[threading.Thread] = []
+
+    def start(self) -> "JobWorker":
+        for n in range(self.threads):
+            thread = threading.Thread(target=self.__run, name=f"job-worker-{n}", daemon=True)
+            thread.start()
+            self._workers.append(thread)
+        return self
+
+    def stop(self, timeout: float = 5) -> None:
+        self._stop.set()
+        for thread in self._workers:
+            thread.join(timeout)
+
+    def run_once(self) -> int:
+        """Runs the jobs that are ready now; returns how many ran."""
+        jobs = self.queue.lease(list(self.handlers), limit=1)
+        for job in jobs:
+            try:
+                self.handlers[job["kind"]](job["payload"])
+                self.queue.complete(job["id"])
+                self.processed += 1
+            except Exception as e:
+                print(f"[JobWorker] {job['kind']} job {job['id']} failed (attempt {job['attempts']}): {e}")
+                self.queue.fail(job["id"], str(e))
+                self.failed += 1
+        return len(jobs)
+
+    def __run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                ran = self.run_once()
+            except Exception as e:
+                print(f"[JobWorker] Error leasing jobs: {e}")
+                ran = 0
+            if not ran:
+                self._stop.wait(self.poll_interval)
+
+
+class QueuedNotifier(INotifierService):
+    """
+    Notifier that only enqueues an "email" job; the job worker delivers
+    it with the real notifier, so requests never wait on SMTP.
+    """
+
+    def __init__(self, queue: IJobQueue):
+        self.queue = queue
+
+    def __enqueue(self, event: str, binary: BinaryFile) -> None:
+        self.queue.enqueue("email", {"event": event, "file_id": binary.id, "status": binary.status})
+
+    def send_approval_request(self, binary: BinaryFile) -> None:
+        self.__enqueue("approval", binary)
+
+    def send_signed_confirmation(self, binary: BinaryFile) -> None:
+        self.__enqueue("signed", binary)
+
+    def send_rejection_notification(self, binary: BinaryFile) -> None:
+        self.__enqueue("rejected", binary)
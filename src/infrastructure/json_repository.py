@@ -10,13 +10,48 @@
 # Repositorio JSON robusto que almacena y gestiona registros
 # de archivos binarios. Corrige estructuras dañadas, valida
 # datos y proporciona operaciones CRUD y búsqueda por tokens.
+# Cada escritura es atómica (temporal + fsync + rename) y las
+# operaciones de lectura-modificación-escritura se serializan con
+# un candado (hilos) y flock sobre <db>.lock (procesos), para que
+# dos peticiones en paralelo no pierdan la actualización de la otra.
+#
+# Junto a la base se guardan sus agregados (<db>.stats.json): conteos
+# por ambiente/estado, bytes y firmas por hora. Cada escritura los
+# actualiza con la diferencia del registro que cambió, así leerlos no
+# depende del tamaño del historial.
+#
+# La búsqueda por prefijo (search) usa un índice en memoria que se
+# construye en la primera búsqueda y después se actualiza en cada
+# escritura de este proceso. El índice se sella con el contador
+# "version" de la base (que toda escritura incrementa), no con la
+# fecha del archivo: solo se reconstruye si otro proceso escribió.
 # ============================================================
 
 import os
+import re
 import json
-from typing import Dict, Any, List, Optional
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, List, Optional
 from src.domain.models import BinaryFile
 from src.application.ports import IDatabaseRepository
+from src.infrastructure.atomic import atomic_open
+from src.infrastructure.record_stats import RecordStats
+from src.infrastructure.search_index import RecordSearchIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo se serializa dentro del proceso
+    fcntl = None
+
+
+# El contador de versión va al final del archivo ({"records": [...], "version": N})
+_VERSION_TAIL = re.compile(rb'"version"\s*:\s*(\d+)\s*\}\s*$')
+_TAIL_BYTES = 64
+
+# Un candado por archivo de base de datos, compartido por todas las instancias
+_PATH_LOCKS: Dict[str, threading.Lock] = {}
+_PATH_LOCKS_GUARD = threading.Lock()
 
 
 class JsonRepository(IDatabaseRepository):
@@ -24,26 +59,35 @@ class JsonRepository(IDatabaseRepository):
     Robust JSON Repository that auto-corrects malformed or legacy JSON structures.
     """
 
-    def __init__(self, json_path: str = "data/database.json"):
+    def __init__(self, json_path: str = "data/database.json", pretty: bool = False):
         self.json_path = json_path
+        self.stats_path = os.path.splitext(json_path)[0] + ".stats.json"
+        self._stats_cache = (None, None)
+        self._search_index: Optional[RecordSearchIndex] = None
+        self._search_version: Optional[int] = None
+        self._search_lock = threading.Lock()
+        # Por defecto se escribe JSON compacto: indent=4 multiplica el
+        # tamaño del archivo que se lee y reescribe en cada operación
+        self.pretty = pretty
         self.__ensure_database()
 
     def __ensure_database(self):
-        os.makedirs(os.path.dirname(self.json_path), exist_ok=True)
+        os.makedirs(os.path.dirname(self.json_path) or ".", exist_ok=True)
 
         # If file doesn't exist → create valid structure
         if not os.path.exists(self.json_path):
-            with open(self.json_path, "w") as db:
-                json.dump({"records": []}, db, indent=4)
+            with self.__locked():
+                self.__save({"records": []}, RecordStats())
             return
 
         # If exists → validate structure
         data = self.__read_raw()
+        valid = isinstance(data, dict) and "records" in data
         fixed = self.__validate_structure(data)
 
-        # Rewrite if fixed
-        with open(self.json_path, "w") as db:
-            json.dump(fixed, db, indent=4)
+        # Rewrite only if fixed
+        if not valid:
+            self.__write_db(fixed)
 
     # --- Basic Safe Readers/Writers ------------------------
 
@@ -58,9 +102,133 @@ class JsonRepository(IDatabaseRepository):
         data = self.__read_raw()
         return self.__validate_structure(data)
 
+    @contextmanager
+    def __locked(self):
+        path = os.path.abspath(self.json_path)
+        with _PATH_LOCKS_GUARD:
+            lock = _PATH_LOCKS.setdefault(path, threading.Lock())
+
+        with lock:
+            if fcntl is None:
+                yield
+                return
+            with open(f"{self.json_path}.lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
     def __write_db(self, content: Dict[str, Any]) -> None:
-        with open(self.json_path, "w") as db:
-            json.dump(content, db, indent=4)
+        with atomic_open(self.json_path, "w") as db:
+            if self.pretty:
+                json.dump(content, db, indent=4)
+            else:
+                json.dump(content, db, separators=(",", ":"))
+
+    # --- Agregados ------------------------------------------
+
+    def __read_stats(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.stats_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def __stats_for(self, data: Dict[str, Any]) -> RecordStats:
+        """
+        Aggregates matching `data`; recomputed if the stored ones belong
+        to another version of the database. Called with the lock held.
+        """
+        stored = self.__read_stats()
+        if stored is not None and stored.get("version") == data.get("version"):
+            return RecordStats(stored)
+        return RecordStats.from_records(data["records"], data.get("version"))
+
+    def __save(self, data: Dict[str, Any], stats: RecordStats, index_change: Optional[Callable] = None) -> None:
+        # La base va primero: si el proceso muere entre las dos escrituras,
+        # la versión no coincide y los agregados se recalculan
+        before = data.get("version")
+        data["version"] = (data.get("version") or 0) + 1
+        stats.version = data["version"]
+        self.__write_db(data)
+        with atomic_open(self.stats_path, "w") as f:
+            json.dump(stats.to_dict(), f, separators=(",", ":"))
+        self.__sync_index(before, data["version"], index_change)
+
+    # --- Índice de búsqueda -----------------------------------
+
+    def __current_version(self) -> Optional[int]:
+        """
+        Version counter read from the tail of the file (no JSON parse);
+        None if the file does not end with it.
+        """
+        try:
+            with open(self.json_path, "rb") as db:
+                db.seek(max(0, os.fstat(db.fileno()).st_size - _TAIL_BYTES))
+                match = _VERSION_TAIL.search(db.read())
+        except OSError:
+            return None
+        return int(match.group(1)) if match else None
+
+    def __sync_index(self, before: Optional[int], after: int, index_change: Optional[Callable]) -> None:
+        """
+        Applies this write to the search index. Called with the database
+        lock held, so no other process wrote between `before` and `after`.
+        """
+        with self._search_lock:
+            if self._search_index is None:
+                return
+            if index_change is not None and self._search_version == before:
+                index_change(self._search_index)
+                self._search_version = after
+            else:
+                # El índice ya estaba atrasado: se reconstruye en la próxima búsqueda
+                self._search_index = None
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Records whose filename, a word of the filename or id starts with
+        `query`; see RecordSearchIndex.search.
+        """
+        with self._search_lock:
+            version = self.__current_version()
+            if self._search_index is None or version is None or version != self._search_version:
+                # El sello es la versión de los registros que se leyeron
+                data = self.__read_db()
+                index = RecordSearchIndex()
+                index.build(data["records"])
+                self._search_index = index
+                self._search_version = data.get("version")
+            return self._search_index.search(query, limit)
+
+    def aggregates(self) -> Dict[str, Any]:
+        """
+        Running aggregates (see RecordStats.summary), read from the small
+        side file instead of the records.
+        """
+        try:
+            st = os.stat(self.stats_path)
+            stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+
+        cached_stamp, cached = self._stats_cache
+        if stamp is not None and stamp == cached_stamp:
+            return cached.summary()
+
+        stored = self.__read_stats()
+        if stored is None:
+            # Base anterior a los agregados: se calculan una vez
+            with self.__locked():
+                data = self.__read_db()
+                # Los registros no cambian: el índice de búsqueda sigue válido
+                self.__save(data, self.__stats_for(data), lambda index: None)
+            return self.aggregates()
+
+        stats = RecordStats(stored)
+        self._stats_cache = (stamp, stats)
+        return stats.summary()
 
     # --- Structure Fixer -----------------------------------
 
@@ -83,9 +251,24 @@ class JsonRepository(IDatabaseRepository):
     # --- CRUD ------------------------------------------------
 
     def add_record(self, record: Any) -> None:
-        data = self.__read_db()
-        data["records"].append(record)
-        self.__write_db(data)
+        with self.__locked():
+            data = self.__read_db()
+            stats = self.__stats_for(data)
+            data["records"].append(record)
+            stats.apply(None, record)
+            self.__save(data, stats, lambda index: index.add(record))
+
+    def add_records(self, records: List[Any]) -> int:
+        if not records:
+            return 0
+        with self.__locked():
+            data = self.__read_db()
+            stats = self.__stats_for(data)
+            data["records"].extend(records)
+            for record in records:
+                stats.apply(None, record)
+            self.__save(data, stats, lambda index: [index.add(r) for r in records])
+        return len(records)
 
     def get_record(self, file_id: str) -> Optional[BinaryFile]:
         data = self.__read_db()
@@ -99,24 +282,56 @@ class JsonRepository(IDatabaseRepository):
         return [BinaryFile.from_dict(r) for r in data["records"]]
 
     def update_record(self, file_id: str, updates: Dict[str, Any]) -> bool:
-        data = self.__read_db()
-        for r in data["records"]:
-            if r["id"] == file_id:
-                r.update(updates)
-                self.__write_db(data)
-                return True
-        return False
+        with self.__locked():
+            data = self.__read_db()
+            for r in data["records"]:
+                if r["id"] == file_id:
+                    stats = self.__stats_for(data)
+                    old = dict(r)
+                    r.update(updates)
+                    stats.apply(old, r)
+                    self.__save(data, stats, lambda index: index.update(file_id, updates))
+                    return True
+            return False
 
     def delete_record(self, file_id: str) -> bool:
-        data = self.__read_db()
-        new_records = [r for r in data["records"] if r["id"] != file_id]
+        with self.__locked():
+            data = self.__read_db()
+            removed = [r for r in data["records"] if r["id"] == file_id]
+
+            if removed:
+                stats = self.__stats_for(data)
+                for r in removed:
+                    stats.apply(r, None)
+                data["records"] = [r for r in data["records"] if r["id"] != file_id]
+                self.__save(data, stats, lambda index: index.remove(file_id))
+                return True
 
-        if len(new_records) != len(data["records"]):
-            data["records"] = new_records
-            self.__write_db(data)
-            return True
+            return False
 
-        return False
+    def delete_records(self, file_ids: List[str]) -> int:
+        ids = set(file_ids)
+        with self.__locked():
+            data = self.__read_db()
+            removed = [r for r in data["records"] if r["id"] in ids]
+
+            if removed:
+                stats = self.__stats_for(data)
+                for r in removed:
+                    stats.apply(r, None)
+                data["records"] = [r for r in data["records"] if r["id"] not in ids]
+                self.__save(data, stats, lambda index: [index.remove(r["id"]) for r in removed])
+
+            return len(removed)
+
+    def compact(self) -> None:
+        """
+        Rewrites the database without indentation and recomputes its
+        aggregates.
+        """
+        with self.__locked():
+            data = self.__read_db()
+            self.__save(data, RecordStats.from_records(data["records"]), lambda index: None)
 
     # --- NEW: Find by approval/reject tokens ----------------
 
@@ -0,0 +1,121 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: metrics_board.py
+# ============================================================
+# Descripción:
+# Tablero de métricas compartido entre los workers del servidor
+# de producción. Cada worker publica periódicamente una foto de
+# sus contadores en RUN_DIR/metrics-<pid>.json (escritura
+# atómica); cualquier worker puede leer las fotos de los demás
+# y sumarlas, así /api/metrics muestra el total del servidor y no
+# solo el del proceso que atendió la petición.
+# ============================================================
+
+import os
+import json
+import atexit
+import threading
+from typing import Any, Callable, Dict
+from src.infrastructure.atomic import atomic_open
+
+
+PREFIX = "metrics-"
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge_counters(snapshots) -> Dict[str, Any]:
+    """
+    Sums the integer leaves of several snapshots with the same shape.
+    Ratios and other floats are per worker and are left out.
+    """
+    total: Dict[str, Any] = {}
+    for snapshot in snapshots:
+        for key, value in (snapshot or {}).items():
+            if isinstance(value, dict):
+                total[key] = merge_counters([total.get(key) or {}, value])
+            elif isinstance(value, int) and not isinstance(value, bool):
+                total[key] = total.get(key, 0) + value
+    return total
+
+
+class SharedMetricsBoard:
+    """
+    Publishes `snapshot()` of this process every `interval` seconds and
+    collects the snapshots of every live worker.
+    """
+
+    def __init__(self, run_dir: str, snapshot: Callable[[], Dict[str, Any]], interval: float = 5.0):
+        os.makedirs(run_dir, exist_ok=True)
+        self.run_dir = run_dir
+        self.snapshot = snapshot
+        self.interval = interval
+        self.pid = os.getpid()
+        self.path = os.path.join(run_dir, f"{PREFIX}{self.pid}.json")
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self.__run, name="metrics-board", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __run(self) -> None:
+        while not self._stop.is_set():
+            self.publish()
+            self._stop.wait(self.interval)
+
+    def publish(self) -> None:
+        try:
+            with atomic_open(self.path, "w") as f:
+                json.dump(self.snapshot(), f, separators=(",", ":"))
+        except Exception as e:
+            print(f"[SharedMetricsBoard] Error publishing metrics: {e}")
+
+    def collect(self) -> Dict[int, Dict[str, Any]]:
+        """
+        {pid: snapshot} of every live worker; this one is always fresh.
+        Files left by dead workers are removed.
+        """
+        workers = {self.pid: self.snapshot()}
+        for name in os.listdir(self.run_dir):
+            if not (name.startswith(PREFIX) and name.endswith(".json")):
+                continue
+            try:
+                pid = int(name[len(PREFIX):-len(".json")])
+            except ValueError:
+                continue
+            if pid == self.pid:
+                continue
+
+            path = os.path.join(self.run_dir, name)
+            if not _alive(pid):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+
+            try:
+                with open(path, "r") as f:
+                    workers[pid] = json.load(f)
+            except (OSError, ValueError):
+                continue
+        return workers
+
+    def close(self) -> None:
+        self._stop.set()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
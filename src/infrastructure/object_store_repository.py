@@ -0,0 +1,464 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: object_store_repository.py
+# ============================================================
+# Descripción:
+# Repositorio de archivos sobre un almacén de objetos compatible
+# con S3 (AWS, MinIO, etc.), para que varios nodos detrás de un
+# balanceador compartan binarios y artefactos firmados. Las rutas
+# que devuelve tienen la forma s3://<bucket>/<prefijo>/<carpeta>/<id>.
+#
+#   - Cargas y descargas en streaming multipart (s3transfer).
+#   - Caché local de lectura (read-through) acotada en bytes: los
+#     artefactos más usados se leen desde disco, con mmap incluido,
+#     y los menos usados se expulsan primero.
+#   - copy_to_signed y link_signed copian del lado del servidor:
+#     la imagen no vuelve a pasar por el nodo. Las imágenes de más
+#     de 5 GiB se copian por rangos (CopySourceRange).
+#
+# Solo los binarios, los artefactos firmados y el nivel frío viven
+# en el bucket. Siguen siendo locales de cada nodo (y deben ir en un
+# volumen compartido, o fijar al cliente a un nodo, si hay varios):
+#   - las sesiones de carga por partes (UPLOAD_DIR)
+#   - los deltas, que DeltaEncoder escribe en su signed_dir local
+#   - las cachés SQLite (firmas, idempotencia, intenciones, cola)
+#   - la base de datos (database.json) y el índice de versiones
+#
+# Requiere el paquete opcional boto3 (pip install boto3). Las
+# credenciales se leen del entorno estándar de AWS.
+# ============================================================
+
+import io
+import os
+import time
+import uuid
+import shutil
+import threading
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from src.application.ports import IFileRepository
+
+
+# Límites de multipart en S3: parte mínima (excepto la última),
+# parte máxima (también para upload_part_copy) y número de partes
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PART_SIZE = 5 * 1024 * 1024 * 1024
+MAX_PARTS = 10_000
+
+# Tamaño de cada rango copiado en el servidor al firmar
+COPY_PART_SIZE = 512 * 1024 * 1024
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def _boto3():
+    try:
+        import boto3
+    except ImportError as e:
+        raise ImportError("object storage requires the 'boto3' package (pip install boto3)") from e
+    return boto3
+
+
+def _copy_ranges(size: int) -> List[Tuple[int, int]]:
+    """
+    Inclusive byte ranges for a server-side copy of `size` bytes: every
+    range is at least COPY_PART_SIZE (so >= MIN_PART_SIZE) and at most
+    MAX_PART_SIZE, leaving one part free for the signature trailer.
+    """
+    part_size = max(COPY_PART_SIZE, -(-size // (MAX_PARTS - 1)))
+    count = max(1, size // part_size)
+    bounds = [i * size // count for i in range(count + 1)]
+    return [(bounds[i], bounds[i + 1] - 1) for i in range(count)]
+
+
+class ReadThroughCache:
+    """
+    Size-bounded local copy of remote objects, evicting the least
+    recently used files first.
+
+    Files used in the last `min_age` seconds are never evicted, so a
+    path returned by get()/fill() stays readable for at least that
+    long, even if another process evicts meanwhile. Readers that only
+    need the bytes should use open(), whose handle survives eviction.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, min_age: float = 300):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.min_age = min_age
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, *key.split("/"))
+
+    def get(self, key: str) -> Optional[str]:
+        path = self.path_for(key)
+        try:
+            # mtime marca el último uso para el LRU
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            return None
+
+    def fill(self, key: str, download) -> str:
+        """
+        Download through `download(tmp_path)` and publish atomically.
+        """
+        self.open(key, download, cached=False).close()
+        return self.path_for(key)
+
+    def open(self, key: str, download, cached: bool = True) -> BinaryIO:
+        """
+        Open handle on the cached copy, downloading on a miss. The file
+        is opened before anyone can evict it: the handle keeps reading
+        even if the cache later removes the path.
+        """
+        path = self.path_for(key)
+        if cached:
+            try:
+                f = open(path, "rb")
+            except FileNotFoundError:
+                f = None
+            if f is not None:
+                try:
+                    os.utime(path)
+                except FileNotFoundError:
+                    pass
+                return f
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            download(tmp_path)
+            f = open(tmp_path, "rb")
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.evict()
+        return f
+
+    def adopt(self, key: str, local_path: str) -> None:
+        """Move an already written local file into the cache."""
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.move(local_path, path)
+        self.evict()
+
+    def remove_partial(self, older_than: float) -> int:
+        cutoff = time.time() - older_than
+        removed = 0
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    if name.endswith(".tmp") and os.path.getmtime(path) <= cutoff:
+                        os.remove(path)
+                        removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+    def discard(self, key: str) -> None:
+        try:
+            os.remove(self.path_for(key))
+        except FileNotFoundError:
+            pass
+
+    def evict(self) -> None:
+        with self._lock:
+            recent = time.time() - self.min_age
+            entries, total = [], 0
+            for root, _, names in os.walk(self.cache_dir):
+                for name in names:
+                    if name.endswith(".tmp"):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, path))
+                    total += st.st_size
+
+            # Un lector con el archivo abierto lo sigue viendo aunque se
+            # borre; los usados hace poco se conservan aunque se exceda
+            # el límite, porque su ruta puede estar por abrirse
+            for mtime, size, path in sorted(entries):
+                if total <= self.max_bytes or mtime > recent:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except FileNotFoundError:
+                    pass
+
+
+class ObjectStoreFileRepository(IFileRepository):
+    """
+    IFileRepository backed by an S3-compatible bucket with a local
+    read-through cache.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region_name: Optional[str] = None,
+        cache_dir: str = os.path.join("data", "cache", "objects"),
+        cache_max_bytes: int = 10 * 1024 * 1024 * 1024,
+        cache_min_age: float = 300,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        cold_storage_class: Optional[str] = None,
+        client: Any = None,
+    ):
+        boto3 = _boto3()
+        from boto3.s3.transfer import TransferConfig
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.client = client or boto3.client("s3", endpoint_url=endpoint_url or None, region_name=region_name or None)
+        self.chunk_size = max(chunk_size, MIN_PART_SIZE)
+        self.cold_storage_class = cold_storage_class
+        self.transfer = TransferConfig(multipart_threshold=self.chunk_size, multipart_chunksize=self.chunk_size)
+        self.cache = ReadThroughCache(cache_dir, cache_max_bytes, cache_min_age)
+
+    # --- Helpers ---------------------------------------------
+
+    def __key(self, folder: str, name: str) -> str:
+        return "/".join(p for p in (self.prefix, folder, name) if p)
+
+    def __uri(self, key: str) -> str:
+        return f"s3://{self.bucket}/{key}"
+
+    def __parse(self, file_path: str) -> Tuple[str, str]:
+        if not file_path.startswith("s3://"):
+            raise ValueError(f"Not an object store path: {file_path}")
+        bucket, _, key = file_path[len("s3://"):].partition("/")
+        return bucket, key
+
+    def __signed_key(self, original_path: str) -> str:
+        _, key = self.__parse(original_path)
+        return self.__key("signed", f"signed_{key.rsplit('/', 1)[-1]}")
+
+    def __download(self, bucket: str, key: str):
+        return lambda tmp: self.client.download_file(bucket, key, tmp, Config=self.transfer)
+
+    def __local(self, file_path: str) -> str:
+        """Local cached copy of the object (downloaded on a miss)."""
+        bucket, key = self.__parse(file_path)
+        cache_key = f"{bucket}/{key}"
+        path = self.cache.get(cache_key)
+        if path is None:
+            path = self.cache.fill(cache_key, self.__download(bucket, key))
+        return path
+
+    def __open_local(self, file_path: str) -> BinaryIO:
+        bucket, key = self.__parse(file_path)
+        return self.cache.open(f"{bucket}/{key}", self.__download(bucket, key))
+
+    def __server_copy(self, source_path: str, dest_key: str, **extra) -> None:
+        bucket, key = self.__parse(source_path)
+        # copy() divide en partes (upload_part_copy) los objetos grandes
+        self.client.copy({"Bucket": bucket, "Key": key}, self.bucket, dest_key, ExtraArgs=extra or None, Config=self.transfer)
+
+    # --- Operations ------------------------------------------
+
+    def path_for(self, file_id: str, signed: bool = False) -> str:
+        return self.__uri(self.__key("signed" if signed else "binaries", file_id))
+
+    def signed_path_for(self, original_path: str) -> str:
+        return self.__uri(self.__signed_key(original_path))
+
+    def save(self, file: Any, file_id: str, signed: bool = False) -> str:
+        key = self.__key("signed" if signed else "binaries", file_id)
+
+        try:
+            source = io.BytesIO(file) if isinstance(file, bytes) else file
+            self.client.upload_fileobj(source, self.bucket, key, Config=self.transfer)
+            return self.__uri(key)
+        except Exception as e:
+            print(f"[ObjectStoreFileRepository] Error saving file: {e}")
+            return ""
+
+    def load(self, file_path: str) -> bytes:
+        try:
+            with self.__open_local(file_path) as f:
+                return f.read()
+        except Exception as e:
+            print(f"[ObjectStoreFileRepository] Error loading file: {e}")
+            return b""
+
+    def open_read(self, file_path: str) -> BinaryIO:
+        return self.__open_local(file_path)
+
+    def raw_path(self, file_path: str) -> Optional[str]:
+        # La copia en caché es un archivo local sin comprimir: permite mmap.
+        # La caché no la expulsa durante cache_min_age segundos
+        try:
+            return self.__local(file_path)
+        except Exception as e:
+            print(f"[ObjectStoreFileRepository] Error caching file: {e}")
+            return None
+
+    def get_sizes(self, file_path: str) -> Dict[str, Any]:
+        bucket, key = self.__parse(file_path)
+        size = self.client.head_object(Bucket=bucket, Key=key)["ContentLength"]
+        return {"codec": None, "raw_size": size, "stored_size": size}
+
+    def move_to_signed(self, original_path: str, signed_data: bytes) -> str:
+        key = self.__signed_key(original_path)
+
+        try:
+            self.client.put_object(Bucket=self.bucket, Key=key, Body=signed_data)
+            return self.__uri(key)
+        except Exception as e:
+            print(f"[ObjectStoreFileRepository] Error moving signed file: {e}")
+            return ""
+
+    def copy_to_signed(self, original_path: str, trailer: bytes) -> str:
+        key = self.__signed_key(original_path)
+        bucket, source_key = self.__parse(original_path)
+
+        try:
+            size = self.client.head_object(Bucket=bucket, Key=source_key)["ContentLength"]
+
+            if size < MIN_PART_SIZE:
+                # Una parte copiada debe medir al menos 5 MiB: los archivos
+                # pequeños se suben completos desde la caché local
+                with self.__open_local(original_path) as f:
+                    body = f.read() + trailer
+                self.client.put_object(Bucket=self.bucket, Key=key, Body=body)
+                return self.__uri(key)
+
+            # Multipart: primero el original copiado en el servidor por
+            # rangos (cada parte copiada admite hasta 5 GiB), al final el
+            # trailer de firma
+            upload = self.client.create_multipart_upload(Bucket=self.bucket, Key=key)
+            upload_id = upload["UploadId"]
+            try:
+                parts = []
+                for number, (first, last) in enumerate(_copy_ranges(size), start=1):
+                    copied = self.client.upload_part_copy(
+                        Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=number,
+                        CopySource={"Bucket": bucket, "Key": source_key},
+                        CopySourceRange=f"bytes={first}-{last}",
+                    )
+                    parts.append({"PartNumber": number, "ETag": copied["CopyPartResult"]["ETag"]})
+
+                tail = self.client.upload_part(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=len(parts) + 1, Body=trailer,
+                )
+                parts.append({"PartNumber": len(parts) + 1, "ETag": tail["ETag"]})
+                self.client.complete_multipart_upload(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts},
+                )
+            except Exception:
+                self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+                raise
+
+            return self.__uri(key)
+        except Exception as e:
+            print(f"[ObjectStoreFileRepository] Error copying signed file: {e}")
+            return ""
+
+    def link_signed(self, signed_path: str, original_path: str) -> str:
+        # S3 no tiene enlaces: copia del lado del servidor
+        key = self.__signed_key(original_path)
+        bucket, source_key = self.__parse(signed_path)
+
+        try:
+            self.client.head_object(Bucket=bucket, Key=source_key)
+        except Exception:
+            return ""
+
+        try:
+            if (bucket, source_key) != (self.bucket, key):
+                self.__server_copy(signed_path, key)
+            return self.__uri(key)
+        except Exception as e:
+            print(f"[ObjectStoreFileRepository] Error linking signed file: {e}")
+            return ""
+
+    def import_file(self, source_path: str, file_id: str) -> str:
+        key = self.__key("binaries", file_id)
+
+        try:
+            self.client.upload_file(source_path, self.bucket, key, Config=self.transfer)
+            # Recién subido es justo el que se va a firmar: queda en caché
+            self.cache.adopt(f"{self.bucket}/{key}", source_path)
+            return self.__uri(key)
+        except Exception as e:
+            print(f"[ObjectStoreFileRepository] Error importing file: {e}")
+            return ""
+
+    def move_to_cold(self, file_path: str) -> str:
+        bucket, key = self.__parse(file_path)
+        cold_key = self.__key("cold", key.rsplit("/", 1)[-1])
+        if (bucket, key) == (self.bucket, cold_key):
+            return file_path
+
+        try:
+            extra = {"StorageClass": self.cold_storage_class} if self.cold_storage_class else {}
+            self.__server_copy(file_path, cold_key, **extra)
+            self.delete(file_path)
+            return self.__uri(cold_key)
+        except Exception as e:
+            print(f"[ObjectStoreFileRepository] Error moving file to cold storage: {e}")
+            return ""
+
+    def remove_incomplete(self, older_than: float = 3600) -> int:
+        """
+        Abort multipart uploads abandoned by a crashed node and drop
+        partial downloads from the local cache.
+        """
+        removed = 0
+        cutoff = time.time() - older_than
+
+        try:
+            paginator = self.client.get_paginator("list_multipart_uploads")
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+                for upload in page.get("Uploads", []):
+                    if upload["Initiated"].timestamp() > cutoff:
+                        continue
+                    self.client.abort_multipart_upload(Bucket=self.bucket, Key=upload["Key"], UploadId=upload["UploadId"])
+                    removed += 1
+        except Exception as e:
+            print(f"[ObjectStoreFileRepository] Error aborting incomplete uploads: {e}")
+
+        return removed + self.cache.remove_partial(older_than)
+
+    def delete(self, file_path: str) -> None:
+        try:
+            bucket, key = self.__parse(file_path)
+            self.client.delete_object(Bucket=bucket, Key=key)
+            self.cache.discard(f"{bucket}/{key}")
+        except Exception as e:
+            print(f"[ObjectStoreFileRepository] Error deleting file: {e}")
+
+    def list_files(self, signed: bool = False) -> list:
+        folder = self.__key("signed" if signed else "binaries", "") + "/"
+
+        try:
+            names = []
+            paginator = self.client.get_paginator("list_objects_v2")
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=folder):
+                names.extend(obj["Key"][len(folder):] for obj in page.get("Contents", []))
+            return names
+        except Exception as e:
+            print(f"[ObjectStoreFileRepository] Error listing files: {e}")
+            return []
+
+    def scan_blobs(self) -> Iterator[Tuple[str, int, float]]:
+        # Un listado paginado (1000 objetos por página) de todo el prefijo
+        folders = tuple(self.__key(f, "") + "/" for f in ("binaries", "signed", "cold"))
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                if obj["Key"].startswith(folders):
+                    yield self.__uri(obj["Key"]), obj["Size"], obj["LastModified"].timestamp()
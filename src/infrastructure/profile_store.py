@@ -0,0 +1,112 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: profile_store.py
+# ============================================================
+# Descripción:
+# Búfer circular en disco con los perfiles (cProfile) de las
+# peticiones lentas. Cada perfil son dos archivos en PROFILE_DIR:
+#
+#   <ms>-<pid>-<n>.prof   <- estadísticas pstats (marshal, compacto)
+#   <ms>-<pid>-<n>.json   <- método, ruta, duración, estado HTTP
+#
+# Al superar max_entries se borran los más antiguos. No guarda
+# estado en memoria, así que todos los workers comparten el mismo
+# búfer y cualquiera puede listar los perfiles de los demás.
+# ============================================================
+
+import os
+import io
+import json
+import time
+import itertools
+from typing import Any, Dict, List, Optional
+from src.infrastructure.atomic import atomic_open, atomic_path
+
+
+class ProfileRingBuffer:
+    """
+    Bounded on-disk store of pstats profiles with their request metadata.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 50):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_entries = max_entries
+        self._counter = itertools.count()
+
+    def __path(self, profile_id: str, extension: str) -> Optional[str]:
+        # Evita rutas fuera del directorio de perfiles
+        if os.path.basename(profile_id) != profile_id:
+            return None
+        return os.path.join(self.directory, f"{profile_id}.{extension}")
+
+    def save(self, profiler, meta: Dict[str, Any]) -> str:
+        """Stores a finished cProfile.Profile; returns its id."""
+        import pstats
+
+        profile_id = f"{int(time.time() * 1000)}-{os.getpid()}-{next(self._counter)}"
+
+        with atomic_path(self.__path(profile_id, "prof")) as tmp:
+            pstats.Stats(profiler).dump_stats(tmp)
+        # La metadata se publica al final: un perfil listado siempre está completo
+        with atomic_open(self.__path(profile_id, "json"), "w") as f:
+            json.dump({"id": profile_id, **meta}, f)
+
+        self.__prune()
+        return profile_id
+
+    def __ids(self) -> List[str]:
+        # Los ids empiezan con milisegundos: orden de nombre = orden de llegada
+        return sorted(n[:-len(".json")] for n in os.listdir(self.directory) if n.endswith(".json"))
+
+    def __prune(self) -> None:
+        ids = self.__ids()
+        for profile_id in ids[: max(0, len(ids) - self.max_entries)]:
+            self.delete(profile_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Metadata of the stored profiles, newest first."""
+        entries = []
+        for profile_id in reversed(self.__ids()):
+            try:
+                with open(self.__path(profile_id, "json"), "r") as f:
+                    entries.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return entries
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        path = self.__path(profile_id, "json")
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def raw_path(self, profile_id: str) -> Optional[str]:
+        path = self.__path(profile_id, "prof")
+        return path if path and os.path.exists(path) else None
+
+    def report(self, profile_id: str, sort: str = "cumulative", limit: int = 40) -> Optional[str]:
+        """pstats text report of one profile."""
+        import pstats
+
+        path = self.raw_path(profile_id)
+        if path is None:
+            return None
+
+        out = io.StringIO()
+        stats = pstats.Stats(path, stream=out)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def delete(self, profile_id: str) -> None:
+        for extension in ("json", "prof"):
+            path = self.__path(profile_id, extension)
+            try:
+                os.remove(path)
+            except (OSError, TypeError):
+                pass
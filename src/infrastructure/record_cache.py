@@ -0,0 +1,264 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: record_cache.py
+# ============================================================
+# Descripción:
+# Caché de lectura para cualquier IDatabaseRepository (JSON hoy,
+# SQLite o remoto después). Guarda en memoria:
+#
+#   - un LRU acotado de registros por id (get_record)
+#   - el listado completo (list_records / list_page), del que también
+#     salen las búsquedas por token de los enlaces del correo
+#
+# Las escrituras pasan directo al repositorio e invalidan lo que
+# tocan (write-through). Para que otros procesos (workers de
+# gunicorn, comandos de mantenimiento) también invaliden, se compara
+# un "sello" de versión: inodo, mtime y tamaño de un archivo. Con el
+# repositorio JSON el sello es la propia base de datos, que cada
+# escritura ya reemplaza (inodo nuevo), así que no se toca; con otro
+# archivo de sello, cada escritura de este decorador lo toca.
+#
+# Los registros se guardan como diccionarios y se entrega un
+# BinaryFile nuevo en cada lectura: los casos de uso modifican el
+# objeto que reciben y eso no debe alterar la caché.
+# ============================================================
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from src.application.ports import IDatabaseRepository
+from src.domain.models import BinaryFile
+
+
+Stamp = Optional[Tuple[int, int, int]]
+
+
+class CachedDatabaseRepository(IDatabaseRepository):
+    """
+    Read-through, write-invalidating cache in front of a database repository.
+    """
+
+    def __init__(
+        self,
+        inner: IDatabaseRepository,
+        max_entries: int = 4096,
+        stamp_path: Optional[str] = None,
+        check_interval: float = 0.0,
+    ):
+        self.inner = inner
+        self.max_entries = max_entries
+        self.stamp_path = stamp_path
+        self.check_interval = check_interval
+        # Tocar la base de datos cambiaría su mtime sin cambiar su
+        # contenido (y el índice de búsqueda del repositorio lo notaría)
+        own_path = getattr(inner, "json_path", None)
+        self.touch_stamp = bool(stamp_path) and not (
+            own_path and os.path.abspath(own_path) == os.path.abspath(stamp_path)
+        )
+
+        self._records: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._listing: Optional[List[Dict[str, Any]]] = None
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._stamp: Stamp = self.__read_stamp()
+        self._checked_at = time.monotonic()
+
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._stamp_changes = 0
+
+    # --- Sello de versión entre procesos --------------------
+
+    def __read_stamp(self) -> Stamp:
+        if not self.stamp_path:
+            return None
+        try:
+            st = os.stat(self.stamp_path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def __touch_stamp(self) -> None:
+        if not self.touch_stamp:
+            return
+        try:
+            with open(self.stamp_path, "a"):
+                os.utime(self.stamp_path)
+        except OSError as e:
+            print(f"[CachedDatabaseRepository] Could not touch {self.stamp_path}: {e}")
+
+    def __sync(self) -> int:
+        """
+        Drops everything if another process changed the stamp; returns
+        the generation the caller must see unchanged before caching.
+        Called with the lock held.
+        """
+        now = time.monotonic()
+        if self.stamp_path and now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            stamp = self.__read_stamp()
+            if stamp != self._stamp:
+                self._stamp = stamp
+                self.__clear()
+                self._stamp_changes += 1
+        return self._generation
+
+    def __clear(self) -> None:
+        self._records.clear()
+        self._listing = None
+        self._by_id = {}
+        self._generation += 1
+
+    def __remember(self, file_id: str, data: Dict[str, Any]) -> None:
+        self._records[file_id] = data
+        self._records.move_to_end(file_id)
+        while len(self._records) > self.max_entries:
+            self._records.popitem(last=False)
+
+    def __invalidate(self, file_ids: Optional[List[str]] = None) -> None:
+        with self._lock:
+            if file_ids is None:
+                self._records.clear()
+            else:
+                for file_id in file_ids:
+                    self._records.pop(file_id, None)
+            # El listado siempre se descarta: cambió su contenido o su orden
+            self._listing = None
+            self._by_id = {}
+            self._generation += 1
+            self._invalidations += 1
+        # No se adopta el sello nuevo: otro proceso pudo escribir justo
+        # después, así que la siguiente lectura descarta todo por seguridad
+        self.__touch_stamp()
+
+    # --- Lecturas ------------------------------------------
+
+    def __cached_listing(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            generation = self.__sync()
+            if self._listing is not None:
+                self._hits += 1
+                return self._listing
+            self._misses += 1
+
+        listing = [record.to_dict() for record in self.inner.list_records()]
+
+        with self._lock:
+            # Una escritura durante la lectura invalida lo que se leyó
+            if self._generation == generation:
+                self._listing = listing
+                self._by_id = {r["id"]: r for r in listing}
+        return listing
+
+    def get_record(self, file_id: str) -> Optional[BinaryFile]:
+        with self._lock:
+            generation = self.__sync()
+            # Con el listado en memoria cualquier id se resuelve sin leer
+            data = self._records.get(file_id) or self._by_id.get(file_id)
+            if data is not None:
+                self.__remember(file_id, data)
+                self._hits += 1
+                return BinaryFile.from_dict(data)
+            self._misses += 1
+
+        record = self.inner.get_record(file_id)
+        if record is None:
+            return None
+
+        with self._lock:
+            if self._generation == generation:
+                self.__remember(file_id, record.to_dict())
+        return record
+
+    def list_records(self) -> List[BinaryFile]:
+        return [BinaryFile.from_dict(r) for r in self.__cached_listing()]
+
+    def list_page(self, offset: int = 0, limit: Optional[int] = None) -> List[BinaryFile]:
+        """
+        A slice of the cached listing, without rebuilding every record.
+        """
+        listing = self.__cached_listing()
+        end = None if limit is None else offset + limit
+        return [BinaryFile.from_dict(r) for r in listing[offset:end]]
+
+    def __find_by(self, field: str, value: str) -> Optional[BinaryFile]:
+        for r in self.__cached_listing():
+            if r.get(field) == value:
+                return BinaryFile.from_dict(r)
+        return None
+
+    def find_by_approval_token(self, token: str) -> Optional[BinaryFile]:
+        return self.__find_by("approval_token", token)
+
+    def find_by_reject_token(self, token: str) -> Optional[BinaryFile]:
+        return self.__find_by("reject_token", token)
+
+    # --- Escrituras (write-through) ------------------------
+
+    def add_record(self, record: Any) -> None:
+        try:
+            self.inner.add_record(record)
+        finally:
+            self.__invalidate([])
+
+    def add_records(self, records: List[Any]) -> int:
+        try:
+            return self.inner.add_records(records)
+        finally:
+            self.__invalidate([])
+
+    def update_record(self, file_id: str, updates: Dict[str, Any]) -> bool:
+        try:
+            return self.inner.update_record(file_id, updates)
+        finally:
+            self.__invalidate([file_id])
+
+    def delete_record(self, file_id: str) -> bool:
+        try:
+            return self.inner.delete_record(file_id)
+        finally:
+            self.__invalidate([file_id])
+
+    def delete_records(self, file_ids: List[str]) -> int:
+        try:
+            return self.inner.delete_records(file_ids)
+        finally:
+            self.__invalidate(list(file_ids))
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        # El índice del repositorio ya se actualiza al escribir
+        return self.inner.search(query, limit)
+
+    def aggregates(self) -> Dict[str, Any]:
+        # El repositorio ya los mantiene al escribir: no hace falta cachearlos
+        return self.inner.aggregates()
+
+    def __getattr__(self, name: str) -> Any:
+        # compact(), json_path, etc. del repositorio envuelto
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "invalidations": self._invalidations,
+                "stamp_changes": self._stamp_changes,
+                "entries": len(self._records),
+                "listing_cached": self._listing is not None,
+            }
+
+
+__all__ = ["CachedDatabaseRepository"]
@@ -0,0 +1,127 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: record_stats.py
+# ============================================================
+# Descripción:
+# Agregados de los registros que el repositorio mantiene al escribir,
+# para que /api/stats no tenga que recorrer la base de datos:
+#
+#   - conteo por ambiente y estado
+#   - bytes de los originales (tamaño real y en disco)
+#   - firmas por hora (últimos HOURLY_WINDOW buckets, según signed_at)
+#
+# Cada escritura aplica la diferencia entre el registro anterior y el
+# nuevo (O(1)). Los agregados se guardan junto a la base de datos con
+# la versión de la base que reflejan; si no coinciden (caída entre
+# las dos escrituras, edición a mano) se recalculan desde los registros.
+# ============================================================
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+
+
+# Horas de historial de firmas que se conservan
+HOURLY_WINDOW = 7 * 24
+
+
+def _hour(timestamp: Optional[str]) -> Optional[str]:
+    # "2025-01-01T13:45:00.123" -> "2025-01-01T13"
+    return timestamp[:13] if timestamp and len(timestamp) >= 13 else None
+
+
+class RecordStats:
+    """
+    Running aggregates over a set of records (as dicts).
+    """
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None):
+        data = data or {}
+        self.version = data.get("version")
+        self.counts: Dict[str, Dict[str, int]] = data.get("counts", {})
+        self.raw_bytes: int = data.get("raw_bytes", 0)
+        self.stored_bytes: int = data.get("stored_bytes", 0)
+        self.signed_per_hour: Dict[str, int] = data.get("signed_per_hour", {})
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]], version: Any = None) -> "RecordStats":
+        stats = cls()
+        for record in records:
+            stats.apply(None, record)
+        stats.version = version
+        return stats
+
+    def __count(self, record: Dict[str, Any], sign: int) -> None:
+        environment = str(record.get("environment") or "unknown")
+        status = str(record.get("status") or "unknown")
+        by_status = self.counts.setdefault(environment, {})
+        by_status[status] = by_status.get(status, 0) + sign
+        if by_status[status] <= 0:
+            del by_status[status]
+            if not by_status:
+                del self.counts[environment]
+
+        # Solo cuentan los originales que siguen en el almacenamiento
+        if record.get("file_path"):
+            self.raw_bytes += sign * (record.get("raw_size") or 0)
+            self.stored_bytes += sign * (record.get("stored_size") or 0)
+
+    def apply(self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> None:
+        """Accounts for one record changing from `old` to `new` (None = absent)."""
+        if old is not None:
+            self.__count(old, -1)
+        if new is not None:
+            self.__count(new, +1)
+
+        # Las firmas son eventos: un registro borrado o archivado después
+        # no reduce la tasa de la hora en que se firmó
+        hour = _hour((new or {}).get("signed_at"))
+        if hour and hour != _hour((old or {}).get("signed_at")):
+            self.signed_per_hour[hour] = self.signed_per_hour.get(hour, 0) + 1
+            self.__prune()
+
+    def __prune(self) -> None:
+        if len(self.signed_per_hour) <= HOURLY_WINDOW:
+            return
+        for hour in sorted(self.signed_per_hour)[:-HOURLY_WINDOW]:
+            del self.signed_per_hour[hour]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "counts": self.counts,
+            "raw_bytes": self.raw_bytes,
+            "stored_bytes": self.stored_bytes,
+            "signed_per_hour": self.signed_per_hour,
+        }
+
+    def summary(self, now: Optional[datetime] = None, hours: int = 24) -> Dict[str, Any]:
+        """
+        Response of /api/stats. Its cost depends on the number of
+        environments, statuses and hours, not on the number of records.
+        """
+        now = now or datetime.now()
+        by_status: Dict[str, int] = {}
+        by_environment: Dict[str, int] = {}
+        for environment, statuses in self.counts.items():
+            by_environment[environment] = sum(statuses.values())
+            for status, count in statuses.items():
+                by_status[status] = by_status.get(status, 0) + count
+
+        recent = [(now - timedelta(hours=h)).strftime("%Y-%m-%dT%H") for h in range(hours)]
+        per_hour = {hour: self.signed_per_hour.get(hour, 0) for hour in reversed(recent)}
+        return {
+            "records": sum(by_environment.values()),
+            "by_status": by_status,
+            "by_environment": by_environment,
+            "by_environment_status": self.counts,
+            "bytes": {"raw": self.raw_bytes, "stored": self.stored_bytes},
+            "signed_this_hour": per_hour[recent[0]],
+            "signed_per_hour": per_hour,
+        }
+
+
+__all__ = ["HOURLY_WINDOW", "RecordStats"]
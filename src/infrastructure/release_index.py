@@ -0,0 +1,175 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: release_index.py
+# ============================================================
+# Descripción:
+# Vista materializada "última versión firmada" por ambiente y
+# filename, para el manifiesto que consultan los dispositivos.
+#
+# El índice vive en un JSON pequeño (data/releases.json) que se
+# actualiza de forma incremental cada vez que un registro llega a
+# 'signed' (flock + escritura atómica). Cada proceso lo mantiene en
+# memoria con el cuerpo de cada manifiesto ya serializado y su
+# ETag; solo vuelve a leer el archivo cuando otro worker lo cambió,
+# así una consulta no toca la base de datos ni serializa nada.
+# ============================================================
+
+import os
+import json
+import time
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from src.application.ports import IReleaseIndex
+from src.domain.models import BinaryFile
+from src.infrastructure.atomic import atomic_open
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo se serializa dentro del proceso
+    fcntl = None
+
+
+def manifest_entry(binary: BinaryFile) -> Dict[str, Any]:
+    """Fields a device needs to download and verify a release."""
+    return {
+        "id": binary.id,
+        "filename": binary.filename,
+        "environment": binary.environment,
+        "uploaded_at": binary.uploaded_at,
+        "size": binary.raw_size,
+        "digest": binary.digest,
+        "hash_mode": binary.hash_mode or "linear",
+        "hash_algorithm": binary.hash_algorithm or "sha256",
+        "block_size": binary.block_size,
+        "signature": binary.signature,
+        "delta": {
+            "base_id": binary.delta_base_id,
+            "size": binary.delta_size,
+            "signature": binary.delta_signature,
+        } if binary.delta_path else None,
+        "encrypted": {
+            "size": binary.encrypted_size,
+            "key_id": binary.encryption_key_id,
+        } if binary.encrypted_path else None,
+    }
+
+
+class JsonReleaseIndex(IReleaseIndex):
+    """
+    Latest signed release per (environment, filename), persisted as JSON
+    and served from memory.
+    """
+
+    def __init__(self, path: str = os.path.join("data", "releases.json"), check_interval: float = 1.0):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.check_interval = check_interval
+
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._served: Dict[str, Tuple[bytes, str]] = {}
+        self._stamp = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def __key(environment: str, filename: str) -> str:
+        return f"{environment}/{filename}"
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    # --- Lectura (camino rápido) -----------------------------
+
+    def __file_stamp(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_ino, st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return None
+
+    def __load(self, entries: Dict[str, Dict[str, Any]], stamp) -> None:
+        served = {}
+        for key, entry in entries.items():
+            body = json.dumps(entry, separators=(",", ":"), sort_keys=True).encode("utf-8")
+            served[key] = (body, '"%s"' % hashlib.sha256(body).hexdigest()[:32])
+        self._entries, self._served, self._stamp = entries, served, stamp
+
+    def __refresh(self) -> None:
+        # Otro worker pudo publicar una versión: se revisa a lo sumo cada check_interval
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return
+
+        with self._lock:
+            self._checked = now
+            stamp = self.__file_stamp()
+            if stamp == self._stamp:
+                return
+            self.__load(self.__read(), stamp)
+
+    def __read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f).get("releases", {})
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def latest(self, environment: str, filename: str) -> Optional[Dict[str, Any]]:
+        self.__refresh()
+        return self._entries.get(self.__key(environment, filename))
+
+    def manifest(self, environment: str, filename: str) -> Optional[Tuple[bytes, str]]:
+        self.__refresh()
+        return self._served.get(self.__key(environment, filename))
+
+    # --- Escritura -------------------------------------------
+
+    @contextmanager
+    def __locked(self) -> Iterator[None]:
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(f"{self.path}.lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def __write(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        with atomic_open(self.path, "w") as f:
+            json.dump({"releases": entries}, f, separators=(",", ":"))
+        self.__load(entries, self.__file_stamp())
+        self._checked = time.monotonic()
+
+    def record_signed(self, binary: BinaryFile) -> None:
+        if binary.status != "signed":
+            return
+
+        key = self.__key(binary.environment, binary.filename)
+        with self.__locked():
+            entries = self.__read()
+            current = entries.get(key)
+            if current and (current.get("uploaded_at") or "") > (binary.uploaded_at or ""):
+                return
+            entries[key] = manifest_entry(binary)
+            self.__write(entries)
+
+    def rebuild(self, records: List[BinaryFile]) -> int:
+        latest: Dict[str, BinaryFile] = {}
+        for r in records:
+            if r.status == "signed":
+                key = self.__key(r.environment, r.filename)
+                if key not in latest or (r.uploaded_at or "") > (latest[key].uploaded_at or ""):
+                    latest[key] = r
+
+        with self.__locked():
+            self.__write({key: manifest_entry(r) for key, r in latest.items()})
+        return len(latest)
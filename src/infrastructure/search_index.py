@@ -0,0 +1,144 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: search_index.py
+# ============================================================
+# Descripción:
+# Índice en memoria para buscar registros por prefijo, sin recorrer
+# la base de datos. Tres listas ordenadas de claves (en minúsculas):
+#
+#   0. el filename completo        "gateway_fw_v1.2.3.bin"
+#   1. cada parte del filename     "gateway", "fw", "v1.2.3.bin"
+#   2. el id                       "3f2a9c..."
+#
+# Una búsqueda por prefijo es una bisección en cada lista (O(log N))
+# más los `limit` resultados que se leen, así que no depende del total
+# de registros. Los resultados salen en ese orden de prioridad (el
+# filename exacto o su prefijo primero, después una versión o
+# palabra dentro del nombre, al final el id).
+#
+# Insertar o quitar un registro es una bisección y un memmove por
+# clave; el repositorio lo hace en cada escritura.
+# ============================================================
+
+import re
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Separadores entre palabras de un filename; el punto no separa para
+# que "v1.2" encuentre "v1.2.3.bin"
+_TOKEN_SPLIT = re.compile(r"[\s_\-/\\]+")
+
+FILENAME, TOKEN, ID = 0, 1, 2
+
+Summary = Tuple[str, Optional[str], Optional[str], Optional[str]]
+
+
+class RecordSearchIndex:
+    """
+    Prefix index over record filenames and ids.
+    """
+
+    def __init__(self):
+        self._keys: List[List[Tuple[str, str]]] = [[], [], []]
+        # id -> (filename, environment, status, uploaded_at)
+        self._records: Dict[str, Summary] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @staticmethod
+    def __keys_for(file_id: str, filename: str) -> List[Tuple[int, str]]:
+        name = (filename or "").lower()
+        keys = [(FILENAME, name), (ID, file_id.lower())]
+        tokens = {t for t in _TOKEN_SPLIT.split(name) if t and t != name}
+        keys += [(TOKEN, t) for t in tokens]
+        return keys
+
+    @staticmethod
+    def __summary(record: Dict[str, Any]) -> Summary:
+        return (record.get("filename") or "", record.get("environment"), record.get("status"), record.get("uploaded_at"))
+
+    def build(self, records: List[Dict[str, Any]]) -> None:
+        """Replaces the index with `records` (sorted once, not per insert)."""
+        keys: List[List[Tuple[str, str]]] = [[], [], []]
+        summaries: Dict[str, Summary] = {}
+        for record in records:
+            file_id = record["id"]
+            summaries[file_id] = self.__summary(record)
+            for kind, key in self.__keys_for(file_id, record.get("filename")):
+                keys[kind].append((key, file_id))
+        for column in keys:
+            column.sort()
+        self._keys, self._records = keys, summaries
+
+    def add(self, record: Dict[str, Any]) -> None:
+        file_id = record["id"]
+        if file_id in self._records:
+            self.remove(file_id)
+        self._records[file_id] = self.__summary(record)
+        for kind, key in self.__keys_for(file_id, record.get("filename")):
+            insort(self._keys[kind], (key, file_id))
+
+    def remove(self, file_id: str) -> None:
+        summary = self._records.pop(file_id, None)
+        if summary is None:
+            return
+        for kind, key in self.__keys_for(file_id, summary[0]):
+            column = self._keys[kind]
+            i = bisect_left(column, (key, file_id))
+            if i < len(column) and column[i] == (key, file_id):
+                del column[i]
+
+    def update(self, file_id: str, updates: Dict[str, Any]) -> None:
+        summary = self._records.get(file_id)
+        if summary is None:
+            return
+        record = dict(zip(("filename", "environment", "status", "uploaded_at"), summary), id=file_id)
+        record.update({k: v for k, v in updates.items() if k in record})
+        if record["filename"] != summary[0]:
+            self.add(record)
+        else:
+            self._records[file_id] = self.__summary(record)
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Up to `limit` records whose filename, a word of the filename or
+        id starts with `query` (case-insensitive).
+        """
+        prefix = (query or "").strip().lower()
+        if not prefix or limit <= 0:
+            return []
+
+        results: List[Dict[str, Any]] = []
+        seen = set()
+        for kind in (FILENAME, TOKEN, ID):
+            column = self._keys[kind]
+            i = bisect_left(column, (prefix, ""))
+            while i < len(column) and len(results) < limit:
+                key, file_id = column[i]
+                if not key.startswith(prefix):
+                    break
+                i += 1
+                if file_id in seen:
+                    continue
+                seen.add(file_id)
+                filename, environment, status, uploaded_at = self._records[file_id]
+                results.append({
+                    "id": file_id,
+                    "filename": filename,
+                    "environment": environment,
+                    "status": status,
+                    "uploaded_at": uploaded_at,
+                    "match": ("filename", "token", "id")[kind],
+                })
+            if len(results) >= limit:
+                break
+        return results
+
+
+__all__ = ["RecordSearchIndex"]
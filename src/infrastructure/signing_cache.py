@@ -0,0 +1,204 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: signing_cache.py
+# ============================================================
+# Descripción:
+# Caché persistente de resultados de firma. La clave es
+# (digest del contenido, key_id de la firma, ambiente) y el valor
+# la firma, la ruta del artefacto firmado y los datos del modo de
+# hash. Se compone de un LRU acotado en memoria respaldado por
+# SQLite en disco, de modo que sobrevive a reinicios y se comparte
+# entre procesos.
+#
+# CachedSigningService envuelve cualquier ISigningService y consulta
+# la caché antes de escribir nada: una imagen idéntica ya firmada solo
+# se enlaza (hard link) como artefacto del nuevo registro, sin
+# reescribir la imagen.
+#
+# Los registros que comparten artefacto comparten inodo, así que un
+# artefacto firmado nunca se modifica en su lugar: toda escritura
+# (FileRepository, atomic.py) crea un archivo nuevo y lo renombra
+# encima, y borrar o mover uno deja intactos los demás enlaces.
+# ============================================================
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from src.application.ports import ISigningService, IFileRepository
+from src.domain.models import BinaryFile
+
+
+CacheKey = Tuple[str, str, str]
+
+
+class SignatureCache:
+    """
+    Memory LRU in front of an SQLite table, both size-bounded.
+    """
+
+    def __init__(
+        self,
+        db_path: str = os.path.join("data", "cache", "signatures.sqlite"),
+        max_memory_entries: int = 1024,
+        max_disk_entries: int = 100_000,
+    ):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[CacheKey, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._stale = 0
+
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS signatures ("
+            " cache_key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS signatures_last_used ON signatures(last_used)")
+        self._db.commit()
+
+    @staticmethod
+    def __db_key(key: CacheKey) -> str:
+        return "|".join(key)
+
+    def __remember(self, key: CacheKey, value: Dict[str, Any]) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self._hits += 1
+                return value
+
+            row = self._db.execute(
+                "SELECT value FROM signatures WHERE cache_key = ?", (self.__db_key(key),)
+            ).fetchone()
+
+            if row is None:
+                self._misses += 1
+                return None
+
+            value = json.loads(row[0])
+            self._db.execute(
+                "UPDATE signatures SET last_used = ? WHERE cache_key = ?", (time.time(), self.__db_key(key))
+            )
+            self._db.commit()
+
+            self.__remember(key, value)
+            self._hits += 1
+            self._disk_hits += 1
+            return value
+
+    def put(self, key: CacheKey, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self.__remember(key, value)
+            self._db.execute(
+                "INSERT OR REPLACE INTO signatures (cache_key, value, last_used) VALUES (?, ?, ?)",
+                (self.__db_key(key), json.dumps(value), time.time()),
+            )
+            # Expulsa las entradas menos usadas si el disco excede el límite
+            self._db.execute(
+                "DELETE FROM signatures WHERE cache_key IN ("
+                " SELECT cache_key FROM signatures ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_disk_entries,),
+            )
+            self._db.commit()
+
+    def forget(self, key: CacheKey) -> None:
+        """Drop an entry whose artifact no longer exists (counted as stale)."""
+        with self._lock:
+            self._stale += 1
+            self._memory.pop(key, None)
+            self._db.execute("DELETE FROM signatures WHERE cache_key = ?", (self.__db_key(key),))
+            self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "stale": self._stale,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+
+class CachedSigningService(ISigningService):
+    """
+    Signing decorator that returns cached results for content that was
+    already signed with the same key and environment.
+    """
+
+    def __init__(self, inner: ISigningService, cache: SignatureCache, file_repo: IFileRepository):
+        self.inner = inner
+        self.cache = cache
+        self.file_repo = file_repo
+
+    @property
+    def key_id(self) -> str:
+        return self.inner.key_id
+
+    def algorithm_for(self, environment: Optional[str]) -> str:
+        return self.inner.algorithm_for(environment)
+
+    def content_digest(self, binary: BinaryFile) -> str:
+        return self.inner.content_digest(binary)
+
+    def artifact_paths(self, binary: BinaryFile) -> List[str]:
+        return self.inner.artifact_paths(binary)
+
+    def sign_file(self, binary: BinaryFile):
+        # La clave es el digest que firmaría el adaptador interno: en modo
+        # lineal, el hash del contenido (gratis si la carga ya lo calculó);
+        # en modo árbol, la raíz Merkle hasheada en paralelo. En ambos casos
+        # lo calculado queda en `binary` y, si no hay acierto, la firma no
+        # vuelve a leer la imagen.
+        algorithm = self.algorithm_for(binary.environment)
+        key = (self.content_digest(binary), self.key_id, binary.environment or "")
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            signed_path = self.file_repo.link_signed(cached["signed_path"], binary.file_path)
+            if signed_path:
+                binary.hash_mode = cached.get("hash_mode")
+                binary.hash_algorithm = cached.get("hash_algorithm", algorithm)
+                binary.block_size = cached.get("block_size")
+                binary.block_hashes = cached.get("block_hashes")
+                return cached["signature"], signed_path
+
+            # El artefacto ya no existe (borrado o archivado): se firma de nuevo
+            self.cache.forget(key)
+
+        signature, signed_path = self.inner.sign_file(binary)
+
+        if signed_path:
+            self.cache.put(key, {
+                "signature": signature,
+                "signed_path": signed_path,
+                "hash_mode": binary.hash_mode,
+                "hash_algorithm": binary.hash_algorithm,
+                "block_size": binary.block_size,
+                "block_hashes": binary.block_hashes,
+            })
+
+        return signature, signed_path
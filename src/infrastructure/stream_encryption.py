@@ -0,0 +1,355 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: stream_encryption.py
+# ============================================================
+# Descripción:
+# Cifrado autenticado por segmentos (AEAD en streaming) para
+# entregar imágenes confidenciales ya firmadas. A diferencia de
+# Fernet, no carga el mensaje completo ni lo infla con base64:
+# cada segmento de tamaño fijo se cifra por separado con
+# AES-256-GCM o ChaCha20-Poly1305, así cifrar y descifrar usan
+# memoria constante y un segmento se puede descifrar sin leer los
+# demás (acceso aleatorio, descargas por rangos, en paralelo).
+#
+# Formato (enteros big-endian):
+#
+#   "OTAE" | versión 1B | algoritmo 1B | tamaño de segmento 4B |
+#   salt 16B | prefijo de nonce 7B | largo key_id 1B | key_id
+#   segmento 0 | segmento 1 | ... | último segmento
+#
+#   segmento i = AEAD(texto[i*S:(i+1)*S]) + etiqueta 16B
+#   nonce i    = prefijo 7B | i 4B | 1 si es el último, si no 0
+#   AAD        = el encabezado completo
+#
+# La llave de cada archivo se deriva con HKDF-SHA256 de la llave
+# maestra del ambiente y la salt aleatoria del encabezado. La
+# marca de "último" en el nonce detecta un archivo truncado en un
+# límite de segmento.
+#
+# EncryptingSigningService agrega el cifrado como etapa posterior
+# a la firma: el artefacto firmado se cifra para los ambientes
+# configurados y el registro guarda la ruta cifrada.
+# ============================================================
+
+import os
+import base64
+import struct
+import hashlib
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from src.application.ports import ISigningService, IFileRepository
+from src.domain.models import BinaryFile
+
+
+MAGIC = b"OTAE"
+VERSION = 1
+TAG_SIZE = 16
+DEFAULT_SEGMENT_SIZE = 1024 * 1024
+
+ALGORITHMS = {"aes-256-gcm": 1, "chacha20-poly1305": 2}
+
+_FIXED_HEADER = struct.Struct(">4sBBI16s7sB")
+
+
+def _aead_class(algorithm_id: int):
+    # cryptography se importa al cifrar, no al arrancar la app
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+    return {1: AESGCM, 2: ChaCha20Poly1305}[algorithm_id]
+
+
+def _file_key(master_key: bytes, salt: bytes, algorithm_id: int) -> bytes:
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+    info = b"ota-stream-aead" + bytes([algorithm_id])
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=salt, info=info).derive(master_key)
+
+
+def _nonce(prefix: bytes, index: int, last: bool) -> bytes:
+    return prefix + struct.pack(">IB", index, 1 if last else 0)
+
+
+def key_id_for(master_key: bytes) -> str:
+    """Public identifier of a master key (never the key itself)."""
+    return hashlib.sha256(b"ota-key-id" + master_key).hexdigest()[:16]
+
+
+def load_key(path: str) -> bytes:
+    """Reads a base64 master key file (32 bytes once decoded)."""
+    with open(path, "rb") as f:
+        key = base64.b64decode(f.read().strip())
+    if len(key) != 32:
+        raise ValueError(f"Encryption key {path} must be 32 bytes (base64), got {len(key)}")
+    return key
+
+
+def generate_key(path: str) -> str:
+    """Creates a new master key file readable only by its owner; returns its key id."""
+    key = os.urandom(32)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(base64.b64encode(key) + b"\n")
+    return key_id_for(key)
+
+
+class StreamHeader:
+    """
+    Parsed header of an encrypted stream, with the derived segment cipher.
+    """
+
+    def __init__(self, raw: bytes, algorithm_id: int, segment_size: int, salt: bytes, nonce_prefix: bytes, key_id: str):
+        self.raw = raw
+        self.algorithm_id = algorithm_id
+        self.segment_size = segment_size
+        self.salt = salt
+        self.nonce_prefix = nonce_prefix
+        self.key_id = key_id
+
+    @property
+    def size(self) -> int:
+        return len(self.raw)
+
+    @classmethod
+    def new(cls, algorithm: str, segment_size: int, key_id: str) -> "StreamHeader":
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown encryption algorithm '{algorithm}', expected one of {tuple(ALGORITHMS)}")
+        if not 0 < segment_size < 2 ** 32:
+            raise ValueError("segment_size must be between 1 byte and 4 GiB")
+
+        key_id_bytes = key_id.encode("ascii")
+        salt, prefix = os.urandom(16), os.urandom(7)
+        raw = _FIXED_HEADER.pack(MAGIC, VERSION, ALGORITHMS[algorithm], segment_size, salt, prefix, len(key_id_bytes))
+        return cls(raw + key_id_bytes, ALGORITHMS[algorithm], segment_size, salt, prefix, key_id)
+
+    @classmethod
+    def read(cls, stream: BinaryIO) -> "StreamHeader":
+        fixed = stream.read(_FIXED_HEADER.size)
+        if len(fixed) != _FIXED_HEADER.size:
+            raise ValueError("Truncated encryption header")
+
+        magic, version, algorithm_id, segment_size, salt, prefix, key_id_len = _FIXED_HEADER.unpack(fixed)
+        if magic != MAGIC or version != VERSION or algorithm_id not in ALGORITHMS.values():
+            raise ValueError("Not an encrypted OTA stream (bad magic, version or algorithm)")
+
+        key_id = stream.read(key_id_len)
+        return cls(fixed + key_id, algorithm_id, segment_size, salt, prefix, key_id.decode("ascii"))
+
+    def cipher(self, master_key: bytes):
+        return _aead_class(self.algorithm_id)(_file_key(master_key, self.salt, self.algorithm_id))
+
+    def segment_offset(self, index: int) -> int:
+        """Byte offset of segment `index` in the encrypted stream."""
+        return self.size + index * (self.segment_size + TAG_SIZE)
+
+
+class EncryptingReader:
+    """
+    File-like reader that yields the encrypted form of `source`, one
+    segment at a time (constant memory). With `workers` > 1, a window of
+    segments is encrypted in parallel threads.
+    """
+
+    def __init__(
+        self,
+        source: BinaryIO,
+        master_key: bytes,
+        key_id: str,
+        algorithm: str = "aes-256-gcm",
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+        workers: int = 1,
+    ):
+        self.header = StreamHeader.new(algorithm, segment_size, key_id)
+        self.source = source
+        self.workers = max(1, workers)
+        self.bytes_out = 0
+
+        self._cipher = self.header.cipher(master_key)
+        self._segments = self.__encrypted_segments()
+        self._buffer = self.header.raw
+        self._pool = None
+
+    def __plain_segments(self) -> Iterator[Tuple[int, bytes, bool]]:
+        # Se lee un segmento por adelantado para saber cuál es el último
+        size = self.header.segment_size
+        current = self.source.read(size)
+        index = 0
+        while True:
+            following = self.source.read(size) if len(current) == size else b""
+            last = not following
+            yield index, current, last
+            if last:
+                return
+            current, index = following, index + 1
+
+    def __encrypt(self, segment: Tuple[int, bytes, bool]) -> bytes:
+        index, plaintext, last = segment
+        return self._cipher.encrypt(_nonce(self.header.nonce_prefix, index, last), plaintext, self.header.raw)
+
+    def __encrypted_segments(self) -> Iterator[bytes]:
+        if self.workers == 1:
+            for segment in self.__plain_segments():
+                yield self.__encrypt(segment)
+            return
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        # Ventana acotada de segmentos en vuelo: la memoria no crece con la imagen
+        window = self.workers * 2
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = []
+            for segment in self.__plain_segments():
+                pending.append(pool.submit(self.__encrypt, segment))
+                if len(pending) >= window:
+                    yield pending.pop(0).result()
+            for future in pending:
+                yield future.result()
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            segment = next(self._segments, None)
+            if segment is None:
+                break
+            self._buffer += segment
+
+        if size < 0:
+            chunk, self._buffer = self._buffer, b""
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        self.bytes_out += len(chunk)
+        return chunk
+
+
+def decrypt_segment(stream: BinaryIO, master_key: bytes, index: int, header: Optional[StreamHeader] = None) -> bytes:
+    """
+    Decrypts only segment `index` (random access). Raises ValueError if
+    the segment does not exist and cryptography's InvalidTag if it was
+    modified.
+    """
+    if header is None:
+        stream.seek(0)
+        header = StreamHeader.read(stream)
+
+    stream.seek(0, os.SEEK_END)
+    total = stream.tell() - header.size
+    full = header.segment_size + TAG_SIZE
+    count = max(1, -(-total // full))
+    if not 0 <= index < count:
+        raise ValueError(f"Segment {index} out of range (0..{count - 1})")
+
+    stream.seek(header.segment_offset(index))
+    ciphertext = stream.read(full)
+    last = index == count - 1
+    return header.cipher(master_key).decrypt(_nonce(header.nonce_prefix, index, last), ciphertext, header.raw)
+
+
+def decrypt_stream(source: BinaryIO, dest: BinaryIO, master_key: bytes) -> int:
+    """
+    Decrypts a whole stream segment by segment into `dest`; returns the
+    plaintext size. A truncated or modified stream raises InvalidTag.
+    """
+    header = StreamHeader.read(source)
+    cipher = header.cipher(master_key)
+    full = header.segment_size + TAG_SIZE
+
+    written = 0
+    index = 0
+    current = source.read(full)
+    while True:
+        following = source.read(full) if len(current) == full else b""
+        last = not following
+        dest.write(cipher.decrypt(_nonce(header.nonce_prefix, index, last), current, header.raw))
+        written += len(current) - TAG_SIZE
+        if last:
+            return written
+        current, index = following, index + 1
+
+
+class EncryptingSigningService(ISigningService):
+    """
+    Signing decorator that encrypts the signed artifact for the
+    environments that have a master key (encrypt-after-sign).
+    """
+
+    def __init__(
+        self,
+        inner: ISigningService,
+        file_repo: IFileRepository,
+        keys: Dict[str, bytes],
+        algorithm: str = "aes-256-gcm",
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+        workers: int = 1,
+    ):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown encryption algorithm '{algorithm}', expected one of {tuple(ALGORITHMS)}")
+
+        self.inner = inner
+        self.file_repo = file_repo
+        self.keys = keys
+        self.algorithm = algorithm
+        self.segment_size = segment_size
+        self.workers = workers
+
+    @property
+    def key_id(self) -> str:
+        return self.inner.key_id
+
+    def algorithm_for(self, environment: Optional[str]) -> str:
+        return self.inner.algorithm_for(environment)
+
+    def content_digest(self, binary: BinaryFile) -> str:
+        return self.inner.content_digest(binary)
+
+    def artifact_paths(self, binary: BinaryFile) -> List[str]:
+        paths = self.inner.artifact_paths(binary)
+        if (binary.environment or "") in self.keys:
+            paths.append(self.file_repo.path_for(f"encrypted_{binary.id}", signed=True))
+        return paths
+
+    def sign_file(self, binary: BinaryFile) -> Tuple[str, str]:
+        signature, signed_path = self.inner.sign_file(binary)
+
+        master_key = self.keys.get(binary.environment or "")
+        if master_key is None or not signed_path:
+            return signature, signed_path
+
+        key_id = key_id_for(master_key)
+        with self.file_repo.open_read(signed_path) as source:
+            reader = EncryptingReader(source, master_key, key_id, self.algorithm, self.segment_size, self.workers)
+            encrypted_path = self.file_repo.save(reader, f"encrypted_{binary.id}", signed=True)
+
+        # Un ambiente confidencial nunca se publica solo en claro
+        if not encrypted_path:
+            raise RuntimeError(f"Could not encrypt signed artifact of {binary.id}")
+
+        binary.encrypted_path = encrypted_path
+        binary.encrypted_size = reader.bytes_out
+        binary.encryption_key_id = key_id
+        return signature, signed_path
+
+
+def load_environment_keys(path_template: str, environments) -> Dict[str, bytes]:
+    """
+    {environment: master key} for each environment, reading
+    `path_template.format(environment=...)`. A missing key is an error:
+    the environment was configured to ship encrypted.
+    """
+    return {env: load_key(path_template.format(environment=env)) for env in environments}
+
+
+__all__ = [
+    "ALGORITHMS",
+    "DEFAULT_SEGMENT_SIZE",
+    "EncryptingReader",
+    "EncryptingSigningService",
+    "StreamHeader",
+    "decrypt_segment",
+    "decrypt_stream",
+    "generate_key",
+    "key_id_for",
+    "load_environment_keys",
+    "load_key",
+]
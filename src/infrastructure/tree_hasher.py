@@ -0,0 +1,228 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: tree_hasher.py
+# ============================================================
+# Descripción:
+# Calcula un hash en árbol (Merkle) sobre bloques de tamaño fijo
+# de un archivo. Cada bloque se hashea en un proceso distinto a
+# partir de una vista mmap, aprovechando todos los núcleos para
+# imágenes de varios GB. Los hashes por bloque permiten que un
+# dispositivo verifique y reanude descargas bloque por bloque.
+#
+# Formato (H = algoritmo configurado, SHA-256 por defecto):
+#   hoja  = H(0x00 || bloque)
+#   nodo  = H(0x01 || izquierdo || derecho)
+#   Si un nivel tiene un número impar de nodos, el último sube
+#   sin cambios al siguiente nivel.
+#
+# Un dispositivo verifica un bloque con su ruta de prueba (los
+# hermanos desde la hoja hasta la raíz, merkle_proof) y la raíz
+# firmada, sin descargar la lista completa de hashes.
+#
+# El pool de procesos es uno por proceso y se reutiliza entre firmas
+# (crearlo cuesta más que hashear una imagen pequeña).
+# ============================================================
+
+import os
+import mmap
+import atexit
+import threading
+from typing import Any, List, Optional, Tuple
+from src.common.hashing import DEFAULT_HASH_ALGORITHM, check_algorithm, new_hash
+
+
+# Tamaño de bloque por defecto (4 MiB, múltiplo de la granularidad de mmap)
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+# Pool compartido: (pid que lo creó, procesos, executor)
+_POOL: Optional[Tuple[int, int, Any]] = None
+_POOL_LOCK = threading.Lock()
+
+
+def check_block_size(block_size: int) -> int:
+    """
+    Validates a tree-mode block size (mmap offsets must be aligned).
+    Raises ValueError otherwise.
+    """
+    if not isinstance(block_size, int) or block_size <= 0 or block_size % mmap.ALLOCATIONGRANULARITY:
+        raise ValueError(
+            f"Invalid block size {block_size!r}: must be a positive multiple of {mmap.ALLOCATIONGRANULARITY}"
+        )
+    return block_size
+
+
+def _shared_pool(workers: int):
+    """
+    Process pool reused across signings. It is rebuilt after a fork
+    (server workers), when more workers are requested, or when a worker
+    died and left it broken.
+    """
+    global _POOL
+    # multiprocessing solo se importa cuando realmente se usa
+    from concurrent.futures import ProcessPoolExecutor
+
+    with _POOL_LOCK:
+        if _POOL is not None:
+            pid, size, pool = _POOL
+            if pid == os.getpid() and size >= workers and not getattr(pool, "_broken", False):
+                return pool
+            if pid == os.getpid():
+                pool.shutdown(wait=False)
+
+        pool = ProcessPoolExecutor(max_workers=workers)
+        _POOL = (os.getpid(), workers, pool)
+        return pool
+
+
+@atexit.register
+def _shutdown_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None and _POOL[0] == os.getpid():
+            _POOL[2].shutdown(wait=True)
+        _POOL = None
+
+
+def _hash_block(task: Tuple[str, int, int, str]) -> str:
+    """
+    Worker: hashea un bloque del archivo a través de una vista mmap.
+    """
+    path, offset, length, algorithm = task
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ, offset=offset) as view:
+            leaf = new_hash(algorithm, LEAF_PREFIX)
+            leaf.update(view)
+            return leaf.hexdigest()
+
+
+def hash_leaf(block: bytes, algorithm: str = DEFAULT_HASH_ALGORITHM) -> str:
+    """Hash de hoja de un bloque ya en memoria (lado del dispositivo)."""
+    return new_hash(algorithm, LEAF_PREFIX + block).hexdigest()
+
+
+def _parents(level: List[bytes], algorithm: str) -> List[bytes]:
+    parents = [
+        new_hash(algorithm, NODE_PREFIX + level[i] + level[i + 1]).digest()
+        for i in range(0, len(level) - 1, 2)
+    ]
+    if len(level) % 2:
+        parents.append(level[-1])
+    return parents
+
+
+def merkle_root(block_hashes: List[str], algorithm: str = DEFAULT_HASH_ALGORITHM) -> str:
+    """
+    Calcula la raíz del árbol a partir de los hashes de hoja.
+    """
+    level = [bytes.fromhex(h) for h in block_hashes] or [new_hash(algorithm, LEAF_PREFIX).digest()]
+
+    while len(level) > 1:
+        level = _parents(level, algorithm)
+
+    return level[0].hex()
+
+
+def merkle_proof(block_hashes: List[str], index: int, algorithm: str = DEFAULT_HASH_ALGORITHM) -> List[str]:
+    """
+    Ruta de prueba del bloque `index`: el hermano de cada nivel, de la
+    hoja a la raíz. Los niveles donde el nodo sube sin hermano no
+    aportan nada (el dispositivo lo deduce de `leaf_count`).
+    """
+    if not 0 <= index < len(block_hashes):
+        raise IndexError(f"Block {index} out of range (0..{len(block_hashes) - 1})")
+
+    level = [bytes.fromhex(h) for h in block_hashes]
+    proof = []
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(level[sibling].hex())
+        level = _parents(level, algorithm)
+        index //= 2
+    return proof
+
+
+def verify_block(
+    block: bytes,
+    index: int,
+    proof: List[str],
+    root: str,
+    leaf_count: int,
+    algorithm: str = DEFAULT_HASH_ALGORITHM,
+) -> bool:
+    """
+    Verifica un bloque descargado con su ruta de prueba contra la raíz
+    firmada (lado del dispositivo).
+    """
+    if not 0 <= index < leaf_count:
+        return False
+
+    try:
+        node = bytes.fromhex(hash_leaf(block, algorithm))
+        siblings = iter(bytes.fromhex(h) for h in proof)
+        width = leaf_count
+        while width > 1:
+            if index ^ 1 < width:
+                sibling = next(siblings)
+                pair = node + sibling if index % 2 == 0 else sibling + node
+                node = new_hash(algorithm, NODE_PREFIX + pair).digest()
+            index //= 2
+            width = (width + 1) // 2
+    except (StopIteration, ValueError):
+        return False
+
+    # Una ruta con hashes de sobra tampoco es válida
+    return next(siblings, None) is None and node.hex() == root
+
+
+class TreeHasher:
+    """
+    Splits a file into fixed-size blocks and hashes them in a process pool.
+    """
+
+    def __init__(
+        self,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        max_workers: Optional[int] = None,
+        algorithm: str = DEFAULT_HASH_ALGORITHM,
+    ):
+        self.block_size = check_block_size(block_size)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.algorithm = check_algorithm(algorithm)
+
+    def hash_file(self, file_path: str) -> Tuple[str, List[str]]:
+        """
+        Returns:
+            tuple[str, list[str]]: (merkle_root_hex, block_hashes_hex)
+        """
+        size = os.path.getsize(file_path)
+        tasks = [
+            (file_path, offset, min(self.block_size, size - offset), self.algorithm)
+            for offset in range(0, size, self.block_size)
+        ]
+
+        # Con un solo bloque (o un solo núcleo) el pool solo agrega costo
+        if len(tasks) <= 1 or self.max_workers == 1:
+            block_hashes = [_hash_block(task) for task in tasks]
+        else:
+            workers = min(self.max_workers, len(tasks))
+            chunksize = max(1, len(tasks) // (workers * 4))
+            pool = _shared_pool(self.max_workers)
+            block_hashes = list(pool.map(_hash_block, tasks, chunksize=chunksize))
+
+        return merkle_root(block_hashes, self.algorithm), block_hashes
+
+    def hash_stream(self, stream) -> Tuple[str, List[str]]:
+        """
+        Same result as hash_file() for data that is not a plain local
+        file (e.g. a compressed blob): blocks are hashed sequentially.
+        """
+        block_hashes = [hash_leaf(block, self.algorithm) for block in iter(lambda: stream.read(self.block_size), b"")]
+        return merkle_root(block_hashes, self.algorithm), block_hashes
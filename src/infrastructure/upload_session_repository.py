@@ -0,0 +1,342 @@
+# ============================================================
+# Politécnica de Santa Rosa
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Alumna: Veronica Vicente Gaona
+# Archivo: upload_session_repository.py
+# ============================================================
+# Descripción:
+# Implementa las sesiones de carga por partes (reanudables).
+# Cada bloque recibido se escribe directamente en un archivo
+# parcial en disco y se agrega a un hash incremental (el
+# algoritmo de firma del ambiente, SHA-256 por defecto),
+# de modo que al finalizar el digest ya está calculado y no es
+# necesario volver a leer la imagen completa para firmarla.
+#
+# Con varios workers (src/app/server.py) los bloques de una misma
+# carga pueden llegar a procesos distintos: cada operación toma un
+# flock sobre el .part y el hash en memoria solo se reutiliza si
+# cubre exactamente los bytes que hay en disco.
+#
+# Al finalizar, la sesión se marca "finalizing" con el candado tomado:
+# desde ese momento write_chunk rechaza bloques, así el .part que se
+# incorpora es exactamente el que produjo el digest. Las sesiones
+# abandonadas se borran con expire_sessions (maintenance gc).
+# ============================================================
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from uuid import uuid4
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from src.application.ports import IUploadSessionRepository
+from src.infrastructure.atomic import atomic_open
+from src.common.hashing import DEFAULT_HASH_ALGORITHM, check_algorithm, new_hash
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo se serializa dentro del proceso
+    fcntl = None
+
+
+# Tamaño de lectura del stream de entrada (1 MiB)
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadSessionRepository(IUploadSessionRepository):
+    """
+    Stores resumable upload sessions under data/uploads/.
+
+    The offset of a session is always the size of its .part file, so a
+    client can resume after a dropped connection (or a server restart)
+    by asking for the current offset and sending the remaining bytes.
+    Each session has its own lock: chunks of different images can be
+    written in parallel.
+    """
+
+    def __init__(self, base_path: str = "data"):
+        self.uploads_dir = os.path.join(base_path, "uploads")
+        # upload_id -> (hash incremental, bytes que ya incluye)
+        self._hashers: Dict[str, Tuple[Any, int]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+        self.__ensure_directories()
+
+    def __ensure_directories(self):
+        os.makedirs(self.uploads_dir, exist_ok=True)
+
+    # --- Helpers ---------------------------------------------
+
+    def __meta_path(self, upload_id: str) -> str:
+        return os.path.join(self.uploads_dir, f"{upload_id}.json")
+
+    def __part_path(self, upload_id: str) -> str:
+        return os.path.join(self.uploads_dir, f"{upload_id}.part")
+
+    def __lock_for(self, upload_id: str) -> threading.Lock:
+        with self._registry_lock:
+            return self._locks.setdefault(upload_id, threading.Lock())
+
+    @contextmanager
+    def __locked(self, upload_id: str) -> Iterator[None]:
+        # Candado del hilo y, entre procesos, flock sobre el archivo parcial
+        with self.__lock_for(upload_id):
+            if fcntl is None or os.path.basename(upload_id) != upload_id:
+                yield
+                return
+            try:
+                part = open(self.__part_path(upload_id), "rb")
+            except OSError:
+                # Sesión inexistente o ya finalizada: el llamador lo detecta
+                yield
+                return
+            with part:
+                fcntl.flock(part, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(part, fcntl.LOCK_UN)
+
+    def __read_session(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        # Evita rutas fuera del directorio de cargas
+        if os.path.basename(upload_id) != upload_id:
+            return None
+
+        try:
+            with open(self.__meta_path(upload_id), "r") as meta:
+                return json.load(meta)
+        except (OSError, ValueError):
+            return None
+
+    def __hasher_for(self, upload_id: str, size: int, algorithm: str):
+        """
+        Returns the running hash of the session. After a restart, or when
+        another worker appended chunks, the state no longer matches the
+        partial file, so it is rebuilt once from disk.
+        """
+        hasher, hashed = self._hashers.get(upload_id, (None, -1))
+        if hasher is None or hashed != size:
+            hasher = new_hash(algorithm)
+            with open(self.__part_path(upload_id), "rb") as part:
+                for chunk in iter(lambda: part.read(CHUNK_SIZE), b""):
+                    hasher.update(chunk)
+        self._hashers[upload_id] = (hasher, size)
+        return hasher
+
+    # --- Sessions --------------------------------------------
+
+    def create_session(
+        self,
+        filename: str,
+        environment: str,
+        total_size: Optional[int] = None,
+        hash_algorithm: str = DEFAULT_HASH_ALGORITHM,
+        max_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        upload_id = str(uuid4())
+        session = {
+            "upload_id": upload_id,
+            "filename": filename,
+            "environment": environment,
+            "total_size": total_size,
+            "max_size": max_size or None,
+            "hash_algorithm": check_algorithm(hash_algorithm),
+            "created_at": datetime.now().isoformat(),
+        }
+
+        open(self.__part_path(upload_id), "wb").close()
+        with open(self.__meta_path(upload_id), "w") as meta:
+            json.dump(session, meta, indent=4)
+
+        self._hashers[upload_id] = (new_hash(hash_algorithm), 0)
+        return {**session, "offset": 0}
+
+    def get_session(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        session = self.__read_session(upload_id)
+        if session is None:
+            return None
+
+        session["offset"] = os.path.getsize(self.__part_path(upload_id))
+        return session
+
+    def write_chunk(self, upload_id: str, offset: int, stream: Any) -> Optional[Dict[str, Any]]:
+        if offset < 0:
+            raise ValueError(f"Negative upload offset: {offset}")
+
+        with self.__locked(upload_id):
+            session = self.__read_session(upload_id)
+            if session is None:
+                return None
+
+            part_path = self.__part_path(upload_id)
+            try:
+                current = os.path.getsize(part_path)
+            except OSError:
+                # Finalizada por otra petición mientras se esperaba el candado
+                return None
+
+            # El estado se arma aquí, con el candado tomado: otro worker
+            # no puede mover el offset entre la lectura y la escritura
+            state = {**session, "offset": current, "accepted": offset <= current, "overflow": False}
+
+            # Hueco: el cliente debe reanudar desde el offset actual.
+            # Una sesión que se está finalizando ya no acepta bytes
+            if offset > current or session.get("finalizing"):
+                state["accepted"] = False
+                return state
+
+            hasher = self.__hasher_for(upload_id, current, session.get("hash_algorithm", DEFAULT_HASH_ALGORITHM))
+
+            # Reenvío de bytes ya recibidos: se descartan los repetidos
+            skip = current - offset
+            # Sin tamaño declarado, el límite del servidor acota el offset
+            limit = session.get("total_size")
+            if limit is None:
+                limit = session.get("max_size")
+
+            try:
+                with open(part_path, "ab") as part:
+                    for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                        if skip:
+                            if len(chunk) <= skip:
+                                skip -= len(chunk)
+                                continue
+                            chunk = chunk[skip:]
+                            skip = 0
+
+                        # Nada más allá del tamaño declarado o del límite
+                        if limit is not None and current + len(chunk) > limit:
+                            chunk = chunk[:max(0, limit - current)]
+                            state["overflow"] = True
+
+                        part.write(chunk)
+                        hasher.update(chunk)
+                        current += len(chunk)
+                        if state["overflow"]:
+                            break
+            except Exception as e:
+                # Conexión caída a medio bloque: el hash se reconstruye
+                # desde disco en el siguiente intento
+                print(f"[UploadSessionRepository] Chunk interrupted for {upload_id}: {e}")
+                self._hashers.pop(upload_id, None)
+                state["offset"] = os.path.getsize(part_path)
+                return state
+
+            self._hashers[upload_id] = (hasher, current)
+            state["offset"] = current
+            return state
+
+    def finalize(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        with self.__locked(upload_id):
+            session = self.__read_session(upload_id)
+            if session is None:
+                return None
+
+            part_path = self.__part_path(upload_id)
+            try:
+                size = os.path.getsize(part_path)
+            except OSError:
+                # Ya se incorporó (el proceso murió antes de complete)
+                return None
+
+            if session.get("total_size") is not None and size != session["total_size"]:
+                print(f"[UploadSessionRepository] Incomplete upload {upload_id}: {size}/{session['total_size']} bytes")
+                return None
+
+            algorithm = session.setdefault("hash_algorithm", DEFAULT_HASH_ALGORITHM)
+            digest = self.__hasher_for(upload_id, size, algorithm).hexdigest()
+
+            # Se marca antes de soltar el candado: un PUT que llegue
+            # mientras se incorpora el .part ya no puede agregarle bytes
+            if not session.get("finalizing"):
+                session["finalizing"] = True
+                with atomic_open(self.__meta_path(upload_id), "w") as meta:
+                    json.dump(session, meta, indent=4)
+
+        # El .part y los metadatos se quedan hasta complete(): si la
+        # incorporación falla, la finalización se puede reintentar
+        return {**session, "offset": size, "size": size, "digest": digest, "part_path": part_path}
+
+    def complete(self, upload_id: str) -> None:
+        with self.__locked(upload_id):
+            for path in (self.__meta_path(upload_id), self.__part_path(upload_id)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    # import_file ya movió el .part
+                    pass
+                except OSError as e:
+                    print(f"[UploadSessionRepository] Error removing {path}: {e}")
+
+            self._hashers.pop(upload_id, None)
+
+        with self._registry_lock:
+            self._locks.pop(upload_id, None)
+
+    def abort(self, upload_id: str) -> bool:
+        with self.__locked(upload_id):
+            if self.__read_session(upload_id) is None:
+                return False
+
+            for path in (self.__meta_path(upload_id), self.__part_path(upload_id)):
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    print(f"[UploadSessionRepository] Error removing {path}: {e}")
+
+            self._hashers.pop(upload_id, None)
+
+        with self._registry_lock:
+            self._locks.pop(upload_id, None)
+
+        return True
+
+    def expire_sessions(self, max_age_seconds: float, dry_run: bool = False) -> List[Dict[str, Any]]:
+        cutoff = time.time() - max_age_seconds
+        sessions: Dict[str, Dict[str, Any]] = {}
+        for name in os.listdir(self.uploads_dir):
+            upload_id, ext = os.path.splitext(name)
+            if ext not in (".json", ".part"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.uploads_dir, name))
+            except OSError:
+                continue
+            entry = sessions.setdefault(upload_id, {"upload_id": upload_id, "size": 0, "mtime": 0.0})
+            entry["size"] += stat.st_size
+            entry["mtime"] = max(entry["mtime"], stat.st_mtime)
+
+        expired = []
+        for upload_id, entry in sorted(sessions.items()):
+            if entry["mtime"] >= cutoff:
+                continue
+            if not dry_run and not self.__expire(upload_id, cutoff):
+                continue
+            expired.append({"upload_id": upload_id, "size": entry["size"]})
+        return expired
+
+    def __expire(self, upload_id: str, cutoff: float) -> bool:
+        paths = (self.__meta_path(upload_id), self.__part_path(upload_id))
+        with self.__locked(upload_id):
+            # Un bloque pudo llegar mientras se recorría el directorio
+            if any(os.path.exists(p) and os.path.getmtime(p) >= cutoff for p in paths):
+                return False
+            for path in paths:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"[UploadSessionRepository] Error removing {path}: {e}")
+                    return False
+
+            self._hashers.pop(upload_id, None)
+
+        with self._registry_lock:
+            self._locks.pop(upload_id, None)
+
+        return True
@@ -8,7 +8,6 @@
 # Archivo: main.py.
 # Descripción: Archivo principal del proyecto.
 # ============================================================
-from cryptography.fernet import Fernet
 from flask import Flask, render_template
 from common.vars import TEMPLATES_DIR, Hosts
 
@@ -18,6 +17,8 @@ app =  Flask(__name__)
 
 @app.route("/")
 def home():
+    # cryptography se importa en la primera petición, no al arrancar
+    from cryptography.fernet import Fernet
 
     # Put this somewhere safe!
     key = Fernet.generate_key()
@@ -28,5 +29,5 @@ def home():
     return render_template("home.html", token=token, message=message)
 if __name__== "__main__":
     host, port = Hosts().main
-app.run(host=host, port=port)
+    app.run(host=host, port=port)
     
\ No newline at end of file
@@ -0,0 +1,100 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_admission.py
+# Descripción: Pruebas del límite por cliente (cubeta de tokens) y
+# del semáforo de firma ponderado por tamaño de archivo.
+# ============================================================
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.common.admission import TokenBucketLimiter, WeightedSemaphore
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_burst_then_retry_after(self):
+        clock = FakeClock()
+        limiter = TokenBucketLimiter(rate=1.0, burst=3, clock=clock)
+
+        self.assertEqual([limiter.acquire("a") for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(limiter.acquire("a"), 1.0)
+
+        # Otro cliente tiene su propia cubeta
+        self.assertEqual(limiter.acquire("b"), 0.0)
+
+        clock.now = 1.0
+        self.assertEqual(limiter.acquire("a"), 0.0)
+        self.assertEqual(limiter.rejected, 1)
+
+
+class TestWeightedSemaphore(unittest.TestCase):
+
+    def test_rejects_when_bytes_exceed_capacity(self):
+        sem = WeightedSemaphore(100)
+
+        with sem.slot(70, timeout=0) as first:
+            self.assertTrue(first)
+            with sem.slot(40, timeout=0) as second:
+                self.assertFalse(second)
+            with sem.slot(30, timeout=0) as third:
+                self.assertTrue(third)
+
+        self.assertEqual(sem.stats()["in_use"], 0)
+        self.assertEqual(sem.stats()["rejected"], 1)
+
+    def test_file_larger_than_capacity_runs_alone(self):
+        sem = WeightedSemaphore(100)
+
+        with sem.slot(10_000, timeout=0) as admitted:
+            self.assertTrue(admitted)
+            self.assertFalse(sem.acquire(1, timeout=0))
+
+
+class TestClientAddress(unittest.TestCase):
+
+    def client(self, proxies):
+        from src.app.main import create_app
+        from src.config import settings
+
+        # El limitador se construye en la primera petición (Lazy)
+        patcher = mock.patch.multiple(
+            settings, TRUSTED_PROXY_COUNT=proxies, RATE_LIMIT_PER_MINUTE=1, RATE_LIMIT_BURST=1, WORKERS=1,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return create_app(background_jobs=False).test_client()
+
+    def post(self, client, forwarded_for):
+        return client.post("/upload", headers={"X-Forwarded-For": forwarded_for}).status_code
+
+    def test_clients_behind_a_trusted_proxy_get_their_own_bucket(self):
+        client = self.client(proxies=1)
+        self.assertEqual(self.post(client, "10.0.0.1"), 400)
+        self.assertEqual(self.post(client, "10.0.0.2"), 400)
+        self.assertEqual(self.post(client, "10.0.0.1"), 429)
+
+    def test_forwarded_header_is_ignored_without_trusted_proxies(self):
+        client = self.client(proxies=0)
+        self.assertEqual(self.post(client, "10.0.0.1"), 400)
+        self.assertEqual(self.post(client, "10.0.0.2"), 429)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_archive.py
+# Descripción: Pruebas del archivado de registros antiguos en
+# particiones comprimidas y de su consulta en solo lectura.
+# ============================================================
+import os
+import sys
+import tempfile
+import subprocess
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.application.use_cases import ArchiveRecordsUseCase
+from src.domain.models import BinaryFile
+from src.infrastructure.archive_repository import ArchiveRepository
+from src.infrastructure.json_repository import JsonRepository
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+HOLD_LOCK = """
+import sys
+from src.infrastructure.archive_repository import ArchiveRepository
+with ArchiveRepository(sys.argv[1]).exclusive():
+    print("locked", flush=True)
+    sys.stdin.read()
+"""
+
+
+def record(file_id, status, days_old, filename="fw.bin"):
+    uploaded_at = (datetime.now() - timedelta(days=days_old)).isoformat()
+    return BinaryFile(id=file_id, filename=filename, environment="prod", status=status, uploaded_at=uploaded_at)
+
+
+class TestArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.json_repo = JsonRepository(os.path.join(self.tmp.name, "database.json"))
+        self.archive = ArchiveRepository(os.path.join(self.tmp.name, "archive"))
+        self.use_case = ArchiveRecordsUseCase(self.json_repo, self.archive)
+
+        for r in (
+            record("old-signed", "signed", 200),
+            record("latest-signed", "signed", 150),
+            record("old-rejected", "rejected", 120),
+            record("old-pending", "pending", 300),
+            record("new-rejected", "rejected", 1),
+        ):
+            self.json_repo.add_record(r.to_dict())
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_moves_old_terminal_records_to_archive(self):
+        archived = self.use_case.execute(90)
+
+        self.assertEqual(sorted(archived), ["old-rejected", "old-signed"])
+        hot = sorted(r.id for r in self.json_repo.list_records())
+        self.assertEqual(hot, ["latest-signed", "new-rejected", "old-pending"])
+
+        self.assertEqual(self.archive.get_record("old-signed").status, "signed")
+        self.assertEqual(sorted(r.id for r in self.archive.list_records()), ["old-rejected", "old-signed"])
+
+    def test_rerun_after_interrupted_archive_does_not_duplicate(self):
+        self.archive.append_records([self.json_repo.get_record("old-signed")])
+        self.use_case.execute(90)
+
+        self.assertEqual(len(self.archive.list_records()), 2)
+
+    def test_archive_is_read_only(self):
+        self.use_case.execute(90)
+        self.assertFalse(self.archive.delete_record("old-signed"))
+        self.assertIsNotNone(self.archive.get_record("old-signed"))
+
+    def test_only_one_process_archives_at_a_time(self):
+        # Otro proceso toma el candado y lo suelta al cerrar su stdin
+        holder = subprocess.Popen(
+            [sys.executable, "-c", HOLD_LOCK, os.path.join(self.tmp.name, "archive")],
+            cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        try:
+            self.assertEqual(holder.stdout.readline().strip(), "locked")
+            with self.archive.exclusive(blocking=False) as acquired:
+                self.assertFalse(acquired)
+        finally:
+            holder.communicate("")
+
+        with self.archive.exclusive(blocking=False) as acquired:
+            self.assertTrue(acquired)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_audit_log.py
+# Descripción: Pruebas de la bitácora de cambios de estado escrita
+# por lotes en segundo plano, su rotación y su consulta.
+# ============================================================
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.application.use_cases import UploadBinaryUseCase, ApproveBinaryUseCase, RejectBinaryUseCase
+from src.infrastructure.audit_log import BufferedAuditLog, read_events, rotated_files
+from src.infrastructure.crypto_adapter import CryptoAdapter
+from src.infrastructure.file_repository import FileRepository
+from src.infrastructure.json_repository import JsonRepository
+
+
+class NamedBytes(io.BytesIO):
+    filename = "fw.bin"
+
+
+class TestAuditLog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base = self.tmp.name
+        self.audit_dir = os.path.join(base, "audit")
+        self.audit = BufferedAuditLog(self.audit_dir, flush_interval=0.01)
+        self.file_repo = FileRepository(base)
+        self.json_repo = JsonRepository(os.path.join(base, "database.json"))
+        self.crypto = CryptoAdapter(self.file_repo)
+
+    def tearDown(self):
+        self.audit.close()
+        self.tmp.cleanup()
+
+    def upload(self, data, environment="dev"):
+        use_case = UploadBinaryUseCase(self.file_repo, self.json_repo, self.crypto, audit_log=self.audit)
+        return use_case.execute(NamedBytes(data), environment, actor="api@test")
+
+    def test_transitions_are_logged_with_actor_and_timing(self):
+        approved = self.upload(b"one")
+        rejected = self.upload(b"two")
+
+        ApproveBinaryUseCase(self.json_repo, self.crypto, audit_log=self.audit).execute(approved.id, "panel@test")
+        RejectBinaryUseCase(self.json_repo, audit_log=self.audit).execute(rejected.id, "email@test")
+        self.audit.flush()
+
+        steps = [(e["old_status"], e["new_status"], e["actor"]) for e in read_events(self.audit_dir, approved.id)]
+        self.assertEqual(steps, [
+            (None, "pending", "api@test"),
+            ("pending", "approved", "panel@test"),
+            ("approved", "signed", "panel@test"),
+        ])
+
+        signed = next(read_events(self.audit_dir, status="signed"))
+        self.assertIn("duration_ms", signed)
+        self.assertIsNotNone(signed["digest"])
+
+        self.assertEqual([e["file_id"] for e in read_events(self.audit_dir, actor="email@test")], [rejected.id])
+
+    def test_rotation_keeps_every_event(self):
+        self.audit.close()
+        self.audit = BufferedAuditLog(self.audit_dir, flush_interval=0.01, max_batch=10, max_bytes=500)
+
+        for i in range(50):
+            self.audit.record({"ts": f"2025-01-01T00:00:{i:02d}", "file_id": str(i)})
+        self.audit.flush()
+
+        self.assertGreater(len(rotated_files(self.audit_dir)), 1)
+        self.assertEqual([e["file_id"] for e in read_events(self.audit_dir)], [str(i) for i in range(50)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_bulk_sign.py
+# Descripción: Prueba de la firma masiva desde la línea de comandos
+# (pool de procesos, registro en lote y resumen de rendimiento).
+# ============================================================
+import os
+import sys
+import json
+import tempfile
+import unittest
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+class TestBulkSign(unittest.TestCase):
+
+    def test_directory_is_signed_and_registered_in_one_batch(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            images = os.path.join(tmp, "release")
+            os.makedirs(images)
+            for i in range(6):
+                with open(os.path.join(images, f"fw-{i}.bin"), "wb") as f:
+                    f.write(os.urandom(4096 + i))
+            # Los dotfiles (metadatos del sistema) no son imágenes
+            open(os.path.join(images, ".DS_Store"), "wb").close()
+
+            env = {**os.environ, "PYTHONPATH": ROOT, "DATA_DIR": os.path.join(tmp, "data")}
+            result = subprocess.run(
+                [sys.executable, "-m", "src.app.maintenance", "bulk-sign", images,
+                 "--environment", "prod", "--workers", "2", "--json"],
+                cwd=tmp, env=env, capture_output=True, text=True, check=True,
+            )
+            summary = json.loads(result.stdout[result.stdout.index("{"):])
+
+            self.assertEqual(summary["signed"], 6)
+            self.assertEqual(summary["failed"], [])
+            self.assertGreater(summary["mib_per_second"], 0)
+
+            with open(os.path.join(tmp, "data", "database.json")) as f:
+                records = json.load(f)["records"]
+            self.assertEqual(sorted(r["filename"] for r in records), [f"fw-{i}.bin" for i in range(6)])
+            self.assertTrue(all(r["status"] == "signed" and r["signature"] for r in records))
+
+            with open(os.path.join(tmp, "data", "releases.json")) as f:
+                self.assertEqual(len(json.load(f)["releases"]), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
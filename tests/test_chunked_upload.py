@@ -0,0 +1,175 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_chunked_upload.py
+# Descripción: Pruebas de la carga por partes reanudable, de la firma
+# reutilizando el digest calculado durante la carga, de los límites de
+# tamaño y formato y de la expiración de sesiones abandonadas.
+# ============================================================
+import io
+import os
+import sys
+import time
+import hashlib
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.application.use_cases import (
+    StartChunkedUploadUseCase,
+    UploadChunkUseCase,
+    FinalizeChunkedUploadUseCase,
+)
+from src.common.ingest import PayloadTooLarge, UnsupportedFormat
+from src.infrastructure.crypto_adapter import CryptoAdapter
+from src.infrastructure.file_repository import FileRepository
+from src.infrastructure.json_repository import JsonRepository
+from src.infrastructure.upload_session_repository import UploadSessionRepository
+
+
+class TestChunkedUpload(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base = self.tmp.name
+        self.upload_repo = UploadSessionRepository(base)
+        self.file_repo = FileRepository(base)
+        self.json_repo = JsonRepository(os.path.join(base, "database.json"))
+        self.crypto = CryptoAdapter(self.file_repo)
+        self.data = os.urandom(3 * 1024 * 1024 + 17)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _put(self, upload_id, offset, payload):
+        return UploadChunkUseCase(self.upload_repo).execute(upload_id, offset, io.BytesIO(payload))
+
+    def _finalize(self, upload_id, **options):
+        use_case = FinalizeChunkedUploadUseCase(self.upload_repo, self.file_repo, self.json_repo, self.crypto, **options)
+        return use_case.execute(upload_id)
+
+    def test_resume_after_gap_and_retransmission(self):
+        session = StartChunkedUploadUseCase(self.upload_repo).execute("fw.bin", "prod", len(self.data))
+        upload_id = session["upload_id"]
+
+        self.assertTrue(self._put(upload_id, 0, self.data[:1000])["accepted"])
+
+        # Un hueco se rechaza y devuelve el offset desde el cual reanudar
+        gap = self._put(upload_id, 5000, self.data[5000:6000])
+        self.assertFalse(gap["accepted"])
+        self.assertEqual(gap["offset"], 1000)
+
+        # Reenvío parcialmente repetido: solo se agregan los bytes nuevos
+        self.assertEqual(self._put(upload_id, 500, self.data[500:2000])["offset"], 2000)
+
+        # Un repositorio nuevo (reinicio) reconstruye el hash desde disco
+        self.upload_repo = UploadSessionRepository(self.tmp.name)
+        self.assertEqual(self.upload_repo.get_session(upload_id)["offset"], 2000)
+        self.assertEqual(self._put(upload_id, 2000, self.data[2000:])["offset"], len(self.data))
+
+        binary = self._finalize(upload_id)
+        expected = hashlib.sha256(self.data).hexdigest()
+
+        self.assertEqual(binary.digest, expected)
+        self.assertEqual(binary.status, "signed")
+        self.assertEqual(binary.signature, expected)
+
+        with open(binary.signed_path, "rb") as f:
+            self.assertEqual(f.read(), self.data + b"\n\n# SIGNATURE: " + expected.encode("utf-8"))
+
+    def test_finalize_rejects_incomplete_upload(self):
+        session = StartChunkedUploadUseCase(self.upload_repo).execute("fw.bin", "dev", len(self.data))
+        self._put(session["upload_id"], 0, self.data[:10])
+
+        self.assertIsNone(self._finalize(session["upload_id"]))
+        self.assertIsNotNone(self.upload_repo.get_session(session["upload_id"]))
+
+    def test_writes_stop_at_total_size_and_negative_offsets_fail(self):
+        session = StartChunkedUploadUseCase(self.upload_repo).execute("fw.bin", "dev", 100)
+        upload_id = session["upload_id"]
+
+        result = self._put(upload_id, 0, self.data[:150])
+        self.assertTrue(result["overflow"])
+        self.assertEqual(result["offset"], 100)
+
+        with self.assertRaises(ValueError):
+            self._put(upload_id, -1, b"x")
+
+    def test_failed_import_keeps_the_session_for_a_retry(self):
+        session = StartChunkedUploadUseCase(self.upload_repo).execute("fw.bin", "prod", len(self.data))
+        upload_id = session["upload_id"]
+        self._put(upload_id, 0, self.data)
+
+        import_file = self.file_repo.import_file
+        self.file_repo.import_file = lambda source, file_id: ""
+        self.assertIsNone(self._finalize(upload_id))
+        self.assertEqual(self.upload_repo.get_session(upload_id)["offset"], len(self.data))
+
+        self.file_repo.import_file = import_file
+        self.assertEqual(self._finalize(upload_id).status, "signed")
+        self.assertIsNone(self.upload_repo.get_session(upload_id))
+
+    def test_no_chunks_are_written_while_finalizing(self):
+        upload_id = StartChunkedUploadUseCase(self.upload_repo).execute("fw.bin", "prod")["upload_id"]
+        self._put(upload_id, 0, self.data)
+
+        # Sin total_size: un PUT entre el digest y la incorporación
+        # agregaría bytes que la firma no cubre
+        import_file = self.file_repo.import_file
+
+        def late_put(source, file_id):
+            late = self._put(upload_id, len(self.data), b"extra")
+            self.assertFalse(late["accepted"])
+            self.assertTrue(late["finalizing"])
+            return import_file(source, file_id)
+
+        self.file_repo.import_file = late_put
+        binary = self._finalize(upload_id)
+
+        self.assertEqual(binary.digest, hashlib.sha256(self.data).hexdigest())
+        with open(binary.file_path, "rb") as f:
+            self.assertEqual(f.read(), self.data)
+
+    def test_server_limit_caps_uploads_without_total_size(self):
+        with self.assertRaises(PayloadTooLarge):
+            StartChunkedUploadUseCase(self.upload_repo, max_size=100).execute("fw.bin", "dev", 101)
+
+        upload_id = StartChunkedUploadUseCase(self.upload_repo, max_size=100).execute("fw.bin", "dev")["upload_id"]
+        self._put(upload_id, 0, self.data[:60])
+        result = self._put(upload_id, 60, self.data[60:150])
+        self.assertTrue(result["overflow"])
+        self.assertEqual(result["offset"], 100)
+
+    def test_finalize_checks_magic_bytes(self):
+        upload_id = StartChunkedUploadUseCase(self.upload_repo).execute("fw.bin", "dev")["upload_id"]
+        self._put(upload_id, 0, b"MZ" + self.data[:100])
+
+        with self.assertRaises(UnsupportedFormat):
+            self._finalize(upload_id, magic_prefixes=[b"\x7fELF"])
+        self.assertIsNone(self.upload_repo.get_session(upload_id))
+        self.assertEqual(self.json_repo.list_records(), [])
+
+    def test_stale_sessions_expire(self):
+        stale = StartChunkedUploadUseCase(self.upload_repo).execute("fw.bin", "dev")["upload_id"]
+        self._put(stale, 0, self.data[:10])
+        active = StartChunkedUploadUseCase(self.upload_repo).execute("fw.bin", "dev")["upload_id"]
+
+        old = time.time() - 7200
+        for ext in (".json", ".part"):
+            os.utime(os.path.join(self.upload_repo.uploads_dir, stale + ext), (old, old))
+
+        report = self.upload_repo.expire_sessions(3600, dry_run=True)
+        self.assertEqual([e["upload_id"] for e in report], [stale])
+        self.assertIsNotNone(self.upload_repo.get_session(stale))
+
+        self.upload_repo.expire_sessions(3600)
+        self.assertIsNone(self.upload_repo.get_session(stale))
+        self.assertIsNotNone(self.upload_repo.get_session(active))
+
+
+if __name__ == '__main__':
+    unittest.main()
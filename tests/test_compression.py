@@ -0,0 +1,120 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_compression.py
+# Descripción: Pruebas del almacenamiento comprimido (ida y vuelta de
+# cada códec) y de la política de retención hacia el nivel frío.
+# ============================================================
+import os
+import sys
+import lzma
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.application.use_cases import ApplyRetentionPolicyUseCase
+from src.domain.models import BinaryFile
+from src.infrastructure.compression import parse_xz_preset
+from src.infrastructure.file_repository import FileRepository
+from src.infrastructure.json_repository import JsonRepository
+
+try:
+    import zstandard  # noqa: F401
+    CODECS = (None, "xz", "zst")
+except ImportError:
+    CODECS = (None, "xz")
+
+
+class TestCompressedStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        # Compresible, pero no trivial
+        self.data = b"".join(i.to_bytes(4, "big") * 64 for i in range(4096)) + os.urandom(1000)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_every_codec_round_trips(self):
+        for codec in CODECS:
+            with self.subTest(codec=codec):
+                repo = FileRepository(os.path.join(self.tmp.name, str(codec)), compression=codec)
+
+                path = repo.save(self.data, "fw")
+                with repo.open_read(path) as f:
+                    self.assertEqual(f.read(), self.data)
+
+                sizes = repo.get_sizes(path)
+                self.assertEqual(sizes["raw_size"], len(self.data))
+                if codec:
+                    self.assertLess(sizes["stored_size"], len(self.data))
+                    self.assertIsNone(repo.raw_path(path))
+
+                signed = repo.copy_to_signed(path, b"\n\n# SIGNATURE: abc")
+                with repo.open_read(signed) as f:
+                    self.assertEqual(f.read(), self.data + b"\n\n# SIGNATURE: abc")
+
+    def test_cold_preset_is_configurable(self):
+        self.assertEqual(parse_xz_preset("6"), 6)
+        self.assertEqual(parse_xz_preset("9e"), 9 | lzma.PRESET_EXTREME)
+        with self.assertRaises(ValueError):
+            parse_xz_preset("12")
+
+        repo = FileRepository(self.tmp.name, cold_preset=1)
+        cold = repo.move_to_cold(repo.save(self.data, "fw"))
+        self.assertTrue(cold.endswith(".xz"))
+        with repo.open_read(cold) as f:
+            self.assertEqual(f.read(), self.data)
+
+
+class TestRetentionPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.file_repo = FileRepository(self.tmp.name)
+        self.db = JsonRepository(os.path.join(self.tmp.name, "database.json"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def add(self, file_id, status, days_old, signed=False):
+        path = self.file_repo.save(file_id.encode() * 100, file_id)
+        self.db.add_record(BinaryFile(
+            id=file_id, filename="fw.bin", environment="prod", status=status,
+            uploaded_at=(datetime.now() - timedelta(days=days_old)).isoformat(),
+            file_path=path,
+            signed_path=self.file_repo.copy_to_signed(path, b"\n\n# SIGNATURE: x") if signed else None,
+        ).to_dict())
+
+    def test_old_rejected_and_superseded_artifacts_go_cold(self):
+        self.add("rejected-old", "rejected", 60)
+        self.add("rejected-new", "rejected", 1)
+        self.add("signed-v1", "signed", 90, signed=True)
+        self.add("signed-v2", "signed", 45, signed=True)
+        self.add("pending-old", "pending", 60)
+
+        use_case = ApplyRetentionPolicyUseCase(self.db, self.file_repo)
+        self.assertEqual(sorted(use_case.execute(30, dry_run=True)), ["rejected-old", "signed-v1"])
+        self.assertEqual(self.db.get_record("signed-v1").storage_tier, None)
+
+        self.assertEqual(sorted(use_case.execute(30)), ["rejected-old", "signed-v1"])
+
+        moved = self.db.get_record("signed-v1")
+        self.assertEqual(moved.storage_tier, "cold")
+        self.assertEqual(os.path.dirname(moved.signed_path), self.file_repo.cold_dir)
+        with self.file_repo.open_read(moved.signed_path) as f:
+            self.assertEqual(f.read(), b"signed-v1" * 100 + b"\n\n# SIGNATURE: x")
+
+        # La versión vigente y lo reciente se quedan donde estaban
+        self.assertIsNone(self.db.get_record("signed-v2").storage_tier)
+        self.assertIsNone(self.db.get_record("rejected-new").storage_tier)
+        self.assertEqual(use_case.execute(30), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_delta.py
+# Descripción: Pruebas de los deltas firmados entre versiones de un
+# mismo archivo y de su aplicación del lado del dispositivo.
+# ============================================================
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.application.use_cases import UploadBinaryUseCase
+from src.infrastructure.crypto_adapter import CryptoAdapter
+from src.infrastructure.delta_encoder import DeltaEncoder, apply_delta
+from src.infrastructure.file_repository import FileRepository
+from src.infrastructure.json_repository import JsonRepository
+from src.infrastructure.release_index import JsonReleaseIndex
+
+
+class NamedBytes(io.BytesIO):
+    filename = "fw.bin"
+
+
+class TestDelta(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base = self.tmp.name
+        self.file_repo = FileRepository(base)
+        self.json_repo = JsonRepository(os.path.join(base, "database.json"))
+        self.delta = DeltaEncoder(self.file_repo, os.path.join(base, "signed"))
+        self.use_case = UploadBinaryUseCase(
+            self.file_repo, self.json_repo, CryptoAdapter(self.file_repo), None, self.delta,
+            release_index=JsonReleaseIndex(os.path.join(base, "releases.json")),
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_second_release_gets_small_signed_delta(self):
+        v1 = os.urandom(256 * 1024)
+        v2 = v1[:100 * 1024] + b"patched!" * 512 + v1[104 * 1024:] + b"tail"
+
+        first = self.use_case.execute(NamedBytes(v1), "prod")
+        second = self.use_case.execute(NamedBytes(v2), "prod")
+
+        self.assertIsNone(first.delta_path)
+        self.assertEqual(second.delta_base_id, first.id)
+        self.assertLess(second.delta_size, len(v2) // 20)
+        self.assertEqual(self.json_repo.get_record(second.id).delta_signature, second.delta_signature)
+
+        # El dispositivo parte del artefacto firmado instalado y llega al nuevo
+        out = os.path.join(self.tmp.name, "rebuilt")
+        self.assertTrue(apply_delta(first.signed_path, second.delta_path, out))
+        with open(out, "rb") as f, open(second.signed_path, "rb") as signed:
+            self.assertEqual(f.read(), signed.read())
+        self.assertFalse(apply_delta(first.file_path, second.delta_path, out))
+
+    def test_shifted_content_is_matched_at_any_offset(self):
+        v1 = os.urandom(256 * 1024)
+        # Unos bytes insertados al inicio desalinean todos los bloques
+        v2 = b"header-v2" + v1[:200 * 1024] + b"x" * 3 + v1[200 * 1024:]
+
+        self.use_case.execute(NamedBytes(v1), "prod")
+        second = self.use_case.execute(NamedBytes(v2), "prod")
+
+        self.assertIsNotNone(second.delta_path)
+        self.assertLess(second.delta_size, len(v2) // 20)
+
+    def test_other_filename_is_not_used_as_base(self):
+        data = os.urandom(64 * 1024)
+        self.use_case.execute(NamedBytes(data), "prod")
+
+        other = NamedBytes(data + b"v2")
+        other.filename = "other.bin"
+        record = self.use_case.execute(other, "prod")
+
+        self.assertIsNone(record.delta_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
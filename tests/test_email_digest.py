@@ -0,0 +1,93 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_email_digest.py
+# Descripción: Pruebas de las plantillas de correo, los
+# destinatarios por ambiente y el modo resumen (sin SMTP real).
+# ============================================================
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.domain.models import BinaryFile
+from src.infrastructure.email_notifier import EmailNotifier, DigestEmailNotifier
+
+
+class Outbox:
+
+    def __init__(self):
+        self.messages = []
+
+    def __call__(self, messages):
+        self.messages.extend(messages)
+
+
+def binary(file_id, environment="prod", filename="fw<1>.bin"):
+    return BinaryFile(id=file_id, filename=filename, environment=environment, status="signed", signed_path="/s")
+
+
+RECEIVERS = {"prod": ["ops@x.com", "qa@x.com"]}
+
+
+class TestEmailNotifier(unittest.TestCase):
+
+    def test_sends_to_every_receiver_of_the_environment(self):
+        notifier = EmailNotifier("me@x.com", "pw", default_receiver="fallback@x.com", receivers=RECEIVERS)
+        notifier._deliver = outbox = Outbox()
+
+        notifier.send_signed_confirmation(binary("a"))
+        notifier.send_rejection_notification(binary("b", environment="dev"))
+
+        (prod_to, _, body), (dev_to, _, _) = outbox.messages
+        self.assertEqual(prod_to, ["ops@x.com", "qa@x.com"])
+        self.assertEqual(dev_to, ["fallback@x.com"])
+        # Las plantillas escapan el HTML de los nombres de archivo
+        self.assertIn("fw&lt;1&gt;.bin", body)
+
+    def test_digest_sends_one_email_per_recipient(self):
+        notifier = DigestEmailNotifier("me@x.com", "pw", receivers=RECEIVERS, window_seconds=3600)
+        notifier._deliver = outbox = Outbox()
+
+        for i in range(20):
+            notifier.send_signed_confirmation(binary(f"s{i}"))
+        notifier.send_approval_request(binary("p1"))
+        self.assertEqual(outbox.messages, [])
+
+        self.assertEqual(notifier.flush(), 2)
+        recipients = [m[0] for m in outbox.messages]
+        self.assertEqual(recipients, [["ops@x.com"], ["qa@x.com"]])
+
+        _, subject, body = outbox.messages[0]
+        self.assertIn("21 evento(s)", subject)
+        self.assertIn("s19", body)
+        self.assertIn("Pendientes de aprobación (1)", body)
+        self.assertEqual(notifier.flush(), 0)
+
+
+class TestNotifierSettings(unittest.TestCase):
+
+    def test_credentials_come_from_settings(self):
+        from src.app.storage import build_notifier
+        from src.config import settings
+
+        with mock.patch.multiple(settings, EMAIL_SENDER="", EMAIL_PASSWORD=""):
+            self.assertIsNone(build_notifier())
+
+        with mock.patch.multiple(
+            settings, EMAIL_SENDER="me@x.com", EMAIL_PASSWORD="pw", EMAIL_DEFAULT_RECEIVER="",
+            SMTP_HOST="smtp.x.com", SMTP_PORT=2525, EMAIL_DIGEST_WINDOW_SECONDS=0,
+        ):
+            notifier = build_notifier()
+        self.assertEqual((notifier.sender_email, notifier.sender_password), ("me@x.com", "pw"))
+        self.assertEqual((notifier.smtp_host, notifier.smtp_port), ("smtp.x.com", 2525))
+        self.assertIsNone(notifier.default_receiver)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_encryption.py
+# Descripción: Pruebas del cifrado AEAD por segmentos (ida y vuelta,
+# acceso aleatorio, alteración y truncado) y del cifrado después de
+# firmar en el caso de uso de firma.
+# ============================================================
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cryptography.exceptions import InvalidTag
+
+from src.application.use_cases import SignBinaryUseCase
+from src.domain.models import BinaryFile
+from src.infrastructure.crypto_adapter import CryptoAdapter
+from src.infrastructure.file_repository import FileRepository
+from src.infrastructure.json_repository import JsonRepository
+from src.infrastructure.stream_encryption import (
+    ALGORITHMS,
+    EncryptingReader,
+    EncryptingSigningService,
+    decrypt_segment,
+    decrypt_stream,
+    key_id_for,
+)
+
+KEY = bytes(range(32))
+SEGMENT = 1024
+
+
+def encrypt(data, algorithm="aes-256-gcm", workers=1):
+    reader = EncryptingReader(io.BytesIO(data), KEY, key_id_for(KEY), algorithm, SEGMENT, workers)
+    # Lecturas pequeñas e irregulares, como las de un upload por partes
+    chunks = iter(lambda: reader.read(700), b"")
+    return b"".join(chunks)
+
+
+def decrypt(blob):
+    out = io.BytesIO()
+    decrypt_stream(io.BytesIO(blob), out, KEY)
+    return out.getvalue()
+
+
+class TestStreamEncryption(unittest.TestCase):
+
+    def test_round_trip_for_every_algorithm_and_size(self):
+        for algorithm in ALGORITHMS:
+            for size in (0, 1, SEGMENT, 3 * SEGMENT, 3 * SEGMENT + 17):
+                with self.subTest(algorithm=algorithm, size=size):
+                    data = os.urandom(size)
+                    self.assertEqual(decrypt(encrypt(data, algorithm)), data)
+
+    def test_parallel_encryption_matches_layout(self):
+        data = os.urandom(10 * SEGMENT + 5)
+        blob = encrypt(data, workers=3)
+        self.assertEqual(decrypt(blob), data)
+
+    def test_single_segment_is_decrypted_without_the_rest(self):
+        data = os.urandom(4 * SEGMENT + 100)
+        blob = io.BytesIO(encrypt(data))
+
+        self.assertEqual(decrypt_segment(blob, KEY, 2), data[2 * SEGMENT:3 * SEGMENT])
+        self.assertEqual(decrypt_segment(blob, KEY, 4), data[4 * SEGMENT:])
+        with self.assertRaises(ValueError):
+            decrypt_segment(blob, KEY, 5)
+
+    def test_modified_segment_is_rejected(self):
+        blob = bytearray(encrypt(os.urandom(2 * SEGMENT)))
+        blob[-SEGMENT] ^= 1
+        with self.assertRaises(InvalidTag):
+            decrypt(bytes(blob))
+
+    def test_truncation_at_segment_boundary_is_rejected(self):
+        blob = encrypt(os.urandom(3 * SEGMENT + 10))
+        # Se quita el último segmento completo: el anterior no está marcado como último
+        with self.assertRaises(InvalidTag):
+            decrypt(blob[:-(10 + 16)])
+
+    def test_wrong_key_is_rejected(self):
+        blob = encrypt(b"firmware")
+        out = io.BytesIO()
+        with self.assertRaises(InvalidTag):
+            decrypt_stream(io.BytesIO(blob), out, bytes(32))
+
+
+class TestEncryptAfterSign(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base = self.tmp.name
+        self.file_repo = FileRepository(base)
+        self.json_repo = JsonRepository(os.path.join(base, "database.json"))
+        self.signing = EncryptingSigningService(
+            CryptoAdapter(self.file_repo), self.file_repo, {"prod": KEY}, segment_size=SEGMENT
+        )
+        self.sign = SignBinaryUseCase(self.json_repo, self.signing)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def add(self, file_id, environment, data):
+        self.json_repo.add_record(BinaryFile(
+            id=file_id, filename="fw.bin", environment=environment, status="approved",
+            uploaded_at="2025-01-01T00:00:00", file_path=self.file_repo.save(io.BytesIO(data), file_id),
+        ).to_dict())
+
+    def test_confidential_environment_gets_encrypted_artifact(self):
+        data = os.urandom(5 * SEGMENT + 3)
+        self.add("fw-prod", "prod", data)
+        self.assertIsNotNone(self.sign.execute("fw-prod"))
+
+        record = self.json_repo.get_record("fw-prod")
+        self.assertEqual(record.encryption_key_id, key_id_for(KEY))
+        self.assertEqual(os.path.getsize(record.encrypted_path), record.encrypted_size)
+        with self.file_repo.open_read(record.encrypted_path) as f:
+            out = io.BytesIO()
+            decrypt_stream(f, out, KEY)
+        self.assertEqual(out.getvalue(), self.file_repo.load(record.signed_path))
+
+        # La recuperación conoce ambos artefactos para poder revertirlos
+        self.assertEqual(self.signing.artifact_paths(record), [record.signed_path, record.encrypted_path])
+
+    def test_other_environments_are_not_encrypted(self):
+        self.add("fw-dev", "dev", b"firmware")
+        self.sign.execute("fw-dev")
+        record = self.json_repo.get_record("fw-dev")
+        self.assertIsNone(record.encrypted_path)
+        self.assertEqual(self.signing.artifact_paths(record), [record.signed_path])
+
+
+if __name__ == "__main__":
+    unittest.main()
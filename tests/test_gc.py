@@ -0,0 +1,90 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_gc.py
+# Descripción: Pruebas del recolector de basura del almacenamiento
+# (huérfanos, rechazados, versiones reemplazadas y modo dry-run).
+# ============================================================
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.application.use_cases import CollectGarbageUseCase
+from src.domain.models import BinaryFile
+from src.infrastructure.file_repository import FileRepository
+from src.infrastructure.json_repository import JsonRepository
+
+
+class TestCollectGarbage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base = self.tmp.name
+        self.file_repo = FileRepository(base)
+        self.json_repo = JsonRepository(os.path.join(base, "database.json"))
+        self.gc = CollectGarbageUseCase(self.json_repo, self.file_repo)
+
+        self.orphan = self.file_repo.save(io.BytesIO(b"orphan"), "no-record")
+        self.v1 = self.add("v1", "signed", "2020-01-01T00:00:00", signed=True)
+        self.v2 = self.add("v2", "signed", "2020-02-01T00:00:00", signed=True)
+        self.rejected = self.add("bad", "rejected", "2020-01-15T00:00:00")
+        self.recent = self.add("new", "rejected", "2999-01-01T00:00:00")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def add(self, file_id, status, uploaded_at, signed=False):
+        record = BinaryFile(
+            id=file_id, filename="fw.bin", environment="prod", status=status, uploaded_at=uploaded_at,
+            file_path=self.file_repo.save(io.BytesIO(file_id.encode()), file_id),
+        )
+        if signed:
+            record.signed_path = self.file_repo.copy_to_signed(record.file_path, b"sig")
+        self.json_repo.add_record(record.to_dict())
+        return record
+
+    def test_dry_run_reports_without_deleting(self):
+        report = self.gc.execute(purge_after_days=30, min_age_seconds=0, dry_run=True)
+
+        self.assertEqual([e["path"] for e in report["orphaned"]], [self.orphan])
+        self.assertEqual([e["id"] for e in report["rejected"]], ["bad"])
+        self.assertEqual([e["id"] for e in report["superseded"]], ["v1"])
+        self.assertGreater(report["reclaimed_bytes"], 0)
+        self.assertTrue(os.path.exists(self.orphan))
+        self.assertTrue(os.path.exists(self.rejected.file_path))
+
+    def test_reclaims_orphans_rejected_and_superseded_originals(self):
+        report = self.gc.execute(purge_after_days=30, min_age_seconds=0, workers=2, batch_size=1)
+        self.assertEqual(report["errors"], 0)
+
+        self.assertFalse(os.path.exists(self.orphan))
+        self.assertFalse(os.path.exists(self.rejected.file_path))
+        self.assertIsNone(self.json_repo.get_record("bad").file_path)
+
+        # De la versión reemplazada solo se conserva el artefacto firmado
+        v1 = self.json_repo.get_record("v1")
+        self.assertIsNone(v1.file_path)
+        self.assertEqual(v1.storage_tier, "purged")
+        self.assertTrue(os.path.exists(self.v1.signed_path))
+
+        # La última versión y los rechazos recientes no se tocan
+        for record in (self.v2, self.recent):
+            self.assertTrue(os.path.exists(record.file_path))
+        self.assertTrue(os.path.exists(self.v2.signed_path))
+
+    def test_recent_orphans_are_kept(self):
+        # Una carga en curso escribe el archivo antes que su registro
+        report = self.gc.execute(min_age_seconds=3600)
+        self.assertEqual(report["orphaned"], [])
+        self.assertTrue(os.path.exists(self.orphan))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_idempotency.py
+# Descripción: Pruebas de la deduplicación de cargas: reintentos con la
+# misma Idempotency-Key, clave reutilizada con otro contenido, reservas
+# que vencen y deduplicación por contenido que ignora rechazados.
+# ============================================================
+import io
+import os
+import sys
+import time
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.application.use_cases import IDEMPOTENCY_CLAIM_TTL, IdempotencyKeyReused, UploadBinaryUseCase
+from src.infrastructure import idempotency_store
+from src.infrastructure.crypto_adapter import CryptoAdapter
+from src.infrastructure.file_repository import FileRepository
+from src.infrastructure.idempotency_store import SqliteIdempotencyStore
+from src.infrastructure.json_repository import JsonRepository
+
+
+def upload_stream(data, filename="fw.bin"):
+    stream = io.BytesIO(data)
+    stream.filename = filename
+    return stream
+
+
+class TestIdempotentUpload(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base = self.tmp.name
+        self.file_repo = FileRepository(base)
+        self.json_repo = JsonRepository(os.path.join(base, "database.json"))
+        self.store = SqliteIdempotencyStore(os.path.join(base, "cache", "idempotency.sqlite"))
+        self.use_case = UploadBinaryUseCase(
+            self.file_repo, self.json_repo, CryptoAdapter(self.file_repo), idempotency_store=self.store,
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def upload(self, data, key=None, filename="fw.bin"):
+        return self.use_case.execute(upload_stream(data, filename), "dev", key)
+
+    def test_replay_returns_the_current_record(self):
+        first = self.upload(b"firmware v1", key="ci-1")
+        self.json_repo.update_record(first.id, {"status": "approved"})
+
+        replay = self.upload(b"firmware v1", key="ci-1")
+        self.assertEqual(replay.id, first.id)
+        self.assertEqual(replay.status, "approved")
+        self.assertEqual(len(self.json_repo.list_records()), 1)
+        self.assertEqual(len(list(self.file_repo.scan_blobs())), 1)
+
+    def test_key_reused_with_other_payload_is_refused(self):
+        self.upload(b"firmware v1", key="ci-1")
+
+        with self.assertRaises(IdempotencyKeyReused):
+            self.upload(b"firmware v2", key="ci-1")
+        with self.assertRaises(IdempotencyKeyReused):
+            self.upload(b"firmware v1", key="ci-1", filename="other.bin")
+        self.assertEqual(len(self.json_repo.list_records()), 1)
+
+    def test_stale_claim_expires(self):
+        self.assertTrue(self.store.claim("key:ci-1", IDEMPOTENCY_CLAIM_TTL))
+        self.assertIsNone(self.upload(b"firmware v1", key="ci-1"))
+
+        # El proceso que reservó la clave murió: al vencer, otro la toma
+        later = time.time() + IDEMPOTENCY_CLAIM_TTL + 1
+        with mock.patch.object(idempotency_store.time, "time", return_value=later):
+            binary = self.upload(b"firmware v1", key="ci-1")
+        self.assertIsNotNone(binary)
+
+    def test_content_dedup_skips_rejected_records(self):
+        first = self.upload(b"firmware v1")
+        self.assertEqual(self.upload(b"firmware v1").id, first.id)
+
+        self.json_repo.update_record(first.id, {"status": "rejected"})
+        second = self.upload(b"firmware v1")
+        self.assertNotEqual(second.id, first.id)
+        self.assertEqual(second.status, "pending")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_ingest.py
+# Descripción: Pruebas del pipeline de ingesta en una sola pasada
+# (digest al escribir, límite de tamaño, bytes mágicos) y de la carga
+# construida sobre él.
+# ============================================================
+import io
+import os
+import sys
+import hashlib
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.application.use_cases import UploadBinaryUseCase
+from src.common.ingest import PayloadTooLarge, UnsupportedFormat
+from src.infrastructure.crypto_adapter import CryptoAdapter
+from src.infrastructure.file_repository import FileRepository
+from src.infrastructure.json_repository import JsonRepository
+
+
+class CountingStream(io.BytesIO):
+    """Cuenta los bytes leídos y no permite volver atrás."""
+    filename = "fw.bin"
+    bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+    def seek(self, *args):
+        raise io.UnsupportedOperation("not seekable")
+
+
+class TestIngestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base = self.tmp.name
+        self.file_repo = FileRepository(base)
+        self.json_repo = JsonRepository(os.path.join(base, "database.json"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def upload(self, data, **kwargs):
+        use_case = UploadBinaryUseCase(self.file_repo, self.json_repo, CryptoAdapter(self.file_repo), **kwargs)
+        stream = CountingStream(data)
+        return use_case.execute(stream, "dev"), stream
+
+    def test_upload_is_read_once_and_hashed_while_written(self):
+        data = os.urandom(3 * 1024 * 1024 + 5)
+        binary, stream = self.upload(data)
+
+        self.assertEqual(stream.bytes_read, len(data))
+        self.assertEqual(binary.digest, hashlib.sha256(data).hexdigest())
+        self.assertEqual(self.file_repo.load(binary.file_path), data)
+        self.assertEqual(self.json_repo.get_record(binary.id).raw_size, len(data))
+
+    def test_oversized_upload_is_rejected_without_a_file(self):
+        with self.assertRaises(PayloadTooLarge):
+            self.upload(b"x" * 2048, max_size=1024)
+        self.assertEqual(list(self.file_repo.scan_blobs()), [])
+        self.assertEqual(self.json_repo.list_records(), [])
+
+    def test_magic_bytes_are_checked(self):
+        elf = [b"\x7fELF"]
+        self.assertIsNotNone(self.upload(b"\x7fELF" + os.urandom(64), magic_prefixes=elf)[0])
+        with self.assertRaises(UnsupportedFormat):
+            self.upload(b"MZ" + os.urandom(64), magic_prefixes=elf)
+        with self.assertRaises(UnsupportedFormat):
+            self.upload(b"\x7f", magic_prefixes=elf)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_job_queue.py
+# Descripción: Pruebas de la cola de trabajos persistente (préstamo
+# vencido, reintentos y cola de muertos, concurrencia, deduplicación)
+# y de la firma retomada por el worker tras una caída.
+# ============================================================
+import io
+import os
+import sys
+import time
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.application.use_cases import ApproveBinaryUseCase, ProcessSigningJobUseCase
+from src.domain.models import BinaryFile
+from src.infrastructure.crypto_adapter import CryptoAdapter
+from src.infrastructure.file_repository import FileRepository
+from src.infrastructure.job_queue import JobWorker, SqliteJobQueue
+from src.infrastructure.json_repository import JsonRepository
+
+
+class TestSqliteJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "jobs.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def queue(self, **kwargs):
+        return SqliteJobQueue(self.path, **kwargs)
+
+    def test_expired_lease_is_taken_again(self):
+        crashed = self.queue(lease_seconds=0.05)
+        job_id = crashed.enqueue("sign", {"file_id": "a"})
+        self.assertEqual([j["id"] for j in crashed.lease(["sign"])], [job_id])
+        self.assertEqual(crashed.lease(["sign"]), [])
+
+        # El worker que lo tenía murió: al vencer el préstamo otro lo toma
+        time.sleep(0.1)
+        jobs = self.queue().lease(["sign"])
+        self.assertEqual([(j["id"], j["attempts"]) for j in jobs], [(job_id, 2)])
+
+    def test_failures_retry_with_backoff_then_dead_letter(self):
+        queue = self.queue(max_attempts=2, retry_base_seconds=0.05)
+        job_id = queue.enqueue("email", {"file_id": "a"})
+
+        queue.lease(["email"])
+        queue.fail(job_id, "smtp down")
+        self.assertEqual(queue.lease(["email"]), [])
+
+        time.sleep(0.1)
+        self.assertEqual(len(queue.lease(["email"])), 1)
+        queue.fail(job_id, "smtp down")
+
+        self.assertEqual(queue.stats(), {"email": {"dead": 1}})
+        self.assertEqual(queue.dead_letters()[0]["error"], "smtp down")
+        self.assertTrue(queue.requeue(job_id))
+        self.assertEqual(len(queue.lease(["email"])), 1)
+
+    def test_concurrency_limit_is_shared_between_processes(self):
+        worker_a = self.queue(concurrency={"sign": 1})
+        worker_b = self.queue(concurrency={"sign": 1})
+        worker_a.enqueue_many("sign", [{"n": 1}, {"n": 2}])
+        worker_a.enqueue("email", {"n": 3})
+
+        self.assertEqual(len(worker_a.lease(["sign"], limit=5)), 1)
+        # La otra firma espera aunque la pida otro proceso; el correo no
+        self.assertEqual([j["kind"] for j in worker_b.lease(["sign", "email"], limit=5)], ["email"])
+
+    def test_dedupe_key_keeps_one_pending_job(self):
+        queue = self.queue()
+        first = queue.enqueue("sign", {"file_id": "a"}, dedupe_key="sign:a")
+        self.assertIsNone(queue.enqueue("sign", {"file_id": "a"}, dedupe_key="sign:a"))
+
+        queue.complete(first)
+        self.assertIsNotNone(queue.enqueue("sign", {"file_id": "a"}, dedupe_key="sign:a"))
+
+
+class TestSigningJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base = self.tmp.name
+        self.file_repo = FileRepository(base)
+        self.json_repo = JsonRepository(os.path.join(base, "database.json"))
+        self.crypto = CryptoAdapter(self.file_repo)
+        self.queue = SqliteJobQueue(os.path.join(base, "jobs.sqlite"), retry_base_seconds=0)
+
+        path = self.file_repo.save(io.BytesIO(b"firmware"), "fw-1")
+        self.json_repo.add_record(BinaryFile(
+            id="fw-1", filename="fw.bin", environment="dev", status="pending",
+            uploaded_at="2025-01-01T00:00:00", file_path=path,
+        ).to_dict())
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def worker(self):
+        signing = ProcessSigningJobUseCase(self.json_repo, self.crypto)
+        return JobWorker(self.queue, {"sign": signing.execute})
+
+    def test_failed_approval_is_signed_by_the_worker(self):
+        class BrokenSigner:
+            def sign_file(self, binary):
+                raise OSError("disk full")
+
+        approve = ApproveBinaryUseCase(self.json_repo, BrokenSigner(), job_queue=self.queue)
+        self.assertIsNone(approve.execute("fw-1"))
+        self.assertEqual(self.json_repo.get_record("fw-1").status, "approved")
+
+        self.assertEqual(self.worker().run_once(), 1)
+        self.assertEqual(self.json_repo.get_record("fw-1").status, "signed")
+        self.assertEqual(self.queue.stats(), {})
+
+    def test_approval_claimed_before_a_crash_is_resumed(self):
+        # La petición registró el trabajo y murió antes de marcar approved
+        self.queue.enqueue(
+            "sign", {"file_id": "fw-1", "operation": "approve", "actor": "panel"},
+            dedupe_key="sign:fw-1", lease_seconds=0,
+        )
+        time.sleep(0.01)
+
+        self.assertEqual(self.worker().run_once(), 1)
+        record = self.json_repo.get_record("fw-1")
+        self.assertEqual(record.status, "signed")
+        self.assertTrue(record.signature)
+        self.assertEqual(self.queue.stats(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
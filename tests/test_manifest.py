@@ -0,0 +1,95 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_manifest.py
+# Descripción: Pruebas del índice de últimas versiones firmadas y del
+# endpoint /manifest (ETag, 304 y Cache-Control).
+# ============================================================
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.application.use_cases import SignBinaryUseCase
+from src.domain.models import BinaryFile
+from src.infrastructure.crypto_adapter import CryptoAdapter
+from src.infrastructure.file_repository import FileRepository
+from src.infrastructure.json_repository import JsonRepository
+from src.infrastructure.release_index import JsonReleaseIndex
+
+
+class TestReleaseIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base = self.tmp.name
+        self.file_repo = FileRepository(base)
+        self.json_repo = JsonRepository(os.path.join(base, "database.json"))
+        self.index_path = os.path.join(base, "releases.json")
+        self.index = JsonReleaseIndex(self.index_path, check_interval=0)
+        self.sign = SignBinaryUseCase(self.json_repo, CryptoAdapter(self.file_repo), release_index=self.index)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def add_approved(self, file_id, uploaded_at, data=b"fw"):
+        path = self.file_repo.save(io.BytesIO(data), file_id)
+        self.json_repo.add_record(BinaryFile(
+            id=file_id, filename="fw.bin", environment="prod", status="approved",
+            uploaded_at=uploaded_at, file_path=path,
+        ).to_dict())
+
+    def test_signing_updates_the_latest_release_incrementally(self):
+        self.assertIsNone(self.index.latest("prod", "fw.bin"))
+
+        self.add_approved("v2", "2025-02-01T00:00:00", b"v2")
+        self.add_approved("v1", "2025-01-01T00:00:00", b"v1")
+        self.sign.execute("v2")
+        # Firmar después una versión más vieja no la vuelve la última
+        self.sign.execute("v1")
+
+        self.assertEqual(self.index.latest("prod", "fw.bin")["id"], "v2")
+        self.assertIsNone(self.index.latest("dev", "fw.bin"))
+
+        # Otro worker con su propio índice en memoria ve la publicación
+        other = JsonReleaseIndex(self.index_path, check_interval=0)
+        self.add_approved("v3", "2025-03-01T00:00:00", b"v3")
+        self.sign.execute("v3")
+        self.assertEqual(other.latest("prod", "fw.bin")["id"], "v3")
+
+        # Reconstruir desde la base de datos da el mismo resultado
+        body, _ = self.index.manifest("prod", "fw.bin")
+        self.assertEqual(other.rebuild(self.json_repo.list_records()), 1)
+        self.assertEqual(self.index.manifest("prod", "fw.bin")[0], body)
+
+    def test_manifest_endpoint_uses_etag_and_cache_control(self):
+        from src.app.main import create_app
+        from src.config import settings
+
+        self.add_approved("v1", "2025-01-01T00:00:00")
+        self.sign.execute("v1")
+
+        with mock.patch.object(settings, "RELEASE_INDEX_PATH", self.index_path):
+            client = create_app(background_jobs=False).test_client()
+
+            response = client.get("/manifest/prod/fw.bin")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()["id"], "v1")
+            self.assertIn("max-age", response.headers["Cache-Control"])
+
+            etag = response.headers["ETag"]
+            cached = client.get("/manifest/prod/fw.bin", headers={"If-None-Match": etag})
+            self.assertEqual(cached.status_code, 304)
+
+            self.assertEqual(client.get("/manifest/dev/fw.bin").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_object_store.py
+# Descripción: Pruebas del repositorio sobre almacén de objetos S3
+# (simulado con moto) y de su caché local de lectura.
+# ============================================================
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+try:
+    import boto3
+    from moto import mock_aws
+except ImportError:
+    boto3 = None
+
+from src.infrastructure.crypto_adapter import CryptoAdapter
+from src.domain.models import BinaryFile
+
+
+@unittest.skipIf(boto3 is None, "boto3/moto not installed")
+class TestObjectStore(unittest.TestCase):
+
+    def setUp(self):
+        from src.infrastructure.object_store_repository import ObjectStoreFileRepository
+
+        os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+        os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+        self.mock = mock_aws()
+        self.mock.start()
+        self.tmp = tempfile.TemporaryDirectory()
+
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="ota")
+        self.repo = ObjectStoreFileRepository(
+            "ota", prefix="nodes", cache_dir=os.path.join(self.tmp.name, "cache"),
+            cache_max_bytes=12 * 1024 * 1024, cache_min_age=0, client=client,
+        )
+
+    def tearDown(self):
+        self.mock.stop()
+        self.tmp.cleanup()
+
+    def test_large_file_is_signed_with_server_side_copy(self):
+        data = os.urandom(6 * 1024 * 1024)
+        path = self.repo.save(io.BytesIO(data), "fw-1")
+        self.assertEqual(path, "s3://ota/nodes/binaries/fw-1")
+
+        binary = BinaryFile(id="fw-1", filename="fw.bin", environment="prod", status="pending", file_path=path)
+        signature, signed_path = CryptoAdapter(self.repo).sign_file(binary)
+
+        signed = self.repo.load(signed_path)
+        self.assertTrue(signed.startswith(data))
+        self.assertTrue(signed.endswith(signature.encode()))
+        self.assertEqual(self.repo.list_files(signed=True), ["signed_fw-1"])
+
+    def test_cache_is_bounded(self):
+        paths = [self.repo.save(os.urandom(5 * 1024 * 1024), f"fw-{i}") for i in range(3)]
+        for path in paths:
+            self.repo.raw_path(path)
+
+        cached = sum(len(files) for _, _, files in os.walk(os.path.join(self.tmp.name, "cache")))
+        self.assertEqual(cached, 2)
+        # Una expulsión solo cuesta volver a descargar
+        self.assertEqual(len(self.repo.load(paths[0])), 5 * 1024 * 1024)
+
+    def test_copy_is_split_into_ranges(self):
+        from src.infrastructure import object_store_repository as store
+
+        data = os.urandom(13 * 1024 * 1024)
+        path = self.repo.save(io.BytesIO(data), "fw-big")
+
+        # Partes de 5 MiB en lugar de 512 MiB para no mover gigabytes
+        with mock.patch.object(store, "COPY_PART_SIZE", store.MIN_PART_SIZE), \
+                mock.patch.object(self.repo.client, "upload_part_copy", wraps=self.repo.client.upload_part_copy) as copy:
+            signed_path = self.repo.copy_to_signed(path, b"\n\n# SIGNATURE: abc")
+
+        ranges = [c.kwargs["CopySourceRange"] for c in copy.call_args_list]
+        self.assertEqual(len(ranges), 2)
+        self.assertEqual(ranges[0], "bytes=0-6815743")
+        self.assertEqual(ranges[-1], f"bytes=6815744-{len(data) - 1}")
+        self.assertEqual(self.repo.load(signed_path), data + b"\n\n# SIGNATURE: abc")
+
+
+class TestCopyRanges(unittest.TestCase):
+
+    def test_ranges_respect_s3_part_limits(self):
+        from src.infrastructure.object_store_repository import (
+            MAX_PART_SIZE, MAX_PARTS, MIN_PART_SIZE, _copy_ranges,
+        )
+
+        for size in (MIN_PART_SIZE, 6 * 1024 ** 3, 5 * 1024 ** 4):
+            with self.subTest(size=size):
+                ranges = _copy_ranges(size)
+                self.assertEqual(ranges[0][0], 0)
+                self.assertEqual(ranges[-1][1], size - 1)
+                self.assertLess(len(ranges), MAX_PARTS)
+                for (first, last), following in zip(ranges, ranges[1:] + [(size, None)]):
+                    self.assertEqual(following[0], last + 1)
+                    self.assertGreaterEqual(last - first + 1, MIN_PART_SIZE)
+                    self.assertLessEqual(last - first + 1, MAX_PART_SIZE)
+
+
+class TestReadThroughCache(unittest.TestCase):
+
+    def setUp(self):
+        from src.infrastructure.object_store_repository import ReadThroughCache
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ReadThroughCache(self.tmp.name, max_bytes=0, min_age=0)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def download(self, data):
+        def write(tmp_path):
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+        return write
+
+    def test_open_handle_survives_eviction(self):
+        with self.cache.open("ota/fw", self.download(b"image")) as f:
+            # Sin cupo: la copia se expulsa al publicarse, el handle sigue
+            self.assertIsNone(self.cache.get("ota/fw"))
+            self.assertEqual(f.read(), b"image")
+
+    def test_recently_used_paths_are_not_evicted(self):
+        self.cache.min_age = 60
+        path = self.cache.fill("ota/fw", self.download(b"image"))
+        self.cache.evict()
+        self.assertTrue(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_profiling.py
+# Descripción: Pruebas del perfilado de peticiones lentas: solo se
+# guardan las que superan el umbral, el búfer en disco es acotado y
+# los perfiles se consultan desde /admin/profiles.
+# ============================================================
+import os
+import sys
+import time
+import tempfile
+import unittest
+from unittest import mock
+
+from flask import Flask
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.app.profiling import install_profiler
+from src.infrastructure.profile_store import ProfileRingBuffer
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ProfileRingBuffer(self.tmp.name, max_entries=3)
+
+        app = Flask(__name__)
+
+        @app.route("/slow")
+        def slow():
+            time.sleep(0.05)
+            return "ok"
+
+        @app.route("/fast")
+        def fast():
+            return "ok"
+
+        install_profiler(app, self.store, threshold_ms=30)
+        self.client = app.test_client()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_only_slow_requests_are_kept_in_a_bounded_buffer(self):
+        self.client.get("/fast")
+        self.assertEqual(self.store.list(), [])
+
+        for _ in range(5):
+            self.client.get("/slow")
+
+        profiles = self.store.list()
+        self.assertEqual(len(profiles), 3)
+        self.assertEqual(profiles[0]["path"], "/slow")
+        self.assertGreaterEqual(profiles[0]["duration_ms"], 30)
+        self.assertIn("sleep", self.store.report(profiles[0]["id"]))
+
+    def test_admin_endpoint_lists_profiles(self):
+        from src.app.main import create_app
+        from src.config import settings
+
+        self.client.get("/slow")
+        with mock.patch.multiple(settings, PROFILING_ENABLED=True, PROFILE_DIR=self.tmp.name, ADMIN_TOKEN="s3cret"):
+            client = create_app(background_jobs=False).test_client()
+
+            self.assertEqual(client.get("/admin/profiles").status_code, 403)
+
+            headers = {"X-Admin-Token": "s3cret"}
+            listing = client.get("/admin/profiles", headers=headers).get_json()
+            profile_id = next(p["id"] for p in listing if p["path"] == "/slow")
+
+            report = client.get(f"/admin/profiles/{profile_id}", headers=headers)
+            self.assertEqual(report.status_code, 200)
+            self.assertIn(b"function calls", report.data)
+
+            raw = client.get(f"/admin/profiles/{profile_id}?format=pstats", headers=headers)
+            self.assertEqual(raw.status_code, 200)
+            self.assertEqual(client.get("/admin/profiles/../x", headers=headers).status_code, 404)
+
+    def test_admin_endpoint_requires_a_configured_token(self):
+        from src.app.main import create_app
+        from src.config import settings
+
+        with mock.patch.multiple(settings, PROFILING_ENABLED=True, PROFILE_DIR=self.tmp.name, ADMIN_TOKEN=""):
+            client = create_app(background_jobs=False).test_client()
+
+            self.assertEqual(client.get("/admin/profiles").status_code, 403)
+            self.assertEqual(client.get("/admin/profiles", headers={"X-Admin-Token": ""}).status_code, 403)
+
+
+if __name__ == "__main__":
+    unittest.main()
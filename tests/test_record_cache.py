@@ -0,0 +1,105 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_record_cache.py
+# Descripción: Pruebas de la caché de lectura de la base de datos
+# (aciertos, invalidación al escribir y entre procesos, LRU acotado).
+# ============================================================
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.domain.models import BinaryFile
+from src.infrastructure.json_repository import JsonRepository
+from src.infrastructure.record_cache import CachedDatabaseRepository
+
+
+class CountingRepository(JsonRepository):
+    reads = 0
+
+    def get_record(self, file_id):
+        self.reads += 1
+        return super().get_record(file_id)
+
+    def list_records(self):
+        self.reads += 1
+        return super().list_records()
+
+
+class TestCachedDatabaseRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "database.json")
+        self.inner = CountingRepository(self.path)
+        self.repo = CachedDatabaseRepository(self.inner, max_entries=2, stamp_path=self.path)
+        for file_id in ("a", "b", "c"):
+            self.repo.add_record(BinaryFile(id=file_id, filename="fw.bin", environment="dev", status="pending").to_dict())
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_repeated_reads_are_served_from_memory(self):
+        self.repo.get_record("a")
+        self.repo.list_records()
+        reads = self.inner.reads
+
+        for _ in range(5):
+            self.assertEqual(self.repo.get_record("a").status, "pending")
+            self.assertEqual([r.id for r in self.repo.list_page(1, 1)], ["b"])
+        self.assertEqual(self.inner.reads, reads)
+        self.assertGreater(self.repo.stats()["hit_rate"], 0.8)
+
+    def test_returned_records_do_not_alias_the_cache(self):
+        record = self.repo.get_record("a")
+        record.status = "signed"
+        self.assertEqual(self.repo.get_record("a").status, "pending")
+
+    def test_writes_invalidate(self):
+        self.repo.get_record("a")
+        self.repo.list_records()
+
+        self.repo.update_record("a", {"status": "approved"})
+        self.assertEqual(self.repo.get_record("a").status, "approved")
+        self.repo.delete_record("b")
+        self.assertEqual([r.id for r in self.repo.list_records()], ["a", "c"])
+
+    def test_write_from_another_process_invalidates(self):
+        self.assertEqual(self.repo.get_record("a").status, "pending")
+        changes = self.repo.stats()["stamp_changes"]
+
+        # Otro worker escribe con su propio repositorio, sin pasar por esta caché
+        JsonRepository(self.path).update_record("a", {"status": "rejected"})
+        self.assertEqual(self.repo.get_record("a").status, "rejected")
+        self.assertEqual(self.repo.stats()["stamp_changes"], changes + 1)
+
+    def test_own_database_is_not_touched_on_write(self):
+        # La base ya se reemplaza al escribir; tocarla solo cambiaría su fecha
+        self.assertFalse(self.repo.touch_stamp)
+        before = os.stat(self.path).st_mtime_ns
+        with mock.patch("os.utime") as utime:
+            self.repo.update_record("a", {"status": "approved"})
+        utime.assert_not_called()
+        self.assertNotEqual(os.stat(self.path).st_mtime_ns, before)
+
+        # Un sello aparte sí se toca en cada escritura
+        stamp = os.path.join(self.tmp.name, "db.stamp")
+        separate = CachedDatabaseRepository(self.inner, stamp_path=stamp)
+        separate.update_record("a", {"status": "signed"})
+        self.assertTrue(os.path.exists(stamp))
+
+    def test_lru_is_bounded(self):
+        for file_id in ("a", "b", "c"):
+            self.repo.get_record(file_id)
+        self.assertEqual(self.repo.stats()["entries"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_record_stats.py
+# Descripción: Pruebas de los agregados incrementales del repositorio
+# (conteos, bytes, firmas por hora y recálculo tras una caída).
+# ============================================================
+import io
+import os
+import sys
+import json
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.application.use_cases import SignBinaryUseCase
+from src.domain.models import BinaryFile
+from src.infrastructure.crypto_adapter import CryptoAdapter
+from src.infrastructure.file_repository import FileRepository
+from src.infrastructure.json_repository import JsonRepository
+from src.infrastructure.record_stats import RecordStats
+
+
+class TestRecordAggregates(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "database.json")
+        self.repo = JsonRepository(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def add(self, file_id, environment="dev", status="pending", size=100):
+        self.repo.add_record(BinaryFile(
+            id=file_id, filename="fw.bin", environment=environment, status=status,
+            file_path=f"/tmp/{file_id}", raw_size=size, stored_size=size // 2,
+        ).to_dict())
+
+    def recomputed(self):
+        with open(self.path) as f:
+            return RecordStats.from_records(json.load(f)["records"]).summary()
+
+    def test_incremental_aggregates_match_a_full_recount(self):
+        self.add("a")
+        self.add("b", "prod")
+        self.repo.add_records([BinaryFile(id="c", filename="x", environment="prod", status="rejected").to_dict()])
+        self.repo.update_record("a", {"status": "approved"})
+        self.repo.update_record("b", {"file_path": None})
+        self.repo.delete_record("c")
+
+        stats = self.repo.aggregates()
+        self.assertEqual(stats["by_status"], {"approved": 1, "pending": 1})
+        self.assertEqual(stats["by_environment"], {"dev": 1, "prod": 1})
+        self.assertEqual(stats["bytes"], {"raw": 100, "stored": 50})
+        self.assertEqual(stats, self.recomputed())
+
+    def test_signings_are_counted_per_hour(self):
+        base = self.tmp.name
+        file_repo = FileRepository(base)
+        self.repo.add_record(BinaryFile(
+            id="fw", filename="fw.bin", environment="dev", status="approved",
+            file_path=file_repo.save(io.BytesIO(b"firmware"), "fw"),
+        ).to_dict())
+
+        SignBinaryUseCase(self.repo, CryptoAdapter(file_repo)).execute("fw")
+
+        stats = self.repo.aggregates()
+        self.assertEqual(stats["by_status"], {"signed": 1})
+        self.assertEqual(stats["signed_this_hour"], 1)
+        self.assertEqual(sum(stats["signed_per_hour"].values()), 1)
+
+    def test_stale_aggregates_are_recomputed(self):
+        self.add("a")
+        # La base se escribió pero el proceso murió antes que los agregados
+        with open(self.path) as f:
+            data = json.load(f)
+        data["records"].append(BinaryFile(id="b", filename="fw.bin", environment="dev", status="signed").to_dict())
+        data["version"] += 1
+        with open(self.path, "w") as f:
+            json.dump(data, f)
+
+        self.add("c")
+        self.assertEqual(self.repo.aggregates()["by_status"], {"pending": 2, "signed": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_recovery.py
+# Descripción: Pruebas de escritura atómica, del registro de
+# intenciones y de la recuperación de firmas interrumpidas.
+# ============================================================
+import io
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.application.use_cases import RecoverInterruptedSigningsUseCase, SignBinaryUseCase
+from src.domain.models import BinaryFile
+from src.infrastructure.crypto_adapter import CryptoAdapter
+from src.infrastructure.file_repository import FileRepository
+from src.infrastructure.intent_log import SqliteIntentLog
+from src.infrastructure.json_repository import JsonRepository
+
+
+class TestRecovery(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base = self.tmp.name
+        self.file_repo = FileRepository(base)
+        self.json_repo = JsonRepository(os.path.join(base, "database.json"))
+        self.crypto = CryptoAdapter(self.file_repo)
+        self.intents = SqliteIntentLog(os.path.join(base, "intents.sqlite"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def add(self, file_id, status="approved", data=b"firmware"):
+        path = self.file_repo.save(io.BytesIO(data), file_id) if data else os.path.join(self.tmp.name, "missing")
+        self.json_repo.add_record(BinaryFile(
+            id=file_id, filename="fw.bin", environment="dev", status=status, file_path=path,
+        ).to_dict())
+
+    def crash_during_signing(self, file_id, operation="sign"):
+        # Intención abierta por un proceso que ya no existe
+        self.intents.begin(file_id, operation, "approved")
+        self.intents._db.execute("UPDATE intents SET owner = ? WHERE file_id = ?", (f"{self.intents.host}:999999999", file_id))
+        self.intents._db.commit()
+
+    def recover(self):
+        use_case = RecoverInterruptedSigningsUseCase(self.json_repo, self.file_repo, self.crypto, self.intents)
+        return use_case.execute()
+
+    def test_interrupted_signing_is_completed_or_rolled_back(self):
+        self.add("resign")
+        self.add("rollback", data=None)
+        self.crash_during_signing("resign")
+        self.crash_during_signing("rollback")
+
+        leftover = os.path.join(self.file_repo.signed_dir, ".tmp-dead-signed_resign")
+        with open(leftover, "wb") as f:
+            f.write(b"trunc")
+        os.utime(leftover, (0, 0))
+
+        result = self.recover()
+
+        self.assertEqual(result["resigned"], ["resign"])
+        self.assertEqual(result["rolled_back"], ["rollback"])
+        self.assertEqual(result["temp_files_removed"], 1)
+        self.assertFalse(os.path.exists(leftover))
+
+        signed = self.json_repo.get_record("resign")
+        self.assertEqual(signed.status, "signed")
+        self.assertTrue(self.file_repo.load(signed.signed_path).startswith(b"firmware"))
+
+        rolled = self.json_repo.get_record("rollback")
+        self.assertEqual((rolled.status, rolled.signed_path), ("approved", None))
+        self.assertEqual(self.intents.pending(), [])
+
+    def test_rollback_deletes_orphaned_artifacts(self):
+        self.add("rollback")
+        record = self.json_repo.get_record("rollback")
+        # El proceso caído alcanzó a escribir el artefacto firmado
+        _, orphan = self.crypto.sign_file(record)
+        self.crash_during_signing("rollback")
+
+        with mock.patch.object(self.crypto, "sign_file", side_effect=OSError("disk full")):
+            result = self.recover()
+
+        self.assertEqual(result["rolled_back"], ["rollback"])
+        self.assertFalse(os.path.exists(orphan))
+        self.assertTrue(os.path.exists(record.file_path))
+
+    @unittest.skipUnless(os.path.exists("/proc/self/stat"), "requires /proc")
+    def test_reused_pid_is_not_a_live_owner(self):
+        self.add("reused")
+        self.intents.begin("reused", "sign", "approved")
+        self.assertEqual(self.intents.pending(), [])
+
+        # El mismo PID, pero de un proceso que arrancó en otro momento
+        owner = f"{self.intents.host}:{os.getpid()}:other-boot.1"
+        self.intents._db.execute("UPDATE intents SET owner = ? WHERE file_id = ?", (owner, "reused"))
+        self.intents._db.commit()
+        self.assertEqual([i["file_id"] for i in self.intents.pending()], ["reused"])
+
+    def test_live_intent_blocks_parallel_signing(self):
+        self.add("busy")
+        self.assertTrue(self.intents.begin("busy", "sign", "approved"))
+
+        use_case = SignBinaryUseCase(self.json_repo, self.crypto, intent_log=self.intents)
+        self.assertIsNone(use_case.execute("busy"))
+        self.assertEqual(self.json_repo.get_record("busy").status, "approved")
+        # Una intención de un proceso vivo no se recupera
+        self.assertEqual(self.recover()["resigned"], [])
+
+    def test_concurrent_writes_do_not_lose_records(self):
+        def worker(n):
+            for i in range(10):
+                self.add(f"{n}-{i}", data=None)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(self.json_repo.list_records()), 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_search_index.py
+# Descripción: Pruebas del índice de búsqueda por prefijo (filename,
+# palabras del filename e id) y de su mantenimiento incremental.
+# ============================================================
+import os
+import sys
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.domain.models import BinaryFile
+from src.infrastructure.json_repository import JsonRepository
+from src.infrastructure.record_cache import CachedDatabaseRepository
+from src.infrastructure.search_index import RecordSearchIndex
+
+
+def record(file_id, filename, environment="dev"):
+    return BinaryFile(id=file_id, filename=filename, environment=environment, status="pending").to_dict()
+
+
+class TestRecordSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = RecordSearchIndex()
+        self.index.build([
+            record("aa11", "gateway_fw_v1.2.3.bin"),
+            record("bb22", "Sensor-FW-v1.2.0.bin"),
+            record("cc33", "gateway_boot.img"),
+        ])
+
+    def ids(self, query, limit=20):
+        return [r["id"] for r in self.index.search(query, limit)]
+
+    def test_filename_prefix_comes_before_word_and_id_matches(self):
+        self.assertEqual(self.ids("gateway"), ["cc33", "aa11"])
+        self.assertEqual(self.ids("v1.2"), ["bb22", "aa11"])
+        self.assertEqual(self.ids("FW"), ["aa11", "bb22"])
+        self.assertEqual(self.index.search("bb")[0]["match"], "id")
+        self.assertEqual(self.ids("gateway", limit=1), ["cc33"])
+        self.assertEqual(self.ids("nothing"), [])
+
+    def test_changes_are_applied_incrementally(self):
+        self.index.add(record("dd44", "gateway_fw_v2.0.bin"))
+        self.index.update("aa11", {"filename": "legacy.bin", "status": "signed"})
+        self.index.remove("cc33")
+
+        self.assertEqual(self.ids("gateway"), ["dd44"])
+        self.assertEqual(self.index.search("legacy")[0]["status"], "signed")
+        self.assertEqual(len(self.index), 3)
+
+
+class TestRepositorySearch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "database.json")
+        self.repo = JsonRepository(self.path)
+        self.repo.add_record(record("aa11", "gateway_fw.bin"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_writes_keep_the_index_current(self):
+        self.assertEqual([r["id"] for r in self.repo.search("gateway")], ["aa11"])
+
+        self.repo.add_records([record("bb22", "gateway_boot.img")])
+        self.repo.update_record("aa11", {"filename": "sensor.bin"})
+        self.assertEqual([r["id"] for r in self.repo.search("gateway")], ["bb22"])
+
+        self.repo.delete_record("bb22")
+        self.assertEqual(self.repo.search("gateway"), [])
+
+    def test_index_is_rebuilt_after_another_process_writes(self):
+        self.repo.search("gateway")
+        other = JsonRepository(self.path)
+        other.add_record(record("bb22", "gateway_boot.img"))
+
+        # Un escritor externo que no pasa por el repositorio
+        with open(self.path) as f:
+            data = json.load(f)
+        data["records"].append(record("cc33", "gateway_app.bin"))
+        with open(self.path, "w") as f:
+            json.dump(data, f)
+
+        self.assertEqual(sorted(r["id"] for r in self.repo.search("gateway")), ["aa11", "bb22", "cc33"])
+
+    def test_writes_through_the_cache_do_not_rebuild_the_index(self):
+        # La pila por defecto: caché sellada con la propia base de datos
+        cached = CachedDatabaseRepository(self.repo, stamp_path=self.path)
+        cached.search("gateway")
+
+        with mock.patch.object(RecordSearchIndex, "build", autospec=True) as build:
+            for i in range(3):
+                cached.add_record(record(f"n{i}", f"gateway_{i}.bin"))
+                cached.update_record("aa11", {"status": "approved"})
+                self.assertEqual(len(cached.search("gateway")), i + 2)
+            # Cambiar solo la fecha del archivo no invalida el índice
+            os.utime(self.path)
+            cached.search("gateway")
+        build.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_server.py
+# Descripción: Pruebas del lanzador con varios workers (respawn,
+# recarga con SIGHUP y apagado), del tablero de métricas compartido
+# y de las cargas por partes atendidas por workers distintos.
+# ============================================================
+import io
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import hashlib
+import tempfile
+import unittest
+import subprocess
+import urllib.request
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.infrastructure.metrics_board import SharedMetricsBoard, merge_counters
+from src.infrastructure.upload_session_repository import UploadSessionRepository
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _children(pid):
+    """pids cuyo padre es `pid` (Linux, /proc)."""
+    children = set()
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        # fields[0] = estado, fields[1] = ppid
+        if int(fields[1]) == pid and fields[0] != "Z":
+            children.add(int(entry))
+    return children
+
+
+def _wait_for(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = condition()
+        if result:
+            return result
+        time.sleep(0.1)
+    raise AssertionError("timeout")
+
+
+@unittest.skipUnless(os.path.isdir("/proc") and hasattr(os, "fork"), "requiere Linux")
+class TestPreforkServer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        data_dir = os.path.join(self.tmp.name, "data")
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+
+        env = dict(os.environ, PYTHONPATH=ROOT, DATA_DIR=data_dir, RATE_LIMIT_PER_MINUTE="0")
+        self.server = subprocess.Popen(
+            [sys.executable, "-m", "src.app.server", "--host", "127.0.0.1", "--port", str(self.port),
+             "--workers", "2", "--graceful-timeout", "5"],
+            cwd=self.tmp.name, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        self.pidfile = os.path.join(data_dir, "run", "master.pid")
+        _wait_for(self._get_metrics)
+
+    def tearDown(self):
+        if self.server.poll() is None:
+            self.server.send_signal(signal.SIGTERM)
+            self.server.wait(timeout=30)
+        self.tmp.cleanup()
+
+    def _get_metrics(self):
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/api/metrics", timeout=2) as r:
+                return json.loads(r.read())
+        except OSError:
+            return None
+
+    def _workers(self):
+        workers = _children(self.server.pid)
+        return workers if len(workers) == 2 else None
+
+    def test_respawn_reload_and_shutdown(self):
+        first = _wait_for(self._workers)
+
+        # Un worker caído se reemplaza
+        victim = next(iter(first))
+        os.kill(victim, signal.SIGKILL)
+        second = _wait_for(lambda: (w := self._workers()) and victim not in w and w)
+        self.assertEqual(len(first & second), 1)
+        self.assertIsNotNone(_wait_for(self._get_metrics))
+
+        # SIGHUP reemplaza a todos los workers sin dejar de atender
+        self.server.send_signal(signal.SIGHUP)
+        third = _wait_for(lambda: (w := self._workers()) and not (w & second) and w)
+        self.assertEqual(len(third), 2)
+        self.assertIsNotNone(_wait_for(self._get_metrics))
+
+        # SIGTERM detiene todo de forma ordenada
+        self.assertTrue(os.path.exists(self.pidfile))
+        self.server.send_signal(signal.SIGTERM)
+        self.assertEqual(self.server.wait(timeout=30), 0)
+        self.assertFalse(os.path.exists(self.pidfile))
+        for pid in third:
+            self.assertFalse(os.path.exists(f"/proc/{pid}"))
+
+    def test_metrics_include_every_worker(self):
+        metrics = self._get_metrics()
+        self.assertIn("totals", metrics)
+        self.assertIn(str(metrics["worker"]), metrics["workers"])
+
+
+class TestSharedMetricsBoard(unittest.TestCase):
+
+    def test_collect_merges_live_workers_and_drops_dead_ones(self):
+        with tempfile.TemporaryDirectory() as run_dir:
+            board = SharedMetricsBoard(run_dir, lambda: {"cache": {"hits": 2, "hit_rate": 0.5}}, interval=60)
+            try:
+                # El proceso padre hace de otro worker vivo; 2**22+1 no existe
+                with open(os.path.join(run_dir, f"metrics-{os.getppid()}.json"), "w") as f:
+                    json.dump({"cache": {"hits": 3, "hit_rate": 1.0}}, f)
+                dead = os.path.join(run_dir, f"metrics-{2 ** 22 + 1}.json")
+                with open(dead, "w") as f:
+                    json.dump({"cache": {"hits": 100}}, f)
+
+                workers = board.collect()
+                self.assertEqual(set(workers), {os.getpid(), os.getppid()})
+                self.assertEqual(merge_counters(workers.values()), {"cache": {"hits": 5}})
+                self.assertFalse(os.path.exists(dead))
+            finally:
+                board.close()
+            self.assertFalse(os.path.exists(board.path))
+
+
+class TestUploadAcrossWorkers(unittest.TestCase):
+
+    def test_chunks_written_by_another_worker_are_hashed(self):
+        with tempfile.TemporaryDirectory() as base:
+            worker_a = UploadSessionRepository(base)
+            worker_b = UploadSessionRepository(base)
+            data = os.urandom(300_000)
+
+            upload_id = worker_a.create_session("fw.bin", "dev", len(data))["upload_id"]
+            worker_a.write_chunk(upload_id, 0, io.BytesIO(data[:100_000]))
+            worker_b.write_chunk(upload_id, 100_000, io.BytesIO(data[100_000:200_000]))
+            worker_a.write_chunk(upload_id, 200_000, io.BytesIO(data[200_000:]))
+
+            result = worker_a.finalize(upload_id)
+            self.assertEqual(result["digest"], hashlib.sha256(data).hexdigest())
+
+
+if __name__ == "__main__":
+    unittest.main()
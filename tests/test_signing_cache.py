@@ -0,0 +1,111 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_signing_cache.py
+# Descripción: Pruebas de la caché de firmas: aciertos en memoria y
+# en disco, entradas obsoletas, modo árbol sin pre-digest lineal y
+# artefactos enlazados que no se afectan entre sí.
+# ============================================================
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.domain.models import BinaryFile
+from src.infrastructure import crypto_adapter
+from src.infrastructure.crypto_adapter import CryptoAdapter
+from src.infrastructure.file_repository import FileRepository
+from src.infrastructure.signing_cache import CachedSigningService, SignatureCache
+
+BLOCK = 64 * 1024
+
+
+class TestSigningCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.file_repo = FileRepository(self.tmp.name)
+        self.cache_path = os.path.join(self.tmp.name, "cache", "signatures.sqlite")
+        self.data = os.urandom(3 * BLOCK + 11)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def service(self, **options):
+        return CachedSigningService(CryptoAdapter(self.file_repo, **options), SignatureCache(self.cache_path), self.file_repo)
+
+    def binary(self, file_id):
+        return BinaryFile(id=file_id, filename="fw.bin", environment="prod", status="approved",
+                          file_path=self.file_repo.save(self.data, file_id))
+
+    def read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_identical_content_is_linked_not_rewritten(self):
+        service = self.service()
+        first_signature, first_path = service.sign_file(self.binary("a"))
+
+        with mock.patch.object(self.file_repo, "copy_to_signed") as copy:
+            signature, path = service.sign_file(self.binary("b"))
+        copy.assert_not_called()
+
+        self.assertEqual(signature, first_signature)
+        self.assertNotEqual(path, first_path)
+        self.assertEqual(self.read(path), self.read(first_path))
+        self.assertEqual(service.cache.stats()["hits"], 1)
+
+        # Otro proceso (otra caché en memoria) encuentra la entrada en SQLite
+        other = self.service()
+        other.sign_file(self.binary("c"))
+        self.assertEqual(other.cache.stats()["disk_hits"], 1)
+
+    def test_missing_artifact_is_signed_again(self):
+        service = self.service()
+        _, first_path = service.sign_file(self.binary("a"))
+        self.file_repo.delete(first_path)
+
+        signature, path = service.sign_file(self.binary("b"))
+        self.assertTrue(os.path.exists(path))
+        self.assertTrue(self.read(path).endswith(signature.encode()))
+        self.assertEqual(service.cache.stats()["stale"], 1)
+
+    def test_tree_mode_does_not_pre_hash_linearly(self):
+        service = self.service(hash_mode="tree", block_size=BLOCK, max_workers=1)
+        binary = self.binary("a")
+
+        with mock.patch.object(crypto_adapter, "hash_stream") as linear, \
+                mock.patch.object(crypto_adapter.TreeHasher, "hash_file", autospec=True,
+                                  side_effect=crypto_adapter.TreeHasher.hash_file) as tree:
+            signature, _ = service.sign_file(binary)
+        linear.assert_not_called()
+        # La raíz calculada para la clave se reutiliza al firmar
+        self.assertEqual(tree.call_count, 1)
+        self.assertEqual(len(binary.block_hashes), 4)
+
+        again = self.binary("b")
+        self.assertEqual(service.sign_file(again)[0], signature)
+        self.assertEqual(again.block_hashes, binary.block_hashes)
+
+    def test_linked_artifacts_stay_independent(self):
+        service = self.service()
+        _, first_path = service.sign_file(self.binary("a"))
+        _, second_path = service.sign_file(self.binary("b"))
+        expected = self.read(second_path)
+
+        # Re-firmar, mover al nivel frío o borrar uno no toca el otro enlace
+        service.inner.sign_file(self.binary("a"))
+        cold = self.file_repo.move_to_cold(first_path)
+        self.file_repo.delete(cold)
+
+        self.assertEqual(self.read(second_path), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_startup.py
+# Descripción: Verifica el presupuesto de arranque en frío: crear la
+# app no debe importar adaptadores pesados, las rutas no deben cargar
+# la infraestructura, y el código propio debe costar poco al lado de
+# Flask (medido con -X importtime en el mismo proceso, así que no
+# depende de la velocidad de la máquina).
+# ============================================================
+import os
+import sys
+import subprocess
+import unittest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Costo máximo de importar src.app.routes (todo el código propio que se
+# carga al arrancar) como fracción del costo de importar Flask; hoy es
+# menos del 5%
+ROUTES_FLASK_RATIO = float(os.getenv("STARTUP_ROUTES_RATIO", "0.25"))
+
+HEAVY_MODULES = ("smtplib", "email.mime", "cryptography", "dotenv", "multiprocessing", "concurrent.futures")
+
+STARTUP_CODE = """
+import sys
+from src.app.main import create_app
+create_app()
+print(",".join(sorted(sys.modules)))
+"""
+
+ROUTES_CODE = """
+import sys
+import flask
+import src.app.routes
+print(",".join(sorted(sys.modules)))
+"""
+
+
+class TestStartup(unittest.TestCase):
+
+    def _run(self, code=STARTUP_CODE):
+        return subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+
+    def test_create_app_does_not_import_heavy_adapters(self):
+        loaded = self._run().stdout.strip().split(",")
+
+        for heavy in HEAVY_MODULES:
+            self.assertFalse(
+                any(m == heavy or m.startswith(heavy + ".") for m in loaded),
+                f"{heavy} no debe importarse al arrancar",
+            )
+
+    def test_routes_do_not_load_infrastructure(self):
+        loaded = self._run(ROUTES_CODE).stdout.strip().split(",")
+
+        eager = [m for m in loaded if m.startswith("src.infrastructure") or m in ("src.app.storage", "src.config.settings")]
+        self.assertEqual(eager, [], "los adaptadores se construyen al primer uso (Lazy), no al importar las rutas")
+
+    def test_routes_import_is_small_next_to_flask(self):
+        # Mejor de tres para no fallar por ruido del sistema
+        best = None
+        for _ in range(3):
+            cumulative = {}
+            for line in self._run(ROUTES_CODE).stderr.splitlines():
+                parts = line.split("|")
+                if len(parts) == 3 and parts[2].strip() in ("flask", "src.app.routes"):
+                    cumulative[parts[2].strip()] = int(parts[1])
+            if len(cumulative) == 2:
+                ratio = cumulative["src.app.routes"] / cumulative["flask"]
+                best = ratio if best is None else min(best, ratio)
+
+        self.assertIsNotNone(best, "No se encontraron flask y src.app.routes en -X importtime")
+        self.assertLess(best, ROUTES_FLASK_RATIO)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+# ============================================================
+# Politécnica de Santa Rosa
+#
+# Materia: Arquitecturas de Software
+# Profesor: Jesús Salvador López Ortega
+# Grupo: ISW28
+# Archivo: test_tree_hash.py
+# Descripción: Pruebas del modo de firma en árbol (Merkle), de la
+# verificación de bloques del lado del dispositivo y de los
+# algoritmos de hash por ambiente.
+# ============================================================
+import io
+import os
+import sys
+import hashlib
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.domain.models import BinaryFile
+from src.infrastructure.crypto_adapter import CryptoAdapter
+from src.infrastructure.file_repository import FileRepository
+from src.infrastructure.tree_hasher import TreeHasher, _shared_pool, hash_leaf, merkle_proof, merkle_root, verify_block
+from src.infrastructure.upload_session_repository import UploadSessionRepository
+
+BLOCK = 64 * 1024
+
+
+class TestTreeHash(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.file_repo = FileRepository(self.tmp.name)
+        self.data = os.urandom(5 * BLOCK + 123)
+        self.path = self.file_repo.save(self.data, "image")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parallel_matches_in_process_hashing(self):
+        blocks = [self.data[i:i + BLOCK] for i in range(0, len(self.data), BLOCK)]
+        expected = [hash_leaf(b) for b in blocks]
+
+        root, block_hashes = TreeHasher(BLOCK, max_workers=2).hash_file(self.path)
+
+        self.assertEqual(block_hashes, expected)
+        self.assertEqual(root, merkle_root(expected))
+
+        # El dispositivo solo tiene la ruta de prueba y la raíz firmada
+        for index in range(len(blocks)):
+            proof = merkle_proof(block_hashes, index)
+            self.assertTrue(verify_block(blocks[index], index, proof, root, len(blocks)))
+        proof = merkle_proof(block_hashes, 3)
+        self.assertFalse(verify_block(blocks[3][:-1] + b"x", 3, proof, root, len(blocks)))
+        self.assertFalse(verify_block(blocks[3], 2, proof, root, len(blocks)))
+        self.assertFalse(verify_block(blocks[3], 3, proof[:-1], root, len(blocks)))
+        self.assertFalse(verify_block(blocks[3], 3, proof + proof[:1], root, len(blocks)))
+
+    def test_process_pool_is_reused_between_files(self):
+        TreeHasher(BLOCK, max_workers=2).hash_file(self.path)
+        pool = _shared_pool(2)
+        TreeHasher(BLOCK, max_workers=2).hash_file(self.path)
+        self.assertIs(_shared_pool(2), pool)
+
+    def test_invalid_block_size_fails_when_configured(self):
+        with self.assertRaises(ValueError):
+            CryptoAdapter(self.file_repo, hash_mode="tree", block_size=1000)
+
+    def test_tree_mode_records_block_hashes(self):
+        binary = BinaryFile(id="image", filename="fw.bin", environment="prod", status="approved", file_path=self.path)
+        signature, signed_path = CryptoAdapter(self.file_repo, hash_mode="tree", block_size=BLOCK).sign_file(binary)
+
+        self.assertEqual(binary.hash_mode, "tree")
+        self.assertEqual(len(binary.block_hashes), 6)
+        self.assertEqual(signature, merkle_root(binary.block_hashes))
+        self.assertEqual(binary.signing_updates()["block_hashes"], binary.block_hashes)
+
+        with open(signed_path, "rb") as f:
+            self.assertTrue(f.read().endswith(signature.encode("utf-8")))
+
+
+class TestHashAlgorithms(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.file_repo = FileRepository(self.tmp.name)
+        self.data = os.urandom(3 * BLOCK + 7)
+        self.path = self.file_repo.save(self.data, "image")
+        self.crypto = CryptoAdapter(self.file_repo, environment_algorithms={"dev": "blake2b"})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def binary(self, environment, **fields):
+        return BinaryFile(id="image", filename="fw.bin", environment=environment, status="approved",
+                          file_path=self.path, **fields)
+
+    def test_each_environment_signs_with_its_algorithm(self):
+        dev, prod = self.binary("dev"), self.binary("prod")
+        self.assertEqual(self.crypto.sign_file(dev)[0], hashlib.blake2b(self.data).hexdigest())
+        self.assertEqual(self.crypto.sign_file(prod)[0], hashlib.sha256(self.data).hexdigest())
+
+        self.assertEqual(dev.signing_updates()["hash_algorithm"], "blake2b")
+        self.assertEqual(BinaryFile.from_dict(prod.to_dict()).hash_algorithm, "sha256")
+        self.assertNotEqual(self.crypto.key_id, CryptoAdapter(self.file_repo).key_id)
+
+    def test_digest_from_another_algorithm_is_not_reused(self):
+        # Un digest SHA-256 de antes del cambio de configuración no es la firma blake2b
+        binary = self.binary("dev", digest=hashlib.sha256(self.data).hexdigest())
+        self.assertEqual(self.crypto.sign_file(binary)[0], hashlib.blake2b(self.data).hexdigest())
+
+    def test_chunked_upload_hashes_with_the_environment_algorithm(self):
+        uploads = UploadSessionRepository(self.tmp.name)
+        upload_id = uploads.create_session("fw.bin", "dev", len(self.data), hash_algorithm="sha512")["upload_id"]
+        uploads.write_chunk(upload_id, 0, io.BytesIO(self.data))
+        session = uploads.finalize(upload_id)
+
+        self.assertEqual(session["hash_algorithm"], "sha512")
+        self.assertEqual(session["digest"], hashlib.sha512(self.data).hexdigest())
+
+    def test_tree_mode_uses_the_algorithm_for_leaves_and_nodes(self):
+        crypto = CryptoAdapter(self.file_repo, hash_mode="tree", block_size=BLOCK, hash_algorithm="sha512")
+        binary = self.binary("prod")
+        root, _ = crypto.sign_file(binary)
+
+        self.assertEqual(binary.hash_algorithm, "sha512")
+        self.assertEqual(root, merkle_root(binary.block_hashes, "sha512"))
+        proof = merkle_proof(binary.block_hashes, 0, "sha512")
+        self.assertTrue(verify_block(self.data[:BLOCK], 0, proof, root, len(binary.block_hashes), "sha512"))
+        self.assertFalse(verify_block(self.data[:BLOCK], 0, proof, root, len(binary.block_hashes)))
+
+    def test_unknown_algorithm_is_rejected_when_configured(self):
+        with self.assertRaises(ValueError):
+            CryptoAdapter(self.file_repo, environment_algorithms={"dev": "md5"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+# bench_hash_algorithms.py
+# Compara el rendimiento de cada algoritmo de hash de la firma
+# (sha256, sha512, blake2b y blake3 si está instalado) para varios
+# tamaños de imagen, en modo lineal y, opcionalmente, en árbol.
+#
+# Uso (desde la raíz del proyecto):
+#   python tools/bench_hash_algorithms.py --sizes-mb 16 256 1024 --tree
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.common.hashing import HASH_ALGORITHMS, check_algorithm, new_hash
+from src.infrastructure.tree_hasher import TreeHasher, DEFAULT_BLOCK_SIZE
+
+
+def linear_hash(path, algorithm):
+    hasher = new_hash(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def best_of(runs, fn, *args):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+parser = argparse.ArgumentParser(description="Benchmark signing hash algorithms")
+parser.add_argument("--sizes-mb", type=int, nargs="+", default=[16, 256], help="Tamaños de imagen a medir")
+parser.add_argument("--algorithms", nargs="+", default=list(HASH_ALGORITHMS), help="Algoritmos a comparar")
+parser.add_argument("--runs", type=int, default=3, help="Repeticiones (se toma la mejor)")
+parser.add_argument("--tree", action="store_true", help="Medir también el modo árbol")
+parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="Bloque del modo árbol (bytes)")
+parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Procesos del modo árbol")
+args = parser.parse_args()
+
+algorithms = []
+for algorithm in args.algorithms:
+    try:
+        algorithms.append(check_algorithm(algorithm))
+    except ImportError as e:
+        print(f"(se omite {algorithm}: {e})")
+
+print(f"{'algoritmo':<10} {'MiB':>6} {'lineal MiB/s':>13}" + (f" {'árbol MiB/s':>12}" if args.tree else ""))
+
+for size_mb in args.sizes_mb:
+    with tempfile.NamedTemporaryFile(delete=False) as tmp:
+        block = os.urandom(1024 * 1024)
+        for _ in range(size_mb):
+            tmp.write(block)
+        path = tmp.name
+
+    try:
+        # Primera lectura para medir con el archivo en la caché de páginas
+        linear_hash(path, "sha256")
+
+        for algorithm in algorithms:
+            linear = best_of(args.runs, linear_hash, path, algorithm)
+            line = f"{algorithm:<10} {size_mb:>6} {size_mb / linear:>13.1f}"
+            if args.tree:
+                hasher = TreeHasher(args.block_size, args.workers, algorithm)
+                tree = best_of(args.runs, hasher.hash_file, path)
+                line += f" {size_mb / tree:>12.1f}"
+            print(line)
+    finally:
+        os.remove(path)
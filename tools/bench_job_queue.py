@@ -0,0 +1,50 @@
+# bench_job_queue.py
+# Mide el rendimiento de la cola de trabajos persistente: encolar,
+# tomar y completar trabajos en lotes (sin ejecutar nada).
+#
+# Uso (desde la raíz del proyecto):
+#   python tools/bench_job_queue.py --jobs 20000 --batch 50
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.infrastructure.job_queue import SqliteJobQueue
+
+parser = argparse.ArgumentParser(description="Benchmark the SQLite job queue")
+parser.add_argument("--jobs", type=int, default=20000, help="Trabajos a procesar")
+parser.add_argument("--batch", type=int, default=50, help="Trabajos por préstamo")
+args = parser.parse_args()
+
+with tempfile.TemporaryDirectory() as tmp:
+    queue = SqliteJobQueue(os.path.join(tmp, "jobs.sqlite"))
+
+    start = time.perf_counter()
+    for n in range(0, args.jobs, 1000):
+        queue.enqueue_many("email", [{"file_id": str(i)} for i in range(n, min(args.jobs, n + 1000))])
+    enqueue_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    done = 0
+    while True:
+        jobs = queue.lease(["email"], limit=args.batch)
+        if not jobs:
+            break
+        queue.complete_many([job["id"] for job in jobs])
+        done += len(jobs)
+    drain_s = time.perf_counter() - start
+
+    # Una transacción por trabajo, como en el camino de una petición
+    start = time.perf_counter()
+    single = min(args.jobs, 2000)
+    for i in range(single):
+        job_id = queue.enqueue("sign", {"file_id": str(i)}, dedupe_key=f"sign:{i}", lease_seconds=60)
+        queue.complete(job_id)
+    single_s = time.perf_counter() - start
+
+print(f"enqueue_many:          {args.jobs / enqueue_s:10.0f} jobs/s")
+print(f"lease+complete (x{args.batch}): {done / drain_s:10.0f} jobs/s")
+print(f"claim+complete (1x1):  {single / single_s:10.0f} jobs/s")
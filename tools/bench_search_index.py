@@ -0,0 +1,55 @@
+# bench_search_index.py
+# Mide el índice de búsqueda por prefijo: construcción, latencia de
+# búsqueda (p50/p99) e inserciones incrementales.
+#
+# Uso (desde la raíz del proyecto):
+#   python tools/bench_search_index.py --records 1000000
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.infrastructure.search_index import RecordSearchIndex
+
+parser = argparse.ArgumentParser(description="Benchmark the record search index")
+parser.add_argument("--records", type=int, default=1000000, help="Registros en el índice")
+parser.add_argument("--queries", type=int, default=2000, help="Búsquedas a medir")
+args = parser.parse_args()
+
+products = ["gateway", "sensor", "camera", "router", "meter", "hub"]
+records = [
+    {
+        "id": f"{random.getrandbits(128):032x}",
+        "filename": f"{random.choice(products)}_fw_v{i % 7}.{i % 13}.{i}.bin",
+        "environment": "prod",
+        "status": "signed",
+    }
+    for i in range(args.records)
+]
+
+index = RecordSearchIndex()
+start = time.perf_counter()
+index.build(records)
+build_s = time.perf_counter() - start
+
+queries = [random.choice(products)[:random.randint(1, 6)] for _ in range(args.queries // 2)]
+queries += [r["id"][:6] for r in random.sample(records, args.queries // 2)]
+latencies = []
+for query in queries:
+    start = time.perf_counter()
+    index.search(query, 20)
+    latencies.append(time.perf_counter() - start)
+latencies.sort()
+
+start = time.perf_counter()
+for i in range(1000):
+    index.add({"id": f"new{i}", "filename": f"gateway_fw_v9.{i}.bin"})
+add_s = (time.perf_counter() - start) / 1000
+
+print(f"build ({args.records} records): {build_s:8.2f} s")
+print(f"search p50:             {latencies[len(latencies) // 2] * 1000:8.3f} ms")
+print(f"search p99:             {latencies[int(len(latencies) * 0.99)] * 1000:8.3f} ms")
+print(f"add (incremental):      {add_s * 1000:8.3f} ms")
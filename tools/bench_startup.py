@@ -0,0 +1,54 @@
+# bench_startup.py
+# Mide el tiempo de arranque en frío de la aplicación usando
+# `python -X importtime` y muestra los módulos más costosos.
+#
+# Uso (desde la raíz del proyecto):
+#   python tools/bench_startup.py --runs 5 --top 15
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Importa la app y la construye, como lo haría un worker al arrancar
+STARTUP_CODE = "from src.app.main import create_app; create_app()"
+
+
+def import_times(code):
+    """
+    Ejecuta `code` en un intérprete nuevo y devuelve
+    {módulo: tiempo acumulado en microsegundos}.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative)
+    return times
+
+
+parser = argparse.ArgumentParser(description="Cold start benchmark (-X importtime)")
+parser.add_argument("--runs", type=int, default=5, help="Intérpretes nuevos a medir")
+parser.add_argument("--top", type=int, default=15, help="Módulos más costosos a mostrar")
+args = parser.parse_args()
+
+runs = [import_times(STARTUP_CODE) for _ in range(args.runs)]
+last = runs[-1]
+
+for module in ("src.app.main", "src.app.routes", "flask"):
+    values = [r[module] for r in runs if module in r]
+    if values:
+        print(f"{module:<20} mediana {statistics.median(values) / 1000:8.1f} ms")
+
+print(f"\nTop {args.top} (acumulado, última ejecución):")
+for module, us in sorted(last.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+    print(f"  {us / 1000:8.1f} ms  {module}")
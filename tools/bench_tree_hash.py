@@ -0,0 +1,58 @@
+# bench_tree_hash.py
+# Compara el tiempo de hash de la firma en modo lineal (SHA-256 de un
+# solo flujo) contra el modo árbol (Merkle en paralelo sobre mmap).
+#
+# Uso (desde la raíz del proyecto):
+#   python tools/bench_tree_hash.py --size-mb 1024 --workers 8
+import os
+import sys
+import time
+import hashlib
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.infrastructure.tree_hasher import TreeHasher, DEFAULT_BLOCK_SIZE
+
+
+def linear_hash(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+parser = argparse.ArgumentParser(description="Benchmark linear vs tree hash")
+parser.add_argument("--size-mb", type=int, default=512, help="Tamaño de la imagen de prueba")
+parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="Tamaño de bloque (bytes)")
+parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Procesos del modo árbol")
+args = parser.parse_args()
+
+with tempfile.NamedTemporaryFile(delete=False) as tmp:
+    block = os.urandom(1024 * 1024)
+    for _ in range(args.size_mb):
+        tmp.write(block)
+    path = tmp.name
+
+try:
+    hasher = TreeHasher(args.block_size, args.workers)
+
+    # Primera lectura para que ambos modos midan con el archivo en caché
+    linear_hash(path)
+
+    linear = timed(linear_hash, path)
+    tree = timed(hasher.hash_file, path)
+
+    print(f"Imagen: {args.size_mb} MiB | bloque: {args.block_size} B | workers: {args.workers}")
+    print(f"linear: {linear:.3f} s  ({args.size_mb / linear:.1f} MiB/s)")
+    print(f"tree:   {tree:.3f} s  ({args.size_mb / tree:.1f} MiB/s)  x{linear / tree:.2f}")
+finally:
+    os.remove(path)
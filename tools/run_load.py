@@ -0,0 +1,149 @@
+# run_load.py
+# Prueba de carga local del servidor de producción (src/app/server.py):
+# arranca el servidor con 1 y con N workers sobre una carpeta de datos
+# temporal, envía cargas concurrentes a /upload y lecturas a
+# /api/metrics, y muestra peticiones por segundo y latencias. Al final
+# verifica que database.json tenga exactamente un registro por carga
+# aceptada (sin registros perdidos ni duplicados entre workers).
+#
+# Uso (desde la raíz del proyecto):
+#   python tools/run_load.py --workers 1 4 --requests 400 --concurrency 16
+#   python tools/run_load.py --workers 4 --reload   # SIGHUP a mitad de la prueba
+import os
+import sys
+import json
+import time
+import uuid
+import signal
+import socket
+import argparse
+import tempfile
+import statistics
+import subprocess
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers, data_dir, port):
+    env = dict(
+        os.environ,
+        PYTHONPATH=ROOT,
+        DATA_DIR=data_dir,
+        RATE_LIMIT_PER_MINUTE="0",
+        # Los correos se acumulan en modo resumen para no medir SMTP
+        EMAIL_DIGEST_WINDOW_SECONDS="86400",
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "src.app.server", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--graceful-timeout", "5"],
+        cwd=os.path.dirname(data_dir), env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/api/metrics", timeout=1).read()
+            return process
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("El servidor no respondió en 30 s")
+
+
+def upload(port, payload):
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="environment"\r\n\r\ndev\r\n'
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="fw-{uuid.uuid4().hex[:8]}.bin"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode() + payload + f"\r\n--{boundary}--\r\n".encode()
+
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}/upload", data=body, method="POST",
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+    )
+    with urllib.request.urlopen(request, timeout=60) as response:
+        return json.loads(response.read())["id"]
+
+
+def read_metrics(port):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/metrics", timeout=60) as response:
+        response.read()
+    return None
+
+
+def run(workers, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = os.path.join(tmp, "data")
+        port = free_port()
+        server = start_server(workers, data_dir, port)
+        payload = os.urandom(args.size_kb * 1024)
+
+        def one(i):
+            start = time.perf_counter()
+            try:
+                result = upload(port, payload) if i % 100 < args.upload_percent else read_metrics(port)
+                return True, result, time.perf_counter() - start
+            except Exception:
+                return False, None, time.perf_counter() - start
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(args.concurrency) as pool:
+                futures = [pool.submit(one, i) for i in range(args.requests)]
+                if args.reload:
+                    time.sleep(0.5)
+                    server.send_signal(signal.SIGHUP)
+                results = [f.result() for f in futures]
+            elapsed = time.perf_counter() - started
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+        latencies = sorted(r[2] for r in results)
+        failed = sum(1 for r in results if not r[0])
+        uploaded = [r[1] for r in results if r[0] and r[1]]
+
+        with open(os.path.join(data_dir, "database.json")) as f:
+            ids = [r["id"] for r in json.load(f)["records"]]
+
+        consistent = sorted(ids) == sorted(uploaded) and len(set(ids)) == len(ids)
+        print(
+            f"workers={workers:<3} {len(results) / elapsed:8.1f} req/s  "
+            f"p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+            f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:7.1f} ms  "
+            f"errores {failed}  registros {len(ids)}/{len(uploaded)} "
+            f"{'OK' if consistent else 'INCONSISTENTE'}"
+        )
+        return consistent and not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local load test for the multi-worker server")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1], help="Configuraciones a medir")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--size-kb", type=int, default=64, help="Tamaño de cada binario subido")
+    parser.add_argument("--upload-percent", type=int, default=50, help="Porcentaje de peticiones que son cargas")
+    parser.add_argument("--reload", action="store_true", help="Enviar SIGHUP durante la prueba")
+    args = parser.parse_args()
+
+    print(f"CPUs: {os.cpu_count()}  peticiones: {args.requests}  concurrencia: {args.concurrency}")
+    ok = all([run(w, args) for w in args.workers])
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()